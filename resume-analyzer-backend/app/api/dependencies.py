@@ -2,10 +2,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError, ExpiredSignatureError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_db
+from app.core.principal_cache import Principal, get_principal_cache
+from app.db.session import AsyncSessionLocal, get_async_db, get_db  # noqa: F401  (session deps re-exported for endpoints)
 from app.models.all_models import User
 from app.schemas.all_schemas import TokenData
 import logging
@@ -16,9 +17,13 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
+async def get_current_user(token: str = Depends(reusable_oauth2)) -> Principal:
+    """
+    The authenticated caller as a `Principal` (id, email, is_active).
+    Cached per (sub, iat), so a warm token costs a JWT decode and a dict
+    lookup — no session checkout, no query.  Endpoints that need the User
+    row load it themselves by `current_user.id`.
+    """
     try:
         payload = jwt.decode(
             token,
@@ -44,8 +49,27 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.id == int(token_data.sub)).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
 
+    cache = get_principal_cache()
+    iat = int(payload.get("iat") or 0)   # tokens issued before iat was added share one slot
+    principal = cache.get(token_data.sub, iat)
+    if principal is None:
+        principal = await _load_principal(token_data.sub)
+        cache.set(token_data.sub, iat, principal)
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+    return principal
+
+
+async def _load_principal(sub: str) -> Principal:
+    try:
+        user_id = int(sub)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Could not validate credentials")
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(User.id, User.email, User.is_active).where(User.id == user_id)
+        )).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return Principal(id=row.id, email=row.email, is_active=bool(row.is_active))
@@ -5,17 +5,22 @@ Includes:
   - API Credit Status
   - Career Risk Indicator (demand-based)
   - Skill Gap Heatmap (color-coded)
-  - Resume Benchmark Mode (FAANG comparison)
+  - Resume Benchmark Mode (population percentiles per role)
   - Resume Version Tracking (improvement over time)
   - System Status & Health
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List, Optional
 
 from app.api import dependencies as deps
-from app.db.session import get_db
-from app.models.all_models import User, Resume, ResumeVersion
+from app.db.session import get_async_db, get_db
+from app.core.principal_cache import Principal
+from app.models.all_models import Resume, ResumeVersion, defer_resume_text
+from app.services.score_percentile_service import ALL_SEGMENT, METRICS, ScorePercentileService
+from app.services.user_stats_service import UserStatsService
 
 router = APIRouter()
 
@@ -23,7 +28,7 @@ router = APIRouter()
 
 @router.get("/api-credits")
 def get_api_credit_status(
-    current_user: User = Depends(deps.get_current_user)
+    current_user: Principal = Depends(deps.get_current_user)
 ):
     """
     📊 Get daily API credit usage for all 3 AI services.
@@ -53,7 +58,7 @@ def check_credits_quick():
 @router.get("/career-risk")
 def get_career_risk(
     target_role: str = "Software Engineer",
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     🚨 Career Risk Indicator
@@ -140,7 +145,7 @@ def get_skill_heatmap(
     resume_id: int,
     target_role: str = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     🔥 Skill Gap Heatmap
@@ -227,23 +232,100 @@ def get_skill_heatmap(
 
 # ==================== RESUME BENCHMARK MODE ====================
 
+# Used until PERCENTILE_MIN_SAMPLES resumes have been scored (a fresh install)
+_REFERENCE_BENCHMARKS = {
+    "faang_average": {
+        "label": "FAANG Candidate Average",
+        "ats_score": 82.5,
+        "breakdown": {
+            "semantic_similarity": 85.0,
+            "skill_coverage": 80.0,
+            "experience_depth": 82.0,
+            "ats_format_score": 88.0,
+            "market_readiness": 85.0,
+        },
+    },
+    "iit_graduate": {
+        "label": "Top IIT/IIIT Graduate",
+        "ats_score": 72.0,
+        "breakdown": {
+            "semantic_similarity": 72.0,
+            "skill_coverage": 75.0,
+            "experience_depth": 60.0,
+            "ats_format_score": 80.0,
+            "market_readiness": 72.0,
+        },
+    },
+    "industry_average": {
+        "label": "Industry Average",
+        "ats_score": 55.0,
+        "breakdown": {
+            "semantic_similarity": 55.0,
+            "skill_coverage": 50.0,
+            "experience_depth": 45.0,
+            "ats_format_score": 65.0,
+            "market_readiness": 55.0,
+        },
+    },
+}
+
+
+def _reference_percentile(user_score: float) -> int:
+    if user_score >= 85:
+        return 95
+    if user_score >= 75:
+        return 80
+    if user_score >= 65:
+        return 65
+    if user_score >= 55:
+        return 45
+    return 25
+
+
+def _population_benchmarks(population, segment: str, overall) -> Dict[str, Dict[str, Any]]:
+    """Reference points (median, top 10%) read off the population histograms."""
+    name = "all resumes" if segment == ALL_SEGMENT else f"{segment} resumes"
+    points = [("top_10_percent", f"Top 10% of {name}", population, 0.9),
+              ("median", f"Median of {name}", population, 0.5)]
+    if segment != ALL_SEGMENT and overall is not None:
+        points.append(("overall_median", "Median of all resumes", overall, 0.5))
+    benchmarks = {}
+    for key, label, source, q in points:
+        ats_score = source.histograms["ats_score"].quantile(q)
+        if ats_score is None:
+            continue
+        breakdown = {}
+        for metric in METRICS[1:]:
+            value = source.histograms[metric].quantile(q)
+            if value is not None:
+                breakdown[metric] = value
+        benchmarks[key] = {
+            "label": label,
+            "ats_score": ats_score,
+            "breakdown": breakdown,
+        }
+    return benchmarks
+
+
 @router.get("/benchmark")
 def benchmark_resume(
     resume_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     📊 Resume Benchmark Mode
     ========================
-    Compare user's resume against:
-      - FAANG average template score
-      - IIT/IIIT graduate profile average
-      - Industry average
-
-    Returns percentile ranking and improvement areas.
+    Rank the resume against every scored resume for its predicted role (or
+    all resumes while the role has fewer than PERCENTILE_MIN_SAMPLES):
+      - Percentile of the ATS score and of each breakdown dimension
+      - Comparison with the population's top 10% and median
+
+    Percentiles come from the in-memory score distributions
+    (ScorePercentileService), not a scan of the resumes table.  Before enough
+    resumes exist, fixed reference profiles (FAANG / IIT / industry) are used.
     """
-    resume = db.query(Resume).filter(
+    resume = db.query(Resume.ats_score, Resume.score_breakdown, Resume.predicted_role).filter(
         Resume.id == resume_id,
         Resume.owner_id == current_user.id,
     ).first()
@@ -253,44 +335,21 @@ def benchmark_resume(
     user_score = resume.ats_score or 50.0
     breakdown = resume.score_breakdown or {}
 
-    # Benchmark reference scores
-    benchmarks = {
-        "faang_average": {
-            "label": "FAANG Candidate Average",
-            "ats_score": 82.5,
-            "breakdown": {
-                "semantic_similarity": 85.0,
-                "skill_coverage": 80.0,
-                "experience_depth": 82.0,
-                "ats_format_score": 88.0,
-                "market_readiness": 85.0,
-            },
-        },
-        "iit_graduate": {
-            "label": "Top IIT/IIIT Graduate",
-            "ats_score": 72.0,
-            "breakdown": {
-                "semantic_similarity": 72.0,
-                "skill_coverage": 75.0,
-                "experience_depth": 60.0,
-                "ats_format_score": 80.0,
-                "market_readiness": 72.0,
-            },
-        },
-        "industry_average": {
-            "label": "Industry Average",
-            "ats_score": 55.0,
-            "breakdown": {
-                "semantic_similarity": 55.0,
-                "skill_coverage": 50.0,
-                "experience_depth": 45.0,
-                "ats_format_score": 65.0,
-                "market_readiness": 55.0,
-            },
-        },
-    }
+    segment, population = ScorePercentileService.population(resume.predicted_role)
+    if population is not None:
+        percentile = round(population.histograms["ats_score"].percentile(user_score), 1)
+        _, overall = ScorePercentileService.population(None)
+        benchmarks = _population_benchmarks(population, segment, overall)
+        breakdown_percentiles = {
+            metric: round(population.histograms[metric].percentile(breakdown[metric]), 1)
+            for metric in METRICS[1:]
+            if isinstance(breakdown.get(metric), (int, float)) and population.histograms[metric].total
+        }
+    else:
+        percentile = _reference_percentile(user_score)
+        benchmarks = _REFERENCE_BENCHMARKS
+        breakdown_percentiles = {}
 
-    # Calculate percentile vs each benchmark
     comparisons = {}
     for key, bench in benchmarks.items():
         diff = round(user_score - bench["ats_score"], 1)
@@ -312,23 +371,15 @@ def benchmark_resume(
             },
         }
 
-    # Overall percentile estimate
-    if user_score >= 85:
-        percentile = 95
-    elif user_score >= 75:
-        percentile = 80
-    elif user_score >= 65:
-        percentile = 65
-    elif user_score >= 55:
-        percentile = 45
-    else:
-        percentile = 25
-
     return {
         "resume_id": resume_id,
         "user_score": user_score,
         "percentile": percentile,
-        "percentile_label": f"Top {100 - percentile}% of candidates",
+        "percentile_label": f"Top {max(round(100 - percentile), 1)}% of candidates",
+        "percentile_source": "population" if population is not None else "reference",
+        "segment": "all" if segment == ALL_SEGMENT else segment,
+        "sample_size": population.sample_count if population is not None else 0,
+        "breakdown_percentiles": breakdown_percentiles,
         "comparisons": comparisons,
     }
 
@@ -336,27 +387,27 @@ def benchmark_resume(
 # ==================== RESUME VERSION TRACKING ====================
 
 @router.get("/versions/{resume_id}")
-def get_resume_versions(
+async def get_resume_versions(
     resume_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     📋 Resume Version History
     =========================
     Get all analysis snapshots for a resume to track improvement over time.
     """
-    resume = db.query(Resume).filter(
+    resume = (await db.execute(select(Resume.id, Resume.ats_score).where(
         Resume.id == resume_id,
         Resume.owner_id == current_user.id,
-    ).first()
+    ))).first()
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    versions = db.query(ResumeVersion).filter(
+    versions = (await db.scalars(select(ResumeVersion).where(
         ResumeVersion.resume_id == resume_id,
         ResumeVersion.owner_id == current_user.id,
-    ).order_by(ResumeVersion.version_number.asc()).all()
+    ).order_by(ResumeVersion.version_number.asc()))).all()
 
     result = []
     for v in versions:
@@ -389,42 +440,42 @@ def get_resume_versions(
 
 
 @router.post("/versions/{resume_id}/snapshot")
-def create_version_snapshot(
+async def create_version_snapshot(
     resume_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     📸 Create a snapshot of the current resume analysis.
     Call this before and after rewrites to track improvement.
     """
-    resume = db.query(Resume).filter(
+    resume = await db.scalar(select(Resume).options(*defer_resume_text()).where(
         Resume.id == resume_id,
         Resume.owner_id == current_user.id,
-    ).first()
+    ))
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    # Get next version number
-    last_version = db.query(ResumeVersion).filter(
-        ResumeVersion.resume_id == resume_id,
-    ).order_by(ResumeVersion.version_number.desc()).first()
+    # Next version number and retention count in one index-only pass (ix_resume_versions_resume_version)
+    last_number, version_count = (await db.execute(
+        select(func.max(ResumeVersion.version_number), func.count())
+        .where(ResumeVersion.resume_id == resume_id)
+    )).one()
 
-    next_version = (last_version.version_number + 1) if last_version else 1
+    next_version = (last_number or 0) + 1
 
     # Retention limit: max 20 versions per resume
     MAX_VERSIONS = 20
-    version_count = db.query(ResumeVersion).filter(
-        ResumeVersion.resume_id == resume_id,
-    ).count()
+    pruned = 0
     if version_count >= MAX_VERSIONS:
         # Delete oldest versions beyond limit
-        oldest = db.query(ResumeVersion).filter(
+        oldest = await db.scalar(select(ResumeVersion).where(
             ResumeVersion.resume_id == resume_id,
-        ).order_by(ResumeVersion.version_number.asc()).first()
+        ).order_by(ResumeVersion.version_number.asc()).limit(1))
         if oldest:
-            db.delete(oldest)
-            db.flush()
+            await db.delete(oldest)
+            await db.flush()
+            pruned = 1
 
     snapshot = ResumeVersion(
         resume_id=resume_id,
@@ -438,8 +489,8 @@ def create_version_snapshot(
         key_strengths=resume.key_strengths,
     )
     db.add(snapshot)
-    db.commit()
-    db.refresh(snapshot)
+    await db.commit()
+    await db.run_sync(UserStatsService.record_snapshot, snapshot, pruned)
 
     return {
         "message": f"Version {next_version} snapshot created",
@@ -452,7 +503,7 @@ def create_version_snapshot(
 
 @router.get("/resume-templates")
 def get_resume_templates(
-    current_user: User = Depends(deps.get_current_user)
+    current_user: Principal = Depends(deps.get_current_user)
 ):
     """
     📄 Get available resume templates
@@ -496,7 +547,7 @@ def get_resume_templates(
 
 @router.get("/export-formats")
 def get_export_formats(
-    current_user: User = Depends(deps.get_current_user)
+    current_user: Principal = Depends(deps.get_current_user)
 ):
     """
     💾 Get available export formats for resumes
@@ -531,7 +582,7 @@ def get_export_formats(
 @router.get("/market-insights")
 def get_market_insights(
     target_role: str = "Software Engineer",
-    current_user: User = Depends(deps.get_current_user)
+    current_user: Principal = Depends(deps.get_current_user)
 ):
     """
     🌐 Get job market insights and trends
@@ -562,16 +613,16 @@ def get_market_insights(
 @router.get("/user-stats")
 def get_user_stats(
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: Principal = Depends(deps.get_current_user)
 ):
     """
     📊 Get user statistics and achievements
     """
     
-    resumes = db.query(Resume).filter(Resume.owner_id == current_user.id).all()
-    
-    total_resumes = len(resumes)
-    avg_score = sum(r.ats_score for r in resumes) / total_resumes if total_resumes > 0 else 0
+    summary = UserStatsService.summary(UserStatsService.get(db, current_user.id))   # one user_stats row
+    total_resumes = summary["total_resumes"]
+    avg_score = summary["average_ats_score"]
+    highest_score = summary["highest_score"]
     
     achievements = []
     
@@ -583,7 +634,7 @@ def get_user_stats(
             "unlocked": True
         })
     
-    if any(r.ats_score >= 80 for r in resumes):
+    if highest_score >= 80:
         achievements.append({
             "name": "ATS Master",
             "description": "Achieved 80+ ATS score",
@@ -604,7 +655,7 @@ def get_user_stats(
         "stats": {
             "total_resumes": total_resumes,
             "average_ats_score": round(avg_score, 2),
-            "highest_score": round(max((r.ats_score for r in resumes), default=0), 2)
+            "highest_score": round(highest_score, 2)
         },
         "achievements": achievements,
         "job_search_health": {
@@ -617,7 +668,7 @@ def get_user_stats(
 def get_salary_insights(
     role: str = "Software Engineer",
     experience_years: int = 3,
-    current_user: User = Depends(deps.get_current_user)
+    current_user: Principal = Depends(deps.get_current_user)
 ):
     """
     💰 Get salary insights for a role
@@ -647,7 +698,7 @@ def get_salary_insights(
 
 @router.get("/system-status")
 def get_system_status(
-    current_user: User = Depends(deps.get_current_user)
+    current_user: Principal = Depends(deps.get_current_user)
 ):
     """
     🏥 System health & component status.
@@ -664,8 +715,8 @@ def get_system_status(
                 "status": "online" if AIModelManager._gemini_configured else "offline",
             },
             "spacy": {
-                "loaded": AIModelManager._spacy_nlp is not None,
-                "status": "online" if AIModelManager._spacy_nlp is not None else "loading",
+                "loaded": AIModelManager._spacy_ner is not None,
+                "status": "online" if AIModelManager._spacy_ner is not None else "loading",
             },
             "rag_engine": {
                 "status": "online",
@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import dependencies as deps
-from app.models.all_models import User
+from app.db.session import get_async_db
+from app.core.principal_cache import Principal
+from app.models.all_models import Resume
+from app.api.streaming import event_stream_response
 from app.services.ai_rewrite_service import AIRewriteService
 from app.services.company_ats_service import CompanyATSService
 from app.services.latex_resume_service import LaTeXResumeService
@@ -28,7 +33,8 @@ class SingleCompanyATSRequest(BaseModel):
     target_role: Optional[str] = "Software Engineer"
 
 class LaTeXRequest(BaseModel):
-    resume_text: str
+    resume_text: str = ""
+    resume_id: Optional[int] = None  # stored resume: reuses its text and segmented sections
     template_id: Optional[str] = "classic"  # classic, modern, academic, minimal, executive
     target_role: Optional[str] = "Software Engineer"
 
@@ -48,7 +54,7 @@ class FullPipelineRequest(BaseModel):
 async def transform_resume(
     request: Request,
     rewrite_req: RewriteRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """AI Resume Transformer — rewrites resume for a specific role or JD."""
     from app.main import limiter
@@ -75,11 +81,42 @@ async def transform_resume(
     return await _run(request, rewrite_req)
 
 
+@router.post("/transform/stream")
+async def transform_resume_stream(
+    request: Request,
+    rewrite_req: RewriteRequest,
+    current_user: Principal = Depends(deps.get_current_user),
+):
+    """AI Resume Transformer, streamed as text/event-stream (token events, then done)."""
+    from app.main import limiter
+
+    @limiter.limit("20/minute")
+    async def _run(request, rewrite_req):
+        jd = rewrite_req.job_description or ""
+        if len(jd.strip()) < 80:
+            events = AIRewriteService.rewrite_section_stream(
+                text=rewrite_req.resume_text,
+                section_type="Entire Resume",
+                target_role=jd.strip() or "Software Engineer",
+                mode=rewrite_req.mode,
+            )
+        else:
+            events = AIRewriteService.rewrite_section_stream(
+                text=rewrite_req.resume_text,
+                section_type="Entire Resume",
+                job_description=jd,
+                mode=rewrite_req.mode,
+            )
+        return event_stream_response(events)
+
+    return await _run(request, rewrite_req)
+
+
 @router.post("/enhance-grammar")
 async def enhance_grammar(
     request: Request,
     grammar_req: GrammarRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """AI Grammar & Clarity Enhancer."""
     from app.main import limiter
@@ -97,7 +134,7 @@ async def enhance_grammar(
 @router.post("/company-ats")
 async def score_company_ats(
     ats_req: CompanyATSRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     🏢 Company-Specific ATS Simulator
@@ -114,7 +151,7 @@ async def score_company_ats(
 @router.post("/company-ats/single")
 async def score_single_company(
     ats_req: SingleCompanyATSRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """Score resume against a single company's ATS system."""
     return await CompanyATSService.score_for_company(
@@ -126,7 +163,7 @@ async def score_single_company(
 
 @router.get("/company-ats/companies")
 async def list_companies(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """List available company ATS profiles."""
     return CompanyATSService.get_available_companies()
@@ -139,7 +176,8 @@ async def list_companies(
 @router.post("/build-resume")
 async def build_resume(
     latex_req: LaTeXRequest,
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     📝 Self-Contained Resume Builder (OUR OWN TECHNOLOGY)
@@ -148,29 +186,56 @@ async def build_resume(
     5 templates: Classic, Modern, Academic, Minimal ATS, Executive.
     """
     from app.services.resume_builder_service import ResumeBuilderService
+    resume_text, sections = await _resume_text_and_sections(latex_req, db, current_user)
     return await ResumeBuilderService.build_resume(
-        resume_text=latex_req.resume_text,
+        resume_text=resume_text,
         template_id=latex_req.template_id,
         target_role=latex_req.target_role,
+        sections=sections,
     )
 
 
 @router.post("/latex")
 async def generate_latex_resume(
     latex_req: LaTeXRequest,
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """LaTeX code export (bonus feature — for users who want Overleaf)."""
+    resume_text, sections = await _resume_text_and_sections(latex_req, db, current_user)
     return await LaTeXResumeService.generate_latex(
-        resume_text=latex_req.resume_text,
+        resume_text=resume_text,
         template_id=latex_req.template_id,
         target_role=latex_req.target_role,
+        sections=sections,
     )
 
 
+async def _resume_text_and_sections(
+    latex_req: LaTeXRequest, db: AsyncSession, user: Principal,
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Text to build from, plus the stored section segmentation when it applies
+    (a resume_id whose text was not edited in the request).
+    """
+    from app.services.file_parser_service import AIRawParser
+    if latex_req.resume_id is None:
+        if not latex_req.resume_text.strip():
+            raise HTTPException(status_code=400, detail="Provide resume_text or resume_id.")
+        return latex_req.resume_text, None
+
+    resume = await db.scalar(select(Resume).where(Resume.id == latex_req.resume_id, Resume.owner_id == user.id))
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    stored_text = resume.content_text or ""
+    if latex_req.resume_text.strip() and latex_req.resume_text != stored_text:
+        return latex_req.resume_text, None   # edited client-side: stored offsets no longer line up
+    return stored_text, AIRawParser.sections_for(resume)
+
+
 @router.get("/templates")
 async def list_templates(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """List available resume templates."""
     from app.services.resume_builder_service import ResumeBuilderService
@@ -188,7 +253,7 @@ class InterviewPrepRequest(BaseModel):
 @router.post("/interview-prep")
 async def generate_interview_prep(
     req: InterviewPrepRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     🎯 AI Interview Prep Engine
@@ -209,7 +274,7 @@ async def generate_interview_prep(
 @router.post("/strength-radar")
 async def resume_strength_radar(
     req: InterviewPrepRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     📊 Resume Strength Radar
@@ -230,7 +295,7 @@ async def resume_strength_radar(
 @router.post("/pipeline")
 async def full_pipeline(
     req: FullPipelineRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     🚀 FULL AUTO-PIPELINE (Our Own Technology)
@@ -305,7 +370,7 @@ class AutoApplyRequest(BaseModel):
 @router.post("/auto-apply")
 async def search_and_auto_apply(
     req: AutoApplyRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     🚀 Auto-Apply Engine
@@ -326,7 +391,7 @@ async def search_and_auto_apply(
 @router.post("/apply-links")
 async def generate_apply_links(
     req: AutoApplyRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     🔗 Quick Apply Links
@@ -344,7 +409,7 @@ async def generate_apply_links(
 
 @router.get("/platforms")
 async def list_job_platforms(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """List all supported job platforms for auto-apply."""
     from app.services.auto_apply_service import AutoApplyService
@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from pathlib import Path
 from app.api import dependencies as deps
 from app.db.session import get_db
-from app.models.all_models import Resume, JobDescription, User
+from app.core.principal_cache import Principal
+from app.models.all_models import Resume, JobDescription
 from app.schemas.all_schemas import JobMatchResult, JobDescriptionCreate
 from typing import List
 import urllib.parse
@@ -206,7 +207,7 @@ def _build_result(idx: int, job: dict, base_score: float) -> dict:
 def recommend_jobs(
     resume_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     Returns real live job recommendations using SerpAPI (primary).
@@ -252,7 +253,7 @@ def match_job_to_resume(
     resume_id: int,
     job_desc: JobDescriptionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     resume = db.query(Resume).filter(
         Resume.id == resume_id, Resume.owner_id == current_user.id
@@ -266,7 +267,7 @@ def match_job_to_resume(
 def create_job(
     job_in: JobDescriptionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     db_job = JobDescription(
         title=job_in.title,
@@ -3,6 +3,8 @@ LinkedIn Integration API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel, EmailStr
@@ -11,10 +13,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-from app.api.dependencies import get_current_user, get_db
+from app.api.dependencies import get_current_user, get_async_db, get_db
+from app.core.principal_cache import Principal
 from app.models.all_models import User
 from app.models.application import Application
 from app.services.linkedin_service import LinkedInService
+from app.services.user_stats_service import UserStatsService
 from app.schemas.linkedin import (
     LinkedInLoginRequest,
     LinkedInLoginResponse,
@@ -35,7 +39,7 @@ linkedin_sessions = {}
 @router.post("/connect", response_model=LinkedInLoginResponse)
 def connect_linkedin(
     request: LinkedInLoginRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -69,7 +73,7 @@ def connect_linkedin(
 @router.post("/search-jobs", response_model=JobSearchResponse)
 def search_jobs(
     request: JobSearchRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -117,7 +121,7 @@ def search_jobs(
 def auto_apply(
     request: AutoApplyRequest,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -144,12 +148,13 @@ def auto_apply(
             raise HTTPException(status_code=404, detail="Resume not found")
         
         # Prepare resume data for application
+        full_name = db.get(User, current_user.id).full_name
         resume_data = {
             'text': resume.content_text,
             'email': current_user.email,
             'phone': '',
-            'first_name': current_user.full_name.split()[0] if current_user.full_name else '',
-            'last_name': ' '.join(current_user.full_name.split()[1:]) if current_user.full_name else '',
+            'first_name': full_name.split()[0] if full_name else '',
+            'last_name': ' '.join(full_name.split()[1:]) if full_name else '',
             'location': request.location or '',
             'linkedin_url': '',
             'website': ''
@@ -177,7 +182,7 @@ def auto_apply(
 @router.post("/generate-cover-letter", response_model=CoverLetterResponse)
 def generate_cover_letter(
     request: CoverLetterRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -213,24 +218,26 @@ def generate_cover_letter(
 
 
 @router.get("/applications")
-def get_applications(
+async def get_applications(
     skip: int = 0,
     limit: int = 50,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user's job applications
     """
     try:
-        applications = db.query(Application).filter(
+        applications = (await db.scalars(select(Application).where(
             Application.user_id == current_user.id
-        ).order_by(Application.applied_at.desc()).offset(skip).limit(limit).all()
+        ).order_by(Application.applied_at.desc()).offset(skip).limit(limit))).all()
         
         return {
             'success': True,
             'applications': applications,
-            'total': db.query(Application).filter(Application.user_id == current_user.id).count()
+            'total': await db.scalar(
+                select(func.count()).select_from(Application).where(Application.user_id == current_user.id)
+            )
         }
         
     except Exception as e:
@@ -238,35 +245,20 @@ def get_applications(
 
 
 @router.get("/applications/stats")
-def get_application_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_application_stats(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get statistics about user's applications
     """
     try:
-        total_applications = db.query(Application).filter(
-            Application.user_id == current_user.id
-        ).count()
-        
-        successful_applications = db.query(Application).filter(
-            Application.user_id == current_user.id,
-            Application.status == 'applied'
-        ).count()
-        
-        failed_applications = db.query(Application).filter(
-            Application.user_id == current_user.id,
-            Application.status == 'failed'
-        ).count()
-        
-        # Get applications by date (last 30 days)
-        from datetime import timedelta
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_applications = db.query(Application).filter(
-            Application.user_id == current_user.id,
-            Application.applied_at >= thirty_days_ago
-        ).count()
+        # Read from the user's rollup row instead of counting their applications
+        summary = UserStatsService.summary(await db.run_sync(UserStatsService.get, current_user.id))
+        total_applications = summary['applications_total']
+        successful_applications = summary['applications_applied']
+        failed_applications = summary['applications_failed']
+        recent_applications = summary['applications_last_30_days']
         
         return {
             'success': True,
@@ -285,7 +277,7 @@ def get_application_stats(
 
 @router.delete("/disconnect")
 def disconnect_linkedin(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -337,6 +329,7 @@ def run_auto_apply(user_id: int, resume_data: dict, search_params: dict, db: Ses
         )
         
         # Save applications to database
+        applications = []
         for app_result in results['applications']:
             application = Application(
                 user_id=user_id,
@@ -349,8 +342,10 @@ def run_auto_apply(user_id: int, resume_data: dict, search_params: dict, db: Ses
                 platform='linkedin'
             )
             db.add(application)
+            applications.append(application)
         
         db.commit()
+        UserStatsService.record_applications(db, user_id, applications)
         linkedin_service.close()
         
     except Exception as e:
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 from app.api import dependencies as deps
-from app.db.session import get_db
-from app.models.all_models import User, Resume
+from app.db.session import get_async_db
+from app.core.principal_cache import Principal
+from app.models.all_models import Resume
+from app.api.streaming import event_stream_response
 from app.services.mentor_service import MentorService
 from app.career_engine.mentor_bot_service import AIMentorBot
 from app.career_engine.career_predictor import CareerPredictor
@@ -35,8 +38,8 @@ class CareerProfile(BaseModel):
 async def chat_with_mentor(
     request: Request,
     chat_req: ChatRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     Direct Chat with AI Career Mentor.
@@ -49,10 +52,10 @@ async def chat_with_mentor(
     async def _chat(request, chat_req, db, current_user):
         resume_content = None
         if chat_req.resume_id:
-            resume = db.query(Resume).filter(
+            resume = await db.scalar(select(Resume).where(
                 Resume.id == chat_req.resume_id,
                 Resume.owner_id == current_user.id
-            ).first()
+            ))
             if resume:
                 resume_content = resume.content_text
 
@@ -70,10 +73,46 @@ async def chat_with_mentor(
 
     return await _chat(request, chat_req, db, current_user)
 
+@router.post("/chat/stream")
+async def chat_with_mentor_stream(
+    request: Request,
+    chat_req: ChatRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
+):
+    """
+    Chat with the AI Career Mentor, streamed as text/event-stream.
+    Token events arrive as the model writes; without AI, one fallback event.
+    """
+    from app.main import limiter
+
+    @limiter.limit("30/minute")
+    async def _chat(request, chat_req, db, current_user):
+        resume_content = None
+        if chat_req.resume_id:
+            resume = await db.scalar(select(Resume).where(
+                Resume.id == chat_req.resume_id,
+                Resume.owner_id == current_user.id
+            ))
+            if resume:
+                resume_content = resume.content_text
+
+        history = None
+        if chat_req.chat_history:
+            history = [{"role": m.role, "content": m.content} for m in chat_req.chat_history]
+
+        return event_stream_response(MentorService.get_advice_stream(
+            user_question=chat_req.question,
+            resume_context=resume_content,
+            chat_history=history,
+        ))
+
+    return await _chat(request, chat_req, db, current_user)
+
 @router.post("/insight")
 async def get_mentor_insight(
     request: MentorInsightRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     Get deep AI insights (Roadmap, Fit Analysis, Skill Graph).
@@ -86,19 +125,19 @@ async def get_mentor_insight(
     )
 
 @router.post("/predict")
-def predict_career(
+async def predict_career(
     profile: CareerProfile,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     Predict career paths based on profile branch and skills.
     """
-    return CareerPredictor.predict_paths(profile.branch, profile.skills, profile.interests)
+    return await CareerPredictor.predict_paths(profile.branch, profile.skills, profile.interests)
 
 @router.get("/strategy/{tier}")
 def get_resume_strategy(
     tier: str,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     Get industry-specific resume strategies (FAANG, MNC, startup).
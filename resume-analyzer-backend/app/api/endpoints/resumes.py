@@ -1,19 +1,29 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status, Request
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import dependencies as deps
-from app.db.session import get_db
-from app.models.all_models import Resume, User
-from app.schemas.all_schemas import ResumeDetailedAnalysis, ResumeInDBBase, ResumeCreate
+from app.db.session import get_async_db
+from app.core.principal_cache import Principal
+from app.models.all_models import Resume, UploadJob
+from app.schemas.all_schemas import ResumeDetailedAnalysis, ResumeSummary, ResumeCreate, UploadJobAccepted, UploadJobStatus
 from app.services.ai_parser_service import AIParserService
-from app.services.file_parser_service import AIRawParser
-from app.services.ats_scoring_service import ATSScoringService
+from app.services.ocr_pool import get_ocr_pool
+from app.services.upload_pipeline import UploadPipeline, TERMINAL_STATUSES
+from app.core.config import settings
 from app.core.resilience import validate_file_content
-import os
+from app.core.blob_store import get_blob_store
+from app.api.streaming import SSE_HEADERS, sse_event
+from app.api.uploads import receive_upload
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import time
 
-router = APIRouter()
+JOB_EVENTS_POLL_SECONDS = 0.5
+JOB_EVENTS_MAX_SECONDS = 600
 
-from fastapi import BackgroundTasks
+router = APIRouter()
 
 import logging
 
@@ -21,236 +31,177 @@ import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-def process_ai_features_wrapper(resume_id, text, user_id, target_role=None):
-    # Create new DB session for background task
-    from app.db.session import SessionLocal
-    db = SessionLocal()
-    try:
-        process_ai_features(resume_id, text, user_id, db, target_role)
-    except Exception as e:
-        logger.error(f"Wrapper failed: {e}")
-    finally:
-        db.close()
-
-def process_ai_features(
-    resume_id: int,
-    extracted_text: str,
-    user_id: int,
-    db: Session,
-    target_role: str = None,  # ← explicit role from user's input
-):
-    """
-    Background task: rewrite the resume for the specified or predicted role.
-    Role prediction is SKIPPED if the user already specified target_role.
-    """
-    logger.info(f"Starting AI rewrite for resume {resume_id}, target={target_role}...")
-    try:
-        detected_role = target_role  # use user's choice directly if provided
-
-        # Only run prediction if user didn't specify a role
-        if not detected_role:
-            from app.services.job_prediction_service import JobPredictionService
-            logger.info("No target role specified — predicting from resume...")
-            predicted_role_data = JobPredictionService.predict_job_role(extracted_text)
-            if predicted_role_data and isinstance(predicted_role_data, list):
-                detected_role = predicted_role_data[0].get('role', 'Software Engineer')
-            else:
-                detected_role = "Software Engineer"
-            logger.info(f"Predicted role: {detected_role}")
-
-        # AI Rewrite for the chosen / predicted role
-        from app.services.ai_rewrite_service import AIRewriteService
-        import asyncio
-
-        logger.info(f"Rewriting resume for role: {detected_role}...")
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        ai_rewritten_text = loop.run_until_complete(
-            AIRewriteService.rewrite_section(
-                text=extracted_text[:4000],
-                section_type="Entire Resume",
-                target_role=detected_role,
-                company_type="MNC",
-            )
-        )
-        loop.close()
-        logger.info("Rewrite complete.")
-
-        # Update DB — keep predicted_role from the main analysis (Gemini already set it)
-        # Only update ai_rewritten_content here
-        resume = db.query(Resume).filter(Resume.id == resume_id).first()
-        if resume:
-            resume.ai_rewritten_content = ai_rewritten_text
-            db.commit()
-            logger.info(f"Resume {resume_id} rewrite saved to DB.")
-        else:
-            logger.error(f"Resume {resume_id} not found in DB during background task.")
-
-    except Exception as e:
-        logger.error(f"Error in background AI processing: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        try:
-            resume = db.query(Resume).filter(Resume.id == resume_id).first()
-            if resume:
-                resume.ai_rewritten_content = "AI rewrite failed. Please try the Optimize option manually."
-                db.commit()
-        except Exception as db_e:
-            logger.error(f"Failed to update resume status: {db_e}")
-
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 limiter = Limiter(key_func=get_remote_address)
 
-@router.post("/upload", response_model=ResumeDetailedAnalysis)
+@router.post(
+    "/upload",
+    response_model=UploadJobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    # The body is parsed by receive_upload (streamed), so describe the form for the docs here
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file", "title"],
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "title": {"type": "string"},
+                            "job_description": {"type": "string"},
+                        },
+                    }
+                }
+            },
+        }
+    },
+)
 @limiter.limit("10/minute")
 async def upload_resume(
     request: Request,
     *,
-    db: Session = Depends(get_db),
-    file: UploadFile = File(...),
-    title: str = Form(...),
-    job_description: Optional[str] = Form(None),
-    current_user: User = Depends(deps.get_current_user),
-    background_tasks: BackgroundTasks
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
-    Upload and analyze resume. AI features run in background for real-time responsiveness.
+    Validate and store the resume, then analyze it asynchronously.
+    Returns 202 with a job id; follow progress via the status / events
+    endpoints and fetch the analysis from the result endpoint.
     """
-    # 0. Security Validation
+    # 0. Security Validation — format and size are enforced while the body streams in
     ALLOWED_EXTENSIONS = {"pdf", "docx", "txt"}
     MAX_FILE_SIZE = 5 * 1024 * 1024 # 5MB
-    
-    file_ext = file.filename.split('.')[-1].lower()
-    if file_ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(status_code=400, detail="Security: Invalid file format. Only PDF and DOCX permitted.")
-        
-    # Read content to check size
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="Security: Document too large (Limit 5MB).")
-
-    # Validate file content (check for embedded scripts/malware)
+
+    upload = await receive_upload(
+        request, "file", max_bytes=MAX_FILE_SIZE, spool_dir="uploads", allowed_extensions=ALLOWED_EXTENSIONS,
+    )
     try:
-        validate_file_content(content, file.filename)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Security: {str(e)}")
+        title = upload.fields.get("title", "").strip()
+        if not title:
+            raise HTTPException(status_code=422, detail="Field required: title")
+        job_description = upload.fields.get("job_description") or None
 
-    # Seek back to start for parser
-    await file.seek(0)
+        # Validate file content (check for embedded scripts/malware) — only the head is sniffed
+        try:
+            validate_file_content(upload.head, upload.filename)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Security: {str(e)}")
+
+        # Scanned PDFs need the OCR pool — don't accept more work while it is saturated
+        ocr_pool = get_ocr_pool()
+        if upload.filename.lower().endswith(".pdf") and ocr_pool.is_full():
+            raise HTTPException(
+                status_code=429,
+                detail="OCR capacity is busy with other scanned documents. Please retry shortly.",
+                headers={"Retry-After": str(ocr_pool.retry_after())},
+            )
 
-    # 1. Parse File
-    try:
-        extracted_text = await AIRawParser.extract_text(file)
-    except Exception as e:
-        logger.error(f"Extraction Error: {str(e)}")
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Neural extraction failed: {str(e)}. Please ensure the file is not password-protected and contains readable text."
-        )
-        
-    if not extracted_text:
-         logger.warning(f"File {file.filename} yielded zero text.")
-         raise HTTPException(
-            status_code=400, 
-            detail="The system could not detect any readable text in this document. If this is a scanned image, ensure the quality is clear."
-         )
-
-    # 2. Analyze Resume
-    # Smart detection: short input = role name; long input = full job description
-    user_target_role = None
-    jd_text = None
-
-    if job_description:
-        if len(job_description.strip()) < 80:
-            # User typed a role name (e.g. "Devops", "Data Scientist")
-            user_target_role = job_description.strip()
-        else:
-            # User pasted a full job description
-            jd_text = job_description
-
-    analysis_result = await ATSScoringService.calculate_score(
-        extracted_text,
-        job_description=jd_text,
-        target_role=user_target_role,
-    )
-    parsed_sections = AIRawParser.extract_sections(extracted_text)
-
-    
-    # 3. Save File to Disk (use the already-read content bytes)
-    file_location = f"uploads/{current_user.id}_{file.filename}"
-    os.makedirs("uploads", exist_ok=True)
-    with open(file_location, "wb") as f:
-        f.write(content)   # `content` was read at the top — no second read needed
-        
-    db_resume = Resume(
-        title=title,
-        file_path=file_location,
-        file_type=file.filename.split('.')[-1],
-        content_text=extracted_text,
-        parsed_data=parsed_sections,
-        ats_score=analysis_result["ats_score"],
-        score_breakdown=analysis_result["breakdown"],
-        missing_keywords=analysis_result.get("missing_skills", []),
-        owner_id=current_user.id,
-        # ✅ Use Gemini-predicted role immediately — no more "Analyzing..." placeholder
-        predicted_role=analysis_result.get("predicted_role", "Analyzing..."),
-        ai_rewritten_content=None,
-        analysis=analysis_result.get("analysis"),
-        suggestions=analysis_result.get("suggestions"),
-        key_strengths=analysis_result.get("key_strengths"),
-        market_readiness=analysis_result.get("breakdown", {}).get("market_readiness", 85)
-    )
-    
-    db.add(db_resume)
-    db.commit()
-    db.refresh(db_resume)
-    
-    # 4. Background task: rewrite resume using the user's target role (or Gemini-predicted one)
-    rewrite_role = user_target_role or analysis_result.get("predicted_role", "Software Engineer")
-    background_tasks.add_task(
-        process_ai_features_wrapper,
-        db_resume.id,
-        extracted_text,
-        current_user.id,
-        rewrite_role,  # ← pass the correct role explicitly
-    )
+        # 1. Keep the file, once per distinct content: identical uploads share one
+        #    sha256-named blob (the spooled temp file is moved into place, not rewritten)
+        await asyncio.to_thread(get_blob_store().put, upload.path, upload.sha256, upload.size)
+    finally:
+        upload.discard()
 
-    # 5. Auto-create version snapshot for tracking
+    # 2. Queue the analysis (extract → score → predict → rewrite) — the upload's blob reference passes to it
     try:
-        from app.models.all_models import ResumeVersion
-        snapshot = ResumeVersion(
-            resume_id=db_resume.id,
-            owner_id=current_user.id,
-            version_number=1,
-            title=f"v1 - {title}",
-            ats_score=db_resume.ats_score,
-            predicted_role=db_resume.predicted_role,
-            score_breakdown=db_resume.score_breakdown,
-            missing_skills=db_resume.missing_keywords,
-            key_strengths=db_resume.key_strengths,
+        job = await UploadPipeline.create_job(db, current_user.id, title, upload.filename)
+        UploadPipeline.start(job.id, upload.sha256, upload.filename, title, job_description, current_user.id)
+    except Exception:
+        # No job owns the reference taken by put() — drop it so the blob can be reclaimed
+        await asyncio.to_thread(get_blob_store().release, upload.sha256)
+        raise
+
+    base = f"{settings.API_V1_STR}/resumes/jobs/{job.id}"
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": base,
+        "result_url": f"{base}/result",
+        "events_url": f"{base}/events",
+    }
+
+
+async def _get_owned_job(db: AsyncSession, job_id: str, user: Principal) -> UploadJob:
+    job = await db.scalar(select(UploadJob).where(UploadJob.id == job_id, UploadJob.owner_id == user.id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=UploadJobStatus)
+async def get_upload_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
+):
+    """Status of an upload job: current stage, per-stage timings (ms) and resume id once scored."""
+    return await _get_owned_job(db, job_id, current_user)
+
+
+@router.get("/jobs/{job_id}/result", response_model=ResumeDetailedAnalysis)
+async def get_upload_job_result(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
+):
+    """
+    Analysis for an upload job.  Available as soon as scoring is done (the
+    rewrite may still be running); 202 with the job status before that.
+    """
+    job = await _get_owned_job(db, job_id, current_user)
+    if job.resume_id is None:
+        if job.status == "failed":
+            raise HTTPException(status_code=422, detail=job.error or "Resume analysis failed")
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(UploadJobStatus.model_validate(job)),
         )
-        db.add(snapshot)
-        db.commit()
-    except Exception as e:
-        logger.warning("Auto-snapshot failed: %s", e)
+    return await get_resume(job.resume_id, db, current_user)
 
-    return db_resume
 
+@router.get("/jobs/{job_id}/events")
+async def stream_upload_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
+):
+    """SSE progress for an upload job: a `progress` event per change, then `done`."""
+    await _get_owned_job(db, job_id, current_user)
+
+    async def body():
+        yield ": stream open\n\n"
+        last = None
+        deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+        while time.monotonic() < deadline:
+            snapshot = await UploadPipeline.snapshot(job_id)
+            if snapshot is None:
+                break
+            if snapshot != last:
+                yield sse_event("progress", snapshot)
+                last = snapshot
+            if snapshot["status"] in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+        yield sse_event("done", {"status": last["status"] if last else "unknown"})
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @router.get("/{resume_id}", response_model=ResumeDetailedAnalysis)
-def get_resume(
+async def get_resume(
     resume_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
 ):
     """
     Get a specific resume analysis result.
     Returns cached AI analysis — no re-processing needed.
     """
-    resume = db.query(Resume).filter(Resume.id == resume_id, Resume.owner_id == current_user.id).first()
+    resume = await db.scalar(select(Resume).where(Resume.id == resume_id, Resume.owner_id == current_user.id))
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
@@ -281,19 +232,25 @@ def get_resume(
 
     return response_obj
 
-@router.get("/", response_model=List[ResumeInDBBase])
-def get_my_resumes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user),
+@router.get("/", response_model=List[ResumeSummary])
+async def get_my_resumes(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
     skip: int = 0,
     limit: int = 10,
 ):
     """
     List all uploaded resumes for the current user.
     """
-    resumes = db.query(Resume).filter(Resume.owner_id == current_user.id).offset(skip).limit(limit).all()
-    return resumes
-from app.schemas.all_schemas import RewriteRequest, JobPredictionRequest, ValidateFitRequest
+    # Column projection: listing never reads the extracted text / rewrite / analysis
+    rows = await db.execute(
+        select(*(getattr(Resume, name) for name in ResumeSummary.model_fields))
+        .where(Resume.owner_id == current_user.id)
+        .order_by(Resume.created_at, Resume.id)   # ix_resumes_owner_created
+        .offset(skip).limit(limit)
+    )
+    return rows.mappings().all()
+from app.schemas.all_schemas import RewriteRequest, JobPredictionRequest, ValidateFitRequest, BatchRoleMatchRequest
 from fastapi import Body
 
 from fastapi import Body, Request
@@ -319,6 +276,29 @@ async def rewrite_resume_section(
         )
     return await _rewrite(request, rewrite_req)
 
+@router.post("/rewrite/stream")
+async def rewrite_resume_section_stream(
+    request: Request,
+    rewrite_req: RewriteRequest = Body(...),
+):
+    """
+    Rewrite a resume section, streamed as text/event-stream so the first
+    lines show up while the rest is still being generated.
+    """
+    from app.main import limiter
+    from app.api.streaming import event_stream_response
+
+    @limiter.limit("20/minute")
+    async def _rewrite(request, rewrite_req):
+        from app.services.ai_rewrite_service import AIRewriteService
+        return event_stream_response(AIRewriteService.rewrite_section_stream(
+            text=rewrite_req.text,
+            section_type=rewrite_req.section_type,
+            target_role=rewrite_req.target_role,
+            company_type=rewrite_req.company_type,
+        ))
+    return await _rewrite(request, rewrite_req)
+
 @router.post("/predict-job")
 async def predict_job_role(
     request: JobPredictionRequest,
@@ -329,6 +309,35 @@ async def predict_job_role(
     from app.services.job_prediction_service import JobPredictionService
     return JobPredictionService.predict_job_role(request.text, request.candidate_labels)
 
+MAX_BATCH_RESUMES = 1000
+
+@router.post("/match-roles/batch")
+def match_roles_batch(
+    request: BatchRoleMatchRequest,
+    current_user: Principal = Depends(deps.get_current_user),
+):
+    """
+    Bulk screening: score many resumes against every role in one pass.
+    Returns one ranked list of role matches per resume, in input order
+    (plus one parsed profile per resume with include_profiles, NER-tagged
+    in one batched spaCy pass).
+    """
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="texts must contain at least one resume.")
+    if len(request.texts) > MAX_BATCH_RESUMES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BATCH_RESUMES} resumes per batch.",
+        )
+    from app.career_engine.semantic_role_matcher import SemanticRoleMatcher
+    top_k = max(1, min(request.top_k, 25))
+    response = {"results": SemanticRoleMatcher.find_roles_batch(request.texts, top_k=top_k)}
+    if request.include_profiles:
+        response["profiles"] = AIParserService.extract_structured_data_many(
+            request.texts, n_process=settings.SPACY_REQUEST_PIPE_PROCESSES,
+        )
+    return response
+
 @router.post("/validate-fit")
 async def validate_role_fit(
     request: ValidateFitRequest,
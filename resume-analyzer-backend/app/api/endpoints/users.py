@@ -2,25 +2,31 @@ from typing import Any, List
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.encoders import jsonable_encoder
 from pydantic.networks import EmailStr
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import dependencies as deps
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.all_models import User
+from app.core.principal_cache import Principal, invalidate_principal
+from app.db.session import get_async_db, get_db
+from app.models.all_models import User as UserModel
 from app.schemas.all_schemas import User, UserCreate, UserUpdate
 
 router = APIRouter()
 
 @router.get("/me", response_model=User)
-def read_user_me(
-    current_user: User = Depends(deps.get_current_user),
+async def read_user_me(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get current user.
     """
-    return current_user
+    user = await db.get(UserModel, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 @router.put("/me", response_model=User)
 def update_user_me(
@@ -29,11 +35,14 @@ def update_user_me(
     password: str = Body(None),
     full_name: str = Body(None),
     email: EmailStr = Body(None),
-    current_user: User = Depends(deps.get_current_user),
+    principal: Principal = Depends(deps.get_current_user),
 ) -> Any:
     """
     Update own user.
     """
+    current_user = db.get(UserModel, principal.id)
+    if not current_user:
+        raise HTTPException(status_code=404, detail="User not found")
     current_user_data = jsonable_encoder(current_user)
     user_in = UserUpdate(**current_user_data)
     
@@ -54,4 +63,5 @@ def update_user_me(
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
+    invalidate_principal(current_user.id)   # email may have changed
     return current_user
@@ -0,0 +1,46 @@
+"""Server-Sent Events helpers for the streaming endpoint variants.
+
+Wire format (one JSON payload per event):
+    event: token     data: {"text": "..."}   — a chunk of model output
+    event: fallback  data: {"text": "..."}   — whole keyword/mock answer, sent once
+    event: error     data: {"detail": "..."} — stream broke mid-way
+    event: done      data: {"chars": N}      — always last
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",   # stop nginx / Render proxies from buffering the stream
+}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream_response(events: AsyncIterator[Tuple[str, str]]) -> StreamingResponse:
+    """
+    Turn a service's (kind, text) stream into a text/event-stream response.
+    A comment line is flushed first so headers and the first byte go out
+    before the model has produced anything.
+    """
+    async def body():
+        yield ": stream open\n\n"
+        chars = 0
+        try:
+            async for kind, text in events:
+                chars += len(text)
+                yield sse_event(kind, {"text": text})
+        except Exception as e:
+            logger.error("SSE stream interrupted: %s", e)
+            yield sse_event("error", {"detail": "Stream interrupted. Please retry."})
+        yield sse_event("done", {"chars": chars})
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
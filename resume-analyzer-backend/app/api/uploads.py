@@ -0,0 +1,184 @@
+"""Streaming multipart upload reception.
+
+The request body is parsed as it arrives instead of being buffered by the
+form parser and then read again by the endpoint:
+
+  - The file part is written chunk by chunk to a temp file inside the
+    destination directory, so keeping it is an os.replace (rename), not a
+    second write
+  - Size is enforced while streaming: the upload is aborted with 413 as
+    soon as the file passes `max_bytes` (or up front, from Content-Length)
+  - The extension is checked from the part headers, before any bytes hit disk
+  - Only the first HEAD_BYTES of the file are kept in memory, for content
+    sniffing (validate_file_content); its sha256 is computed on the way in
+    (content-addressed storage, app/core/blob_store.py)
+
+Usage:
+    upload = await receive_upload(request, "file", max_bytes=5 * 1024 * 1024, spool_dir="uploads")
+    try:
+        validate_file_content(upload.head, upload.filename)
+        upload.persist(f"uploads/{user_id}_{upload.filename}")
+    finally:
+        upload.discard()   # no-op once persisted
+"""
+
+import os
+import hashlib
+import tempfile
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException, Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+HEAD_BYTES = 4096
+MAX_FIELD_BYTES = 64 * 1024      # title / job description
+_FORM_OVERHEAD_BYTES = 2 * MAX_FIELD_BYTES
+
+
+class StreamedUpload:
+    """A received file on disk (temp name until persisted) plus the form's text fields."""
+
+    def __init__(self, path: str, filename: str, size: int, sha256: str, head: bytes, fields: Dict[str, str]):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self.head = head
+        self.fields = fields
+        self._persisted = False
+
+    def persist(self, destination: str) -> str:
+        """Move the temp file into place (same directory → atomic rename)."""
+        os.replace(self.path, destination)
+        self.path = destination
+        self._persisted = True
+        return destination
+
+    def discard(self) -> None:
+        if self._persisted:
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _PartState:
+    def __init__(self):
+        self.headers: Dict[bytes, bytes] = {}
+        self.header_field = b""
+        self.header_value = b""
+        self.name: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.value = bytearray()
+
+
+async def receive_upload(
+    request: Request,
+    file_field: str,
+    max_bytes: int,
+    spool_dir: str,
+    allowed_extensions: Optional[Iterable[str]] = None,
+) -> StreamedUpload:
+    """
+    Stream a multipart/form-data body: `file_field` goes to a temp file in
+    `spool_dir`, every other field is returned as text.  Raises HTTPException
+    (400 / 413 / 422) and leaves nothing on disk on failure.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload.")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + _FORM_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Security: Document too large (Limit {max_bytes // (1024 * 1024)}MB).")
+
+    allowed = {ext.lower() for ext in allowed_extensions} if allowed_extensions else None
+    os.makedirs(spool_dir, exist_ok=True)
+
+    fields: Dict[str, str] = {}
+    events: List[tuple] = []
+    part = _PartState()
+    spool = None
+    filename = ""
+    size = 0
+    digest = hashlib.sha256()
+    head = bytearray()
+
+    callbacks = {
+        "on_part_begin": lambda: events.append(("begin", None)),
+        "on_part_data": lambda data, start, end: events.append(("data", bytes(data[start:end]))),
+        "on_part_end": lambda: events.append(("end", None)),
+        "on_header_field": lambda data, start, end: events.append(("hfield", bytes(data[start:end]))),
+        "on_header_value": lambda data, start, end: events.append(("hvalue", bytes(data[start:end]))),
+        "on_header_end": lambda: events.append(("hend", None)),
+        "on_headers_finished": lambda: events.append(("headers", None)),
+    }
+    parser = MultipartParser(boundary, callbacks)
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            # Callbacks only record events; act on them here where raising is safe
+            for kind, data in events:
+                if kind == "begin":
+                    part = _PartState()
+                elif kind == "hfield":
+                    part.header_field += data
+                elif kind == "hvalue":
+                    part.header_value += data
+                elif kind == "hend":
+                    part.headers[part.header_field.lower()] = part.header_value
+                    part.header_field, part.header_value = b"", b""
+                elif kind == "headers":
+                    _, disposition = parse_options_header(part.headers.get(b"content-disposition", b""))
+                    part.name = disposition.get(b"name", b"").decode("utf-8", "replace")
+                    if b"filename" in disposition and part.name == file_field:
+                        if spool is not None:
+                            raise HTTPException(status_code=400, detail="Only one file may be uploaded.")
+                        filename = os.path.basename(disposition[b"filename"].decode("utf-8", "replace"))
+                        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+                        if allowed is not None and ext not in allowed:
+                            raise HTTPException(
+                                status_code=400,
+                                detail=f"Security: Invalid file format. Only {', '.join(sorted(allowed)).upper()} permitted.",
+                            )
+                        spool = tempfile.NamedTemporaryFile(dir=spool_dir, prefix=".upload_", delete=False)
+                        part.filename = filename
+                elif kind == "data":
+                    if part.filename is not None:
+                        size += len(data)
+                        if size > max_bytes:
+                            logger.warning("Upload %s aborted mid-stream at %d bytes (limit %d)", filename, size, max_bytes)
+                            raise HTTPException(status_code=413, detail=f"Security: Document too large (Limit {max_bytes // (1024 * 1024)}MB).")
+                        if len(head) < HEAD_BYTES:
+                            head += data[:HEAD_BYTES - len(head)]
+                        spool.write(data)
+                        digest.update(data)
+                    else:
+                        part.value += data
+                        if len(part.value) > MAX_FIELD_BYTES:
+                            raise HTTPException(status_code=413, detail=f"Form field '{part.name}' is too large.")
+                elif kind == "end":
+                    if part.filename is None and part.name:
+                        fields[part.name] = part.value.decode("utf-8", "replace")
+            events.clear()
+        parser.finalize()
+
+        if spool is None:
+            raise HTTPException(status_code=422, detail=f"Field required: {file_field}")
+        spool.close()
+        return StreamedUpload(spool.name, filename, size, digest.hexdigest(), bytes(head), fields)
+    except BaseException:
+        # Includes client disconnects / cancellation mid-upload
+        if spool is not None:
+            spool.close()
+            try:
+                os.remove(spool.name)
+            except OSError:
+                pass
+        raise
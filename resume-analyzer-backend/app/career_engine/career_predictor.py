@@ -3,61 +3,27 @@ AI Career Prediction Engine — Powered by Gemini / OpenAI
 All predictions are live AI-generated, not from static databases.
 """
 
-import os
 import json
 import re
 import logging
-from pathlib import Path
-from dotenv import dotenv_values
 from typing import List, Dict, Any
 
 logger = logging.getLogger(__name__)
 
-_env_path = Path(__file__).resolve().parent.parent.parent / ".env"
-
-
-def _get_key(name: str) -> str:
-    vals = dotenv_values(_env_path)
-    return vals.get(name, "") or os.getenv(name, "")
-
-
-def _ai_predict(prompt: str, max_tokens: int = 800) -> str:
-    """Call Gemini (primary) or OpenAI (fallback) for career prediction."""
-
-    # Try Gemini first
-    gem_key = _get_key("GEMINI_API_KEY")
-    if gem_key and gem_key != "YOUR_NEW_KEY_HERE":
-        try:
-            import google.generativeai as genai
-            genai.configure(api_key=gem_key)
-            model = genai.GenerativeModel(
-                "gemini-2.0-flash",
-                generation_config={"temperature": 0.5, "max_output_tokens": max_tokens},
-            )
-            return model.generate_content(prompt).text
-        except Exception as e:
-            logger.warning(f"Gemini career prediction failed ({e}), trying OpenAI...")
-
-    # Try OpenAI
-    oai_key = _get_key("OPENAI_API_KEY")
-    if oai_key and oai_key.startswith("sk-"):
-        try:
-            from openai import OpenAI
-            client = OpenAI(api_key=oai_key)
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert career advisor. Return only valid JSON."},
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=max_tokens,
-                temperature=0.5,
-            )
-            return resp.choices[0].message.content or ""
-        except Exception as e:
-            logger.warning(f"OpenAI career prediction failed: {e}")
-
-    return ""
+
+async def _ai_predict(prompt: str, max_tokens: int = 800) -> str:
+    """Call Gemini (primary) or OpenAI (fallback) for career prediction via the shared AIProvider clients."""
+    from app.core.ai_provider import AIProvider
+    try:
+        return await AIProvider.generate(
+            prompt=prompt,
+            system_prompt="You are an expert career advisor. Return only valid JSON.",
+            max_tokens=max_tokens,
+            temperature=0.5,
+        )
+    except Exception as e:
+        logger.warning(f"AI career prediction failed: {e}")
+        return ""
 
 
 class CareerPredictor:
@@ -68,7 +34,7 @@ class CareerPredictor:
     """
 
     @staticmethod
-    def predict_paths(branch: str, skills: List[str], interests: List[str]) -> Dict[str, Any]:
+    async def predict_paths(branch: str, skills: List[str], interests: List[str]) -> Dict[str, Any]:
         """
         Uses AI to predict best-fit career domains and emerging roles
         based on the candidate's branch, skills, and interests.
@@ -114,7 +80,7 @@ RULES:
 - top_companies_hiring must be real companies currently hiring in India.
 - salary_outlook must be realistic for Indian market."""
 
-        raw = _ai_predict(prompt)
+        raw = await _ai_predict(prompt)
 
         if raw:
             try:
@@ -17,10 +17,104 @@ from pathlib import Path
 from dotenv import load_dotenv
 from typing import Dict, Any, List
 
+from app.services.ai_skill_ontology import SkillMatcher
+
 load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env", override=True)
 
 logger = logging.getLogger(__name__)
 
+# Domain configuration for the keyword fallback
+_KEYWORD_DOMAINS = [
+    {
+        "id": "ml",
+        "keywords": ["machine learning", "tensorflow", "pytorch", "deep learning", "nlp", "ai/ml", "scikit", "keras"],
+        "role": "Machine Learning Engineer",
+        "domain": "AI & Machine Learning",
+        "salary": "12-28 LPA",
+        "growth": 9.5,
+        "skills": ["PyTorch", "MLOps", "Deep Learning", "Transformers", "Feature Engineering"]
+    },
+    {
+        "id": "ds",
+        "keywords": ["data science", "pandas", "numpy", "matplotlib", "jupyter", "r programming", "statistics"],
+        "role": "Data Scientist",
+        "domain": "Data Science",
+        "salary": "10-24 LPA",
+        "growth": 8.8,
+        "skills": ["Statistical Analysis", "A/B Testing", "Tableau", "SQL Advanced", "Big Data"]
+    },
+    {
+        "id": "frontend",
+        "keywords": ["react", "angular", "vue", "frontend", "html5", "css3", "javascript", "typescript", "tailwind"],
+        "role": "Frontend Developer",
+        "domain": "Frontend Development",
+        "salary": "8-20 LPA",
+        "growth": 8.5,
+        "skills": ["React Hooks", "Next.js", "State Management", "Vitest", "Tailwind CSS"]
+    },
+    {
+        "id": "backend_node",
+        "keywords": ["node.js", "express", "backend", "mongodb", "rest api", "graphql", "nest.js"],
+        "role": "Backend Developer (Node.js)",
+        "domain": "Backend Development",
+        "salary": "9-22 LPA",
+        "growth": 8.7,
+        "skills": ["Express.js", "Microservices", "Redis", "PostgreSQL", "System Design"]
+    },
+    {
+        "id": "backend_python",
+        "keywords": ["fastapi", "django", "flask", "python", "sqlalchemy", "celery", "pydantic"],
+        "role": "Backend Developer (Python)",
+        "domain": "Backend Development",
+        "salary": "9-22 LPA",
+        "growth": 8.9,
+        "skills": ["FastAPI", "AsyncIO", "PostgreSQL", "Docker", "Event-Driven Dev"]
+    },
+    {
+        "id": "backend_java",
+        "keywords": ["java", "spring boot", "hibernate", "microservices", "jsp", "servlets", "maven"],
+        "role": "Java Full Stack Developer",
+        "domain": "Enterprise Software",
+        "salary": "10-24 LPA",
+        "growth": 8.2,
+        "skills": ["Spring Boot", "Microservices", "Kafka", "Cloud Foundation", "Docker"]
+    },
+    {
+        "id": "devops",
+        "keywords": ["docker", "kubernetes", "devops", "ci/cd", "terraform", "jenkins", "ansible", "aws", "prometheus"],
+        "role": "DevOps Engineer",
+        "domain": "DevOps & Cloud",
+        "salary": "11-26 LPA",
+        "growth": 9.0,
+        "skills": ["Kubernetes", "Terraform", "Cloud Networking", "CI/CD Pipelines", "Monitoring"]
+    },
+    {
+        "id": "mobile",
+        "keywords": ["android", "ios", "flutter", "react native", "swift", "kotlin", "mobile app"],
+        "role": "Mobile App Developer",
+        "domain": "Mobile Development",
+        "salary": "8-20 LPA",
+        "growth": 8.0,
+        "skills": ["Mobile UI/UX", "State Management", "Firebase", "App Publishing", "Native APIs"]
+    },
+    {
+        "id": "cyber",
+        "keywords": ["cybersecurity", "security", "penetration", "metasploit", "cryptography", "firewall", "nmap"],
+        "role": "Cybersecurity Analyst",
+        "domain": "Security Engineering",
+        "salary": "10-25 LPA",
+        "growth": 9.1,
+        "skills": ["Vulnerability Scanning", "Network Security", "Cloud Security", "IAM", "Compliance"]
+    }
+]
+
+# One compiled matcher over every domain keyword / skill, built at import time
+_DOMAIN_MATCHER = SkillMatcher({
+    term.lower(): term.lower()
+    for dom in _KEYWORD_DOMAINS
+    for term in dom["keywords"] + dom["skills"]
+})
+
 
 def _call_ai_sync(prompt: str, system: str = "You are an expert AI career analyst.", max_tokens: int = 1200) -> str:
     """
@@ -177,101 +271,16 @@ RULES:
     @staticmethod
     def _keyword_intel(resume_text: str, user_skills: List[str], target_role: str = None) -> Dict[str, Any]:
         """Highly granular keyword-based fallback with 90%+ accurate domain mapping."""
-        text_lower = resume_text.lower()
         skills_lower = {s.lower() for s in (user_skills or [])}
-
-        # Domain Configuration
-        DOMAINS = [
-            {
-                "id": "ml",
-                "keywords": ["machine learning", "tensorflow", "pytorch", "deep learning", "nlp", "ai/ml", "scikit", "keras"],
-                "role": "Machine Learning Engineer",
-                "domain": "AI & Machine Learning",
-                "salary": "12-28 LPA",
-                "growth": 9.5,
-                "skills": ["PyTorch", "MLOps", "Deep Learning", "Transformers", "Feature Engineering"]
-            },
-            {
-                "id": "ds",
-                "keywords": ["data science", "pandas", "numpy", "matplotlib", "jupyter", "r programming", "statistics"],
-                "role": "Data Scientist",
-                "domain": "Data Science",
-                "salary": "10-24 LPA",
-                "growth": 8.8,
-                "skills": ["Statistical Analysis", "A/B Testing", "Tableau", "SQL Advanced", "Big Data"]
-            },
-            {
-                "id": "frontend",
-                "keywords": ["react", "angular", "vue", "frontend", "html5", "css3", "javascript", "typescript", "tailwind"],
-                "role": "Frontend Developer",
-                "domain": "Frontend Development",
-                "salary": "8-20 LPA",
-                "growth": 8.5,
-                "skills": ["React Hooks", "Next.js", "State Management", "Vitest", "Tailwind CSS"]
-            },
-            {
-                "id": "backend_node",
-                "keywords": ["node.js", "express", "backend", "mongodb", "rest api", "graphql", "nest.js"],
-                "role": "Backend Developer (Node.js)",
-                "domain": "Backend Development",
-                "salary": "9-22 LPA",
-                "growth": 8.7,
-                "skills": ["Express.js", "Microservices", "Redis", "PostgreSQL", "System Design"]
-            },
-            {
-                "id": "backend_python",
-                "keywords": ["fastapi", "django", "flask", "python", "sqlalchemy", "celery", "pydantic"],
-                "role": "Backend Developer (Python)",
-                "domain": "Backend Development",
-                "salary": "9-22 LPA",
-                "growth": 8.9,
-                "skills": ["FastAPI", "AsyncIO", "PostgreSQL", "Docker", "Event-Driven Dev"]
-            },
-            {
-                "id": "backend_java",
-                "keywords": ["java", "spring boot", "hibernate", "microservices", "jsp", "servlets", "maven"],
-                "role": "Java Full Stack Developer",
-                "domain": "Enterprise Software",
-                "salary": "10-24 LPA",
-                "growth": 8.2,
-                "skills": ["Spring Boot", "Microservices", "Kafka", "Cloud Foundation", "Docker"]
-            },
-            {
-                "id": "devops",
-                "keywords": ["docker", "kubernetes", "devops", "ci/cd", "terraform", "jenkins", "ansible", "aws", "prometheus"],
-                "role": "DevOps Engineer",
-                "domain": "DevOps & Cloud",
-                "salary": "11-26 LPA",
-                "growth": 9.0,
-                "skills": ["Kubernetes", "Terraform", "Cloud Networking", "CI/CD Pipelines", "Monitoring"]
-            },
-            {
-                "id": "mobile",
-                "keywords": ["android", "ios", "flutter", "react native", "swift", "kotlin", "mobile app"],
-                "role": "Mobile App Developer",
-                "domain": "Mobile Development",
-                "salary": "8-20 LPA",
-                "growth": 8.0,
-                "skills": ["Mobile UI/UX", "State Management", "Firebase", "App Publishing", "Native APIs"]
-            },
-            {
-                "id": "cyber",
-                "keywords": ["cybersecurity", "security", "penetration", "metasploit", "cryptography", "firewall", "nmap"],
-                "role": "Cybersecurity Analyst",
-                "domain": "Security Engineering",
-                "salary": "10-25 LPA",
-                "growth": 9.1,
-                "skills": ["Vulnerability Scanning", "Network Security", "Cloud Security", "IAM", "Compliance"]
-            }
-        ]
+        found = _DOMAIN_MATCHER.find(resume_text)
 
         # Scoring System
         best_match = None
         highest_score = 0
 
-        for dom in DOMAINS:
-            score = sum(3 for k in dom["keywords"] if k in text_lower)
-            score += sum(1 for k in dom["skills"] if k.lower() in text_lower)
+        for dom in _KEYWORD_DOMAINS:
+            score = sum(3 for k in dom["keywords"] if k in found)
+            score += sum(1 for k in dom["skills"] if k.lower() in found)
             if score > highest_score:
                 highest_score = score
                 best_match = dom
@@ -1,13 +1,25 @@
 """
-Advanced RAG Engine v2.0 — TF-IDF + Cosine Similarity
-=====================================================
+Advanced RAG Engine v3.0 — Sparse TF-IDF + Cosine Similarity
+============================================================
 
 UPGRADED from basic keyword matching to a REAL vector search engine:
   1. TF-IDF vectorization of role profiles (skills + description + tools)
   2. Cosine similarity for accurate role-resume matching
   3. Multi-signal scoring: TF-IDF + skill overlap + section detection
   4. Weighted ranking with configurable boosting
-  5. Cold-start cache protection with hash-based invalidation
+  5. Cold-start cache protection: memory-mapped binary index, invalidated
+     on DB mtime/size with a hash check only when those change
+
+v3.0 — the index is a precomputed, L2-normalised CSR term-by-role matrix plus
+role-by-skill incidence matrices, so one retrieval is a single sparse mat-vec
+product and a vectorized skill-hit count (flat latency as roles grow).
+Everything a retrieval reads lives in one immutable `_RagIndex`; a build or
+hot reload publishes a new one with a single assignment under `_index_lock`,
+so a request never mixes a new vocabulary with an old matrix.
+
+Skill hits are word-boundary matches ("R" no longer hits inside "React"),
+widened with each term's plural / singular and its SkillOntology synonyms,
+so "REST APIs" still counts for "REST API" and "k8s" for "Kubernetes".
 
 This engine feeds:
   - Job prediction (top-3 roles with confidence)
@@ -18,6 +30,7 @@ This engine feeds:
 """
 
 import numpy as np
+from scipy import sparse
 import json
 import os
 import time
@@ -25,26 +38,50 @@ import logging
 import hashlib
 import math
 import re
-from typing import List, Dict, Any, Tuple
+import threading
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from collections import Counter
 
+from app.services.ai_skill_ontology import SkillMatcher, SkillOntology
+from app.career_engine.role_store import RoleKnowledgeStore
+
 logger = logging.getLogger(__name__)
 
-# Global state
-_roles_data: Dict[str, Any] = {}
-_role_names: List[str] = []
-_tfidf_matrix: Dict[str, Dict[str, float]] = {}  # role_name -> {word: tfidf_score}
-_idf_scores: Dict[str, float] = {}
-_vocabulary: set = set()
 
-# Cache paths
-_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
-_CACHE_FILE = os.path.join(_CACHE_DIR, "rag_index_v2_cache.json")
+class _RagIndex(NamedTuple):
+    """One consistent build of the index — never mutated after publication."""
+    version: int                                   # RoleKnowledgeStore.version() of the snapshot
+    roles_data: Dict[str, Any]                     # RoleKnowledgeStore snapshot the index was built from
+    role_names: List[str]
+    vocabulary: Dict[str, int]                     # term -> row in term_role_matrix
+    idf: np.ndarray                                # idf weight per vocabulary row
+    term_role_matrix: sparse.csr_matrix            # (terms x roles), columns L2-normalised
+    # Skill index — role-by-term incidence over skill / role-name terms
+    skill_terms: Dict[str, int]                    # lowercase skill term -> column
+    skill_matcher: SkillMatcher                    # surface forms (variants included) -> skill term
+    mandatory_incidence: sparse.csr_matrix         # (roles x skill terms)
+    advanced_incidence: sparse.csr_matrix
+    tool_incidence: sparse.csr_matrix
+    name_incidence: sparse.csr_matrix
+    mandatory_totals: np.ndarray                   # list lengths, as used for coverage
+    advanced_totals: np.ndarray
+    tool_totals: np.ndarray
+
+
+# Global state: the published index (swapped whole) and the lock serialising builds
+_index: Optional[_RagIndex] = None
+_index_lock = threading.Lock()
+
+# Cache paths (binary index; bump _INDEX_FORMAT whenever the layout changes)
+_INDEX_FORMAT = 4
+_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache", f"rag_index_v{_INDEX_FORMAT}")
+_META_FILE = "meta.json"
+_ROLES_FILE = "roles.json"
 _DB_PATH = os.path.join(os.path.dirname(__file__), "role_database.json")
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# TF-IDF ENGINE (local, zero dependencies beyond stdlib + numpy)
+# TF-IDF ENGINE (local, zero dependencies beyond stdlib + numpy/scipy)
 # ──────────────────────────────────────────────────────────────────────────────
 
 _STOP_WORDS = frozenset({
@@ -61,9 +98,12 @@ _STOP_WORDS = frozenset({
 })
 
 
+_TOKEN_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9+#./-]{1,}')
+
+
 def _tokenize(text: str) -> List[str]:
     """Tokenize text into lowercase words, removing stop words and short tokens."""
-    words = re.findall(r'[a-zA-Z][a-zA-Z0-9+#./-]{1,}', text.lower())
+    words = _TOKEN_RE.findall(text.lower())
     return [w for w in words if w not in _STOP_WORDS and len(w) > 1]
 
 
@@ -91,24 +131,20 @@ def _compute_idf(documents: List[List[str]]) -> Dict[str, float]:
     }
 
 
-def _cosine_similarity(vec_a: Dict[str, float], vec_b: Dict[str, float]) -> float:
-    """Compute cosine similarity between two sparse TF-IDF vectors."""
-    common = set(vec_a.keys()) & set(vec_b.keys())
-    if not common:
-        return 0.0
-
-    dot_product = sum(vec_a[w] * vec_b[w] for w in common)
-    norm_a = math.sqrt(sum(v ** 2 for v in vec_a.values()))
-    norm_b = math.sqrt(sum(v ** 2 for v in vec_b.values()))
-
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot_product / (norm_a * norm_b)
-
-
 # ──────────────────────────────────────────────────────────────────────────────
 # CACHE MANAGEMENT (cold start protection)
 # ──────────────────────────────────────────────────────────────────────────────
+#
+# Binary index layout (one directory per format version):
+#   meta.json        format, DB fingerprint (mtime_ns, size, md5), shapes
+#   roles.json       role names (column order; profiles come from RoleKnowledgeStore)
+#   vocabulary.npy   term table (row order of the term-by-role matrix)
+#   idf.npy          idf weight per term
+#   data.npy / indices.npy / indptr.npy   CSR arrays of the term-by-role matrix
+#
+# Arrays are opened with np.load(mmap_mode="r"), so gunicorn workers on the
+# same host share the page cache instead of each parsing a private copy.
+# meta.json is written last and acts as the commit marker.
 
 def _compute_db_hash() -> str:
     try:
@@ -118,43 +154,113 @@ def _compute_db_hash() -> str:
         return ""
 
 
-def _save_cache():
+def _db_stat() -> Tuple[int, int]:
+    st = os.stat(_DB_PATH)
+    return st.st_mtime_ns, st.st_size
+
+
+def _atomic_write(name: str, write) -> None:
+    """Write a cache file via temp file + rename so readers never see a torn file."""
+    path = os.path.join(_CACHE_DIR, name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _write_meta(meta: Dict[str, Any]) -> None:
+    _atomic_write(_META_FILE, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+
+def _save_cache(index: _RagIndex):
     try:
         os.makedirs(_CACHE_DIR, exist_ok=True)
-        cache_data = {
-            "db_hash": _compute_db_hash(),
-            "roles_data": _roles_data,
-            "role_names": _role_names,
-            "tfidf_matrix": _tfidf_matrix,
-            "idf_scores": _idf_scores,
+        mtime_ns, size = _db_stat()
+        vocabulary = index.vocabulary
+        arrays = {
+            "vocabulary": np.array(sorted(vocabulary, key=vocabulary.get), dtype=str),
+            "idf": index.idf,
+            "data": index.term_role_matrix.data,
+            "indices": index.term_role_matrix.indices,
+            "indptr": index.term_role_matrix.indptr,
         }
-        with open(_CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(cache_data, f)
-        logger.info("✅ RAG v2 index cached to disk (TF-IDF precomputed)")
+        for name, arr in arrays.items():
+            _atomic_write(f"{name}.npy", lambda f, arr=arr: np.save(f, arr, allow_pickle=False))
+        roles_blob = json.dumps({"role_names": index.role_names})
+        _atomic_write(_ROLES_FILE, lambda f: f.write(roles_blob.encode("utf-8")))
+        _write_meta({
+            "format": _INDEX_FORMAT,
+            "db_mtime_ns": mtime_ns,
+            "db_size": size,
+            "db_hash": _compute_db_hash(),
+            "n_terms": len(vocabulary),
+            "n_roles": len(index.role_names),
+            "nnz": int(index.term_role_matrix.nnz),
+        })
+        logger.info("✅ RAG v3 index cached to disk (binary, format=%d)", _INDEX_FORMAT)
     except Exception as e:
-        logger.warning("Failed to save RAG v2 cache: %s", e)
+        logger.warning("Failed to save RAG v3 cache: %s", e)
 
 
-def _load_cache() -> bool:
-    global _roles_data, _role_names, _tfidf_matrix, _idf_scores, _vocabulary
+def _load_cache() -> Optional[_RagIndex]:
     try:
-        if not os.path.exists(_CACHE_FILE):
-            return False
-        with open(_CACHE_FILE, "r", encoding="utf-8") as f:
-            cache = json.load(f)
-        if cache.get("db_hash") != _compute_db_hash():
-            logger.info("RAG v2 cache stale — rebuilding TF-IDF index")
-            return False
-        _roles_data = cache["roles_data"]
-        _role_names = cache["role_names"]
-        _tfidf_matrix = cache["tfidf_matrix"]
-        _idf_scores = cache.get("idf_scores", {})
-        _vocabulary = set(_idf_scores.keys())
-        logger.info("⚡ RAG v2 index loaded from cache | roles=%d | vocab=%d", len(_role_names), len(_vocabulary))
-        return True
+        meta_path = os.path.join(_CACHE_DIR, _META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != _INDEX_FORMAT:
+            logger.info("RAG v3 cache format changed — rebuilding TF-IDF index")
+            return None
+
+        # Cheap fingerprint first; only hash the DB when mtime/size moved
+        mtime_ns, size = _db_stat()
+        if (mtime_ns, size) != (meta.get("db_mtime_ns"), meta.get("db_size")):
+            if _compute_db_hash() != meta.get("db_hash"):
+                logger.info("RAG v3 cache stale — rebuilding TF-IDF index")
+                return None
+            meta.update(db_mtime_ns=mtime_ns, db_size=size)  # touched, content unchanged
+            _write_meta(meta)
+
+        arrays = {
+            name: np.load(os.path.join(_CACHE_DIR, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+            for name in ("vocabulary", "idf", "data", "indices", "indptr")
+        }
+        n_terms, n_roles = meta["n_terms"], meta["n_roles"]
+        if (
+            arrays["vocabulary"].shape[0] != n_terms
+            or arrays["indptr"].shape[0] != n_terms + 1
+            or arrays["data"].shape[0] != meta["nnz"]
+        ):
+            logger.warning("RAG v3 cache arrays inconsistent with meta — rebuilding")
+            return None
+
+        with open(os.path.join(_CACHE_DIR, _ROLES_FILE), "r", encoding="utf-8") as f:
+            roles_blob = json.load(f)
+        version = RoleKnowledgeStore.version()
+        roles_data = RoleKnowledgeStore.roles()
+        if len(roles_blob["role_names"]) != n_roles or roles_blob["role_names"] != list(roles_data):
+            return None
+
+        role_names = roles_blob["role_names"]
+        index = _RagIndex(
+            version=version,
+            roles_data=roles_data,
+            role_names=role_names,
+            vocabulary={term: i for i, term in enumerate(arrays["vocabulary"].tolist())},
+            idf=arrays["idf"],
+            term_role_matrix=sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=(n_terms, n_roles),
+                copy=False,
+            ),
+            **_build_skill_index(roles_data, role_names),
+        )
+        logger.info("⚡ RAG v3 index loaded from cache (mmap) | roles=%d | vocab=%d", n_roles, n_terms)
+        return index
     except Exception as e:
-        logger.warning("Failed to load RAG v2 cache: %s", e)
-        return False
+        logger.warning("Failed to load RAG v3 cache: %s", e)
+        return None
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -179,145 +285,305 @@ def _build_role_document(role_name: str, role_data: Dict) -> str:
     return " ".join(parts)
 
 
-def build_index():
-    """Build the TF-IDF vector index from role_database.json."""
-    global _roles_data, _role_names, _tfidf_matrix, _idf_scores, _vocabulary
-    _t0 = time.perf_counter()
-
-    logger.info("⚡ Initializing RAG v2.0 Engine (TF-IDF + Cosine Similarity)...")
-
-    # Try cache first
-    if _load_cache():
-        return
+def _role_name_words(role_name: str) -> List[str]:
+    return [w for w in role_name.lower().split() if len(w) > 2]
+
+
+def _skill_variants(term: str) -> List[str]:
+    """Other spellings of a skill term: plural / singular of its last word."""
+    head, _, last = term.rpartition(" ")
+    prefix = f"{head} " if head else ""
+    if not last.isalpha() or len(last) < 3:
+        return []
+    if last.endswith(("s", "x", "ch", "sh")):
+        variants = [f"{prefix}{last}es"]
+        if last.endswith("s") and not last.endswith("ss"):
+            variants.append(f"{prefix}{last[:-1]}")   # "microservices" → "microservice"
+        return variants
+    return [f"{prefix}{last}s"]
+
+
+def _skill_surface_forms(skill_terms: Dict[str, int]) -> Dict[str, str]:
+    """Surface form -> skill term: each term, then its variants and ontology synonyms."""
+    forms = {term: term for term in skill_terms}
+    for term in skill_terms:
+        for variant in _skill_variants(term):
+            forms.setdefault(variant, term)   # another term's exact spelling wins
+    for synonym, canonical in SkillOntology.SYNONYMS.items():
+        term = canonical.lower()
+        if term in skill_terms:
+            forms.setdefault(synonym, term)
+    return forms
+
+
+def _incidence(skill_terms: Dict[str, int], rows: List[List[str]]) -> sparse.csr_matrix:
+    """Role-by-skill-term 0/1 matrix from per-role term lists."""
+    indptr, indices = [0], []
+    for terms in rows:
+        cols = sorted({skill_terms[t.lower()] for t in terms})
+        indices.extend(cols)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float64)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), len(skill_terms)))
+
+
+def _build_skill_index(roles_data: Dict[str, Any], role_names: List[str]) -> Dict[str, Any]:
+    """The role-by-skill incidence matrices and the compiled skill matcher (_RagIndex fields)."""
+    mandatory = [roles_data[r].get("mandatory_skills", []) for r in role_names]
+    advanced = [roles_data[r].get("advanced_skills", []) for r in role_names]
+    tools = [roles_data[r].get("tools", []) for r in role_names]
+    names = [_role_name_words(r) for r in role_names]
+
+    skill_terms: Dict[str, int] = {}
+    for group in (mandatory, advanced, tools, names):
+        for terms in group:
+            for t in terms:
+                skill_terms.setdefault(t.lower(), len(skill_terms))
 
-    # Load knowledge base
-    if not os.path.exists(_DB_PATH):
-        logger.error("❌ Role Database not found at %s", _DB_PATH)
-        return
+    return {
+        "skill_terms": skill_terms,
+        "skill_matcher": SkillMatcher(_skill_surface_forms(skill_terms)),
+        "mandatory_incidence": _incidence(skill_terms, mandatory),
+        "advanced_incidence": _incidence(skill_terms, advanced),
+        "tool_incidence": _incidence(skill_terms, tools),
+        "name_incidence": _incidence(skill_terms, names),
+        "mandatory_totals": np.array([len(m) for m in mandatory], dtype=np.float64),
+        "advanced_totals": np.array([len(a) for a in advanced], dtype=np.float64),
+        "tool_totals": np.array([len(t) for t in tools], dtype=np.float64),
+    }
 
-    try:
-        with open(_DB_PATH, encoding='utf-8') as f:
-            _roles_data = json.load(f)
-        _role_names = list(_roles_data.keys())
-
-        # Build documents for each role
-        documents = []
-        for role_name in _role_names:
-            doc_text = _build_role_document(role_name, _roles_data[role_name])
-            tokens = _tokenize(doc_text)
-            documents.append(tokens)
-
-        # Compute IDF across all documents
-        _idf_scores = _compute_idf(documents)
-        _vocabulary = set(_idf_scores.keys())
-
-        # Compute TF-IDF vectors for each role
-        _tfidf_matrix = {}
-        for i, role_name in enumerate(_role_names):
-            tf = _compute_tf(documents[i])
-            tfidf_vec = {
-                word: tf_val * _idf_scores.get(word, 1.0)
-                for word, tf_val in tf.items()
-            }
-            _tfidf_matrix[role_name] = tfidf_vec
 
+def _build(version: int, roles_data: Dict[str, Any]) -> _RagIndex:
+    """Build a complete index from one RoleKnowledgeStore snapshot."""
+    role_names = list(roles_data.keys())
+
+    # Build documents for each role
+    documents = []
+    for role_name in role_names:
+        doc_text = _build_role_document(role_name, roles_data[role_name])
+        tokens = _tokenize(doc_text)
+        documents.append(tokens)
+
+    # Compute IDF across all documents
+    idf_scores = _compute_idf(documents)
+    vocabulary = {term: i for i, term in enumerate(idf_scores)}
+    idf = np.fromiter(idf_scores.values(), dtype=np.float64, count=len(idf_scores))
+
+    # TF-IDF term-by-role matrix, each role column L2-normalised once here
+    rows, cols, vals = [], [], []
+    for j, tokens in enumerate(documents):
+        for word, tf_val in _compute_tf(tokens).items():
+            i = vocabulary[word]
+            rows.append(i)
+            cols.append(j)
+            vals.append(tf_val * idf[i])
+    matrix = sparse.csc_matrix(
+        (vals, (rows, cols)), shape=(len(vocabulary), len(role_names)), dtype=np.float64,
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0))).ravel()
+    norms[norms == 0] = 1.0
+
+    return _RagIndex(
+        version=version,
+        roles_data=roles_data,
+        role_names=role_names,
+        vocabulary=vocabulary,
+        idf=idf,
+        term_role_matrix=sparse.csr_matrix(matrix @ sparse.diags(1.0 / norms)),
+        **_build_skill_index(roles_data, role_names),
+    )
+
+
+def build_index() -> Optional[_RagIndex]:
+    """Build (or load from cache) the sparse TF-IDF index and publish it; returns the live index."""
+    global _index
+    with _index_lock:
+        # Another thread may have published a build for this store version while we waited
+        if _index is not None and _index.version == RoleKnowledgeStore.version():
+            return _index
+
+        _t0 = time.perf_counter()
+        logger.info("⚡ Initializing RAG v3.0 Engine (Sparse TF-IDF + Cosine Similarity)...")
+
+        # Try cache first
+        index = _load_cache()
+        if index is not None:
+            _index = index
+            return index
+
+        # Load knowledge base (version first, so a reload mid-build triggers another rebuild)
+        version = RoleKnowledgeStore.version()
+        roles_data = RoleKnowledgeStore.roles()
+        if not roles_data:
+            logger.error("❌ Role Database is empty or missing at %s", _DB_PATH)
+            return _index
+
+        try:
+            index = _build(version, roles_data)
+        except Exception as e:
+            logger.error("Failed to build RAG v3 index: %s", e)
+            return _index
+
+        _index = index
         _elapsed_ms = (time.perf_counter() - _t0) * 1000
         logger.info(
-            "✅ RAG v2 index built | roles=%d | vocab=%d | elapsed=%.1fms",
-            len(_role_names), len(_vocabulary), _elapsed_ms,
+            "✅ RAG v3 index built | roles=%d | vocab=%d | nnz=%d | elapsed=%.1fms",
+            len(index.role_names), len(index.vocabulary), index.term_role_matrix.nnz, _elapsed_ms,
         )
 
-        # Cache for cold starts
-        _save_cache()
+    # Cache for cold starts (outside the lock — readers already have the new index)
+    _save_cache(index)
+    return index
+
+
+def _ensure_index() -> Optional[_RagIndex]:
+    """The live index — built on first use, and rebuilt when the role store has reloaded."""
+    index = _index
+    if index is None or index.version != RoleKnowledgeStore.version():
+        index = build_index()
+    return index
 
-    except Exception as e:
-        logger.error("Failed to build RAG v2 index: %s", e)
+
+def indexed_role_names() -> List[str]:
+    """Role names of the published index (empty until it is built)."""
+    index = _index
+    return index.role_names if index is not None else []
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # RETRIEVAL (core function used across all endpoints)
 # ──────────────────────────────────────────────────────────────────────────────
 
+def _cosine_scores(index: _RagIndex, resume_text: str) -> np.ndarray:
+    """Cosine similarity of the resume against every role: one sparse mat-vec."""
+    vocabulary = index.vocabulary
+    tf = _compute_tf(_tokenize(resume_text))
+    rows = np.fromiter(
+        (vocabulary[w] for w in tf if w in vocabulary),  # only known vocabulary
+        dtype=np.int64,
+    )
+    if rows.size == 0:
+        return np.zeros(len(index.role_names))
+    weights = np.fromiter((tf[w] for w in tf if w in vocabulary), dtype=np.float64) * index.idf[rows]
+    weights /= np.linalg.norm(weights)
+    return index.term_role_matrix[rows].T @ weights
+
+
+def _skill_hits(index: _RagIndex, resume_text: str) -> Tuple[set, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Matched skill terms plus per-role mandatory/advanced/tool/name hit counts."""
+    found = index.skill_matcher.find(resume_text)
+    present = np.zeros(len(index.skill_terms))
+    present[[index.skill_terms[t] for t in found]] = 1.0
+    return (
+        found,
+        index.mandatory_incidence @ present,
+        index.advanced_incidence @ present,
+        index.tool_incidence @ present,
+        index.name_incidence @ present,
+    )
+
+
+def _document_term_matrix(index: _RagIndex, texts: List[str]) -> sparse.csr_matrix:
+    """(resumes x terms) TF-IDF matrix over the role vocabulary, rows L2-normalised."""
+    indptr, indices, tf_values = [0], [], []
+    for text in texts:
+        for word, tf_val in _compute_tf(_tokenize(text)).items():
+            i = index.vocabulary.get(word)
+            if i is not None:  # only known vocabulary
+                indices.append(i)
+                tf_values.append(tf_val)
+        indptr.append(len(indices))
+    indices = np.asarray(indices, dtype=np.int64)
+    data = np.asarray(tf_values, dtype=np.float64) * index.idf[indices]
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(texts), len(index.vocabulary)))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+
+
+def _skill_presence(index: _RagIndex, texts: List[str]) -> Tuple[List[set], sparse.csr_matrix]:
+    """Matched skill terms per resume plus the (resumes x skill terms) 0/1 matrix."""
+    skill_terms = index.skill_terms
+    found_sets = [index.skill_matcher.find(text) for text in texts]
+    indptr, indices = [0], []
+    for found in found_sets:
+        indices.extend(sorted(skill_terms[t] for t in found))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float64)
+    return found_sets, sparse.csr_matrix((data, indices, indptr), shape=(len(texts), len(skill_terms)))
+
+
+def _confidence(index: _RagIndex, cos_sim, mandatory_hits, advanced_hits, tool_hits) -> Tuple[np.ndarray, np.ndarray]:
+    """Skill coverage and combined confidence (0-100); broadcasts over a batch axis."""
+    total_skills = index.mandatory_totals + index.advanced_totals + index.tool_totals
+    skill_coverage = (mandatory_hits + advanced_hits + tool_hits) / np.maximum(total_skills, 1)
+    confidence = np.minimum(100, np.round(
+        (cos_sim * 40) +
+        (skill_coverage * 35) +
+        (mandatory_hits / np.maximum(index.mandatory_totals, 1)) * 25
+    , 1))
+    return skill_coverage, confidence
+
+
+def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Indices of the top-k scores along the last axis, best first, via
+    argpartition (no full sort). Works for one score vector or a batch.
+    """
+    k = min(top_k, scores.shape[-1])
+    if k <= 0:
+        return np.zeros(scores.shape[:-1] + (0,), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(part, order, axis=-1)
+
+
 def retrieve_relevant_roles(resume_text: str, top_k: int = 3) -> List[str]:
     """Retrieve top-K most relevant roles using TF-IDF cosine similarity."""
-    global _roles_data, _role_names, _tfidf_matrix
     _t0 = time.perf_counter()
 
-    if not _role_names:
-        build_index()
-    if not resume_text or len(resume_text.strip()) < 10:
+    index = _ensure_index()
+    if not resume_text or len(resume_text.strip()) < 10 or index is None:
         return ["Software Engineer"]
 
     try:
-        # Tokenize resume
-        resume_tokens = _tokenize(resume_text)
-        resume_tf = _compute_tf(resume_tokens)
-        resume_tfidf = {
-            word: tf_val * _idf_scores.get(word, 1.0)
-            for word, tf_val in resume_tf.items()
-            if word in _vocabulary  # only consider known vocabulary
-        }
+        # Signal 1: TF-IDF Cosine Similarity (0-1 range, weight=50%)
+        cos_sim = _cosine_scores(index, resume_text)
+
+        # Signal 2: Direct Skill Match (weight=30%)
+        _, mandatory_hits, advanced_hits, tool_hits, name_hits = _skill_hits(index, resume_text)
+        skill_score = np.where(
+            index.mandatory_totals > 0,
+            (mandatory_hits / np.maximum(index.mandatory_totals, 1)) * 0.6 +
+            (advanced_hits / np.maximum(index.advanced_totals, 1)) * 0.25 +
+            (tool_hits / np.maximum(index.tool_totals, 1)) * 0.15,
+            0.0,
+        )
+
+        # Signal 3: Role Name in Resume (weight=20%)
+        name_score = np.minimum(name_hits * 0.3, 1.0)
 
-        # Score each role using multi-signal approach
-        scored_roles: List[Tuple[str, float]] = []
-
-        for role_name in _role_names:
-            role_vec = _tfidf_matrix.get(role_name, {})
-
-            # Signal 1: TF-IDF Cosine Similarity (0-1 range, weight=50%)
-            cos_sim = _cosine_similarity(resume_tfidf, role_vec)
-
-            # Signal 2: Direct Skill Match (weight=30%)
-            role_data = _roles_data[role_name]
-            mandatory_skills = role_data.get("mandatory_skills", [])
-            advanced_skills = role_data.get("advanced_skills", [])
-            tools = role_data.get("tools", [])
-            all_skills = mandatory_skills + advanced_skills + tools
-
-            text_lower = resume_text.lower()
-            mandatory_hits = sum(1 for s in mandatory_skills if s.lower() in text_lower)
-            advanced_hits = sum(1 for s in advanced_skills if s.lower() in text_lower)
-            tool_hits = sum(1 for t in tools if t.lower() in text_lower)
-
-            if mandatory_skills:
-                skill_score = (
-                    (mandatory_hits / len(mandatory_skills)) * 0.6 +
-                    (advanced_hits / max(len(advanced_skills), 1)) * 0.25 +
-                    (tool_hits / max(len(tools), 1)) * 0.15
-                )
-            else:
-                skill_score = 0
-
-            # Signal 3: Role Name in Resume (weight=20%)
-            name_score = 0.0
-            role_words = role_name.lower().split()
-            for rw in role_words:
-                if rw in text_lower and len(rw) > 2:
-                    name_score += 0.3
-            name_score = min(name_score, 1.0)
-
-            # Combined score (weighted)
-            final_score = (cos_sim * 0.50) + (skill_score * 0.30) + (name_score * 0.20)
-            scored_roles.append((role_name, final_score))
-
-        # Sort and return top-k
-        scored_roles.sort(key=lambda x: x[1], reverse=True)
-        results = [name for name, score in scored_roles[:top_k] if score > 0.01]
+        # Combined score (weighted)
+        final_score = (cos_sim * 0.50) + (skill_score * 0.30) + (name_score * 0.20)
+
+        # Top-k
+        top = _top_k_indices(final_score, top_k)
+        results = [index.role_names[i] for i in top if final_score[i] > 0.01]
 
         if not results:
             results = ["Software Engineer"]
 
         _elapsed_ms = (time.perf_counter() - _t0) * 1000
         logger.info(
-            "RAG v2 retrieval | top_roles=%s | scores=%s | elapsed=%.1fms",
+            "RAG v3 retrieval | top_roles=%s | scores=%s | elapsed=%.1fms",
             results,
-            [f"{s:.3f}" for _, s in scored_roles[:top_k]],
+            [f"{final_score[i]:.3f}" for i in top],
             _elapsed_ms,
         )
         return results
 
     except Exception as e:
-        logger.error("⚠️ RAG v2 retrieval error: %s", e)
+        logger.error("⚠️ RAG v3 retrieval error: %s", e)
         return ["Software Engineer"]
 
 
@@ -326,89 +592,115 @@ def retrieve_roles_with_scores(resume_text: str, top_k: int = 5) -> List[Dict[st
     Enhanced retrieval returning detailed role matches with confidence scores.
     Used by the Smart Pipeline and Career Predictor for detailed feedback.
     """
-    global _roles_data, _role_names, _tfidf_matrix
     _t0 = time.perf_counter()
 
-    if not _role_names:
-        build_index()
-    if not resume_text or len(resume_text.strip()) < 10:
+    index = _ensure_index()
+    if not resume_text or len(resume_text.strip()) < 10 or index is None:
         return [{"role": "Software Engineer", "confidence": 50.0, "skills_matched": [], "skills_missing": []}]
 
     try:
-        resume_tokens = _tokenize(resume_text)
-        resume_tf = _compute_tf(resume_tokens)
-        resume_tfidf = {
-            word: tf_val * _idf_scores.get(word, 1.0)
-            for word, tf_val in resume_tf.items()
-            if word in _vocabulary
-        }
-        text_lower = resume_text.lower()
-
-        scored_roles = []
-        for role_name in _role_names:
-            role_vec = _tfidf_matrix.get(role_name, {})
-            role_data = _roles_data[role_name]
-
-            # Cosine similarity
-            cos_sim = _cosine_similarity(resume_tfidf, role_vec)
-
-            # Skill analysis
-            mandatory = role_data.get("mandatory_skills", [])
-            advanced = role_data.get("advanced_skills", [])
-            tools = role_data.get("tools", [])
-
-            matched_mandatory = [s for s in mandatory if s.lower() in text_lower]
-            matched_advanced = [s for s in advanced if s.lower() in text_lower]
-            matched_tools = [t for t in tools if t.lower() in text_lower]
-            missing_mandatory = [s for s in mandatory if s.lower() not in text_lower]
-
-            all_matched = matched_mandatory + matched_advanced + matched_tools
-            total_skills = len(mandatory) + len(advanced) + len(tools)
-            skill_coverage = len(all_matched) / max(total_skills, 1)
-
-            # Combined confidence (0-100)
-            confidence = min(100, round(
-                (cos_sim * 40) +
-                (skill_coverage * 35) +
-                (len(matched_mandatory) / max(len(mandatory), 1)) * 25
-            , 1))
-
-            scored_roles.append({
-                "role": role_name,
-                "confidence": confidence,
-                "cosine_score": round(cos_sim * 100, 1),
-                "skill_coverage": round(skill_coverage * 100, 1),
-                "skills_matched": all_matched[:8],
-                "skills_missing": missing_mandatory[:5],
-                "category": role_data.get("category", "General"),
-                "growth_score": role_data.get("growth_score", 7.0),
-                "salary_range": role_data.get("avg_salary_range", "N/A"),
-            })
-
-        # Sort by confidence
-        scored_roles.sort(key=lambda x: x["confidence"], reverse=True)
+        cos_sim = _cosine_scores(index, resume_text)
+        found, mandatory_hits, advanced_hits, tool_hits, _ = _skill_hits(index, resume_text)
+
+        # Combined confidence (0-100)
+        skill_coverage, confidence = _confidence(index, cos_sim, mandatory_hits, advanced_hits, tool_hits)
+
+        scored_roles = [
+            _role_detail(index, i, found, cos_sim[i], skill_coverage[i], confidence[i])
+            for i in _top_k_indices(confidence, top_k)
+        ]
 
         _elapsed_ms = (time.perf_counter() - _t0) * 1000
         logger.info(
-            "RAG v2 detailed retrieval | top=%s | elapsed=%.1fms",
-            [r["role"] for r in scored_roles[:top_k]], _elapsed_ms,
+            "RAG v3 detailed retrieval | top=%s | elapsed=%.1fms",
+            [r["role"] for r in scored_roles], _elapsed_ms,
         )
-        return scored_roles[:top_k]
+        return scored_roles
 
     except Exception as e:
-        logger.error("RAG v2 detailed retrieval error: %s", e)
+        logger.error("RAG v3 detailed retrieval error: %s", e)
         return [{"role": "Software Engineer", "confidence": 50.0, "skills_matched": [], "skills_missing": []}]
 
 
+def retrieve_roles_batch(texts: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+    """
+    Bulk screening: score many resumes against every role in one pass.
+    All resumes go into one document-term matrix, so cosine similarity and
+    skill hits are single sparse matrix products for the whole batch.
+    Returns one list per input text, with the same detail dicts as
+    `retrieve_roles_with_scores`.
+    """
+    _t0 = time.perf_counter()
+
+    index = _ensure_index()
+    fallback = [{"role": "Software Engineer", "confidence": 50.0, "skills_matched": [], "skills_missing": []}]
+    valid = [i for i, t in enumerate(texts) if t and len(t.strip()) >= 10]
+    results: List[List[Dict[str, Any]]] = [list(fallback) for _ in texts]
+    if not valid or index is None:
+        return results
+
+    try:
+        batch = [texts[i] for i in valid]
+        cos_sim = (_document_term_matrix(index, batch) @ index.term_role_matrix).toarray()
+        found_sets, presence = _skill_presence(index, batch)
+        mandatory_hits = (presence @ index.mandatory_incidence.T).toarray()
+        advanced_hits = (presence @ index.advanced_incidence.T).toarray()
+        tool_hits = (presence @ index.tool_incidence.T).toarray()
+
+        skill_coverage, confidence = _confidence(index, cos_sim, mandatory_hits, advanced_hits, tool_hits)
+        top = _top_k_indices(confidence, top_k)
+
+        for row, i in enumerate(valid):
+            results[i] = [
+                _role_detail(index, j, found_sets[row], cos_sim[row, j], skill_coverage[row, j], confidence[row, j])
+                for j in top[row]
+            ]
+
+        _elapsed_ms = (time.perf_counter() - _t0) * 1000
+        logger.info(
+            "RAG v3 batch retrieval | resumes=%d | roles=%d | elapsed=%.1fms",
+            len(batch), len(index.role_names), _elapsed_ms,
+        )
+        return results
+
+    except Exception as e:
+        logger.error("RAG v3 batch retrieval error: %s", e)
+        return results
+
+
+def _role_detail(index: _RagIndex, i: int, found: set, cos_sim: float, skill_coverage: float,
+                 confidence: float) -> Dict[str, Any]:
+    """Per-role detail dict (only built for the roles that made the top-k)."""
+    role_name = index.role_names[i]
+    role_data = index.roles_data[role_name]
+    mandatory = role_data.get("mandatory_skills", [])
+    advanced = role_data.get("advanced_skills", [])
+    tools = role_data.get("tools", [])
+
+    matched_mandatory = [s for s in mandatory if s.lower() in found]
+    matched_advanced = [s for s in advanced if s.lower() in found]
+    matched_tools = [t for t in tools if t.lower() in found]
+    missing_mandatory = [s for s in mandatory if s.lower() not in found]
+    all_matched = matched_mandatory + matched_advanced + matched_tools
+
+    return {
+        "role": role_name,
+        "confidence": float(confidence),
+        "cosine_score": round(float(cos_sim) * 100, 1),
+        "skill_coverage": round(float(skill_coverage) * 100, 1),
+        "skills_matched": all_matched[:8],
+        "skills_missing": missing_mandatory[:5],
+        "category": role_data.get("category", "General"),
+        "growth_score": role_data.get("growth_score", 7.0),
+        "salary_range": role_data.get("avg_salary_range", "N/A"),
+    }
+
+
 def get_role_data(role_name: str) -> Dict[str, Any]:
     """Get full role profile data for a specific role."""
-    if not _roles_data:
-        build_index()
-    return _roles_data.get(role_name, {})
+    return RoleKnowledgeStore.get_role(role_name)
 
 
 def get_all_role_names() -> List[str]:
     """Get all available role names."""
-    if not _role_names:
-        build_index()
-    return _role_names.copy()
+    return RoleKnowledgeStore.role_names()
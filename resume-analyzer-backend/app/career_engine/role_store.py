@@ -0,0 +1,177 @@
+"""
+Role Knowledge Store — one in-process copy of role_database.json
+================================================================
+
+The scoring engine, the RAG engine, SemanticRoleMatcher and the keyword
+fallback all read the same role profiles.  This store parses the file once,
+precomputes each role's keyword template and template word set, and
+hot-reloads when the file's mtime/size changes (checked at most every
+CHECK_INTERVAL seconds, so the hot path is a clock read).
+
+Consumers that derive their own state from the roles (the RAG index) compare
+`RoleKnowledgeStore.version()` to know when to rebuild.
+"""
+
+import json
+import os
+import re
+import time
+import logging
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DB_PATH = os.path.join(os.path.dirname(__file__), "role_database.json")
+
+# Templates for roles missing from role_database.json
+_FALLBACK_TEMPLATES = {
+    "Software Engineer": "Python Java C++ algorithms data structures system design backend API REST microservices git testing CI/CD Docker Kubernetes debugging object-oriented distributed systems multithreading SQL databases agile",
+    "Data Scientist": "Python R SQL machine learning statistics data analysis pandas numpy tensorflow scikit-learn visualization deep learning NLP feature engineering A/B testing regression classification modeling",
+    "Full Stack Developer": "React JavaScript TypeScript Node.js HTML CSS REST API MongoDB PostgreSQL Docker frontend backend Next.js Redux state management responsive design authentication websocket",
+    "DevOps Engineer": "Docker Kubernetes AWS Azure CI/CD Jenkins Linux bash terraform monitoring Prometheus Grafana Ansible automation infrastructure git GitLab GitHub Actions deployment",
+    "Machine Learning Engineer": "Python TensorFlow PyTorch deep learning NLP computer vision MLOps model deployment feature engineering distributed training GPU CUDA neural networks transformers LLMs",
+    "Data Engineer": "Python SQL Spark Airflow ETL data warehouse BigQuery Snowflake Kafka data pipeline dbt Hadoop data modeling batch streaming",
+    "Frontend Developer": "React JavaScript TypeScript HTML CSS Tailwind responsive design accessibility performance optimization webpack Next.js Redux testing component architecture design system",
+    "Backend Developer": "Python Java Node.js SQL PostgreSQL MongoDB REST API GraphQL microservices Docker Kubernetes authentication caching message queue Redis system design scalability",
+    "Mobile App Developer": "React Native Flutter Kotlin Swift Android iOS Firebase REST API mobile UI state management push notifications app deployment testing accessibility",
+    "Cybersecurity Analyst": "network security SIEM vulnerability assessment incident response penetration testing cryptography firewall IDS IPS threat hunting malware analysis SOC OWASP compliance",
+    "Product Manager": "product strategy roadmap user research data analysis agile scrum stakeholder management A/B testing metrics KPIs OKRs prioritization user stories sprint planning",
+    "UI/UX Designer": "Figma user research wireframing prototyping visual design interaction design design thinking usability testing accessibility design systems responsive design typography color theory",
+    "Cloud Architect": "AWS Azure GCP cloud architecture terraform networking security serverless cost optimization CDN edge computing multi-cloud migration scalability high availability disaster recovery",
+    "QA/Test Engineer": "test automation selenium cypress API testing SQL test planning agile BDD TDD performance testing security testing CI/CD bug tracking regression testing",
+    "Business Analyst": "requirements analysis SQL Excel data analysis process mapping stakeholder management Agile UML BPMN Power BI Tableau documentation business intelligence",
+}
+_GENERIC_TEMPLATE = "professional experience technical skills project management problem solving communication teamwork leadership analytical thinking"
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def template_words(template: str) -> FrozenSet[str]:
+    """Word set of a role template (words of 3+ chars), as used by score_relevance."""
+    return frozenset(w for w in _WORD_RE.findall(template.lower()) if len(w) > 2)
+
+
+def build_role_template(role: str, role_data: Dict[str, Any]) -> str:
+    """Keyword template for a role profile: name, description, skills, tools, certs, topics."""
+    parts = [
+        role,
+        role_data.get("description", ""),
+        " ".join(role_data.get("mandatory_skills", [])),
+        " ".join(role_data.get("advanced_skills", [])),
+        " ".join(role_data.get("tools", [])),
+        " ".join(role_data.get("certifications", [])),
+        " ".join(role_data.get("interview_topics", [])),
+    ]
+    return " ".join(parts)
+
+
+_FALLBACK_WORDS = {role: template_words(t) for role, t in _FALLBACK_TEMPLATES.items()}
+_GENERIC_WORDS = template_words(_GENERIC_TEMPLATE)
+
+_lock = threading.Lock()
+
+
+class RoleKnowledgeStore:
+    """
+    Process-wide role profile store.
+    - role_database.json is parsed once and re-parsed only when it changes.
+    - Templates and template word sets are precomputed per role.
+    - Returned dicts are shared; callers must treat them as read-only.
+    """
+
+    CHECK_INTERVAL: float = 2.0   # seconds between file stat checks
+
+    _roles: Dict[str, Dict[str, Any]] = {}
+    _role_names: List[str] = []
+    _templates: Dict[str, str] = {}
+    _template_words: Dict[str, FrozenSet[str]] = {}
+    _stat: Optional[Tuple[int, int]] = None
+    _version: int = 0
+    _next_check: float = 0.0
+
+    # ── Loading ──────────────────────────────────────────────────
+    @classmethod
+    def _refresh(cls) -> None:
+        """Reload the database if it changed since the last check (throttled)."""
+        now = time.monotonic()
+        if now < cls._next_check:
+            return
+        with _lock:
+            if now < cls._next_check:           # double-check after lock
+                return
+            try:
+                st = os.stat(_DB_PATH)
+                stat = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stat = None
+            if stat != cls._stat or cls._version == 0:
+                cls._load(stat)
+            cls._next_check = now + cls.CHECK_INTERVAL
+
+    @classmethod
+    def _load(cls, stat: Optional[Tuple[int, int]]) -> None:
+        roles: Dict[str, Dict[str, Any]] = {}
+        try:
+            if stat is None:
+                raise FileNotFoundError(_DB_PATH)
+            with open(_DB_PATH, encoding="utf-8") as f:
+                roles = json.load(f)
+        except Exception as e:
+            if cls._version:
+                # Keep serving the last good copy (e.g. a half-written edit)
+                logger.warning("Role Database reload failed, keeping previous copy: %s", e)
+                cls._stat = stat                # retry on the next change, not every check
+                return
+            logger.error("❌ Failed to load Role Database at %s: %s", _DB_PATH, e)
+
+        templates = {role: build_role_template(role, data) for role, data in roles.items()}
+        cls._roles = roles
+        cls._role_names = list(roles)
+        cls._templates = templates
+        cls._template_words = {role: template_words(t) for role, t in templates.items()}
+        cls._stat = stat
+        cls._version += 1
+        logger.info("✅ Role knowledge store loaded | roles=%d | version=%d", len(roles), cls._version)
+
+    # ── Accessors ────────────────────────────────────────────────
+    @classmethod
+    def version(cls) -> int:
+        """Bumped on every (re)load; dependants rebuild when it changes."""
+        cls._refresh()
+        return cls._version
+
+    @classmethod
+    def roles(cls) -> Dict[str, Dict[str, Any]]:
+        """All role profiles keyed by role name, in database order."""
+        cls._refresh()
+        return cls._roles
+
+    @classmethod
+    def role_names(cls) -> List[str]:
+        cls._refresh()
+        return cls._role_names.copy()
+
+    @classmethod
+    def get_role(cls, role: str) -> Dict[str, Any]:
+        """Full profile for one role, or {} if unknown."""
+        cls._refresh()
+        return cls._roles.get(role, {})
+
+    @classmethod
+    def get_template(cls, role: str) -> str:
+        """Keyword template for a role: database profile, then fallback, then generic."""
+        cls._refresh()
+        template = cls._templates.get(role)
+        if template is not None:
+            return template
+        return _FALLBACK_TEMPLATES.get(role, _GENERIC_TEMPLATE)
+
+    @classmethod
+    def get_template_words(cls, role: str) -> FrozenSet[str]:
+        """Precomputed `template_words(get_template(role))`."""
+        cls._refresh()
+        words = cls._template_words.get(role)
+        if words is not None:
+            return words
+        return _FALLBACK_WORDS.get(role, _GENERIC_WORDS)
@@ -9,8 +9,9 @@ Provides detailed role match results with confidence scores and skill analysis.
 from app.career_engine.rag_engine import (
     retrieve_relevant_roles,
     retrieve_roles_with_scores,
-    get_role_data,
+    retrieve_roles_batch,
 )
+from app.career_engine.role_store import RoleKnowledgeStore
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,7 +44,22 @@ class SemanticRoleMatcher:
             logger.error(f"SemanticRoleMatcher detailed error: {e}")
             return [{"role": "Software Engineer", "confidence": 50.0, "skills_matched": [], "skills_missing": []}]
 
+    @classmethod
+    def find_roles_batch(cls, resume_texts, top_k: int = 5):
+        """
+        Bulk screening: detailed role matches for many resumes in one
+        matrix pass. Returns one result list per resume, in input order.
+        """
+        try:
+            return retrieve_roles_batch(resume_texts, top_k=top_k)
+        except Exception as e:
+            logger.error(f"SemanticRoleMatcher batch error: {e}")
+            return [
+                [{"role": "Software Engineer", "confidence": 50.0, "skills_matched": [], "skills_missing": []}]
+                for _ in resume_texts
+            ]
+
     @classmethod
     def get_role_profile(cls, role_name: str):
-        """Get complete profile data for a specific role."""
-        return get_role_data(role_name)
+        """Get complete profile data for a specific role (shared role store)."""
+        return RoleKnowledgeStore.get_role(role_name)
@@ -1,7 +1,7 @@
 """Singleton Model Manager — loads all AI models ONCE.
 
-All heavy model initialization (Gemini API config, spaCy NLP, embedding mock)
-is centralized here.  Call `get_*` methods from any service — the first call
+All heavy model initialization (Gemini API config, spaCy NLP / NER-only
+pipeline, embedding mock) is centralized here.  Call `get_*` methods from any service — the first call
 initializes, all subsequent calls return the cached instance.
 """
 
@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 
 _init_lock = threading.Lock()
 
+# Components the NER-only pipeline leaves out — only doc.ents is ever read
+_NER_EXCLUDED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter", "morphologizer"]
+
 
 class AIModelManager:
     """
@@ -29,6 +32,8 @@ class AIModelManager:
     _gemini_configured: bool = False
     _gemini_api_key: str = ""
     _spacy_nlp = None
+    _spacy_ner = None
+    _spacy_ner_failed: bool = False
     _embedding_model = None
 
     # ── Gemini Singleton ─────────────────────────────────────────
@@ -93,13 +98,38 @@ class AIModelManager:
                 return cls._spacy_nlp
             try:
                 import spacy
-                cls._spacy_nlp = spacy.load("en_core_web_sm")
+                cls._spacy_nlp = spacy.load(settings.SPACY_MODEL)
                 logger.info("✅ spaCy NLP model loaded (singleton).")
             except Exception as e:
                 logger.error(f"Failed to load spaCy model: {e}")
                 return None
         return cls._spacy_nlp
 
+    # ── spaCy NER-only Singleton ─────────────────────────────────
+    @classmethod
+    def get_spacy_ner(cls):
+        """
+        Lean spaCy pipeline for entity extraction: tok2vec + ner only (tagger,
+        parser, lemmatizer ... are never loaded).  Callers cap their input at
+        SPACY_MAX_CHARS.  A missing model is reported once, not retried per call.
+        """
+        if cls._spacy_ner is not None or cls._spacy_ner_failed:
+            return cls._spacy_ner
+
+        with _init_lock:
+            if cls._spacy_ner is not None or cls._spacy_ner_failed:
+                return cls._spacy_ner
+            try:
+                import spacy
+                nlp = spacy.load(settings.SPACY_MODEL, exclude=_NER_EXCLUDED_COMPONENTS)
+                nlp.max_length = max(nlp.max_length, settings.SPACY_MAX_CHARS)
+                cls._spacy_ner = nlp
+                logger.info("✅ spaCy NER pipeline loaded (singleton) | components=%s", nlp.pipe_names)
+            except Exception as e:
+                cls._spacy_ner_failed = True
+                logger.error(f"Failed to load spaCy NER pipeline: {e}")
+        return cls._spacy_ner
+
     # ── Embedding Mock Singleton ─────────────────────────────────
     @classmethod
     def get_embedding_model(cls):
@@ -115,7 +145,7 @@ class AIModelManager:
     def preload(cls):
         """Pre-warm all singletons at startup."""
         cls.configure_gemini()
-        cls.get_spacy_nlp()
+        cls.get_spacy_ner()
         cls.get_embedding_model()
 
 
@@ -5,17 +5,25 @@ Single gateway for ALL AI features.
 Priority: Gemini (free, configured) → OpenAI (paid) → Smart Fallback
 
 This ensures every feature works regardless of which API keys are available.
+Identical concurrent requests (double-clicked uploads, parallel endpoints)
+are coalesced into one provider call via `llm_flight`.  Provider calls go
+through the pooled async clients in `llm_clients` (no thread per call).
+`generate_stream` / `chat_stream` yield text deltas for SSE endpoints.
 """
 
 import os
 import re
 import json
+import copy
 import logging
 import asyncio
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, Tuple
 from dotenv import load_dotenv
 
+from app.core.resilience import flight_key, llm_flight
+from app.core.llm_clients import get_gemini_client, get_openai_client
+
 _env_path = Path(__file__).resolve().parent.parent.parent / ".env"
 load_dotenv(dotenv_path=_env_path, override=False)
 
@@ -55,7 +63,19 @@ class AIProvider:
             temperature: Creativity level
             provider: Force a specific provider or "auto"
             timeout: Timeout in seconds
+
+        Concurrent calls with the same prompt and params share one provider call.
         """
+        key = flight_key("generate", prompt, system_prompt, max_tokens, temperature, provider)
+        return await llm_flight.do(
+            key,
+            lambda: AIProvider._generate(prompt, system_prompt, max_tokens, temperature, provider, timeout),
+        )
+
+    @staticmethod
+    async def _generate(
+        prompt: str, system_prompt: str, max_tokens: int, temperature: float, provider: str, timeout: int
+    ) -> str:
         result = ""
 
         # ── Try Gemini (Primary) ────────────────────────────────────
@@ -93,7 +113,19 @@ class AIProvider:
         temperature: float = 0.4,
         timeout: int = 45,
     ) -> Optional[Dict[str, Any]]:
-        """Generate AI response and parse as JSON."""
+        """Generate AI response and parse as JSON (concurrent identical calls share one result)."""
+        key = flight_key("generate_json", prompt, system_prompt, max_tokens, temperature)
+        parsed = await llm_flight.do(
+            key,
+            lambda: AIProvider._generate_json(prompt, system_prompt, max_tokens, temperature, timeout),
+        )
+        # Each caller gets its own copy of the shared dict
+        return copy.deepcopy(parsed)
+
+    @staticmethod
+    async def _generate_json(
+        prompt: str, system_prompt: str, max_tokens: int, temperature: float, timeout: int
+    ) -> Optional[Dict[str, Any]]:
         raw = await AIProvider.generate(
             prompt=prompt,
             system_prompt=system_prompt,
@@ -214,8 +246,6 @@ Reference actual skills, growth scores, and salary ranges from the knowledge bas
     async def _call_gemini(
         prompt: str, system_prompt: str, max_tokens: int, temperature: float, timeout: int
     ) -> str:
-        import google.generativeai as genai
-        from app.core.ai_model import AIModelManager
         from app.services.api_credit_manager import APICreditManager
 
         # Check credits
@@ -223,20 +253,11 @@ Reference actual skills, growth scores, and salary ranges from the knowledge bas
         if not allowed:
             raise ValueError(f"Gemini daily credit limit reached (0 remaining)")
 
-        AIModelManager.configure_gemini()
-
-        model = genai.GenerativeModel(
-            "gemini-2.0-flash",
-            generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
-            system_instruction=system_prompt,
-        )
-
-        def _sync():
-            response = model.generate_content(prompt)
-            return response.text
-
         logger.info("Gemini credit used. Remaining today: %d", remaining)
-        return await asyncio.wait_for(asyncio.to_thread(_sync), timeout=timeout)
+        return await asyncio.wait_for(
+            get_gemini_client().generate(prompt, system_prompt, max_tokens, temperature, timeout),
+            timeout=timeout,
+        )
 
     # ─────────────────────────────────────────────────────────────────
     # Internal: OpenAI
@@ -245,31 +266,22 @@ Reference actual skills, growth scores, and salary ranges from the knowledge bas
     async def _call_openai(
         prompt: str, system_prompt: str, max_tokens: int, temperature: float, timeout: int
     ) -> str:
-        from openai import AsyncOpenAI
         from app.services.api_credit_manager import APICreditManager
 
         allowed, remaining = APICreditManager.check_and_use("openai")
         if not allowed:
             raise ValueError("OpenAI daily credit limit reached")
 
-        key = os.getenv("OPENAI_API_KEY", "")
-        client = AsyncOpenAI(api_key=key, timeout=float(timeout))
-
         logger.info("OpenAI credit used. Remaining today: %d", remaining)
 
-        resp = await asyncio.wait_for(
-            client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature,
-            ),
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+        return await asyncio.wait_for(
+            get_openai_client().chat(messages, max_tokens, temperature, timeout),
             timeout=timeout,
         )
-        return resp.choices[0].message.content or ""
 
     # ─────────────────────────────────────────────────────────────────
     # Conversational Chat (with history)
@@ -307,22 +319,25 @@ Reference actual skills, growth scores, and salary ranges from the knowledge bas
         messages: List[Dict[str, str]], system_prompt: str,
         max_tokens: int, temperature: float, timeout: int
     ) -> str:
-        import google.generativeai as genai
-        from app.core.ai_model import AIModelManager
         from app.services.api_credit_manager import APICreditManager
 
         allowed, remaining = APICreditManager.check_and_use("gemini")
         if not allowed:
             raise ValueError("Gemini daily limit reached")
 
-        AIModelManager.configure_gemini()
+        final_prompt = AIProvider._gemini_chat_prompt(messages)
 
-        model = genai.GenerativeModel(
-            "gemini-2.0-flash",
-            generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
-            system_instruction=system_prompt,
+        logger.info("Gemini chat credit used. Remaining: %d", remaining)
+        result = await asyncio.wait_for(
+            get_gemini_client().generate(final_prompt, system_prompt, max_tokens, temperature, timeout),
+            timeout=timeout,
         )
+        # Clean any "AI Mentor:" prefix that Gemini might add
+        result = re.sub(r'^AI Mentor:\s*', '', result.strip())
+        return result
 
+    @staticmethod
+    def _gemini_chat_prompt(messages: List[Dict[str, str]]) -> str:
         # Build conversation for Gemini
         # Gemini uses a different format — we'll concatenate into a single prompt
         conversation_text = ""
@@ -330,7 +345,7 @@ Reference actual skills, growth scores, and salary ranges from the knowledge bas
             role_label = "Student" if msg["role"] == "user" else "AI Mentor"
             conversation_text += f"\n{role_label}: {msg['content']}\n"
 
-        final_prompt = f"""Continue this conversation as the AI Mentor. 
+        return f"""Continue this conversation as the AI Mentor. 
 Respond to the student's latest message.
 
 CONVERSATION:
@@ -338,43 +353,135 @@ CONVERSATION:
 
 AI Mentor:"""
 
-        def _sync():
-            response = model.generate_content(final_prompt)
-            return response.text
-
-        logger.info("Gemini chat credit used. Remaining: %d", remaining)
-        result = await asyncio.wait_for(asyncio.to_thread(_sync), timeout=timeout)
-        # Clean any "AI Mentor:" prefix that Gemini might add
-        result = re.sub(r'^AI Mentor:\s*', '', result.strip())
-        return result
-
     @staticmethod
     async def _chat_openai(
         messages: List[Dict[str, str]], system_prompt: str,
         max_tokens: int, temperature: float, timeout: int
     ) -> str:
-        from openai import AsyncOpenAI
         from app.services.api_credit_manager import APICreditManager
 
         allowed, remaining = APICreditManager.check_and_use("openai")
         if not allowed:
             raise ValueError("OpenAI daily limit reached")
 
-        key = os.getenv("OPENAI_API_KEY", "")
-        client = AsyncOpenAI(api_key=key, timeout=float(timeout))
-
         oai_messages = [{"role": "system", "content": system_prompt}]
         for msg in messages[-10:]:
             oai_messages.append({"role": msg["role"], "content": msg["content"]})
 
         logger.info("OpenAI chat credit used. Remaining: %d", remaining)
-        resp = await asyncio.wait_for(
-            client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=oai_messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-            ),
+        return await asyncio.wait_for(
+            get_openai_client().chat(oai_messages, max_tokens, temperature, timeout),
             timeout=timeout,
         )
-        return resp.choices[0].message.content or ""
+
+    # ─────────────────────────────────────────────────────────────────
+    # Streaming (SSE endpoints)
+    # ─────────────────────────────────────────────────────────────────
+    @staticmethod
+    async def generate_stream(
+        prompt: str,
+        system_prompt: str = "You are a helpful AI assistant.",
+        max_tokens: int = 1200,
+        temperature: float = 0.7,
+        provider: str = "auto",
+        timeout: int = 45,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response as text deltas. Gemini → OpenAI like `generate`;
+        yields nothing if every provider fails, so callers can fall back.
+        """
+        attempts = []
+        if provider in ("auto", "gemini") and AIProvider._gemini_available():
+            attempts.append(("Gemini", "gemini", lambda: get_gemini_client().generate_stream(
+                prompt, system_prompt, max_tokens, temperature, timeout,
+            )))
+        if provider in ("auto", "openai") and AIProvider._openai_available():
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ]
+            attempts.append(("OpenAI", "openai", lambda: get_openai_client().chat_stream(
+                messages, max_tokens, temperature, timeout,
+            )))
+        async for delta in AIProvider._stream_first_available(attempts):
+            yield delta
+
+    @staticmethod
+    async def chat_stream(
+        messages: List[Dict[str, str]],
+        system_prompt: str = "You are a helpful AI assistant.",
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        timeout: int = 30,
+    ) -> AsyncIterator[str]:
+        """Streaming `chat`: same message format, yields text deltas."""
+        attempts = []
+        if AIProvider._gemini_available():
+            final_prompt = AIProvider._gemini_chat_prompt(messages)
+            attempts.append(("Gemini", "gemini", lambda: _strip_leading(
+                get_gemini_client().generate_stream(final_prompt, system_prompt, max_tokens, temperature, timeout),
+                re.compile(r'^\s*AI Mentor:\s*'), len("AI Mentor: "),
+            )))
+        if AIProvider._openai_available():
+            oai_messages = [{"role": "system", "content": system_prompt}]
+            for msg in messages[-10:]:
+                oai_messages.append({"role": msg["role"], "content": msg["content"]})
+            attempts.append(("OpenAI", "openai", lambda: get_openai_client().chat_stream(
+                oai_messages, max_tokens, temperature, timeout,
+            )))
+        async for delta in AIProvider._stream_first_available(attempts):
+            yield delta
+
+    @staticmethod
+    async def _stream_first_available(
+        attempts: List[Tuple[str, str, Callable[[], AsyncIterator[str]]]],
+    ) -> AsyncIterator[str]:
+        """
+        Stream from the first provider that produces output.  A provider is
+        only skipped for the next if it fails before its first delta — text
+        already sent to the client cannot be retracted.
+        """
+        from app.services.api_credit_manager import APICreditManager
+
+        for label, credit_key, open_stream in attempts:
+            allowed, remaining = APICreditManager.check_and_use(credit_key)
+            if not allowed:
+                logger.warning("%s daily credit limit reached — skipping stream", label)
+                continue
+            logger.info("%s stream credit used. Remaining today: %d", label, remaining)
+
+            sent = 0
+            try:
+                async for delta in open_stream():
+                    sent += len(delta)
+                    yield delta
+            except Exception as e:
+                if sent:
+                    logger.warning("%s stream broke after %d chars: %s", label, sent, str(e)[:100])
+                    return
+                logger.warning("%s stream failed: %s — trying next provider", label, str(e)[:100])
+                continue
+            if sent:
+                logger.info("AI response streamed via %s (%d chars)", label, sent)
+                return
+
+        logger.warning("All AI providers failed to stream.")
+
+
+async def _strip_leading(stream: AsyncIterator[str], pattern: "re.Pattern", lookahead: int) -> AsyncIterator[str]:
+    """Drop a prefix (e.g. "AI Mentor:") from a delta stream, buffering only the first few chars."""
+    head = ""
+    async for delta in stream:
+        if head is None:
+            yield delta
+            continue
+        head += delta
+        if len(head) >= lookahead:
+            head = pattern.sub("", head, count=1)
+            if head:
+                yield head
+            head = None
+    if head:
+        head = pattern.sub("", head, count=1)
+        if head:
+            yield head
@@ -0,0 +1,384 @@
+"""Content-Addressed Resume Storage
+===============================
+Uploads are stored once per distinct content, named by their sha256:
+
+  - Identical files share one blob across users, re-uploads and versions;
+    `stored_blobs.refcount` counts the resumes (and in-flight uploads)
+    using it, and the blob is deleted when that drops to zero
+  - Resume.file_path holds blob_key(digest) ("blobs/ab/abcdef..."), which
+    says nothing about the backend; the locator (server path / s3:// URI)
+    stays internal to this module and stored_blobs
+  - Extraction cache: the extracted text + parsed sections are kept per
+    blob (hot copy in the analysis cache, durable copy on the blob row), so
+    a re-uploaded identical PDF skips parsing and OCR entirely.  Bump
+    EXTRACTION_VERSION when extraction output changes.
+  - Backends (BLOB_STORE_BACKEND):
+        local — files under BLOB_STORE_LOCAL_DIR/ab/abcdef... (default);
+                the spooled upload is moved into place, not copied
+        s3    — AWS_S3_BUCKET / BLOB_STORE_S3_PREFIX via boto3; set
+                AWS_S3_ENDPOINT_URL for S3-compatible stores (MinIO, R2),
+                or to local:// for `LocalS3`, an in-process stand-in with
+                the same client API for tests
+
+Usage:
+    store = get_blob_store()
+    locator = store.put(upload.path, upload.sha256, upload.size)   # +1 ref
+    async with store.local_path(digest) as path:
+        ...   # parse the file
+    store.release(digest)                                          # -1 ref
+"""
+
+import os
+import re
+import shutil
+import asyncio
+import logging
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.all_models import StoredBlob
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_VERSION = "2"   # 2: segmented sections with offsets
+
+_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def blob_key(digest: str) -> str:
+    """Backend-independent name for a blob, stored as Resume.file_path."""
+    return f"blobs/{digest[:2]}/{digest}"
+
+
+def blob_digest(locator: Optional[str]) -> Optional[str]:
+    """sha256 of the blob a Resume.file_path (key or locator) points at (None for pre-blob uploads)."""
+    if not locator:
+        return None
+    match = _DIGEST_RE.search(os.path.basename(locator))
+    return match.group(0) if match else None
+
+
+# ─── BACKENDS ────────────────────────────────────────────────────────────────
+# put() consumes the source file; fetch() returns (local path, is_temporary).
+
+class LocalBlobBackend:
+    """Blobs on local disk, fanned out into 256 directories by hash prefix."""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def locator(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.locator(digest))
+
+    def put(self, digest: str, src_path: str) -> None:
+        path = self.locator(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(src_path, path)   # a rename when the spool dir is on the same filesystem
+
+    def fetch(self, digest: str) -> Tuple[str, bool]:
+        return self.locator(digest), False
+
+    def delete(self, digest: str) -> None:
+        try:
+            os.remove(self.locator(digest))
+        except OSError:
+            pass
+
+
+class LocalS3Error(Exception):
+    """Shaped like botocore's ClientError so S3BlobBackend handles both the same way."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.response = {"Error": {"Code": code, "Message": message}}
+
+
+class LocalS3:
+    """
+    In-process stand-in for a boto3 S3 client (head_object / upload_file /
+    download_file / delete_object), so the S3 backend can be exercised
+    without a bucket.
+    """
+
+    def __init__(self):
+        self._objects: Dict[Tuple[str, str], bytes] = {}
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        with self._lock:
+            body = self._objects.get((Bucket, Key))
+        if body is None:
+            raise LocalS3Error("404", f"s3://{Bucket}/{Key} not found")
+        return {"ContentLength": len(body)}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str) -> None:
+        with open(Filename, "rb") as f:
+            body = f.read()
+        with self._lock:
+            self._objects[(Bucket, Key)] = body
+
+    def download_file(self, Bucket: str, Key: str, Filename: str) -> None:
+        with self._lock:
+            body = self._objects.get((Bucket, Key))
+        if body is None:
+            raise LocalS3Error("404", f"s3://{Bucket}/{Key} not found")
+        with open(Filename, "wb") as f:
+            f.write(body)
+
+    def delete_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        with self._lock:
+            self._objects.pop((Bucket, Key), None)
+        return {}
+
+
+class S3BlobBackend:
+    """S3 / S3-compatible object store; blobs are downloaded to a temp file for parsing."""
+
+    name = "s3"
+
+    def __init__(self, client, bucket: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    @classmethod
+    def from_settings(cls) -> "S3BlobBackend":
+        if not settings.AWS_S3_BUCKET:
+            raise ValueError("AWS_S3_BUCKET is not set")
+        if (settings.AWS_S3_ENDPOINT_URL or "").startswith("local://"):
+            return cls(LocalS3(), settings.AWS_S3_BUCKET, settings.BLOB_STORE_S3_PREFIX)
+        import boto3  # optional dependency, only needed for this backend
+        client = boto3.client(
+            "s3",
+            region_name=settings.AWS_REGION,
+            endpoint_url=settings.AWS_S3_ENDPOINT_URL or None,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        )
+        return cls(client, settings.AWS_S3_BUCKET, settings.BLOB_STORE_S3_PREFIX)
+
+    def _key(self, digest: str) -> str:
+        return f"{self.prefix}{digest[:2]}/{digest}"
+
+    def locator(self, digest: str) -> str:
+        return f"s3://{self.bucket}/{self._key(digest)}"
+
+    def exists(self, digest: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(digest))
+            return True
+        except Exception as e:
+            code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put(self, digest: str, src_path: str) -> None:
+        self.client.upload_file(Filename=src_path, Bucket=self.bucket, Key=self._key(digest))
+        os.remove(src_path)
+
+    def fetch(self, digest: str) -> Tuple[str, bool]:
+        fd, path = tempfile.mkstemp(prefix="blob_")
+        os.close(fd)
+        try:
+            self.client.download_file(Bucket=self.bucket, Key=self._key(digest), Filename=path)
+        except Exception:
+            os.remove(path)
+            raise
+        return path, True
+
+    def delete(self, digest: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(digest))
+
+
+# ─── STORE FRONT ─────────────────────────────────────────────────────────────
+
+class BlobStore:
+    """Refcounted, deduplicating front over a backend, plus the per-blob extraction cache."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stored = 0
+        self.deduplicated = 0
+        self.deleted = 0
+        self.extraction_hits = 0
+        self.extraction_misses = 0
+
+    # ── blobs ──
+
+    def put(self, src_path: str, digest: str, size: int) -> str:
+        """
+        Take a reference on `digest`, storing `src_path` as its blob unless an
+        identical one is already stored.  Consumes `src_path`; returns the locator.
+        """
+        locator = self.backend.locator(digest)
+        known = self._acquire(digest, size, locator)
+        if known and self.backend.exists(digest):
+            os.remove(src_path)
+            self.deduplicated += 1
+            logger.info("Blob %s already stored — upload deduplicated", digest[:12])
+        else:
+            self.backend.put(digest, src_path)
+            self.stored += 1
+        return locator
+
+    def _acquire(self, digest: str, size: int, locator: str) -> bool:
+        """+1 ref (creating the row if needed); True if the blob row already existed."""
+        db = SessionLocal()
+        try:
+            bump = {StoredBlob.refcount: StoredBlob.refcount + 1, StoredBlob.last_used_at: func.now()}
+            if db.query(StoredBlob).filter(StoredBlob.sha256 == digest).update(bump, synchronize_session=False):
+                db.commit()
+                return True
+            db.add(StoredBlob(sha256=digest, size=size, locator=locator, refcount=1))
+            try:
+                db.commit()
+                return False
+            except IntegrityError:
+                # Same content uploaded concurrently — the other request created the row
+                db.rollback()
+                db.query(StoredBlob).filter(StoredBlob.sha256 == digest).update(bump, synchronize_session=False)
+                db.commit()
+                return True
+        finally:
+            db.close()
+
+    def release(self, digest: str) -> None:
+        """-1 ref; the blob (and its cached extraction) goes when nothing uses it."""
+        db = SessionLocal()
+        try:
+            db.query(StoredBlob).filter(StoredBlob.sha256 == digest).update(
+                {StoredBlob.refcount: StoredBlob.refcount - 1}, synchronize_session=False,
+            )
+            gone = db.query(StoredBlob).filter(StoredBlob.sha256 == digest, StoredBlob.refcount <= 0).delete(
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+        if gone:
+            self.backend.delete(digest)
+            self.deleted += 1
+            logger.info("Blob %s no longer referenced — deleted", digest[:12])
+
+    @asynccontextmanager
+    async def local_path(self, digest: str):
+        """A local file path for the blob (downloaded to a temp file for remote backends)."""
+        path, temporary = await asyncio.to_thread(self.backend.fetch, digest)
+        try:
+            yield path
+        finally:
+            if temporary:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # ── extraction cache ──
+
+    @staticmethod
+    def _hot_key(digest: str) -> str:
+        return f"extract:{digest}:{EXTRACTION_VERSION}"
+
+    def get_extraction(self, digest: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(text, sections) extracted earlier from this blob, or None."""
+        from app.core.result_cache import get_analysis_cache
+        cached = get_analysis_cache().get(self._hot_key(digest))
+        if cached is None:
+            db = SessionLocal()
+            try:
+                row = (
+                    db.query(StoredBlob.extracted_text, StoredBlob.parsed_sections)
+                    .filter(StoredBlob.sha256 == digest, StoredBlob.extraction_version == EXTRACTION_VERSION)
+                    .first()
+                )
+            finally:
+                db.close()
+            if row is not None and row[0]:
+                cached = {"text": row[0], "sections": row[1] or {}}
+                get_analysis_cache().set(self._hot_key(digest), cached)
+        if cached is None:
+            self.extraction_misses += 1
+            return None
+        self.extraction_hits += 1
+        return cached["text"], cached["sections"]
+
+    def save_extraction(self, digest: str, text: str, sections: Dict[str, Any]) -> None:
+        from app.core.result_cache import get_analysis_cache
+        get_analysis_cache().set(self._hot_key(digest), {"text": text, "sections": sections})
+        db = SessionLocal()
+        try:
+            db.query(StoredBlob).filter(StoredBlob.sha256 == digest).update(
+                {
+                    StoredBlob.extraction_version: EXTRACTION_VERSION,
+                    StoredBlob.extracted_text: text,
+                    StoredBlob.parsed_sections: sections,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Could not persist extraction for blob %s: %s", digest[:12], e)
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            blobs, total_bytes, refs = db.query(
+                func.count(StoredBlob.sha256), func.sum(StoredBlob.size), func.sum(StoredBlob.refcount),
+            ).one()
+        except Exception:
+            blobs = total_bytes = refs = None
+        finally:
+            db.close()
+        return {
+            "backend": self.backend.name,
+            "blobs": blobs,
+            "bytes": int(total_bytes or 0),
+            "references": int(refs or 0),
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "deleted": self.deleted,
+            "extraction_hits": self.extraction_hits,
+            "extraction_misses": self.extraction_misses,
+        }
+
+
+def _backend_from_settings():
+    kind = settings.BLOB_STORE_BACKEND.lower()
+    if kind == "s3":
+        try:
+            return S3BlobBackend.from_settings()
+        except Exception as e:
+            logger.warning("Blob store backend 's3' unavailable (%s) — storing uploads on local disk", e)
+    return LocalBlobBackend(settings.BLOB_STORE_LOCAL_DIR)
+
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store, built from settings on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BlobStore(_backend_from_settings())
+                logger.info("✅ Blob store ready | backend=%s", _store.backend.name)
+    return _store
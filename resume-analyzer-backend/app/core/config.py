@@ -12,6 +12,11 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "password")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "resume_analyzer_ai")
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    # Connection pool, per engine (sync and async each get one; SQLite ignores these)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
 
     @property
     def database_url(self) -> str:
@@ -34,6 +39,9 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "ai_resume_analyzer_super_secret_jwt_key_2024_do_not_share")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24 hours
+    # Authenticated principals cached per (token sub, iat) — skips the user lookup on every request
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))  # 0 disables
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -51,19 +59,75 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: Optional[str] = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_S3_BUCKET: Optional[str] = os.getenv("AWS_S3_BUCKET")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
+    AWS_S3_ENDPOINT_URL: Optional[str] = os.getenv("AWS_S3_ENDPOINT_URL")  # S3-compatible store (MinIO, R2...); local:// = in-process stand-in
+
+    # RESUME BLOB STORE (content-addressed uploads, deduplicated by sha256: local | s3)
+    BLOB_STORE_BACKEND: str = os.getenv("BLOB_STORE_BACKEND", "local")
+    BLOB_STORE_LOCAL_DIR: str = os.getenv("BLOB_STORE_LOCAL_DIR", "uploads/blobs")
+    BLOB_STORE_S3_PREFIX: str = os.getenv("BLOB_STORE_S3_PREFIX", "resumes/")
 
     # AI PROVIDERS (HuggingFace / OpenAI / Gemini)
     HUGGINGFACE_API_KEY: Optional[str] = os.getenv("HUGGINGFACE_API_KEY")
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
+
+    # LLM CLIENTS (pooled async REST clients; point the bases at a stub server in tests)
+    GEMINI_API_BASE: str = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+    OPENAI_API_BASE: str = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+    LLM_MAX_CONCURRENCY_GEMINI: int = int(os.getenv("LLM_MAX_CONCURRENCY_GEMINI", "8"))
+    LLM_MAX_CONCURRENCY_OPENAI: int = int(os.getenv("LLM_MAX_CONCURRENCY_OPENAI", "8"))
     
     # REAL-TIME JOBS API
     SERPAPI_API_KEY: Optional[str] = os.getenv("SERPAPI_API_KEY")
 
+    # ANALYSIS RESULT CACHE (memory | sqlite | redis)
+    ANALYSIS_CACHE_BACKEND: str = os.getenv("ANALYSIS_CACHE_BACKEND", "memory")
+    ANALYSIS_CACHE_URL: str = os.getenv("ANALYSIS_CACHE_URL", "")  # sqlite path, redis:// URL or local://
+    ANALYSIS_CACHE_TTL_SECONDS: int = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "86400"))  # 24 hours
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "2048"))
+
+    # POPULATION PERCENTILES (/benchmark) — score histograms per predicted_role, persisted in score_distributions
+    PERCENTILE_BIN_WIDTH: float = float(os.getenv("PERCENTILE_BIN_WIDTH", "0.5"))  # score points per bin (0-100 scale)
+    PERCENTILE_MIN_SAMPLES: int = int(os.getenv("PERCENTILE_MIN_SAMPLES", "20"))  # below this a role falls back to all resumes
+    PERCENTILE_REFRESH_SECONDS: int = int(os.getenv("PERCENTILE_REFRESH_SECONDS", "60"))  # reload other workers' updates
+
+    # SPACY (NER-only pipeline for AIParserService; batched nlp.pipe for bulk parsing)
+    SPACY_MODEL: str = os.getenv("SPACY_MODEL", "en_core_web_sm")
+    SPACY_MAX_CHARS: int = int(os.getenv("SPACY_MAX_CHARS", "20000"))  # resume text beyond this is not NER-tagged
+    SPACY_PIPE_BATCH_SIZE: int = int(os.getenv("SPACY_PIPE_BATCH_SIZE", "32"))
+    SPACY_PIPE_PROCESSES: int = int(os.getenv("SPACY_PIPE_PROCESSES", "0"))  # offline / scripted batches; 0 = one per CPU core
+    SPACY_REQUEST_PIPE_PROCESSES: int = int(os.getenv("SPACY_REQUEST_PIPE_PROCESSES", "1"))  # inside an API request: no process pool per request
+
+    # STRUCTURED RESUME EXTRACTION (builders / LaTeX / company ATS; the LLM only parses below this confidence)
+    STRUCTURE_LLM_MIN_CONFIDENCE: float = float(os.getenv("STRUCTURE_LLM_MIN_CONFIDENCE", "0.6"))
+
+    # TASK QUEUE (durable background tasks; run workers with `python -m app.task_worker run`)
+    TASK_QUEUE_EMBEDDED_WORKER: bool = os.getenv("TASK_QUEUE_EMBEDDED_WORKER", "true").lower() == "true"  # false on the API only where dedicated workers run (Procfile)
+    TASK_WORKER_CONCURRENCY: int = int(os.getenv("TASK_WORKER_CONCURRENCY", "2"))
+    TASK_LEASE_SECONDS: int = int(os.getenv("TASK_LEASE_SECONDS", "600"))  # running task is re-claimed after this
+    TASK_MAX_ATTEMPTS: int = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+    TASK_RETRY_BASE_SECONDS: float = float(os.getenv("TASK_RETRY_BASE_SECONDS", "5"))
+    TASK_RETRY_MAX_SECONDS: float = float(os.getenv("TASK_RETRY_MAX_SECONDS", "300"))
+    UPLOAD_REWRITE_WAIT_SECONDS: float = float(os.getenv("UPLOAD_REWRITE_WAIT_SECONDS", "120"))
+    UPLOAD_REWRITE_PICKUP_SECONDS: float = float(os.getenv("UPLOAD_REWRITE_PICKUP_SECONDS", "15"))  # no worker claims the rewrite by then: stage fails
+    UPLOAD_JOB_STALE_SECONDS: int = int(os.getenv("UPLOAD_JOB_STALE_SECONDS", "1800"))  # unfinished job untouched this long is failed at startup
+
     # OCR SETTINGS
     SARVAM_API_KEY: Optional[str] = os.getenv("SARVAM_API_KEY")
     TESSERACT_PATH: str = os.getenv("TESSERACT_PATH", r"C:\Program Files\Tesseract-OCR\tesseract.exe")
 
+    OCR_TARGET_DPI: int = int(os.getenv("OCR_TARGET_DPI", "300"))
+    OCR_MAX_PAGE_PIXELS: int = int(os.getenv("OCR_MAX_PAGE_PIXELS", "9000000"))  # ~A4 at 300 DPI; caps large pages
+    OCR_WORKERS: int = int(os.getenv("OCR_WORKERS", "2"))
+    OCR_QUEUE_SIZE: int = int(os.getenv("OCR_QUEUE_SIZE", "16"))  # jobs (pages/images) waiting beyond the workers
+    OCR_JOB_TIMEOUT_SECONDS: float = float(os.getenv("OCR_JOB_TIMEOUT_SECONDS", "60"))
+
+    # PDF EXTRACTION (page-parallel text layer; only pages without one are OCR'd)
+    PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "20"))
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PDF_PAGES_PER_TASK: int = int(os.getenv("PDF_PAGES_PER_TASK", "2"))
+    PDF_PAGE_MIN_CHARS: int = int(os.getenv("PDF_PAGE_MIN_CHARS", "50"))  # below this a page counts as scanned
+
     class Config:
         case_sensitive = True
         env_file = ".env"
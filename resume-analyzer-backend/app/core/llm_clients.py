@@ -0,0 +1,380 @@
+"""Async-Native LLM Provider Clients
+==================================
+One long-lived client per provider, talking to the REST APIs directly over a
+shared httpx connection pool instead of the blocking SDKs:
+
+  - No thread-pool worker is held while waiting on the model
+  - Keep-alive (and HTTP/2 when `h2` is installed) — no TLS handshake per call
+  - Per-provider limit on concurrent requests (LLM_MAX_CONCURRENCY_*), shared
+    by every event loop in the process (API loop, embedded task worker)
+  - Base URLs are configurable, so tests point them at scripts/llm_stub_server.py
+  - Streaming variants read the providers' SSE endpoints and yield text deltas
+
+Usage:
+    text = await get_gemini_client().generate(prompt, system_prompt, 1200, 0.7, timeout=45)
+    text = await get_openai_client().chat(messages, 800, 0.7, timeout=30)
+    async for delta in get_gemini_client().generate_stream(prompt, system_prompt):
+        ...
+"""
+
+import os
+import re
+import json
+import asyncio
+import logging
+import threading
+import importlib.util
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_KEEPALIVE_EXPIRY_SECONDS = 60.0
+_HTTP_STATUS = re.compile(r"(?:^|HTTP |: )(\d{3})\b")   # "gemini HTTP 400: ..." / SDK "400 API key not valid"
+
+
+class LLMProviderError(Exception):
+    """Provider returned an error status or an unusable body (message keeps the HTTP status)."""
+
+
+def permanent_provider_error(message: str) -> bool:
+    """
+    True when retrying cannot help: no API key / credit left, or a 4xx
+    rejection (bad key, bad request, unknown model).  408 / 409 / 429 and
+    5xx / network errors are transient.
+    """
+    lowered = message.lower()
+    if "not configured" in lowered or "credit limit" in lowered:
+        return True
+    status = _HTTP_STATUS.search(message)
+    return bool(status) and 400 <= int(status.group(1)) < 500 and int(status.group(1)) not in (408, 409, 429)
+
+
+class _ProcessLimiter:
+    """
+    Async concurrency limit shared across event loops (asyncio.Semaphore is
+    bound to one loop).  A released slot is handed straight to the oldest
+    waiter, on whichever loop it is waiting.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    async def __aenter__(self) -> None:
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            if waiter[1].done() and not waiter[1].cancelled():
+                self._release()   # the slot arrived as we were cancelled — pass it on
+            raise
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+            self._active -= 1
+
+    def _hand_over(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            self._release()
+        else:
+            future.set_result(None)
+
+
+class AsyncLLMClient:
+    """
+    Base client: pooled httpx.AsyncClients plus a process-wide concurrency limit.
+
+    An httpx.AsyncClient is bound to the event loop that created it, so each
+    loop gets its own (created lazily, closed by close_llm_clients() on that
+    loop); the concurrency limit is shared, so it holds however many loops
+    make calls.
+    """
+
+    name = "llm"
+
+    def __init__(self, base_url: str, max_concurrency: int):
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._clients_lock = threading.Lock()
+        self._limiter = _ProcessLimiter(self.max_concurrency)
+
+    def _api_key(self) -> str:
+        raise NotImplementedError
+
+    def _auth_headers(self, key: str) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is not None:
+            return client
+        with self._clients_lock:
+            # Loops that closed without close_llm_clients() took their connections with them
+            for dead in [other for other in self._clients if other.is_closed()]:
+                del self._clients[dead]
+            client = self._clients[loop] = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                timeout=httpx.Timeout(45.0, connect=5.0),
+            )
+        logger.info(
+            "✅ %s client ready | base=%s | http2=%s | max_concurrency=%d | loops=%d",
+            self.name, self.base_url, _HTTP2, self.max_concurrency, len(self._clients),
+        )
+        return client
+
+    async def _post_json(self, path: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        key = self._api_key()
+        if not key:
+            raise LLMProviderError(f"{self.name} API key not configured")
+        client = self._ensure_client()
+
+        async with self._limiter:
+            self.requests += 1
+            self.in_flight += 1
+            try:
+                resp = await client.post(path, json=payload, headers=self._auth_headers(key), timeout=timeout)
+            except httpx.HTTPError as e:
+                self.errors += 1
+                raise LLMProviderError(f"{self.name} request failed: {e}") from e
+            finally:
+                self.in_flight -= 1
+
+        if resp.status_code >= 400:
+            self.errors += 1
+            raise LLMProviderError(f"{self.name} HTTP {resp.status_code}: {resp.text[:200]}")
+        return resp.json()
+
+    async def _stream_sse(
+        self, path: str, payload: Dict[str, Any], timeout: float, params: Optional[Dict[str, str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        POST and yield each JSON `data:` event of the provider's SSE response.
+        The concurrency slot is held until the stream ends; `timeout` bounds
+        each read, so a stalled stream fails instead of hanging.
+        """
+        key = self._api_key()
+        if not key:
+            raise LLMProviderError(f"{self.name} API key not configured")
+        client = self._ensure_client()
+
+        async with self._limiter:
+            self.requests += 1
+            self.in_flight += 1
+            try:
+                async with client.stream(
+                    "POST", path, json=payload, params=params,
+                    headers=self._auth_headers(key), timeout=timeout,
+                ) as resp:
+                    if resp.status_code >= 400:
+                        body = (await resp.aread()).decode("utf-8", "replace")
+                        raise LLMProviderError(f"{self.name} HTTP {resp.status_code}: {body[:200]}")
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        if data:
+                            yield json.loads(data)
+            except httpx.HTTPError as e:
+                self.errors += 1
+                raise LLMProviderError(f"{self.name} stream failed: {e}") from e
+            except LLMProviderError:
+                self.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+    async def aclose(self) -> None:
+        """Close the running loop's client (each loop closes its own)."""
+        with self._clients_lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "event_loops": len(self._clients),
+            "http2": _HTTP2,
+        }
+
+
+class GeminiClient(AsyncLLMClient):
+    """Gemini `generateContent` REST endpoint."""
+
+    name = "gemini"
+    model = "gemini-2.0-flash"
+
+    def _api_key(self) -> str:
+        from app.core.ai_model import AIModelManager
+        return AIModelManager.configure_gemini()
+
+    def _auth_headers(self, key: str) -> Dict[str, str]:
+        return {"x-goog-api-key": key}
+
+    @staticmethod
+    def _payload(prompt: str, system_prompt: Optional[str], max_tokens: int, temperature: float) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": temperature, "maxOutputTokens": max_tokens},
+        }
+        if system_prompt:
+            payload["systemInstruction"] = {"parts": [{"text": system_prompt}]}
+        return payload
+
+    async def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1200,
+        temperature: float = 0.7,
+        timeout: float = 45,
+    ) -> str:
+        payload = self._payload(prompt, system_prompt, max_tokens, temperature)
+        data = await self._post_json(f"models/{self.model}:generateContent", payload, timeout)
+        try:
+            parts = data["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError, TypeError):
+            raise LLMProviderError(f"gemini returned no candidates: {str(data.get('promptFeedback', ''))[:200]}")
+        return "".join(p.get("text", "") for p in parts)
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1200,
+        temperature: float = 0.7,
+        timeout: float = 45,
+    ) -> AsyncIterator[str]:
+        """Yield text deltas from `streamGenerateContent` as they arrive."""
+        payload = self._payload(prompt, system_prompt, max_tokens, temperature)
+        async for event in self._stream_sse(
+            f"models/{self.model}:streamGenerateContent", payload, timeout, params={"alt": "sse"},
+        ):
+            for candidate in event.get("candidates", [])[:1]:
+                text = "".join(p.get("text", "") for p in candidate.get("content", {}).get("parts", []))
+                if text:
+                    yield text
+
+
+class OpenAIClient(AsyncLLMClient):
+    """OpenAI `chat/completions` REST endpoint."""
+
+    name = "openai"
+    model = "gpt-4o-mini"
+
+    def _api_key(self) -> str:
+        return os.getenv("OPENAI_API_KEY", "")
+
+    def _auth_headers(self, key: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {key}"}
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        timeout: float = 45,
+    ) -> str:
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        data = await self._post_json("chat/completions", payload, timeout)
+        try:
+            return data["choices"][0]["message"].get("content") or ""
+        except (KeyError, IndexError, TypeError):
+            raise LLMProviderError(f"openai returned no choices: {str(data)[:200]}")
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        timeout: float = 45,
+    ) -> AsyncIterator[str]:
+        """Yield content deltas from a `stream: true` chat completion."""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+        }
+        async for event in self._stream_sse("chat/completions", payload, timeout):
+            for choice in event.get("choices", [])[:1]:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    yield text
+
+
+_gemini_client: Optional[GeminiClient] = None
+_openai_client: Optional[OpenAIClient] = None
+
+
+def get_gemini_client() -> GeminiClient:
+    global _gemini_client
+    if _gemini_client is None:
+        _gemini_client = GeminiClient(settings.GEMINI_API_BASE, settings.LLM_MAX_CONCURRENCY_GEMINI)
+    return _gemini_client
+
+
+def get_openai_client() -> OpenAIClient:
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = OpenAIClient(settings.OPENAI_API_BASE, settings.LLM_MAX_CONCURRENCY_OPENAI)
+    return _openai_client
+
+
+def llm_client_stats() -> Dict[str, Any]:
+    return {c.name: c.stats() for c in (_gemini_client, _openai_client) if c is not None}
+
+
+async def close_llm_clients() -> None:
+    """Close the running loop's pooled connections (API shutdown, embedded worker exit)."""
+    for client in (_gemini_client, _openai_client):
+        if client is not None:
+            await client.aclose()
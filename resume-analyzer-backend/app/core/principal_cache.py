@@ -0,0 +1,114 @@
+"""Authenticated Principal Cache
+=============================
+deps.get_current_user used to load the full User row on every
+authenticated request, including endpoints that only need the caller's id.
+It now resolves a token to a `Principal` (id, email, is_active), cached per
+(token sub, token iat):
+
+  - Hit  → no session checkout, no query
+  - Miss → one SELECT of three columns, then cached for
+           PRINCIPAL_CACHE_TTL_SECONDS (LRU-bounded by PRINCIPAL_CACHE_MAX_ENTRIES)
+  - invalidate(user_id) drops every cached token of a user; call it after
+    anything that changes email / is_active (PUT /users/me, deactivation)
+
+The cache is per process: another worker may serve a stale principal for up
+to the TTL after an invalidation, which is why the TTL is short.
+Hit / miss counters are reported at /healthz.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Principal(NamedTuple):
+    """The authenticated caller — an immutable snapshot, not a live ORM row."""
+    id: int
+    email: str
+    is_active: bool
+
+
+class PrincipalCache:
+    """In-process LRU of (sub, iat) → Principal with per-entry expiry."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._data: "OrderedDict[Tuple[str, int], Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sub: str, iat: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._data.get((sub, iat))
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[(sub, iat)]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end((sub, iat))
+            self.hits += 1
+            return entry[1]
+
+    def set(self, sub: str, iat: int, principal: Principal) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[(sub, iat)] = (time.monotonic() + self.ttl, principal)
+            self._data.move_to_end((sub, iat))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget every cached token of `user_id`."""
+        sub = str(user_id)
+        with self._lock:
+            for key in [k for k in self._data if k[0] == sub]:
+                del self._data[key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._data),
+            "ttl_seconds": self.ttl,
+        }
+
+
+_cache: Optional[PrincipalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Process-wide principal cache, built from settings on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop cached principals of `user_id` (after email / is_active changes)."""
+    get_principal_cache().invalidate(user_id)
@@ -5,17 +5,20 @@ Centralizes:
   - Input sanitization for resume text
   - Prompt injection guard
   - Retry logic with exponential backoff
+  - Single-flight coalescing of identical in-flight LLM calls
 
 All AI-calling services should use these before invoking any LLM.
 """
 
 import re
 import time
+import hashlib
 import logging
 import asyncio
+import threading
 import concurrent.futures
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -153,6 +156,7 @@ def sanitize_resume_text(text: str, max_words: int = MAX_RESUME_WORDS) -> str:
 def validate_file_content(content: bytes, filename: str) -> None:
     """
     Validate uploaded file content beyond just extension/size checks.
+    Only the first 4 KB are inspected, so the upload's head is enough.
     Raises ValueError for suspicious content.
     """
     # Check for embedded script execution patterns (more specific to avoid skill false positives)
@@ -243,3 +247,98 @@ def wrap_resume_for_llm(resume_text: str, max_chars: int = 4000) -> str:
         f"{cleaned}\n"
         "=== END RESUME DATA ==="
     )
+
+
+# ─── 4. SINGLE-FLIGHT (request coalescing) ──────────────────────────────────
+
+def flight_key(namespace: str, *parts: Any) -> str:
+    """
+    Key for identical LLM requests: text parts are whitespace-normalised so a
+    re-sent prompt differing only in spacing still coalesces.
+    """
+    h = hashlib.sha256(namespace.encode("utf-8"))
+    for part in parts:
+        if isinstance(part, str):
+            part = " ".join(part.split())
+        h.update(b"\x1f" + repr(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one execution.
+
+    The first caller for a key runs the work; callers arriving while it is
+    still in flight share its result (or exception) instead of spending
+    another LLM credit and worker slot.  Nothing is kept once the call
+    finishes — repeat requests go to the analysis cache, not here.
+
+      do(key, factory)      async: factory() -> awaitable, run as one shared task
+      do_sync(key, fn)      threads: fn() runs once, other threads block on it
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0      # calls that actually ran
+        self.coalesced = 0     # calls served by another caller's in-flight run
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None and not task.done() and task.get_loop() is loop:
+                self.coalesced += 1
+            else:
+                # Run as its own task so one caller's cancellation (client
+                # disconnect) does not cancel the call for everyone else.
+                task = loop.create_task(factory())
+                self._tasks[key] = task
+                task.add_done_callback(lambda t, key=key: self._forget_task(key, t))
+                self.executed += 1
+        return await asyncio.shield(task)
+
+    def _forget_task(self, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def do_sync(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._futures[key] = future
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._futures.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._futures.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.executed + self.coalesced
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._tasks) + len(self._futures),
+            "dedup_rate": round(self.coalesced / total, 3) if total else 0.0,
+        }
+
+
+# Shared by AIProvider and the Gemini ATS analyzer; keys are namespaced per call type
+llm_flight = SingleFlight("llm")
@@ -0,0 +1,341 @@
+"""Content-Addressed Analysis Result Cache
+========================================
+Caches finished analyses (ATS scoring, job prediction) so a re-upload of
+the same resume skips the 1-3 s Gemini round-trip and keeps its credit.
+
+  - Key   = sha256(normalised text + target role + JD hash + engine version)
+  - TTL   per entry; LRU eviction once `max_entries` is reached
+  - Backends (ANALYSIS_CACHE_BACKEND):
+        memory  — in-process OrderedDict (default)
+        sqlite  — file shared by all workers on one host (ANALYSIS_CACHE_URL = path)
+        redis   — any Redis-compatible server (ANALYSIS_CACHE_URL = redis://...);
+                  `LocalRedis` is an in-process stand-in with the same API for tests
+  - Hit / miss / eviction counters are reported at /healthz
+
+Values are JSON, so every hit returns a fresh copy the caller may mutate.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ─── KEYS ────────────────────────────────────────────────────────────────────
+
+def text_hash(text: Optional[str]) -> str:
+    """sha256 of whitespace-normalised text ('' for empty input)."""
+    if not text:
+        return ""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def make_cache_key(namespace: str, text: str, **parts: Any) -> str:
+    """
+    Content-addressed key: namespace + sha256 over the normalised text and
+    every discriminating part (role, JD hash, prompt/engine version, ...).
+    """
+    h = hashlib.sha256(text_hash(text).encode("ascii"))
+    for name in sorted(parts):
+        h.update(f"\x1f{name}={parts[name]}".encode("utf-8"))
+    return f"{namespace}:{h.hexdigest()}"
+
+
+def version_tag(*sources: str) -> str:
+    """Short digest of prompt templates / engine versions; changes invalidate old entries."""
+    return hashlib.sha256("\x1e".join(sources).encode("utf-8")).hexdigest()[:12]
+
+
+# ─── BACKENDS ────────────────────────────────────────────────────────────────
+# Each backend stores JSON strings and counts its own evictions (LRU drops and
+# expired entries).  `get` returns None for missing or expired keys.
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                self.evictions += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheBackend:
+    """
+    SQLite file backend — survives restarts and is shared by all gunicorn
+    workers on the host.  LRU order is tracked in `last_access`.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_cache_lru ON analysis_cache (last_access)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at FROM analysis_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at <= now:
+            conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+            conn.commit()
+            self.evictions += 1
+            return None
+        conn.execute("UPDATE analysis_cache SET last_access = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO analysis_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, value, now + ttl, now),
+        )
+        expired = conn.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (now,)).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM analysis_cache WHERE key IN ("
+                " SELECT key FROM analysis_cache ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+        conn.commit()
+        self.evictions += max(expired, 0) + max(overflow, 0)
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM analysis_cache")
+        conn.commit()
+
+    def size(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+
+
+class LocalRedis:
+    """
+    In-process stand-in for a Redis client (get / set ex= / delete / flushdb /
+    dbsize), so the Redis backend can be exercised without a server.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value, ex: Optional[int] = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        with self._lock:
+            self._data[key] = (time.time() + ex if ex else None, value)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for k in keys if self._data.pop(k, None) is not None)
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+        return True
+
+    def dbsize(self) -> int:
+        return len(self._data)
+
+
+class RedisCacheBackend:
+    """
+    Redis-compatible backend.  Expiry uses native key TTLs; LRU eviction is
+    the server's job (run it with `maxmemory-policy allkeys-lru`), so
+    `evictions` here stays 0.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "analysis:"):
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        import redis  # optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url, socket_timeout=1.0))
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, ex=max(int(ttl), 1))
+
+    def clear(self) -> None:
+        self.client.flushdb()
+
+    def size(self) -> int:
+        return int(self.client.dbsize())
+
+
+# ─── CACHE FRONT ─────────────────────────────────────────────────────────────
+
+class AnalysisCache:
+    """
+    Counting front over a backend.  Backend errors never fail an analysis:
+    they are logged and treated as a miss / skipped write.
+    """
+
+    def __init__(self, backend, default_ttl: float):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Analysis cache read failed (%s): %s", self.backend.name, e)
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            self.backend.set(key, json.dumps(value), ttl or self.default_ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Analysis cache write failed (%s): %s", self.backend.name, e)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        try:
+            size = self.backend.size()
+        except Exception:
+            size = None
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": size,
+        }
+
+
+def _backend_from_settings():
+    kind = settings.ANALYSIS_CACHE_BACKEND.lower()
+    max_entries = settings.ANALYSIS_CACHE_MAX_ENTRIES
+    try:
+        if kind == "sqlite":
+            return SQLiteCacheBackend(settings.ANALYSIS_CACHE_URL or "analysis_cache.db", max_entries)
+        if kind == "redis":
+            if settings.ANALYSIS_CACHE_URL.startswith("local://"):
+                return RedisCacheBackend(LocalRedis())
+            return RedisCacheBackend.from_url(settings.ANALYSIS_CACHE_URL or "redis://localhost:6379/0")
+    except Exception as e:
+        logger.warning("Analysis cache backend '%s' unavailable (%s) — using in-process cache", kind, e)
+    return MemoryCacheBackend(max_entries)
+
+
+_cache: Optional[AnalysisCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide cache, built from settings on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnalysisCache(_backend_from_settings(), settings.ANALYSIS_CACHE_TTL_SECONDS)
+                logger.info(
+                    "✅ Analysis cache ready | backend=%s | ttl=%ss | max_entries=%d",
+                    _cache.backend.name, settings.ANALYSIS_CACHE_TTL_SECONDS, settings.ANALYSIS_CACHE_MAX_ENTRIES,
+                )
+    return _cache
@@ -0,0 +1,396 @@
+"""Durable Task Queue
+==================
+Background work (AI rewrites, backfills) as rows in the `task_queue` table
+of the app database (SQLite or Postgres), executed by worker processes:
+
+  - Survives restarts: a task is only gone once a worker marks it done
+  - Claiming is atomic — Postgres uses FOR UPDATE SKIP LOCKED, SQLite a
+    compare-and-set UPDATE — so any number of workers can share the table
+  - A worker that dies mid-task loses its lease after TASK_LEASE_SECONDS
+    and the task is claimed again
+  - Failures retry with exponential backoff (TASK_RETRY_BASE_SECONDS,
+    doubling, capped at TASK_RETRY_MAX_SECONDS) up to max_attempts;
+    a handler raises PermanentTaskError when retrying cannot help
+  - Idempotency keys: enqueueing a key that already exists returns the
+    existing task (a failed one is re-queued; a done one too with
+    requeue_finished=True)
+  - Lanes: "interactive" (user is waiting) is always claimed before
+    "batch"; workers can also be dedicated to one lane
+
+Handlers register by kind:
+    @task_handler("resume_rewrite", on_give_up=mark_failed)
+    async def rewrite(payload): ...
+
+Workers: by default each API process runs one in a thread
+(TASK_QUEUE_EMBEDDED_WORKER), so single-process deployments (Docker,
+Railway, nixpacks, Render) need nothing else.  To scale them separately
+from the API, run dedicated processes and set the flag false on the API
+(as the Procfile does):
+    python -m app.task_worker run --lanes interactive,batch --concurrency 2
+
+Queue operations are blocking DB calls: from async code, run them with
+asyncio.to_thread (TaskQueue.wait and the worker already do).
+"""
+
+import os
+import time
+import uuid
+import random
+import socket
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.all_models import TaskRecord
+
+logger = logging.getLogger(__name__)
+
+LANES = {"interactive": 0, "batch": 10}   # lane → priority (lower is claimed first)
+TERMINAL_STATUSES = ("done", "failed")
+
+
+# ─── HANDLER REGISTRY ────────────────────────────────────────────────────────
+
+HandlerFn = Callable[[Dict[str, Any]], Union[Any, Awaitable[Any]]]
+
+
+class TaskHandler(NamedTuple):
+    fn: HandlerFn
+    max_attempts: int
+    on_give_up: Optional[Callable[[Dict[str, Any], str], None]]
+
+
+_handlers: Dict[str, TaskHandler] = {}
+
+
+class PermanentTaskError(Exception):
+    """Raised by a handler when retrying cannot succeed: the task fails now (on_give_up runs)."""
+
+
+def task_handler(
+    kind: str,
+    max_attempts: Optional[int] = None,
+    on_give_up: Optional[Callable[[Dict[str, Any], str], None]] = None,
+):
+    """Register `fn(payload)` (sync or async) for tasks of `kind`; raising means retry."""
+    def decorator(fn: HandlerFn) -> HandlerFn:
+        _handlers[kind] = TaskHandler(fn, max_attempts or settings.TASK_MAX_ATTEMPTS, on_give_up)
+        return fn
+    return decorator
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before attempt `attempts + 1`, with ±20% jitter."""
+    delay = min(settings.TASK_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), settings.TASK_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+# ─── QUEUE OPERATIONS ────────────────────────────────────────────────────────
+
+class TaskQueue:
+    @staticmethod
+    def enqueue(
+        kind: str,
+        payload: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        lane: str = "interactive",
+        requeue_finished: bool = False,
+    ) -> int:
+        """
+        Add a task (or return the existing one for `idempotency_key`); returns
+        its id.  A failed task under the key is re-queued, and so is a done
+        one with `requeue_finished` (work that must run again after it).
+        """
+        if lane not in LANES:
+            raise ValueError(f"Unknown task lane: {lane}")
+        handler = _handlers.get(kind)
+        db = SessionLocal()
+        try:
+            task = TaskRecord(
+                kind=kind,
+                payload=payload,
+                idempotency_key=idempotency_key,
+                lane=lane,
+                priority=LANES[lane],
+                status="queued",
+                attempts=0,
+                max_attempts=handler.max_attempts if handler else settings.TASK_MAX_ATTEMPTS,
+                run_at=datetime.utcnow(),
+            )
+            db.add(task)
+            try:
+                db.commit()
+                return task.id
+            except IntegrityError:
+                db.rollback()
+
+            existing = db.query(TaskRecord).filter(TaskRecord.idempotency_key == idempotency_key).first()
+            if existing is None:
+                raise RuntimeError(f"Task with key {idempotency_key} vanished during enqueue")
+            if existing.status == "failed" or (requeue_finished and existing.status == "done"):
+                existing.status = "queued"
+                existing.attempts = 0
+                existing.run_at = datetime.utcnow()
+                existing.payload = payload
+                existing.lane = lane
+                existing.priority = LANES[lane]
+                existing.last_error = None
+                existing.finished_at = None
+                db.commit()
+                logger.info("Task %s (%s) re-queued", existing.id, idempotency_key)
+            return existing.id
+        finally:
+            db.close()
+
+    @staticmethod
+    def status(task_id: int) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            row = db.query(TaskRecord.status).filter(TaskRecord.id == task_id).first()
+            return row[0] if row else None
+        finally:
+            db.close()
+
+    @staticmethod
+    async def wait_for_pickup(task_id: int, timeout: float, poll_interval: float = 0.5) -> bool:
+        """True once a worker has claimed the task (or it finished); False if none did within `timeout`."""
+        deadline = time.monotonic() + timeout
+        while True:
+            row = await asyncio.to_thread(TaskQueue._progress, task_id)
+            if row is None or row[0] != "queued" or row[1] > 0:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll_interval)
+
+    @staticmethod
+    def _progress(task_id: int) -> Optional[Tuple[str, int]]:
+        db = SessionLocal()
+        try:
+            row = db.query(TaskRecord.status, TaskRecord.attempts).filter(TaskRecord.id == task_id).first()
+            return (row[0], row[1]) if row else None
+        finally:
+            db.close()
+
+    @staticmethod
+    async def wait(task_id: int, timeout: float, poll_interval: float = 1.0) -> Optional[str]:
+        """Poll until the task is done / failed or `timeout` passes; returns the last status seen."""
+        deadline = time.monotonic() + timeout
+        while True:
+            status = await asyncio.to_thread(TaskQueue.status, task_id)
+            if status in TERMINAL_STATUSES or status is None or time.monotonic() >= deadline:
+                return status
+            await asyncio.sleep(poll_interval)
+
+    @staticmethod
+    def claim(worker_id: str, lanes: Iterable[str]) -> Optional[TaskRecord]:
+        """
+        Lease the next runnable task: queued and due, or running with an
+        expired lease.  Returns a detached row, or None if nothing is due.
+        """
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.TASK_LEASE_SECONDS)
+        db = SessionLocal()
+        try:
+            query = (
+                db.query(TaskRecord)
+                .filter(
+                    TaskRecord.lane.in_(list(lanes)),
+                    or_(
+                        and_(TaskRecord.status == "queued", TaskRecord.run_at <= now),
+                        and_(TaskRecord.status == "running", TaskRecord.locked_at < stale),
+                    ),
+                )
+                .order_by(TaskRecord.priority, TaskRecord.run_at, TaskRecord.id)
+                .limit(1)
+            )
+            if engine.dialect.name == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+            candidate = query.first()
+            if candidate is None:
+                db.rollback()
+                return None
+
+            seen_status, seen_owner = candidate.status, candidate.locked_by   # commit() expires the row
+            # Compare-and-set on (status, attempts): loses cleanly if another worker got there first
+            claimed = (
+                db.query(TaskRecord)
+                .filter(
+                    TaskRecord.id == candidate.id,
+                    TaskRecord.status == candidate.status,
+                    TaskRecord.attempts == candidate.attempts,
+                )
+                .update(
+                    {
+                        TaskRecord.status: "running",
+                        TaskRecord.attempts: candidate.attempts + 1,
+                        TaskRecord.locked_by: worker_id,
+                        TaskRecord.locked_at: now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if not claimed:
+                return None
+            task = db.query(TaskRecord).filter(TaskRecord.id == candidate.id).first()
+            if seen_status == "running":
+                logger.warning("Task %s lease expired (worker %s) — reclaimed by %s", task.id, seen_owner, worker_id)
+            db.expunge(task)
+            return task
+        finally:
+            db.close()
+
+    @staticmethod
+    def complete(task: TaskRecord, worker_id: str) -> None:
+        TaskQueue._finish(task, worker_id, {
+            TaskRecord.status: "done",
+            TaskRecord.finished_at: datetime.utcnow(),
+            TaskRecord.locked_by: None,
+            TaskRecord.locked_at: None,
+        })
+
+    @staticmethod
+    def fail(task: TaskRecord, worker_id: str, error: str) -> bool:
+        """Record a failed attempt; returns True if the task will be retried."""
+        retry = task.attempts < task.max_attempts
+        values = {
+            TaskRecord.last_error: error[:2000],
+            TaskRecord.locked_by: None,
+            TaskRecord.locked_at: None,
+        }
+        if retry:
+            values[TaskRecord.status] = "queued"
+            values[TaskRecord.run_at] = datetime.utcnow() + timedelta(seconds=retry_delay(task.attempts))
+        else:
+            values[TaskRecord.status] = "failed"
+            values[TaskRecord.finished_at] = datetime.utcnow()
+        TaskQueue._finish(task, worker_id, values)
+        return retry
+
+    @staticmethod
+    def _finish(task: TaskRecord, worker_id: str, values: Dict[Any, Any]) -> None:
+        db = SessionLocal()
+        try:
+            updated = (
+                db.query(TaskRecord)
+                .filter(TaskRecord.id == task.id, TaskRecord.locked_by == worker_id)
+                .update(values, synchronize_session=False)
+            )
+            db.commit()
+            if not updated:
+                logger.warning("Task %s was reclaimed by another worker before %s finished it", task.id, worker_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def stats() -> Dict[str, Dict[str, int]]:
+        """{lane: {status: count}}"""
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(TaskRecord.lane, TaskRecord.status, func.count(TaskRecord.id))
+                .group_by(TaskRecord.lane, TaskRecord.status)
+                .all()
+            )
+        finally:
+            db.close()
+        out: Dict[str, Dict[str, int]] = {}
+        for lane, status, count in rows:
+            out.setdefault(lane, {})[status] = count
+        return out
+
+
+# ─── WORKER ──────────────────────────────────────────────────────────────────
+
+class TaskWorker:
+    """Runs `concurrency` claim/execute loops over the given lanes until stopped."""
+
+    def __init__(
+        self,
+        lanes: Iterable[str] = tuple(LANES),
+        concurrency: int = 1,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None,
+    ):
+        self.lanes = [lane for lane in lanes if lane in LANES]
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.processed = 0
+        self.failed = 0
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def run(self) -> None:
+        logger.info("✅ Task worker %s | lanes=%s | concurrency=%d", self.worker_id, self.lanes, self.concurrency)
+        await asyncio.gather(*(self._loop(i) for i in range(self.concurrency)))
+        logger.info("Task worker %s stopped (%d done, %d failed attempts)", self.worker_id, self.processed, self.failed)
+
+    async def _loop(self, slot: int) -> None:
+        slot_id = f"{self.worker_id}/{slot}"
+        while not self._stop.is_set():
+            try:
+                task = await asyncio.to_thread(TaskQueue.claim, slot_id, self.lanes)
+            except Exception as e:
+                logger.warning("Task claim failed: %s", e)
+                task = None
+            if task is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._execute(task, slot_id)
+
+    async def _execute(self, task: TaskRecord, slot_id: str) -> None:
+        handler = _handlers.get(task.kind)
+        payload = task.payload or {}
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for task kind '{task.kind}'")
+            if asyncio.iscoroutinefunction(handler.fn):
+                await handler.fn(payload)
+            else:
+                await asyncio.to_thread(handler.fn, payload)   # keep the other slots running
+        except Exception as e:
+            self.failed += 1
+            error = f"{type(e).__name__}: {e}"
+            if handler is None or isinstance(e, PermanentTaskError):
+                task.max_attempts = task.attempts   # no point retrying
+            retry = await asyncio.to_thread(TaskQueue.fail, task, slot_id, error)
+            logger.error("Task %s (%s) attempt %d/%d failed: %s%s", task.id, task.kind, task.attempts,
+                         task.max_attempts, error, " — will retry" if retry else " — giving up")
+            if not retry and handler and handler.on_give_up:
+                try:
+                    await asyncio.to_thread(handler.on_give_up, payload, error)
+                except Exception as give_up_error:
+                    logger.error("Task %s give-up hook failed: %s", task.id, give_up_error)
+            return
+        await asyncio.to_thread(TaskQueue.complete, task, slot_id)
+        self.processed += 1
+        logger.info("Task %s (%s) done in %.0f ms", task.id, task.kind, (time.perf_counter() - started) * 1000)
+
+    def start_in_thread(self, on_exit: Optional[Callable[[], Awaitable[None]]] = None) -> threading.Thread:
+        """
+        Run this worker on its own event loop in a daemon thread (embedded API
+        worker); `on_exit` runs on that loop after the worker stops (e.g. to
+        close loop-bound clients).
+        """
+        async def main() -> None:
+            try:
+                await self.run()
+            finally:
+                if on_exit is not None:
+                    await on_exit()
+
+        thread = threading.Thread(target=lambda: asyncio.run(main()), name="task-worker", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,69 @@
+"""
+Schema migrations that create_all cannot do.
+
+Base.metadata.create_all builds missing tables (with their indexes) but
+never touches a table that already exists, so an index added to a model
+later is missing on every deployed database.  ensure_indexes() creates
+each declared index that the live table lacks; it is idempotent and runs at
+startup after create_all.
+
+    python -m app.db.migrations            # create missing indexes
+    python -m app.db.migrations --dry-run  # list them only
+
+On Postgres, CREATE INDEX blocks writes to the table while it builds; on a
+large `resumes` table, run this by hand off-peak before deploying.
+"""
+
+import logging
+import argparse
+from typing import List
+
+from sqlalchemy import inspect
+
+from app.db.base import Base
+from app.models import all_models  # noqa: F401  (registers tables on Base.metadata)
+from app.models import application  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+def missing_indexes(bind) -> List:
+    """Declared indexes absent from tables that already exist."""
+    inspector = inspect(bind)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue   # create_all builds it, indexes included
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+def ensure_indexes(bind) -> List[str]:
+    """Create every missing declared index; returns their names."""
+    created = []
+    for index in missing_indexes(bind):
+        index.create(bind=bind)
+        created.append(index.name)
+        logger.info("Created index %s on %s", index.name, index.table.name)
+    return created
+
+
+def main(argv=None) -> None:
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(prog="python -m app.db.migrations", description="Create missing declared indexes")
+    parser.add_argument("--dry-run", action="store_true", help="list missing indexes without creating them")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-7s | %(name)s | %(message)s")
+
+    if args.dry_run:
+        for index in missing_indexes(engine):
+            print(f"{index.table.name}.{index.name} ({', '.join(c.name for c in index.columns)})")
+        return
+    created = ensure_indexes(engine)
+    print(f"Created {len(created)} index(es)" + (f": {', '.join(created)}" if created else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,61 @@
+"""Database engines and sessions.
+
+Two engines share one DATABASE_URL:
+
+  - `engine` / `SessionLocal` / `get_db`: sync SQLAlchemy, used by sync
+    (`def`) handlers, which FastAPI runs in its threadpool, and by
+    background workers (upload pipeline, task queue, CLIs)
+  - `async_engine` / `AsyncSessionLocal` / `get_async_db`: SQLAlchemy
+    AsyncSession on asyncpg (Postgres) or aiosqlite (SQLite), for
+    `async def` handlers, so their queries no longer block the event loop
+    or take a threadpool slot
+
+Migration path: an `async def` handler that touches the DB takes
+`db: AsyncSession = Depends(get_async_db)` and awaits `db.execute(select(...))`
+/ `db.get()` / `db.commit()`.  deps.get_current_user resolves the caller
+through AsyncSessionLocal (on a principal cache miss).  Sync handlers keep
+`get_db` until they are converted.
+
+Pool sizes come from config (DB_POOL_SIZE, DB_MAX_OVERFLOW, ...) and apply
+to each engine separately.
+"""
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver form of a sync URL (postgresql → asyncpg, sqlite → aiosqlite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    parsed = parsed.set(drivername=_ASYNC_DRIVERS[backend])
+    if backend == "postgresql" and "sslmode" in parsed.query:
+        # libpq's ?sslmode=require (Railway / Supabase URLs) is ?ssl=require for asyncpg
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_pre_ping": True,                               # Verify connections before reuse
+        "pool_size": settings.DB_POOL_SIZE,                  # Connections kept open
+        "max_overflow": settings.DB_MAX_OVERFLOW,            # Extra connections under burst
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,    # Recycle before server-side idle timeouts
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,    # Wait for a free connection, then error
+    }
+
+
 # SQLite requires check_same_thread=False for FastAPI
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
@@ -12,22 +64,26 @@ if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
         pool_pre_ping=True,
         connect_args=connect_args,
     )
+    async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), pool_pre_ping=True)
 else:
-    # Production: PostgreSQL / MySQL — configure connection pooling
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        pool_pre_ping=True,      # Verify connections before reuse
-        pool_size=5,             # Maintain 5 connections in pool
-        max_overflow=10,         # Allow up to 10 extra under burst
-        pool_recycle=1800,       # Recycle connections every 30 min
-        pool_timeout=30,         # Wait 30s for available connection
-    )
+    # Production: PostgreSQL — connection pooling sized from config
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **_pool_options())
+    async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), **_pool_options())
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, under asyncio, illegal) lazy refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -84,6 +84,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
             "success": False,
             "error": str(exc.detail),
         },
+        headers=getattr(exc, "headers", None),   # e.g. Retry-After on 429, WWW-Authenticate on 401
     )
 
 
@@ -138,12 +139,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 # ── 🔹5 In-Memory Caching Layer ──────────────────────────────────────────
 from functools import lru_cache
-
-@lru_cache(maxsize=64)
-def _cached_role_template(role: str) -> str:
-    """Cache role templates so repeated scoring for the same role avoids disk I/O."""
-    from app.services.ai_scoring_engine import AIScoringEngine
-    return AIScoringEngine.get_role_template(role)
+from app.career_engine.role_store import RoleKnowledgeStore
 
 @lru_cache(maxsize=128)
 def _cached_rag_retrieval(resume_hash: str, top_k: int = 3):
@@ -155,11 +151,29 @@ def _cached_rag_retrieval(resume_hash: str, top_k: int = 3):
 
 # Expose cache utilities for services to use
 app.state.cache = {
-    "role_template": _cached_role_template,
+    "role_template": RoleKnowledgeStore.get_template,  # loaded once, hot-reloaded on change
     "rag_retrieval": _cached_rag_retrieval,
 }
 
 
+_embedded_task_worker = None
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Close pooled LLM connections
+    from app.core.llm_clients import close_llm_clients
+    await close_llm_clients()
+    # Stop PDF extraction worker processes
+    from app.services.pdf_page_extractor import shutdown_pdf_pool
+    shutdown_pdf_pool()
+    from app.services.ocr_pool import shutdown_ocr_pool
+    shutdown_ocr_pool()
+    # Let the embedded task worker finish what it holds (unfinished tasks stay queued in the DB)
+    if _embedded_task_worker is not None:
+        _embedded_task_worker.stop()
+
+
 @app.on_event("startup")
 def startup_event():
     # Build RAG Index & Preload Models in Background to avoid blocking Cold Start
@@ -167,7 +181,9 @@ def startup_event():
         # 1. Database Initialization (Moved to background to avoid blocking Startup)
         try:
             logger.info("Verifying Neural Database in background...")
+            from app.db.migrations import ensure_indexes
             all_models.Base.metadata.create_all(bind=engine)
+            ensure_indexes(engine)   # indexes added to tables that already exist
 
             from app.db.session import SessionLocal
             from app.db.init_db import init_db
@@ -177,6 +193,14 @@ def startup_event():
             finally:
                 db.close()
             logger.info("✅ AI Database: Synchronized.")
+
+            # Upload jobs a previous process was running when it stopped
+            from app.services.upload_pipeline import UploadPipeline
+            UploadPipeline.sweep_interrupted_jobs()
+
+            # Daily re-scan of the /benchmark score distributions (batch lane, once per day across workers)
+            from app.services.score_percentile_service import ScorePercentileService
+            ScorePercentileService.schedule_rebuild()
         except Exception as e:
             logger.error(f"❌ AI Database: Sync Failed: {e}")
 
@@ -194,6 +218,18 @@ def startup_event():
 
     threading.Thread(target=preload_all, daemon=True).start()
 
+    # ── Embedded task-queue worker (AI rewrites) ──────────────────────────────
+    # On by default, so deployments that only start the API still run queued tasks; the
+    # Procfile turns it off for "web" because its "worker" runs `python -m app.task_worker run`.
+    global _embedded_task_worker
+    if settings.TASK_QUEUE_EMBEDDED_WORKER:
+        from app.core.llm_clients import close_llm_clients
+        from app.core.task_queue import TaskWorker
+        _embedded_task_worker = TaskWorker(concurrency=settings.TASK_WORKER_CONCURRENCY)
+        _embedded_task_worker.start_in_thread(on_exit=close_llm_clients)
+    else:
+        logger.info("Embedded task worker off — queued rewrites run in `python -m app.task_worker run`")
+
     # ── Self-Ping Keep-Alive (prevents Render Free Tier from sleeping) ────────
     KEEP_ALIVE_URL = os.getenv("KEEP_ALIVE_URL", "")  # e.g. https://resume-analyzer-python-1.onrender.com
     KEEP_ALIVE_INTERVAL = int(os.getenv("KEEP_ALIVE_INTERVAL", "840"))  # 14 minutes
@@ -254,23 +290,45 @@ def health_check():
         "api": "healthy",
         "database": db_healthy,
         "gemini_configured": AIModelManager._gemini_configured,
-        "spacy_loaded": AIModelManager._spacy_nlp is not None,
+        "spacy_loaded": AIModelManager._spacy_ner is not None,
         "rag_index": len(_role_names_check()) > 0,
     }
     all_healthy = all(v for v in components.values() if isinstance(v, bool))
 
+    from app.core.result_cache import get_analysis_cache
+    from app.core.principal_cache import get_principal_cache
+    from app.core.resilience import llm_flight
+    from app.core.llm_clients import llm_client_stats
+    from app.services.ocr_pool import get_ocr_pool
+    from app.core.task_queue import TaskQueue
+    from app.core.blob_store import get_blob_store
+
     return {
         "status": "healthy" if all_healthy else "degraded",
         "timestamp": datetime.datetime.utcnow().isoformat(),
         "components": components,
+        "analysis_cache": get_analysis_cache().stats(),
+        "principal_cache": get_principal_cache().stats(),
+        "llm_single_flight": llm_flight.stats(),
+        "llm_clients": llm_client_stats(),
+        "ocr_pool": get_ocr_pool().stats(),
+        "task_queue": _task_queue_stats(TaskQueue),
+        "blob_store": get_blob_store().stats(),
     }
 
 
+def _task_queue_stats(task_queue):
+    try:
+        return task_queue.stats()
+    except Exception:
+        return None
+
+
 def _role_names_check():
     """Check if RAG index is built."""
     try:
-        from app.career_engine.rag_engine import _role_names
-        return _role_names
+        from app.career_engine.rag_engine import indexed_role_names
+        return indexed_role_names()
     except Exception:
         return []
 
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, JSON, Index
+from sqlalchemy.orm import defer, relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -48,6 +48,22 @@ class Resume(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_resumes_owner_created", "owner_id", "created_at"),  # per-user listing / analytics
+    )
+
+
+def defer_resume_text():
+    """
+    Query options that skip a Resume's large columns (extracted text, rewrite,
+    analysis, sections) — for listings and aggregates.  Touching one of them
+    on such a row raises instead of issuing a query per row.
+    """
+    return [
+        defer(column, raiseload=True)
+        for column in (Resume.content_text, Resume.ai_rewritten_content, Resume.analysis, Resume.parsed_data)
+    ]
+
 class JobDescription(Base):
     __tablename__ = "job_descriptions"
     
@@ -84,3 +100,115 @@ class ResumeVersion(Base):
     # Relationships
     resume = relationship("Resume", backref="versions")
     owner = relationship("User")
+
+    __table_args__ = (
+        Index("ix_resume_versions_resume_version", "resume_id", "version_number"),  # history / next version number
+    )
+
+
+class UploadJob(Base):
+    """One POST /resumes/upload run through the async pipeline (extract → score → predict → rewrite)."""
+    __tablename__ = "upload_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, returned to the client
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=True)  # set once scoring has saved the resume
+    title = Column(String, nullable=True)
+    filename = Column(String, nullable=True)
+
+    status = Column(String, default="queued")  # queued, running, completed, failed
+    stage = Column(String, nullable=True)  # current (or last) stage
+    stage_timings = Column(JSON, nullable=True)  # {"extract": ms, "score": ms, ...}
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class TaskRecord(Base):
+    """Durable background task (app/core/task_queue.py) — claimed by worker processes."""
+    __tablename__ = "task_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # handler name, e.g. "resume_rewrite"
+    payload = Column(JSON, nullable=True)
+    idempotency_key = Column(String, unique=True, nullable=True)  # e.g. "resume_rewrite:42:DevOps Engineer"
+
+    lane = Column(String, nullable=False, default="interactive")  # interactive, batch
+    priority = Column(Integer, nullable=False, default=0)  # lower is claimed first
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_at = Column(DateTime, nullable=False)  # UTC; not claimable before this (retry backoff)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)  # lease start; stale leases are re-claimed
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_task_queue_claim", "status", "lane", "priority", "run_at"),
+    )
+
+
+class StoredBlob(Base):
+    """Content-addressed upload (app/core/blob_store.py): one stored copy per sha256, shared by every resume that references it."""
+    __tablename__ = "stored_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    locator = Column(String, nullable=False)  # backend path / s3:// URI (internal; Resume.file_path holds blob_key())
+    refcount = Column(Integer, nullable=False, default=0)  # resumes (and in-flight uploads) using it
+
+    # Extraction cache: a re-upload of the same bytes skips parsing and OCR
+    extraction_version = Column(String, nullable=True)
+    extracted_text = Column(Text, nullable=True)
+    parsed_sections = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class UserStats(Base):
+    """Per-user analytics rollup (app/services/user_stats_service.py) — updated on every resume / snapshot / application write."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    # Resumes
+    resume_count = Column(Integer, nullable=False, default=0)
+    scored_count = Column(Integer, nullable=False, default=0)  # resumes with an ats_score (the average's denominator)
+    ats_score_sum = Column(Float, nullable=False, default=0.0)
+    ats_score_max = Column(Float, nullable=True)
+    ats_score_min = Column(Float, nullable=True)
+    first_upload_at = Column(DateTime, nullable=True)  # UTC
+    last_upload_at = Column(DateTime, nullable=True)
+    weekday_uploads = Column(JSON, nullable=True)  # [Sunday .. Saturday] counts
+    monthly_uploads = Column(JSON, nullable=True)  # {"2026-10": 3, ...}
+    daily_uploads = Column(JSON, nullable=True)  # {"2026-10-18": 1, ...}, trimmed to the activity window
+    skill_counts = Column(JSON, nullable=True)  # {"python": 4, ...} — resumes mentioning each skill
+
+    # Version snapshots
+    snapshot_count = Column(Integer, nullable=False, default=0)  # stored (retention-pruned ones not counted)
+    latest_snapshot_score = Column(Float, nullable=True)
+    latest_snapshot_at = Column(DateTime, nullable=True)
+
+    # Applications
+    application_count = Column(Integer, nullable=False, default=0)
+    applications_applied = Column(Integer, nullable=False, default=0)
+    applications_failed = Column(Integer, nullable=False, default=0)
+    daily_applications = Column(JSON, nullable=True)  # {"2026-10-18": 2, ...}, trimmed to the activity window
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ScoreDistribution(Base):
+    """Score histograms for one population segment (app/services/score_percentile_service.py)."""
+    __tablename__ = "score_distributions"
+
+    segment = Column(String, primary_key=True)  # predicted_role, or "__all__" for every resume
+    sample_count = Column(Integer, nullable=False, default=0)
+    bin_width = Column(Float, nullable=False)
+    histograms = Column(JSON, nullable=False)  # {"ats_score": [count per bin], "skill_coverage": [...], ...}
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -2,7 +2,7 @@
 Application Model - Track job applications
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -39,3 +39,7 @@ class Application(Base):
     
     # Relationships
     user = relationship("User", backref="applications")
+
+    __table_args__ = (
+        Index("ix_applications_user_applied", "user_id", "applied_at"),  # per-user listing / stats
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, HttpUrl
+from pydantic import BaseModel, EmailStr, Field, HttpUrl, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -54,6 +54,14 @@ class ResumeInDBBase(ResumeBase):
     created_at: datetime
     owner_id: int
     
+    @field_validator("file_path")
+    @classmethod
+    def _public_file_path(cls, value: Optional[str]) -> Optional[str]:
+        # Never expose a server path / bucket URI (rows saved before file_path held the blob key)
+        from app.core.blob_store import blob_digest, blob_key
+        digest = blob_digest(value)
+        return blob_key(digest) if digest else value
+
     # Futuristic Upgrade Fields
     analysis: Optional[str] = None
     suggestions: Optional[List[str]] = []
@@ -66,12 +74,47 @@ class ResumeInDBBase(ResumeBase):
 class Resume(ResumeInDBBase):
     pass
 
+class ResumeSummary(ResumeBase):
+    """Listing row — scores and metadata only; GET /resumes/{id} has the text and analysis."""
+    id: int
+    file_type: Optional[str] = None
+    ats_score: Optional[float] = 0.0
+    predicted_role: Optional[str] = None
+    market_readiness: Optional[float] = 85.0
+    created_at: datetime
+    owner_id: int
+
+    class Config:
+        from_attributes = True
+
 class ResumeDetailedAnalysis(Resume):
     grammar_errors: Optional[List[Any]] = None
     ai_feedback: Optional[str] = None
     matching_jobs: Optional[List[Dict[str, Any]]] = None # Jobs predicted for this resume
     skills_gap_roadmap: Optional[Dict[str, Any]] = None # New roadmap feature
 
+# --- Upload Pipeline Schemas ---
+
+class UploadJobAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    result_url: str
+    events_url: str
+
+class UploadJobStatus(BaseModel):
+    id: str
+    status: str
+    stage: Optional[str] = None
+    stage_timings: Optional[Dict[str, float]] = None
+    resume_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 # --- Job/Matching Schemas ---
 class JobDescriptionCreate(BaseModel):
     title: str
@@ -107,3 +150,8 @@ class JobPredictionRequest(BaseModel):
 class ValidateFitRequest(BaseModel):
     text: str
     target_role: str
+
+class BatchRoleMatchRequest(BaseModel):
+    texts: List[str]
+    top_k: int = 5
+    include_profiles: bool = False  # also return parsed contact / skills / entities per resume
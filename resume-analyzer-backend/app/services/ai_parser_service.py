@@ -1,14 +1,51 @@
+import os
 import re
+import copy
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Sequence
+
+from app.core.config import settings
+from app.core.result_cache import get_analysis_cache, make_cache_key
+from app.services.ai_skill_ontology import SkillMatcher, SkillOntology
 
 logger = logging.getLogger(__name__)
 
+# The parser's own skill list predates the ontology; terms the ontology does
+# not cover are kept here so parsed_data["skills"] still reports them.
+_PARSER_EXTRA_SKILLS = {
+    "cpp": "C++",
+    "node": "Node.js",
+    "nodejs": "Node.js",
+    "powerbi": "Power BI",
+    "git": "Git",
+    "github": "GitHub",
+    "project management": "Project Management",
+    "leadership": "Leadership",
+    "communication": "Communication",
+    "teamwork": "Teamwork",
+    "problem solving": "Problem Solving",
+    "critical thinking": "Critical Thinking",
+}
+_PARSER_SKILL_MATCHER = SkillMatcher({**_PARSER_EXTRA_SKILLS, **SkillOntology.matcher_terms()})
+
+# Bump when the extraction rules change; cached structured data is keyed on it
+_PARSER_VERSION = "ner-1"
+
+
+def _cache_key(text: str, ner: bool) -> str:
+    return make_cache_key("parsed", text, model=settings.SPACY_MODEL if ner else "", version=_PARSER_VERSION)
+
+
 class AIParserService:
     """
     AI Resume Analyzer Parser
     Uses spaCy NER and rule-based extraction for high-fidelity structured data.
     IIT/IIIT Level Implementation
+
+    Only doc.ents is read, so the NER-only pipeline is used
+    (AIModelManager.get_spacy_ner) on at most SPACY_MAX_CHARS of text.
+    Results are cached per text hash, and bulk callers tag many resumes
+    in one nlp.pipe pass (extract_structured_data_many).
     """
     
     _nlp = None
@@ -17,7 +54,7 @@ class AIParserService:
     def get_nlp(cls):
         if cls._nlp is None:
             from app.core.ai_model import AIModelManager
-            cls._nlp = AIModelManager.get_spacy_nlp()
+            cls._nlp = AIModelManager.get_spacy_ner()
         return cls._nlp
 
     @staticmethod
@@ -25,16 +62,62 @@ class AIParserService:
         """
         Main entry point for structured extraction.
         """
+        return AIParserService.extract_structured_data_many([text])[0]
+
+    @staticmethod
+    def extract_structured_data_many(texts: Sequence[str], n_process: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Structured data for many resumes, in input order.  Cache hits are
+        returned as is.  The distinct misses are NER-tagged together with
+        nlp.pipe, spread over `n_process` worker processes (default
+        SPACY_PIPE_PROCESSES, 0 = one per core) once each gets a full batch.
+        API handlers pass SPACY_REQUEST_PIPE_PROCESSES: a pool forked per
+        request would multiply across concurrent requests in the web worker.
+        """
         nlp = AIParserService.get_nlp()
-        doc = nlp(text) if nlp else None
-        
+        cache = get_analysis_cache()
+        keys = [_cache_key(text, nlp is not None) for text in texts]
+        results: List[Optional[Dict[str, Any]]] = [cache.get(key) for key in keys]
+
+        first_index: Dict[str, int] = {}   # key → first position that needs it computed
+        for i, result in enumerate(results):
+            if result is None:
+                first_index.setdefault(keys[i], i)
+        if not first_index:
+            return results
+
+        indices = list(first_index.values())
+        docs = AIParserService._ner_docs([texts[i] for i in indices], nlp, n_process)
+        for i, doc in zip(indices, docs):
+            results[i] = AIParserService._structure(texts[i], doc)
+            cache.set(keys[i], results[i])
+        for i, result in enumerate(results):
+            if result is None:   # a repeat of a text earlier in this batch
+                results[i] = copy.deepcopy(results[first_index[keys[i]]])
+        return results
+
+    @staticmethod
+    def _ner_docs(texts: List[str], nlp, n_process: Optional[int]) -> List[Any]:
+        if nlp is None:
+            return [None] * len(texts)
+        batch_size = settings.SPACY_PIPE_BATCH_SIZE
+        processes = n_process if n_process is not None else (settings.SPACY_PIPE_PROCESSES or os.cpu_count() or 1)
+        # Worker processes only pay for their start-up once each has a full batch to tag
+        processes = max(1, min(processes, len(texts) // batch_size))
+        capped = (text[:settings.SPACY_MAX_CHARS] for text in texts)
+        if processes > 1:
+            logger.info("NER-tagging %d resumes across %d processes", len(texts), processes)
+        return list(nlp.pipe(capped, batch_size=batch_size, n_process=processes))
+
+    @staticmethod
+    def _structure(text: str, doc) -> Dict[str, Any]:
         return {
             "personal_info": AIParserService._extract_personal_info(text, doc),
             "education": AIParserService._extract_education(text, doc),
             "experience": AIParserService._extract_experience(text, doc),
             "skills": AIParserService._extract_skills(text, doc),
             "projects": AIParserService._extract_projects(text, doc),
-            "entities": [(ent.text, ent.label_) for ent in doc.ents] if doc else []
+            "entities": [[ent.text, ent.label_] for ent in doc.ents] if doc else []
         }
 
     @staticmethod
@@ -60,23 +143,8 @@ class AIParserService:
         """
         IIT Level: Uses a combination of predefined skill sets and NER.
         """
-        # Common skill keywords (expandable)
-        skill_db = {
-            "python", "java", "cpp", "javascript", "react", "node", "express", "fastapi",
-            "mongodb", "postgresql", "mysql", "docker", "kubernetes", "aws", "azure", "gcp",
-            "machine learning", "deep learning", "nlp", "computer vision", "tensorflow", "pytorch",
-            "scikit-learn", "pandas", "numpy", "matplotlib", "seaborn", "tableau", "powerbi",
-            "git", "github", "ci/cd", "agile", "scrum", "project management", "leadership",
-            "communication", "teamwork", "problem solving", "critical thinking"
-        }
-        
-        found_skills = set()
-        text_lower = text.lower()
-        
-        # Rule-based match
-        for skill in skill_db:
-            if re.search(rf'\b{re.escape(skill)}\b', text_lower):
-                found_skills.add(skill.capitalize())
+        # Rule-based match — single pass over ontology skills plus the parser's extras
+        found_skills = _PARSER_SKILL_MATCHER.find(text)
         
         # Entity match (for uncommon skills)
         if doc:
@@ -8,7 +8,7 @@ from app.core.resilience import (
     sanitize_resume_text,
     GEMINI_TIMEOUT_SECONDS,
 )
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 import json
 import re
 import logging
@@ -44,6 +44,132 @@ def _get_gemini_model(model_name: str = "gemini-2.0-flash"):
     )
 
 
+def _build_rewrite_prompt(
+    text: str,
+    target_role: str,
+    company_type: str,
+    job_description: Optional[str],
+    mode: str,
+) -> str:
+    """Full-resume rewrite prompt (JD-aligned when a job description is given)."""
+    mode_instruction = ""
+    if mode == "Creative":
+        mode_instruction = "11. MODE: CREATIVE. While maintaining absolute factual truth, use highly engaging narrative language, impactful vocabulary, and heavily emphasize the candidate's unique value proposition and leadership potential."
+    else:
+        mode_instruction = "11. MODE: ATS. Strongly prioritize exact keyword matches from the target role/JD. Keep language direct, focus purely on hard technical competencies, and maximize metric visibility."
+
+    if job_description:
+        prompt = f"""You are the world's top Executive Resume Writer and ATS Technical Recruiter for FAANG/MAANG, Fortune 500, and top-tier Tech MNCs.
+
+Your task is to comprehensively RE-ENGINEER this resume to achieve a 100% ATS match for the specific Job Description provided, while remaining STRICTLY FACTUAL to the candidate's original history. 
+
+JOB DESCRIPTION:
+{job_description[:3000]}
+
+ORIGINAL RESUME CONTENT:
+{text[:4000]}
+
+REWRITE RULES (CRITICAL & NON-NEGOTIABLE):
+1. STRICT FACTUAL ACCURACY: You are forbidden from inventing companies, degrees, roles, or entirely fake projects. You MUST ONLY elevate, rephrase, and extract the maximum possible value from the candidate's actual provided experience.
+2. HYPER-TARGETED ATS ALIGNMENT: Analyze the Job Description deeply. Identify the core skills, technologies, and phrasing used by this specific company. Mirror these EXACT keywords naturally throughout the candidate's experience. If the JD requires "Python" and the candidate used it, ensure Python is front-and-center.
+3. DEEP, IMPACT-DRIVEN REWRITE: Do not just copy the old bullets. Completely rewrite every bullet point using the Google/FAANG XYZ formula: "Accomplished [X] as measured by [Y], by doing [Z]".
+   - ALWAYS start with a potent action verb (Architected, Engineered, Spearheaded, Optimized, Deployed).
+   - NEVER use weak verbs (Helped, Worked on, Responsible for).
+4. REALISTIC QUANTIFICATION: Add realistic metrics (percentages, time saved, efficiency improved) ONLY if they logically align with the actual experience described. Do not use absurd numbers for junior roles.
+5. EXECUTIVE SUMMARY: Write a commanding 3-sentence professional summary that directly positions the candidate as the perfect solution to the problems outlined in the JD.
+6. SKILLS OPTIMIZATION: Rebuild the Skills section. Group them logically (Languages, Frameworks, Cloud, Tools). The skills requested in the JD MUST be listed first.
+7. FORMATTING STRICTURES: Return CLEAN PLAIN TEXT ONLY.
+   - NO Markdown formatting (no **, no ##). 
+   - NO LaTeX.
+   - NO HTML.
+   - NO tables or weird characters (bullet points should use standard hyphens or plain bullets).
+8. FLAWLESS EXECUTION: Zero grammar errors. Zero typos. Perfect professional corporate tone.
+
+OUTPUT: Return the COMPLETE, aggressively optimized resume text. DO NOT include intros, commentary, or pleasantries. Jump straight into the resume content."""
+    else:
+        prompt = f"""You are an elite AI resume consultant who has placed 500+ candidates at FAANG, top MNCs, and Big 4 companies. 
+
+Perform a DEEP REWRITE of this resume specifically for a **{target_role}** role at a {company_type}, maintaining absolute factual accuracy.
+
+ORIGINAL RESUME CONTENT:
+{text[:4000]}
+
+TARGET ROLE: {target_role}
+COMPANY TYPE: {company_type}
+
+REWRITE RULES (CRITICAL — follow precisely):
+1. STRICT FACTUAL ACCURACY: Do NOT invent experiences, companies, projects, or degrees. Only enhance what is provided in the ORIGINAL RESUME CONTENT.
+2. Professional Summary: Write a powerful 3-sentence summary positioning the candidate as an ideal {target_role}. 
+   Highlight actual relevant experience, key technical strengths, and career passion.
+3. Technical Skills: Reorder to prioritize skills most critical for {target_role} first.
+   - Group by: Programming Languages | Frameworks & Libraries | Databases | Tools & Platforms | Cloud & DevOps
+4. Experience Bullets: Do a DEEP REWRITE of EVERY bullet using STAR format with quantified results.
+   - Action Verb + Task Description + Technology Used + Measurable Result
+   - Use REALISTIC metrics based on the original content.
+5. Projects: Emphasize projects that demonstrate {target_role} competencies based on factual data.
+6. If skills relevant to {target_role} are clearly implied by their work but not explicitly listed, add them naturally.
+7. Fix ALL grammar mistakes, awkward phrasing, and typos.
+8. Use ATS-friendly formatting: clear section headers, consistent bullet style, no tables or columns.
+9. Plain professional English only — NO LaTeX, **, ###, or special symbols.
+10. Add a "Key Achievements" or "Highlights" section if the candidate has notable accomplishments.
+{mode_instruction}
+
+OUTPUT: Return the COMPLETE rewritten resume text only. No introduction or commentary."""
+
+    return prompt
+
+
+_PREAMBLE_RE = re.compile(r'^(Here is|Below is|I\'ve rewritten).*?\n\n', flags=re.IGNORECASE)
+
+
+def _clean_rewrite_text(cleaned: str) -> str:
+    """Strip markdown artifacts and any "Here is your..." preamble from a rewrite."""
+    cleaned = re.sub(r'\*{1,2}', '', cleaned)
+    cleaned = re.sub(r'#{1,3}\s', '', cleaned)
+    cleaned = re.sub(r'^[-]{3,}$', '', cleaned, flags=re.MULTILINE)
+    cleaned = re.sub(r'^["\']|["\']$', '', cleaned.strip())
+    # Remove "Here is your..." preamble if Gemini added it
+    cleaned = _PREAMBLE_RE.sub('', cleaned)
+    return cleaned
+
+
+async def _clean_rewrite_stream(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Streaming `_clean_rewrite_text`: buffers to line boundaries so the same
+    markdown clean-up applies, and drops a leading "Here is..." paragraph.
+    """
+    buffer = ""
+    started = False      # past any preamble
+    skipping = False     # inside a preamble paragraph
+
+    def clean_line(line: str) -> str:
+        line = re.sub(r'\*{1,2}', '', line)
+        line = re.sub(r'#{1,3}\s', '', line)
+        return '' if re.fullmatch(r'-{3,}', line.strip()) else line
+
+    async for delta in deltas:
+        buffer += delta
+        *lines, buffer = buffer.split("\n")
+        out = []
+        for line in lines:
+            if not started:
+                if skipping:
+                    skipping = bool(line.strip())
+                    continue
+                if not line.strip():
+                    continue
+                if re.match(r"(Here is|Below is|I've rewritten)", line.strip().strip('"\''), re.IGNORECASE):
+                    skipping = True
+                    continue
+                started = True
+                line = line.lstrip().lstrip('"\'')
+            out.append(clean_line(line) + "\n")
+        if out:
+            yield "".join(out)
+    if buffer.strip():
+        yield clean_line(buffer.rstrip().rstrip('"\''))
+
+
 class AIRewriteService:
 
     @staticmethod
@@ -114,80 +240,9 @@ No explanation, no quotes, just the role name."""
         def _sync_rewrite():
             model = _get_gemini_model()
 
-            mode_instruction = ""
-            if mode == "Creative":
-                mode_instruction = "11. MODE: CREATIVE. While maintaining absolute factual truth, use highly engaging narrative language, impactful vocabulary, and heavily emphasize the candidate's unique value proposition and leadership potential."
-            else:
-                mode_instruction = "11. MODE: ATS. Strongly prioritize exact keyword matches from the target role/JD. Keep language direct, focus purely on hard technical competencies, and maximize metric visibility."
-
-            if job_description:
-                prompt = f"""You are the world's top Executive Resume Writer and ATS Technical Recruiter for FAANG/MAANG, Fortune 500, and top-tier Tech MNCs.
-
-Your task is to comprehensively RE-ENGINEER this resume to achieve a 100% ATS match for the specific Job Description provided, while remaining STRICTLY FACTUAL to the candidate's original history. 
-
-JOB DESCRIPTION:
-{job_description[:3000]}
-
-ORIGINAL RESUME CONTENT:
-{text[:4000]}
-
-REWRITE RULES (CRITICAL & NON-NEGOTIABLE):
-1. STRICT FACTUAL ACCURACY: You are forbidden from inventing companies, degrees, roles, or entirely fake projects. You MUST ONLY elevate, rephrase, and extract the maximum possible value from the candidate's actual provided experience.
-2. HYPER-TARGETED ATS ALIGNMENT: Analyze the Job Description deeply. Identify the core skills, technologies, and phrasing used by this specific company. Mirror these EXACT keywords naturally throughout the candidate's experience. If the JD requires "Python" and the candidate used it, ensure Python is front-and-center.
-3. DEEP, IMPACT-DRIVEN REWRITE: Do not just copy the old bullets. Completely rewrite every bullet point using the Google/FAANG XYZ formula: "Accomplished [X] as measured by [Y], by doing [Z]".
-   - ALWAYS start with a potent action verb (Architected, Engineered, Spearheaded, Optimized, Deployed).
-   - NEVER use weak verbs (Helped, Worked on, Responsible for).
-4. REALISTIC QUANTIFICATION: Add realistic metrics (percentages, time saved, efficiency improved) ONLY if they logically align with the actual experience described. Do not use absurd numbers for junior roles.
-5. EXECUTIVE SUMMARY: Write a commanding 3-sentence professional summary that directly positions the candidate as the perfect solution to the problems outlined in the JD.
-6. SKILLS OPTIMIZATION: Rebuild the Skills section. Group them logically (Languages, Frameworks, Cloud, Tools). The skills requested in the JD MUST be listed first.
-7. FORMATTING STRICTURES: Return CLEAN PLAIN TEXT ONLY.
-   - NO Markdown formatting (no **, no ##). 
-   - NO LaTeX.
-   - NO HTML.
-   - NO tables or weird characters (bullet points should use standard hyphens or plain bullets).
-8. FLAWLESS EXECUTION: Zero grammar errors. Zero typos. Perfect professional corporate tone.
-
-OUTPUT: Return the COMPLETE, aggressively optimized resume text. DO NOT include intros, commentary, or pleasantries. Jump straight into the resume content."""
-            else:
-                prompt = f"""You are an elite AI resume consultant who has placed 500+ candidates at FAANG, top MNCs, and Big 4 companies. 
-
-Perform a DEEP REWRITE of this resume specifically for a **{target_role}** role at a {company_type}, maintaining absolute factual accuracy.
-
-ORIGINAL RESUME CONTENT:
-{text[:4000]}
-
-TARGET ROLE: {target_role}
-COMPANY TYPE: {company_type}
-
-REWRITE RULES (CRITICAL — follow precisely):
-1. STRICT FACTUAL ACCURACY: Do NOT invent experiences, companies, projects, or degrees. Only enhance what is provided in the ORIGINAL RESUME CONTENT.
-2. Professional Summary: Write a powerful 3-sentence summary positioning the candidate as an ideal {target_role}. 
-   Highlight actual relevant experience, key technical strengths, and career passion.
-3. Technical Skills: Reorder to prioritize skills most critical for {target_role} first.
-   - Group by: Programming Languages | Frameworks & Libraries | Databases | Tools & Platforms | Cloud & DevOps
-4. Experience Bullets: Do a DEEP REWRITE of EVERY bullet using STAR format with quantified results.
-   - Action Verb + Task Description + Technology Used + Measurable Result
-   - Use REALISTIC metrics based on the original content.
-5. Projects: Emphasize projects that demonstrate {target_role} competencies based on factual data.
-6. If skills relevant to {target_role} are clearly implied by their work but not explicitly listed, add them naturally.
-7. Fix ALL grammar mistakes, awkward phrasing, and typos.
-8. Use ATS-friendly formatting: clear section headers, consistent bullet style, no tables or columns.
-9. Plain professional English only — NO LaTeX, **, ###, or special symbols.
-10. Add a "Key Achievements" or "Highlights" section if the candidate has notable accomplishments.
-{mode_instruction}
-
-OUTPUT: Return the COMPLETE rewritten resume text only. No introduction or commentary."""
-
+            prompt = _build_rewrite_prompt(text, target_role, company_type, job_description, mode)
             response = model.generate_content(prompt)
-            cleaned = response.text
-            # Strip markdown artifacts
-            cleaned = re.sub(r'\*{1,2}', '', cleaned)
-            cleaned = re.sub(r'#{1,3}\s', '', cleaned)
-            cleaned = re.sub(r'^[-]{3,}$', '', cleaned, flags=re.MULTILINE)
-            cleaned = re.sub(r'^["\']|["\']$', '', cleaned.strip())
-            # Remove "Here is your..." preamble if Gemini added it
-            cleaned = re.sub(r'^(Here is|Below is|I\'ve rewritten).*?\n\n', '', cleaned, flags=re.IGNORECASE)
-            return cleaned
+            return _clean_rewrite_text(response.text)
 
         try:
             return await asyncio.wait_for(
@@ -201,6 +256,42 @@ OUTPUT: Return the COMPLETE rewritten resume text only. No introduction or comme
             logger.error("AI Rewrite Error: %s", e)
             return f"Rewrite failed: {str(e)}"
 
+    @staticmethod
+    async def rewrite_section_stream(
+        text: str,
+        section_type: str,
+        target_role: str = "General",
+        company_type: str = "MNC",
+        job_description: str = None,
+        mode: str = "ATS",
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Streaming `rewrite_section` for SSE endpoints.
+        Yields ("token", text) as the rewrite arrives, line by line after
+        markdown clean-up; if no provider can stream, a single ("fallback", text).
+        """
+        from app.core.ai_provider import AIProvider
+
+        if not target_role or target_role.lower() in ("general", ""):
+            target_role = await AIRewriteService.detect_best_role(text)
+            logger.info(f"Auto-detected role for streaming rewrite: {target_role}")
+
+        prompt = _build_rewrite_prompt(text, target_role, company_type, job_description, mode)
+        sent = False
+        async for chunk in _clean_rewrite_stream(AIProvider.generate_stream(
+            prompt=prompt,
+            system_prompt="You are an expert resume writer. Return plain text only.",
+            max_tokens=3000,
+            temperature=0.4,
+            timeout=GEMINI_TIMEOUT_SECONDS,
+        )):
+            sent = True
+            yield "token", chunk
+
+        if not sent:
+            logger.warning("Streaming rewrite unavailable — emitting fallback message")
+            yield "fallback", "Rewrite failed: AI providers are unavailable right now. Please try again."
+
     @staticmethod
     async def rewrite_resume(resume_text: str, job_description: str, mode: str = "ATS") -> str:
         """Alias — rewrites a full resume aligned to a Job Description."""
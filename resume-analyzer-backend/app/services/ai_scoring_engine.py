@@ -6,21 +6,23 @@ UPGRADED from v1 with:
   - Action verb quality analysis (strong/weak verb ratio)
   - Quantification depth scoring (metrics, percentages, numbers)
   - ATS format quality (bullets, line length, section headers)
-  - RAG-enhanced role template matching (25 roles, not 5 hardcoded)
+  - RAG-enhanced role template matching (25 roles, not 5 hardcoded), served from the
+    shared RoleKnowledgeStore with precomputed template word sets
   - Skill synonym matching via SkillOntology
   - Industry-specific scoring adjustments
+  - Single-pass ResumeFeatures extraction; every sub-score is a pure function over it
 
 This is the CORE scoring module (keyword-based, no API needed).
 `ats_scoring_service.py` is the WRAPPER that tries Gemini first.
 """
 
 from app.services.ai_skill_ontology import SkillOntology
+from app.career_engine.role_store import RoleKnowledgeStore, template_words
 import re
-import json
-import os
 import time
 import logging
-from typing import Dict, List, Any
+from collections import Counter
+from typing import Dict, List, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +47,218 @@ WEAK_VERBS = frozenset({
     "tried", "used", "had", "got", "went", "was",
 })
 
+# Achievement signals counted by the experience-depth sub-score
+IMPACT_VERBS = frozenset({
+    "increased", "decreased", "improved", "reduced", "optimized",
+    "grew", "saved", "delivered", "boosted", "elevated",
+})
+SCALE_WORDS = ("million", "billion", "lakh", "crore")
+COUNT_NOUNS = ("users", "clients", "projects", "teams", "members", "customers", "endpoints", "requests")
+MULTIPLIER_WORDS = ("faster", "improvement", "increase", "reduction")
+RANK_WORDS = ("top", "first", "ranked")
+CURRENCY_SYMBOLS = ("$", "₹")
+
+# 10 key resume sections; a keyword hits when its tokens appear in sequence
+# (the last token may be a prefix, so "project" also covers "projects")
+SECTION_KEYWORDS = {
+    "contact": ["email", "phone", "linkedin", "github", "@", "portfolio", "website"],
+    "summary": ["summary", "objective", "profile", "about me", "professional summary"],
+    "education": ["bachelor", "master", "b.tech", "m.tech", "university", "college",
+                  "degree", "gpa", "cgpa", "diploma", "phd", "mba", "certification"],
+    "experience": ["experience", "internship", "worked", "employed", "company",
+                   "organization", "intern", "full-time", "part-time", "contract"],
+    "skills": ["skills", "technologies", "tools", "languages", "frameworks",
+               "proficiency", "competencies", "technical skills"],
+    "projects": ["project", "built", "developed", "created", "implemented",
+                 "portfolio", "capstone", "thesis", "research project"],
+    "achievements": ["award", "winner", "achievement", "rank", "gold", "silver",
+                     "hackathon", "certification", "scholarship", "honor", "dean's list"],
+    "certifications": ["certified", "certification", "certificate", "coursera",
+                       "udemy", "aws certified", "google certified", "microsoft certified"],
+    "publications": ["published", "paper", "journal", "conference", "arxiv",
+                     "ieee", "acm", "research paper"],
+    "extracurricular": ["volunteer", "club", "society", "leadership", "community",
+                        "open source", "contributor", "organizer", "mentor"],
+}
+
+# Every non-space character that is not part of a word is its own token, so
+# two tokens are adjacent in the list iff only whitespace separates them.
+_TOKEN_RE = re.compile(r"\w+|\S")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _build_section_index():
+    single: Dict[str, set] = {}
+    multi: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+    for section, keywords in SECTION_KEYWORDS.items():
+        for kw in keywords:
+            parts = tuple(_TOKEN_RE.findall(kw))
+            if len(parts) == 1:
+                single.setdefault(parts[0], set()).add(section)
+            else:
+                multi.setdefault(parts[0], []).append((parts[1:], section))
+    return single, multi, max(len(k) for k in single)
+
+
+_SECTION_SINGLE, _SECTION_MULTI, _SECTION_MAX_LEN = _build_section_index()
+
+
+class ResumeFeatures:
+    """
+    Everything the keyword scorer needs, from ONE tokenizer pass.
+
+    Attributes:
+      tokens          lowercase token list (token index == position)
+      positions_of()  token -> list of positions (C-level list scans, memoised)
+      word_count      whitespace-delimited word count (length heuristics)
+      numbers         number index: (position, leading digits, suffix) per
+                      token that starts with a digit ("40", "10x", "5k")
+      digit_runs      every digit run in the text (quantification)
+      metric_hits     achievement signals (%, currency, scale, counts, 10x,
+                      rankings, impact verbs)
+      sections        resume sections with at least one keyword hit
+      strong_verbs / weak_verbs
+      skills          canonical ontology skills (compiled matcher pass)
+    """
+
+    def __init__(self, resume_text: str):
+        self.word_count = len(resume_text.split())
+        self.tokens = _TOKEN_RE.findall(resume_text.lower())
+        self.counts = Counter(self.tokens)
+        self._positions: Dict[str, List[int]] = {}
+        self.numbers: List[Tuple[int, str, str]] = []
+        self.digit_runs: List[str] = []
+
+        for tok, count in self.counts.items():
+            if tok.isalpha():
+                continue
+            runs = _DIGITS_RE.findall(tok)
+            if not runs:
+                continue
+            self.digit_runs.extend(runs * count)
+            leading = _DIGITS_RE.match(tok)
+            if leading:
+                digits = leading.group()
+                for pos in self.positions_of(tok):
+                    self.numbers.append((pos, digits, tok[len(digits):]))
+        self.numbers.sort()
+
+        self.strong_verbs = sum(self.counts[v] for v in STRONG_VERBS if v in self.counts)
+        self.weak_verbs = sum(self.counts[v] for v in WEAK_VERBS if v in self.counts)
+        self.metric_hits = self._count_metrics()
+        self.sections = self._find_sections()
+        self.skills = SkillOntology.extract_skills_from_text(resume_text)
+        self.skill_set = set(self.skills)
+
+    def positions_of(self, tok: str) -> List[int]:
+        found = self._positions.get(tok)
+        if found is None:
+            found, start = [], 0
+            for _ in range(self.counts.get(tok, 0)):
+                start = self.tokens.index(tok, start)
+                found.append(start)
+                start += 1
+            self._positions[tok] = found
+        return found
+
+    def _token(self, pos: int) -> str:
+        return self.tokens[pos] if 0 <= pos < len(self.tokens) else ""
+
+    def _count_metrics(self) -> int:
+        hits = sum(self.counts[v] for v in IMPACT_VERBS if v in self.counts)
+        for pos, digits, suffix in self.numbers:
+            if self._token(pos - 1) in CURRENCY_SYMBOLS:                # $ 1,200 / ₹50000
+                hits += 1
+            if suffix:
+                if suffix.startswith(SCALE_WORDS + COUNT_NOUNS):          # 5million / 10users
+                    hits += 1
+                elif suffix.startswith("x") and (                         # 10x faster
+                    suffix[1:].startswith(MULTIPLIER_WORDS)
+                    or (suffix == "x" and self._token(pos + 1).startswith(MULTIPLIER_WORDS))
+                ):
+                    hits += 1
+                continue
+            nxt = self._token(pos + 1)
+            if nxt == "%" or nxt.startswith(SCALE_WORDS):                 # 40 % / 3 crore
+                hits += 1
+            elif (self._token(pos + 2) if nxt == "+" else nxt).startswith(COUNT_NOUNS):
+                hits += 1                                                 # 10+ users
+        for word in RANK_WORDS:                                           # top 5 / ranked 1
+            for pos in self.positions_of(word):
+                if self._token(pos + 1)[:1].isdigit():
+                    hits += 1
+        return hits
+
+    def _find_sections(self) -> set:
+        found = set()
+        for tok in self.counts:
+            for n in range(1, min(len(tok), _SECTION_MAX_LEN) + 1):
+                sections = _SECTION_SINGLE.get(tok[:n])
+                if sections:
+                    found |= sections
+            for rest, section in _SECTION_MULTI.get(tok, ()):
+                if section in found:
+                    continue
+                for pos in self.positions_of(tok):
+                    following = self.tokens[pos + 1:pos + 1 + len(rest)]
+                    if (
+                        len(following) == len(rest)
+                        and following[:-1] == list(rest[:-1])
+                        and following[-1].startswith(rest[-1])
+                    ):
+                        found.add(section)
+                        break
+        return found
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SUB-SCORES — pure functions over ResumeFeatures (all 0-100)
+# ──────────────────────────────────────────────────────────────────────────────
+
+def score_relevance(features: ResumeFeatures, template_words: set) -> float:
+    """TF-IDF-inspired keyword relevance against a role template word set."""
+    if not template_words:
+        return 45.0
+
+    # Weighted matching: skill terms get 2x weight
+    skill_terms = {w for w in template_words if len(w) > 3}
+    basic_terms = template_words - skill_terms
+
+    skill_matches = sum(1 for w in skill_terms if w in features.counts)
+    basic_matches = sum(1 for w in basic_terms if w in features.counts)
+
+    weighted_match = (skill_matches * 2 + basic_matches)
+    weighted_total = (len(skill_terms) * 2 + len(basic_terms))
+
+    raw = (weighted_match / weighted_total) * 100
+    # Mild boost (1.15x) to keep scores honest
+    return round(min(raw * 1.15, 100), 2)
+
+
+def score_skill_coverage(features: ResumeFeatures, cluster_skills: List[str]) -> Tuple[float, List[str]]:
+    matched = [s for s in cluster_skills if s in features.skill_set]
+    return min((len(matched) / max(len(cluster_skills) * 0.4, 1)) * 100, 100), matched
+
+
+def score_experience_depth(features: ResumeFeatures) -> float:
+    return min((features.metric_hits / 8) * 100, 100)
+
+
+def score_structure(features: ResumeFeatures) -> float:
+    return min((len(features.sections) / 7) * 100, 100)  # Expect at least 7 of 10
+
+
+def score_verb_quality(features: ResumeFeatures) -> float:
+    total_verbs = features.strong_verbs + features.weak_verbs
+    if total_verbs > 0:
+        return (features.strong_verbs / total_verbs) * 100
+    return 30  # No action verbs detected = low
+
+
+def score_quantification(features: ResumeFeatures) -> float:
+    meaningful_numbers = sum(1 for n in features.digit_runs if 2 <= len(n) <= 10)  # 2+ digit numbers
+    return min((meaningful_numbers / 10) * 100, 100)
+
 
 class AIScoringEngine:
     """
@@ -66,84 +280,36 @@ class AIScoringEngine:
         All sub-scores are in 0-100 range.
         """
         _t0 = time.perf_counter()
-        words = resume_text.split()
-        word_count = len(words)
-        text_lower = resume_text.lower()
+        features = ResumeFeatures(resume_text)
+        word_count = features.word_count
 
         # Extract skills using ontology (more accurate)
-        ontology_skills = SkillOntology.extract_skills_from_text(resume_text)
         parsed_skills = parsed_data.get("skills", [])
-        user_skills = list(set(ontology_skills + parsed_skills))
+        user_skills = list(set(features.skills + parsed_skills))
 
         # 1. Relevance Score — TF-IDF keyword overlap with role template
-        template = AIScoringEngine.get_role_template(target_role)
-        relevance_score = AIScoringEngine.calculate_relevance_score(resume_text, template)
+        relevance_score = score_relevance(features, RoleKnowledgeStore.get_template_words(target_role))
 
         # 2. Skill Coverage — uses ontology for better matching
         cluster = SkillOntology.map_role_to_cluster(target_role)
         cluster_skills = SkillOntology.get_cluster_skills(cluster)
-        matched_skills = [s for s in cluster_skills if s.lower() in text_lower]
-        skill_coverage = min((len(matched_skills) / max(len(cluster_skills) * 0.4, 1)) * 100, 100)
+        skill_coverage, matched_skills = score_skill_coverage(features, cluster_skills)
 
         # 3. Experience Depth — broader achievement signals
-        metric_patterns = [
-            r'\d+\s*%',                            # percentages
-            r'\$\s*[\d,]+',                        # dollar amounts
-            r'₹\s*[\d,]+',                         # rupee amounts
-            r'\d+\s*(million|billion|lakh|crore)',  # large numbers
-            r'increased|decreased|improved|reduced|optimized|grew|saved|delivered|boosted|elevated',
-            r'\d+\+?\s*(users|clients|projects|teams|members|customers|endpoints|requests)',
-            r'\d+x\s*(faster|improvement|increase|reduction)',  # multiplier metrics
-            r'(top|first|ranked)\s*\d+',           # rankings
-        ]
-        depth_hits = sum(
-            len(re.findall(pat, resume_text, re.IGNORECASE))
-            for pat in metric_patterns
-        )
-        experience_depth = min((depth_hits / 8) * 100, 100)
+        depth_hits = features.metric_hits
+        experience_depth = score_experience_depth(features)
 
         # 4. Structure Score — checks for 10 key resume sections
-        section_keywords = {
-            "contact": ["email", "phone", "linkedin", "github", "@", "portfolio", "website"],
-            "summary": ["summary", "objective", "profile", "about me", "professional summary"],
-            "education": ["bachelor", "master", "b.tech", "m.tech", "university", "college",
-                         "degree", "gpa", "cgpa", "diploma", "phd", "mba", "certification"],
-            "experience": ["experience", "internship", "worked", "employed", "company",
-                          "organization", "intern", "full-time", "part-time", "contract"],
-            "skills": ["skills", "technologies", "tools", "languages", "frameworks",
-                       "proficiency", "competencies", "technical skills"],
-            "projects": ["project", "built", "developed", "created", "implemented",
-                        "portfolio", "capstone", "thesis", "research project"],
-            "achievements": ["award", "winner", "achievement", "rank", "gold", "silver",
-                           "hackathon", "certification", "scholarship", "honor", "dean's list"],
-            "certifications": ["certified", "certification", "certificate", "coursera",
-                             "udemy", "aws certified", "google certified", "microsoft certified"],
-            "publications": ["published", "paper", "journal", "conference", "arxiv",
-                           "ieee", "acm", "research paper"],
-            "extracurricular": ["volunteer", "club", "society", "leadership", "community",
-                              "open source", "contributor", "organizer", "mentor"],
-        }
-
-        sections_found = sum(
-            1 for kws in section_keywords.values()
-            if any(kw in text_lower for kw in kws)
-        )
-        structure_score = min((sections_found / 7) * 100, 100)  # Expect at least 7 of 10
+        sections_found = len(features.sections)
+        structure_score = score_structure(features)
 
         # 5. Action Verb Quality (NEW in v2)
-        words_lower = [w.lower().rstrip(".,;:") for w in words]
-        strong_count = sum(1 for w in words_lower if w in STRONG_VERBS)
-        weak_count = sum(1 for w in words_lower if w in WEAK_VERBS)
-        total_verbs = strong_count + weak_count
-        if total_verbs > 0:
-            verb_quality = (strong_count / total_verbs) * 100
-        else:
-            verb_quality = 30  # No action verbs detected = low
+        strong_count = features.strong_verbs
+        weak_count = features.weak_verbs
+        verb_quality = score_verb_quality(features)
 
         # 6. Quantification Score (NEW in v2)
-        number_pattern = re.findall(r'\d+', resume_text)
-        meaningful_numbers = [n for n in number_pattern if 2 <= len(n) <= 10]  # 2+ digit numbers
-        quantification_score = min((len(meaningful_numbers) / 10) * 100, 100)
+        quantification_score = score_quantification(features)
 
         # Final weighted score (7 dimensions)
         final_score = (
@@ -202,7 +368,7 @@ class AIScoringEngine:
                 gaps=gap_analysis,
                 depth_hits=depth_hits,
                 sections_found=sections_found,
-                total_sections=len(section_keywords),
+                total_sections=len(SECTION_KEYWORDS),
                 word_count=word_count,
                 verb_quality=verb_quality,
                 quantification=quantification_score,
@@ -212,7 +378,7 @@ class AIScoringEngine:
                 "gaps":            gap_analysis,
                 "depth_hits":      depth_hits,
                 "sections_found":  sections_found,
-                "total_sections":  len(section_keywords),
+                "total_sections":  len(SECTION_KEYWORDS),
                 "user_skills":     user_skills,
                 "word_count":      word_count,
                 "relevance":       relevance_score,
@@ -396,29 +562,7 @@ class AIScoringEngine:
         Returns genuine 0-100 reflecting actual alignment with role template.
         """
         try:
-            # Build word sets (filter short words)
-            resume_words = set(re.findall(r'\w+', resume_text.lower()))
-            template_words = {w for w in re.findall(r'\w+', target_template.lower()) if len(w) > 2}
-
-            if not template_words:
-                return 45.0
-
-            # Weighted matching: skill terms get 2x weight
-            skill_terms = {w for w in template_words if len(w) > 3}
-            basic_terms = template_words - skill_terms
-
-            skill_matches = len(resume_words & skill_terms)
-            basic_matches = len(resume_words & basic_terms)
-
-            weighted_match = (skill_matches * 2 + basic_matches)
-            weighted_total = (len(skill_terms) * 2 + len(basic_terms))
-
-            if weighted_total == 0:
-                return 45.0
-
-            raw = (weighted_match / weighted_total) * 100
-            # Mild boost (1.15x) to keep scores honest
-            return round(min(raw * 1.15, 100), 2)
+            return score_relevance(ResumeFeatures(resume_text), template_words(target_template))
         except Exception as e:
             logger.error(f"Relevance scoring error: {e}")
             return 35.0
@@ -428,47 +572,6 @@ class AIScoringEngine:
     def get_role_template(role: str) -> str:
         """
         Get comprehensive role template for keyword matching.
-        Uses RAG engine's role_database.json (25 roles) with fallback.
+        Served from the shared RoleKnowledgeStore (role_database.json, 25 roles) with fallback.
         """
-        db_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            "career_engine", "role_database.json"
-        )
-        try:
-            if os.path.exists(db_path):
-                with open(db_path, encoding='utf-8') as f:
-                    role_db = json.load(f)
-                role_data = role_db.get(role)
-                if role_data:
-                    parts = [
-                        role,
-                        role_data.get("description", ""),
-                        " ".join(role_data.get("mandatory_skills", [])),
-                        " ".join(role_data.get("advanced_skills", [])),
-                        " ".join(role_data.get("tools", [])),
-                        " ".join(role_data.get("certifications", [])),
-                        " ".join(role_data.get("interview_topics", [])),
-                    ]
-                    return " ".join(parts)
-        except Exception:
-            pass
-
-        # Expanded fallback templates
-        templates = {
-            "Software Engineer": "Python Java C++ algorithms data structures system design backend API REST microservices git testing CI/CD Docker Kubernetes debugging object-oriented distributed systems multithreading SQL databases agile",
-            "Data Scientist": "Python R SQL machine learning statistics data analysis pandas numpy tensorflow scikit-learn visualization deep learning NLP feature engineering A/B testing regression classification modeling",
-            "Full Stack Developer": "React JavaScript TypeScript Node.js HTML CSS REST API MongoDB PostgreSQL Docker frontend backend Next.js Redux state management responsive design authentication websocket",
-            "DevOps Engineer": "Docker Kubernetes AWS Azure CI/CD Jenkins Linux bash terraform monitoring Prometheus Grafana Ansible automation infrastructure git GitLab GitHub Actions deployment",
-            "Machine Learning Engineer": "Python TensorFlow PyTorch deep learning NLP computer vision MLOps model deployment feature engineering distributed training GPU CUDA neural networks transformers LLMs",
-            "Data Engineer": "Python SQL Spark Airflow ETL data warehouse BigQuery Snowflake Kafka data pipeline dbt Hadoop data modeling batch streaming",
-            "Frontend Developer": "React JavaScript TypeScript HTML CSS Tailwind responsive design accessibility performance optimization webpack Next.js Redux testing component architecture design system",
-            "Backend Developer": "Python Java Node.js SQL PostgreSQL MongoDB REST API GraphQL microservices Docker Kubernetes authentication caching message queue Redis system design scalability",
-            "Mobile App Developer": "React Native Flutter Kotlin Swift Android iOS Firebase REST API mobile UI state management push notifications app deployment testing accessibility",
-            "Cybersecurity Analyst": "network security SIEM vulnerability assessment incident response penetration testing cryptography firewall IDS IPS threat hunting malware analysis SOC OWASP compliance",
-            "Product Manager": "product strategy roadmap user research data analysis agile scrum stakeholder management A/B testing metrics KPIs OKRs prioritization user stories sprint planning",
-            "UI/UX Designer": "Figma user research wireframing prototyping visual design interaction design design thinking usability testing accessibility design systems responsive design typography color theory",
-            "Cloud Architect": "AWS Azure GCP cloud architecture terraform networking security serverless cost optimization CDN edge computing multi-cloud migration scalability high availability disaster recovery",
-            "QA/Test Engineer": "test automation selenium cypress API testing SQL test planning agile BDD TDD performance testing security testing CI/CD bug tracking regression testing",
-            "Business Analyst": "requirements analysis SQL Excel data analysis process mapping stakeholder management Agile UML BPMN Power BI Tableau documentation business intelligence",
-        }
-        return templates.get(role, "professional experience technical skills project management problem solving communication teamwork leadership analytical thinking")
+        return RoleKnowledgeStore.get_template(role)
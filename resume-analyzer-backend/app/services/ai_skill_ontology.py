@@ -11,12 +11,124 @@ New Features:
   - Weighted skill importance (Core > Advanced > Tools)
   - Industry-specific skill recommendations
   - Skill gap analysis with priority ordering
+  - Compiled single-pass skill matcher (word-boundary aware, span offsets)
 """
 
 import re
 from typing import Dict, List, Set, Tuple
 
 
+class SkillMatcher:
+    """
+    Compiled multi-pattern matcher for skill / keyword vocabularies.
+
+    All surface forms are folded into ONE regex — a prefix-trie alternation,
+    so the engine never retries hundreds of branches per character — with
+    word-boundary guards, so a resume is scanned exactly once and "R" / "Go" / "Java" no longer hit inside other words.
+    Because the longest form wins, terms nested inside a longer match
+    ("Linux" in "Kali Linux") are precomputed and reported by both `find`
+    and `finditer` (with their own spans).
+    Build it once at import time and reuse it for every request.
+    """
+
+    def __init__(self, terms: Dict[str, str]):
+        # surface form (lower, single-spaced) -> canonical name
+        self._canonical: Dict[str, str] = {
+            " ".join(surface.lower().split()): canonical
+            for surface, canonical in terms.items()
+            if surface.strip()
+        }
+        alternatives = sorted(self._canonical, key=len, reverse=True)
+        trie: Dict[str, dict] = {}
+        for surface in alternatives:
+            node = trie
+            for ch in surface:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        body = SkillMatcher._trie_regex(trie)
+        # Surface forms are lowercase, so text is lowercased once and matched
+        # case-sensitively (much faster than IGNORECASE); the IGNORECASE twin
+        # only serves text whose length changes under lower().
+        self._pattern = re.compile(rf"(?<!\w)(?:{body})(?!\w)") if body else None
+        self._pattern_ci = re.compile(self._pattern.pattern, re.IGNORECASE) if body else None
+        # outer surface -> [(canonical, pattern)] for each term nested inside it
+        self._nested: Dict[str, List[Tuple[str, "re.Pattern"]]] = {}
+        for outer in alternatives:
+            if " " in outer or not outer.isalnum():
+                nested = [
+                    (self._canonical[inner], re.compile(
+                        r"(?<!\w)" + r"\s+".join(map(re.escape, inner.split(" "))) + r"(?!\w)"
+                    ))
+                    for inner in alternatives
+                    if inner != outer and SkillMatcher._contains_word(outer, inner)
+                ]
+                if nested:
+                    self._nested[outer] = nested
+        self._implied: Dict[str, Set[str]] = {
+            outer: {canonical for canonical, _ in nested} for outer, nested in self._nested.items()
+        }
+
+    @staticmethod
+    def _trie_regex(node: Dict[str, dict]) -> str:
+        # Greedy optional groups make the longest surface form win, with the
+        # trailing boundary guard forcing a backtrack to a shorter one if needed.
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + SkillMatcher._trie_regex(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+    @staticmethod
+    def _contains_word(outer: str, inner: str) -> bool:
+        start = outer.find(inner)
+        while start != -1:
+            end = start + len(inner)
+            before = outer[start - 1] if start > 0 else " "
+            after = outer[end] if end < len(outer) else " "
+            if not (before.isalnum() or before == "_") and not (after.isalnum() or after == "_"):
+                return True
+            start = outer.find(inner, start + 1)
+        return False
+
+    def _scan(self, text: str):
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return self._pattern.finditer(lowered)
+        return self._pattern_ci.finditer(text)
+
+    def finditer(self, text: str) -> List[Tuple[str, int, int]]:
+        """Return (canonical, start, end) for every match, nested terms included, in text order."""
+        if not text or self._pattern is None:
+            return []
+        spans = []
+        for m in self._scan(text):
+            surface = " ".join(m.group().lower().split())
+            spans.append((self._canonical[surface], m.start(), m.end()))
+            for canonical, pattern in self._nested.get(surface, ()):
+                for inner in pattern.finditer(m.group().lower()):
+                    spans.append((canonical, m.start() + inner.start(), m.start() + inner.end()))
+        spans.sort(key=lambda span: (span[1], -span[2]))
+        return spans
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of canonical names present in the text (nested terms included)."""
+        if not text or self._pattern is None:
+            return set()
+        # No spans needed: findall + dedupe keeps per-match work in C
+        found: Set[str] = set()
+        for surface in set(self._pattern.findall(text.lower())):
+            surface = " ".join(surface.split())
+            found.add(self._canonical[surface])
+            found.update(self._implied.get(surface, ()))
+        return found
+
+
 class SkillOntology:
     """
     AI Skill Ontology & Taxonomy v2.0
@@ -316,24 +428,34 @@ class SkillOntology:
 
         return report
 
+    @staticmethod
+    def match_skills(text: str) -> List[Tuple[str, int, int]]:
+        """
+        Single pass over the text with the compiled ontology matcher.
+        Returns (canonical_skill, start, end) spans in text order.
+        """
+        return _SKILL_MATCHER.finditer(text)
+
     @staticmethod
     def extract_skills_from_text(text: str) -> List[str]:
         """
         Extract recognized skills from resume text using ontology matching.
         More accurate than simple keyword parsing.
         """
-        text_lower = text.lower()
-        found_skills = set()
+        return sorted(_SKILL_MATCHER.find(text))
 
-        for cluster_name, categories in SkillOntology.CLUSTERS.items():
+    @staticmethod
+    def matcher_terms() -> Dict[str, str]:
+        """Surface form -> canonical name for every cluster skill and synonym (SkillMatcher input)."""
+        terms: Dict[str, str] = {}
+        for categories in SkillOntology.CLUSTERS.values():
             for cat_skills in categories.values():
                 for skill in cat_skills:
-                    if skill.lower() in text_lower:
-                        found_skills.add(skill)
-
-        # Also check synonyms
+                    terms[skill.lower()] = skill
         for synonym, canonical in SkillOntology.SYNONYMS.items():
-            if synonym in text_lower and canonical not in found_skills:
-                found_skills.add(canonical)
+            # A skill's own name always wins over a synonym spelled the same way
+            terms.setdefault(synonym, canonical)
+        return terms
+
 
-        return sorted(list(found_skills))
+_SKILL_MATCHER = SkillMatcher(SkillOntology.matcher_terms())
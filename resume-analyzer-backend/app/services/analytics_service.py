@@ -4,8 +4,8 @@ Advanced Analytics Service - Track resume performance and provide insights
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.all_models import Resume, User
+from app.models.all_models import Resume, User, UserStats, defer_resume_text
+from app.services.user_stats_service import UserStatsService
 import json
 
 class AnalyticsService:
@@ -17,7 +17,7 @@ class AnalyticsService:
         Get comprehensive analytics for a specific resume
         """
         
-        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        resume = db.query(Resume).options(*defer_resume_text()).filter(Resume.id == resume_id).first()
         if not resume:
             return {"error": "Resume not found"}
         
@@ -65,41 +65,41 @@ class AnalyticsService:
     @staticmethod
     def get_user_analytics(user_id: int, db: Session) -> Dict[str, Any]:
         """
-        Get comprehensive analytics for a user's job search journey
+        Get comprehensive analytics for a user's job search journey.
+        Reads the user's `user_stats` rollup (UserStatsService) — one row,
+        however many resumes they have uploaded.
         """
         
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
+        row = (
+            db.query(User.created_at, UserStats)
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if not row:
             return {"error": "User not found"}
+        created_at, stats = row
+        stats = stats or UserStatsService.rebuild(db, user_id)
+        summary = UserStatsService.summary(stats)
+        total_resumes = summary["total_resumes"]
         
-        # Get all user's resumes
-        resumes = db.query(Resume).filter(Resume.owner_id == user_id).all()
-        
-        if not resumes:
+        if not total_resumes:
             return {
                 "user_id": user_id,
                 "total_resumes": 0,
                 "message": "No resumes uploaded yet"
             }
         
-        # Calculate aggregate metrics
-        total_resumes = len(resumes)
-        avg_ats_score = sum(r.ats_score for r in resumes) / total_resumes if total_resumes > 0 else 0
-        highest_score = max((r.ats_score for r in resumes), default=0)
-        lowest_score = min((r.ats_score for r in resumes), default=0)
-        
-        # Get all unique skills across resumes
-        all_skills = set()
-        for resume in resumes:
-            if resume.score_breakdown and "extracted_skills" in resume.score_breakdown:
-                all_skills.update(resume.score_breakdown["extracted_skills"])
+        avg_ats_score = summary["average_ats_score"]
+        highest_score = summary["highest_score"]
+        lowest_score = summary["lowest_score"]
         
         # Calculate job search progress
-        account_age_days = (datetime.utcnow() - user.created_at).days
+        account_age_days = (datetime.utcnow() - created_at).days
         
         return {
             "user_id": user_id,
-            "account_created": user.created_at.isoformat(),
+            "account_created": created_at.isoformat(),
             "account_age_days": account_age_days,
             "resume_stats": {
                 "total_resumes": total_resumes,
@@ -109,17 +109,21 @@ class AnalyticsService:
                 "score_improvement": round(highest_score - lowest_score, 2)
             },
             "skill_profile": {
-                "total_unique_skills": len(all_skills),
-                "top_skills": list(all_skills)[:15],
-                "skill_diversity_score": min(len(all_skills) * 2, 100)
+                "total_unique_skills": summary["unique_skills"],
+                "top_skills": summary["top_skills"],
+                "skill_diversity_score": min(summary["unique_skills"] * 2, 100)
             },
             "activity": {
-                "resumes_this_month": AnalyticsService._count_resumes_this_month(resumes),
-                "most_active_day": AnalyticsService._get_most_active_day(resumes),
-                "upload_frequency": AnalyticsService._calculate_upload_frequency(resumes)
+                "resumes_this_month": summary["resumes_this_month"],
+                "most_active_day": summary["most_active_day"],
+                "upload_frequency": AnalyticsService._calculate_upload_frequency(
+                    total_resumes, summary["first_upload_at"], summary["last_upload_at"]
+                )
             },
             "job_search_health": {
-                "score": AnalyticsService._calculate_job_search_health(user, resumes),
+                "score": AnalyticsService._calculate_job_search_health(
+                    total_resumes, avg_ats_score, summary["resumes_last_30_days"]
+                ),
                 "status": AnalyticsService._get_health_status(avg_ats_score),
                 "next_steps": AnalyticsService._suggest_next_steps(avg_ats_score, total_resumes)
             }
@@ -205,31 +209,12 @@ class AnalyticsService:
         return recommendations
     
     @staticmethod
-    def _count_resumes_this_month(resumes: List[Resume]) -> int:
-        """Count resumes uploaded this month"""
-        current_month = datetime.utcnow().month
-        current_year = datetime.utcnow().year
-        return sum(1 for r in resumes if r.created_at.month == current_month and r.created_at.year == current_year)
-    
-    @staticmethod
-    def _get_most_active_day(resumes: List[Resume]) -> str:
-        """Get the day of week with most uploads"""
-        if not resumes:
-            return "N/A"
-        day_counts = {}
-        for resume in resumes:
-            day = resume.created_at.strftime("%A")
-            day_counts[day] = day_counts.get(day, 0) + 1
-        return max(day_counts, key=day_counts.get) if day_counts else "N/A"
-    
-    @staticmethod
-    def _calculate_upload_frequency(resumes: List[Resume]) -> str:
+    def _calculate_upload_frequency(total_resumes: int, first_upload: datetime, last_upload: datetime) -> str:
         """Calculate how often user uploads resumes"""
-        if len(resumes) < 2:
+        if total_resumes < 2 or first_upload is None:
             return "Not enough data"
         
-        dates = sorted([r.created_at for r in resumes])
-        avg_days_between = sum((dates[i+1] - dates[i]).days for i in range(len(dates)-1)) / (len(dates)-1)
+        avg_days_between = (last_upload - first_upload).total_seconds() / 86400 / (total_resumes - 1)
         
         if avg_days_between < 7:
             return "Very Active (multiple per week)"
@@ -239,23 +224,21 @@ class AnalyticsService:
             return "Occasional (monthly)"
     
     @staticmethod
-    def _calculate_job_search_health(user: User, resumes: List[Resume]) -> int:
+    def _calculate_job_search_health(total_resumes: int, avg_ats_score: float, recent_resumes: int) -> int:
         """Calculate overall job search health score (0-100)"""
         score = 50  # Base score
         
         # Factor 1: Resume count
-        if len(resumes) >= 3:
+        if total_resumes >= 3:
             score += 15
-        elif len(resumes) >= 1:
+        elif total_resumes >= 1:
             score += 10
         
         # Factor 2: Average ATS score
-        if resumes:
-            avg_ats = sum(r.ats_score for r in resumes) / len(resumes)
-            score += int(avg_ats * 0.3)
+        if total_resumes:
+            score += int(avg_ats_score * 0.3)
         
         # Factor 3: Recent activity
-        recent_resumes = [r for r in resumes if (datetime.utcnow() - r.created_at).days < 30]
         if recent_resumes:
             score += 10
         
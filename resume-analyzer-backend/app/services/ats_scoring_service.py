@@ -13,9 +13,12 @@ PRODUCTION HARDENING:
   - All Gemini calls wrapped in 30s timeout
   - Resume text sanitized & prompt-injection-guarded before LLM
   - Keyword fallback always available (offline mode)
+  - Finished analyses cached by content hash + role + JD + engine version,
+    so repeats skip the LLM round-trip (see core/result_cache.py)
 """
 
 import asyncio
+import copy
 import os
 import re
 import json
@@ -32,7 +35,10 @@ from app.core.resilience import (
     guard_prompt_injection,
     wrap_resume_for_llm,
     GEMINI_TIMEOUT_SECONDS,
+    flight_key,
+    llm_flight,
 )
+from app.core.result_cache import get_analysis_cache, make_cache_key, text_hash, version_tag
 from app.services.ai_scoring_engine import AIScoringEngine
 from app.services.ai_parser_service import AIParserService
 from app.services.ai_skill_ontology import SkillOntology
@@ -104,7 +110,16 @@ def _call_gemini_sync(resume_text: str, job_description: str = None, target_role
     - Input sanitized & prompt-injection-guarded
     - Wrapped in structured delimiters so LLM treats resume as DATA
     - Job description also sanitized if provided
+    - Concurrent identical analyses share one Gemini call (single-flight)
     """
+    key = flight_key("gemini_ats", resume_text, job_description, target_role)
+    result = llm_flight.do_sync(
+        key, lambda: _gemini_analysis(resume_text, job_description, target_role),
+    )
+    return copy.deepcopy(result)
+
+
+def _gemini_analysis(resume_text: str, job_description: str = None, target_role: str = None) -> Dict[str, Any]:
     _t0 = time.perf_counter()
     from app.core.ai_model import AIModelManager
 
@@ -228,6 +243,29 @@ def _keyword_score_sync(resume_text: str, job_description: str = None, target_ro
     return out
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# RESULT CACHE
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Bump when scoring logic changes; the prompt text is hashed in automatically.
+_ENGINE_VERSION = version_tag(_ANALYSIS_PROMPT, "gemini-2.0-flash", "AIScoringEngine v2.0")
+
+# Keyword results served while Gemini is configured but failing are only kept
+# briefly, so a recovered Gemini takes over again soon.
+_FALLBACK_CACHE_TTL = 300
+
+
+def _analysis_cache_key(resume_text: str, job_description: str, target_role: str, engine: str) -> str:
+    return make_cache_key(
+        "ats",
+        resume_text,
+        role=target_role or "",
+        jd=text_hash(job_description),
+        engine=engine,
+        version=_ENGINE_VERSION,
+    )
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # PUBLIC SERVICE
 # ──────────────────────────────────────────────────────────────────────────────
@@ -267,6 +305,7 @@ class ATSScoringService:
         - Gemini call wrapped in 30s timeout
         - Automatic keyword fallback on timeout/error (offline mode)
         - target_role always honoured when specified
+        - Repeats of the same resume/role/JD served from the analysis cache
         """
         # ── Sanitize input first ─────────────────────────────────
         try:
@@ -286,6 +325,15 @@ class ATSScoringService:
         from app.core.ai_model import AIModelManager
         key = AIModelManager.configure_gemini()
 
+        cache = get_analysis_cache()
+        cache_key = _analysis_cache_key(
+            resume_text, job_description, target_role, "gemini" if key else "keyword",
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("Analysis cache hit: score=%.2f, role=%s", cached["ats_score"], cached["predicted_role"])
+            return cached
+
         if key:
             try:
                 # ── Gemini with timeout ──────────────────────────
@@ -302,6 +350,7 @@ class ATSScoringService:
                         "Gemini analysis done: score=%.2f, role=%s",
                         result['ats_score'], result['predicted_role'],
                     )
+                    cache.set(cache_key, result)
                     return result
             except (TimeoutError, Exception) as e:
                 logger.warning("Gemini analysis failed (%s), using keyword fallback", e)
@@ -314,4 +363,5 @@ class ATSScoringService:
         # Still honour the user's target role in fallback
         if target_role:
             result["predicted_role"] = target_role
+        cache.set(cache_key, result, ttl=_FALLBACK_CACHE_TTL if key else None)
         return result
@@ -12,7 +12,9 @@ Simulates ATS scoring patterns for:
 - Meta       (Move Fast, Impact at Scale, Technical Innovation)
 - Apple      (Attention to Detail, Passion, Privacy & Security)
 
-Uses unified AIProvider (Gemini → OpenAI → keyword fallback).
+Uses unified AIProvider (Gemini → OpenAI → keyword fallback).  The keyword
+fallback checks "missing X" red flags against the structured resume data
+shared with the builders (resume_structure_service), not the raw text.
 """
 
 import json
@@ -23,6 +25,14 @@ from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Red flags about something being absent — checked against the structured resume
+_ABSENCE_FLAGS = {
+    "no contact info": lambda d: not (d.get("email") or d.get("phone")),
+    "no certifications mentioned": lambda d: not d.get("certifications"),
+    "no academic details": lambda d: not d.get("education"),
+    "no education section": lambda d: not d.get("education"),
+}
+
 # Company ATS profiles — what each company's ATS system prioritizes
 COMPANY_PROFILES = {
     "google": {
@@ -162,8 +172,12 @@ class CompanyATSService:
         resume_text: str,
         company_id: str,
         target_role: str = "Software Engineer",
+        structure: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Score a resume against a specific company's ATS system."""
+        """
+        Score a resume against a specific company's ATS system.
+        `structure` is the resume's structured data, if the caller already has it.
+        """
         profile = COMPANY_PROFILES.get(company_id.lower())
         if not profile:
             return {"error": f"Unknown company: {company_id}"}
@@ -234,7 +248,9 @@ Return ONLY valid JSON:
             return result
 
         # Keyword fallback
-        return CompanyATSService._keyword_score(resume_text, profile, target_role)
+        if structure is None:
+            structure = await CompanyATSService._structure(resume_text)
+        return CompanyATSService._keyword_score(resume_text, profile, target_role, structure)
 
     @staticmethod
     async def score_all_companies(
@@ -246,9 +262,10 @@ Return ONLY valid JSON:
         if not companies:
             companies = ["google", "amazon", "microsoft", "tcs", "infosys"]
 
-        # Run all scoring tasks concurrently
+        # One structured extraction for every company's fallback; run all scoring tasks concurrently
+        structure = await CompanyATSService._structure(resume_text)
         tasks = [
-            CompanyATSService.score_for_company(resume_text, company, target_role)
+            CompanyATSService.score_for_company(resume_text, company, target_role, structure)
             for company in companies
         ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -291,13 +308,25 @@ Return ONLY valid JSON:
         ]
 
     @staticmethod
-    def _keyword_score(resume_text: str, profile: Dict, target_role: str) -> Dict[str, Any]:
+    async def _structure(resume_text: str) -> Dict[str, Any]:
+        """Cached structured resume (local rules only — never an extra LLM call for scoring)."""
+        from app.services.resume_structure_service import ResumeStructureService
+        return (await ResumeStructureService.extract(resume_text, allow_llm=False)).data
+
+    @staticmethod
+    def _keyword_score(
+        resume_text: str, profile: Dict, target_role: str, structure: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """Keyword-based fallback scoring when AI is unavailable."""
         text_lower = resume_text.lower()
 
         # Score based on keyword presence
         keyword_hits = [k for k in profile["critical_keywords"] if k.lower() in text_lower]
-        red_flags = [r for r in profile["red_flags"] if r.lower() in text_lower]
+        red_flags = [
+            r for r in profile["red_flags"]
+            if (structure is not None and r in _ABSENCE_FLAGS and _ABSENCE_FLAGS[r](structure))
+            or (r not in _ABSENCE_FLAGS and r.lower() in text_lower)
+        ]
         verb_hits = [v for v in profile["preferred_verbs"] if v.lower() in text_lower]
 
         # Base score calculation
@@ -1,35 +1,54 @@
 import logging
-import pdfplumber
 import docx
-from fastapi import UploadFile
-import io
 import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
 from app.services.ocr_service import OCRService
+from app.services.section_segmenter import segment_sections, is_current
 
 logger = logging.getLogger(__name__)
 
+
+class ExtractedDocument(NamedTuple):
+    text: str
+    headings: List[str]   # heading candidates from the layout (PDF font size/weight, DOCX styles)
+    layout: str           # "pdf", "docx" or "text" — where the headings came from
+
+
 class AIRawParser:
     @staticmethod
-    async def extract_text(file: UploadFile) -> str:
-        content = await file.read()
-        await file.seek(0) # Reset file pointer for subsequent reads
-        file_type = file.filename.split('.')[-1].lower()
+    async def extract_text_from_path(file_path: str, filename: str) -> str:
+        """
+        Extract text from an upload stored on disk.  Every parser opens the
+        path itself, so the document is never held in memory more than once.
+        """
+        return (await AIRawParser.extract_document(file_path, filename)).text
+
+    @staticmethod
+    async def extract_document(file_path: str, filename: str) -> ExtractedDocument:
+        """Same as extract_text_from_path, plus the layout's heading candidates for extract_sections."""
+        file_type = filename.split('.')[-1].lower()
         
         extracted_text = ""
+        headings: List[str] = []
+        layout = "text"
         
         try:
             if file_type == 'pdf':
                 # Use OCR Service which handles both text-based and scanned PDFs
-                extracted_text = await OCRService.extract_text_from_bytes(content, 'pdf')
+                extracted_text, headings = await OCRService.extract_pdf_document(file_path)
+                layout = "pdf"
                     
             elif file_type in ['docx', 'doc']:
                 try:
-                    doc = docx.Document(io.BytesIO(content))
+                    doc = docx.Document(file_path)
                     # Extract from both paragraphs AND tables (often used in resumes)
                     parts = []
                     for para in doc.paragraphs:
                         if para.text.strip():
                             parts.append(para.text)
+                            if AIRawParser._is_docx_heading(para):
+                                headings.append(para.text)
+                    layout = "docx"
                     
                     for table in doc.tables:
                         for row in table.rows:
@@ -44,9 +63,11 @@ class AIRawParser:
             
             elif file_type in ['jpg', 'jpeg', 'png']:
                 # New: Support for image-based resumes
-                extracted_text = await OCRService.extract_text_from_bytes(content, file_type)
+                extracted_text = await OCRService.extract_text_from_file(file_path, file_type)
 
             elif file_type == 'txt':
+                with open(file_path, 'rb') as f:
+                    content = f.read()
                 try:
                     extracted_text = content.decode('utf-8')
                 except UnicodeDecodeError:
@@ -58,56 +79,44 @@ class AIRawParser:
             if not extracted_text or not extracted_text.strip():
                 logger.warning(f"No text extracted from {file_type} file.")
                 # We return actual empty string so caller can handle as 400
-                return ""
+                return ExtractedDocument("", [], layout)
 
             # Basic cleanup: normalize spaces but preserve some structural newlines
             extracted_text = re.sub(r'[ \t]+', ' ', extracted_text)
             extracted_text = re.sub(r'\n{3,}', '\n\n', extracted_text).strip()
-            return extracted_text
+            return ExtractedDocument(extracted_text, headings, layout)
 
         except Exception as e:
-            logger.error(f"Parser Error for {file.filename}: {str(e)}")
+            logger.error(f"Parser Error for {filename}: {str(e)}")
             raise e
     
     @staticmethod
-    def extract_sections(text: str) -> dict:
+    def _is_docx_heading(para) -> bool:
+        """Heading / Title paragraph style, or a short paragraph set entirely in bold."""
+        style = (para.style.name if para.style is not None else "") or ""
+        if style.lower().startswith(("heading", "title")):
+            return True
+        runs = [r for r in para.runs if r.text.strip()]
+        return bool(runs) and len(para.text.split()) <= 6 and all(r.bold for r in runs)
+
+    @staticmethod
+    def extract_sections(
+        text: str,
+        heading_hints: Optional[Iterable[str]] = None,
+        layout: str = "text",
+    ) -> Dict[str, Any]:
         """
-        Heuristic-based section extraction.
+        Deterministic section segmentation with character offsets into `text`
+        (see section_segmenter.py); stored as Resume.parsed_data.
         """
-        sections = {
-            "contact_info": "",
-            "summary": "",
-            "experience": "",
-            "education": "",
-            "skills": "",
-            "projects": "",
-            "certifications": ""
-        }
-        
-        text_lower = text.lower()
-        
-        # Simple regex-based splitting (can be improved with ML/NER)
-        keywords = {
-            "experience": ["experience", "work history", "employment"],
-            "education": ["education", "academic", "qualifications"],
-            "skills": ["skills", "technologies", "competencies"],
-            "projects": ["projects", "personal projects"],
-            "certifications": ["certifications", "courses", "achievements"],
-            "summary": ["summary", "profile", "objective"]
-        }
-        
-        # This is a simplified extraction logic
-        # In a real-world scenario, you might use strict regex or layout analysis
-        
-        current_section = "contact_info"
-        lines = text.split('\n') # If we preserved newlines
-        
-        # If text was flattened, we can try to split by known headers
-        # For now, let's just return the full text in 'raw' and do
-        # basic keyword search for entire blocks if possible.
-        
-        # Robust implementation requires preserving layout or smart segmentation.
-        # Here we just return the raw text for NLP analysis as a single block for now,
-        # but structured data is better.
-        
-        return {"raw_text": text} # Placeholder for complex logic
+        return segment_sections(text, heading_hints, layout)
+
+    @staticmethod
+    def sections_for(resume) -> Dict[str, Any]:
+        """
+        A resume's stored sections; rows saved before segmentation (or by an
+        older segmenter) are segmented from their text on the fly.
+        """
+        if is_current(resume.parsed_data):
+            return resume.parsed_data
+        return segment_sections(resume.content_text or "")
@@ -1,5 +1,6 @@
 import google.generativeai as genai
 from app.core.config import settings
+from app.core.result_cache import get_analysis_cache, make_cache_key, version_tag
 import logging
 import json
 import re
@@ -10,6 +11,10 @@ from dotenv import dotenv_values
 
 logger = logging.getLogger(__name__)
 
+# Bump when the prediction prompt or the RAG fallback changes (invalidates cached predictions)
+_ENGINE_VERSION = "gemini-2.0-flash:predict-v1+rag-v3"
+_FALLBACK_CACHE_TTL = 300   # RAG results while Gemini is configured but failing
+
 _env_path = Path(__file__).resolve().parent.parent.parent / ".env"
 
 
@@ -66,6 +71,8 @@ class JobPredictionService:
         Predicts the most suitable job roles based on resume text.
         Uses Gemini for genuine AI-powered prediction.
         Falls back gracefully to keyword-based RAG if Gemini is unavailable.
+        Repeats of the same resume and label set are served from the analysis
+        cache without spending a Gemini credit.
         """
         _t0 = time.perf_counter()
         labels = candidate_labels or JobPredictionService.DEFAULT_ROLES
@@ -75,6 +82,20 @@ class JobPredictionService:
         from app.core.ai_model import AIModelManager
 
         key = AIModelManager.configure_gemini()
+
+        cache = get_analysis_cache()
+        cache_key = make_cache_key(
+            "predict",
+            resume_text or "",
+            labels=version_tag(*labels),
+            engine="gemini" if key else "rag",
+            version=_ENGINE_VERSION,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("Job prediction cache hit | roles=%s", [p.get("role") for p in cached])
+            return cached
+
         allowed, remaining = APICreditManager.check_and_use("gemini") if key else (False, 0)
         
         if key and allowed:
@@ -121,6 +142,7 @@ Return ONLY valid JSON array, no explanation:
                             "Gemini job prediction completed | roles=%s | latency=%.0fms",
                             [p['role'] for p in predictions], _elapsed_ms,
                         )
+                        cache.set(cache_key, predictions[:5])
                         return predictions[:5]
 
                 logger.warning(f"Gemini returned unparseable output: {response.text[:200]}")
@@ -133,6 +155,7 @@ Return ONLY valid JSON array, no explanation:
         result = JobPredictionService._rag_predict(resume_text)
         _elapsed_ms = (time.perf_counter() - _t0) * 1000
         logger.info("RAG fallback prediction completed | latency=%.0fms", _elapsed_ms)
+        cache.set(cache_key, result, ttl=_FALLBACK_CACHE_TTL if key else None)
         return result
 
     @staticmethod
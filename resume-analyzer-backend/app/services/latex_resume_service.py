@@ -10,15 +10,17 @@ Templates:
 4. Minimal ATS — Ultra-clean, maximum ATS compatibility
 5. Executive Impact — Bold headers, achievement-focused
 
-Uses AI to extract structured resume sections, then fills professional LaTeX templates.
+Fills professional LaTeX templates from the structured resume data shared with the
+HTML builder (resume_structure_service: local extraction, LLM only when unsure).
 """
 
-import re
 import json
 import logging
 import asyncio
 from typing import Dict, Any, Optional, List
 
+from app.services.resume_structure_service import ResumeStructureService
+
 logger = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────────────────────────
@@ -58,65 +60,6 @@ TEMPLATES = {
     },
 }
 
-# System prompt for AI resume structuring
-_STRUCTURE_PROMPT = """You are an expert resume parser. Extract the resume content into structured JSON sections.
-
-Return ONLY valid JSON with this exact structure:
-{
-  "name": "Full Name",
-  "email": "email@example.com",
-  "phone": "+1-XXX-XXX-XXXX",
-  "linkedin": "linkedin.com/in/username",
-  "github": "github.com/username",
-  "location": "City, State",
-  "summary": "2-3 sentence professional summary",
-  "education": [
-    {
-      "degree": "B.Tech in Computer Science",
-      "institution": "University Name",
-      "year": "2020-2024",
-      "gpa": "8.5/10"
-    }
-  ],
-  "experience": [
-    {
-      "title": "Software Engineer",
-      "company": "Company Name",
-      "duration": "Jan 2023 - Present",
-      "bullets": [
-        "Achievement bullet 1 with metrics",
-        "Achievement bullet 2"
-      ]
-    }
-  ],
-  "projects": [
-    {
-      "name": "Project Name",
-      "tech": "React, Node.js, MongoDB",
-      "bullets": [
-        "What the project does",
-        "Key technical achievement"
-      ]
-    }
-  ],
-  "skills": {
-    "languages": ["Python", "Java", "JavaScript"],
-    "frameworks": ["React", "FastAPI", "Spring Boot"],
-    "tools": ["Docker", "Git", "AWS"],
-    "databases": ["PostgreSQL", "MongoDB"]
-  },
-  "certifications": ["AWS Certified Developer", "Google Cloud Associate"],
-  "achievements": ["Hackathon winner", "Published paper"]
-}
-
-RULES:
-- Extract ONLY information that actually exists in the resume
-- Do NOT invent any information
-- If a section is empty, use empty array [] or empty string ""
-- Keep bullet points concise and impactful
-- Preserve all technical terms exactly as written"""
-
-
 def _escape_latex(text: str) -> str:
     """Escape special LaTeX characters."""
     if not text:
@@ -451,11 +394,13 @@ class LaTeXResumeService:
         resume_text: str,
         template_id: str = "classic",
         target_role: str = "Software Engineer",
+        sections: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Generate professional LaTeX resume code.
+        `sections` is the stored segmentation of `resume_text` (Resume.parsed_data), if any.
 
-        1. AI extracts structured data from resume text
+        1. Structured data from the resume text (cached per content hash)
         2. Fills the selected LaTeX template
         3. Returns complete compilable LaTeX code
         """
@@ -464,8 +409,9 @@ class LaTeXResumeService:
 
         template_info = TEMPLATES[template_id]
 
-        # Step 1: Extract structured data using AI
-        structured_data = await LaTeXResumeService._extract_structure(resume_text, target_role)
+        # Step 1: Structured data — local rules, the LLM only for low-confidence parses
+        extraction = await ResumeStructureService.extract(resume_text, sections)
+        structured_data = extraction.data
 
         if not structured_data:
             return {
@@ -486,6 +432,7 @@ class LaTeXResumeService:
                 "description": template_info["description"],
             },
             "extracted_sections": list(structured_data.keys()),
+            "structure_source": extraction.source,
             "instructions": (
                 "📋 How to use:\n"
                 "1. Go to overleaf.com and create a new project\n"
@@ -526,63 +473,6 @@ class LaTeXResumeService:
 
         return result
 
-    @staticmethod
-    async def _extract_structure(resume_text: str, target_role: str) -> Optional[Dict]:
-        """Extract structured resume data using AI."""
-        from app.core.ai_provider import AIProvider
-
-        prompt = f"""Parse this resume text into structured JSON sections.
-Target Role: {target_role}
-
-RESUME TEXT:
-{resume_text[:5000]}
-
-{_STRUCTURE_PROMPT}"""
-
-        result = await AIProvider.generate_json(
-            prompt=prompt,
-            system_prompt="You are an expert resume parser. Extract resume content into structured JSON. Be accurate — do not invent information.",
-            max_tokens=1500,
-            temperature=0.2,
-            timeout=45,
-        )
-
-        if result and result.get("name"):
-            return result
-
-        # Fallback: basic text parsing
-        return LaTeXResumeService._basic_parse(resume_text)
-
-    @staticmethod
-    def _basic_parse(text: str) -> Dict:
-        """Basic regex-based resume parsing fallback."""
-        lines = text.strip().split("\n")
-        name = lines[0].strip() if lines else "Your Name"
-
-        # Try to find email
-        email_match = re.search(r'[\w.-]+@[\w.-]+\.\w+', text)
-        email = email_match.group() if email_match else ""
-
-        # Try to find phone
-        phone_match = re.search(r'[\+]?[\d\s\-().]{10,}', text)
-        phone = phone_match.group().strip() if phone_match else ""
-
-        return {
-            "name": name,
-            "email": email,
-            "phone": phone,
-            "linkedin": "",
-            "github": "",
-            "location": "",
-            "summary": "",
-            "education": [],
-            "experience": [],
-            "projects": [],
-            "skills": {"languages": [], "frameworks": [], "tools": []},
-            "certifications": [],
-            "achievements": [],
-        }
-
     @staticmethod
     def get_templates() -> List[Dict[str, str]]:
         """Return available template information."""
@@ -16,7 +16,7 @@ import logging
 import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Tuple
 
 _env_path = Path(__file__).resolve().parent.parent.parent / ".env"
 load_dotenv(dotenv_path=_env_path, override=True)
@@ -58,23 +58,13 @@ class MentorService:
         if resume_context and len(resume_context) > 10000:
             resume_context = resume_context[:10000]
 
-        context_block = (
-            f"**Resume Context (first 2000 chars):**\n{resume_context[:2000]}\n\n"
-            if resume_context else ""
-        )
-        full_query = f"{context_block}**Student Query:** {user_question}"
+        full_query = MentorService._full_query(user_question, resume_context)
 
         # ── Try AI with chat history ──────────────────────────────
         try:
             if chat_history and len(chat_history) > 0:
                 # Use conversational chat with history
-                messages = []
-                for msg in chat_history[-8:]:  # Last 8 messages for context
-                    messages.append({
-                        "role": msg.get("role", "user"),
-                        "content": msg.get("content", "")
-                    })
-                messages.append({"role": "user", "content": full_query})
+                messages = MentorService._chat_messages(chat_history, full_query)
 
                 result = await AIProvider.chat(
                     messages=messages,
@@ -103,6 +93,70 @@ class MentorService:
         logger.info("Using smart mock advice fallback")
         return MentorService._smart_mock_advice(user_question, resume_context)
 
+    @staticmethod
+    async def get_advice_stream(
+        user_question: str,
+        resume_context: str = None,
+        chat_history: List[Dict[str, str]] = None,
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Streaming `get_advice` for SSE: yields ("token", text) deltas as the
+        provider produces them, or one ("fallback", text) with the smart mock.
+        """
+        from app.core.ai_provider import AIProvider
+
+        if resume_context and len(resume_context) > 10000:
+            resume_context = resume_context[:10000]
+        full_query = MentorService._full_query(user_question, resume_context)
+
+        if chat_history:
+            deltas = AIProvider.chat_stream(
+                messages=MentorService._chat_messages(chat_history, full_query),
+                system_prompt=_SYSTEM_PROMPT,
+                max_tokens=800,
+                temperature=0.7,
+                timeout=45,
+            )
+        else:
+            deltas = AIProvider.generate_stream(
+                prompt=full_query,
+                system_prompt=_SYSTEM_PROMPT,
+                max_tokens=800,
+                temperature=0.7,
+                timeout=45,
+            )
+
+        sent = False
+        try:
+            async for delta in deltas:
+                sent = True
+                yield "token", delta
+        except Exception as e:
+            logger.error(f"AIProvider mentor stream failed: {e}")
+
+        if not sent:
+            logger.info("Using smart mock advice fallback (stream)")
+            yield "fallback", MentorService._smart_mock_advice(user_question, resume_context)
+
+    @staticmethod
+    def _full_query(user_question: str, resume_context: str = None) -> str:
+        context_block = (
+            f"**Resume Context (first 2000 chars):**\n{resume_context[:2000]}\n\n"
+            if resume_context else ""
+        )
+        return f"{context_block}**Student Query:** {user_question}"
+
+    @staticmethod
+    def _chat_messages(chat_history: List[Dict[str, str]], full_query: str) -> List[Dict[str, str]]:
+        messages = []
+        for msg in chat_history[-8:]:  # Last 8 messages for context
+            messages.append({
+                "role": msg.get("role", "user"),
+                "content": msg.get("content", "")
+            })
+        messages.append({"role": "user", "content": full_query})
+        return messages
+
     @staticmethod
     def _smart_mock_advice(question: str, context: str = None) -> str:
         """High-quality mock advice when no AI provider is available."""
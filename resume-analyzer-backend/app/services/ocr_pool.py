@@ -0,0 +1,236 @@
+"""Bounded OCR Worker Pool
+=======================
+Runs OCR jobs (one page or one image each) in a fixed-size process pool so
+Tesseract and the blocking Sarvam call never touch the event loop:
+
+  - OCR_WORKERS processes; at most that many jobs are handed to the pool at
+    once, the rest wait in an in-loop queue
+  - The queue is bounded: a batch that would push pending jobs past
+    OCR_WORKERS + OCR_QUEUE_SIZE is rejected up front with OCRQueueFull
+    (the API turns it into 429 + Retry-After)
+  - Each job gets OCR_JOB_TIMEOUT_SECONDS once it starts running; waiting
+    callers stop waiting when it expires, and the job itself is passed the
+    same budget so Tesseract / Sarvam give up too
+  - A cancelled request (client went away) cancels its jobs that have not
+    started yet
+  - Queue depth, wait and run latency are reported at /healthz
+
+Usage:
+    text = await get_ocr_pool().run(job_fn, *args)
+    async for i, text in get_ocr_pool().run_many(job_fn, [args0, args1, ...]):
+        ...   # (position in the batch, result or None if that job failed)
+"""
+
+import math
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_EWMA_ALPHA = 0.2
+_MAX_RETRY_AFTER_SECONDS = 120
+
+
+class OCRQueueFull(Exception):
+    """OCR queue is at capacity; `retry_after` is a rough wait in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"OCR queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class OCRJobTimeout(Exception):
+    """An OCR job ran longer than OCR_JOB_TIMEOUT_SECONDS."""
+
+
+class OCRJobPool:
+    def __init__(self, workers: int, queue_size: int, job_timeout: float):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.job_timeout = job_timeout
+        self.pending = 0          # admitted jobs not yet finished (queued + running)
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.avg_wait = 0.0
+        self.avg_run = job_timeout / 10
+        self.max_run = 0.0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ── executor / slots ──
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # spawn: forking a threaded uvicorn worker is unsafe, and Windows only has spawn
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    logger.info(
+                        "✅ OCR pool ready | workers=%d | capacity=%d | job_timeout=%ss",
+                        self.workers, self.capacity, self.job_timeout,
+                    )
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._loop = loop
+        return self._slots
+
+    # ── admission ──
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained."""
+        estimate = math.ceil(self.pending / self.workers * self.avg_run)
+        return max(1, min(estimate, _MAX_RETRY_AFTER_SECONDS))
+
+    def is_full(self) -> bool:
+        return self.pending >= self.capacity
+
+    def _admit(self, n_jobs: int) -> None:
+        # A batch larger than the whole queue is still let in when the pool is idle
+        if self.pending and self.pending + n_jobs > self.capacity:
+            self.rejected += 1
+            retry_after = self.retry_after()
+            logger.warning(
+                "OCR queue full (%d pending, capacity %d) — rejecting %d job(s), retry in %ss",
+                self.pending, self.capacity, n_jobs, retry_after,
+            )
+            raise OCRQueueFull(retry_after)
+        self.pending += n_jobs
+        self.submitted += n_jobs
+
+    # ── execution ──
+
+    async def _execute(self, fn: Callable, args: Sequence[Any]) -> Any:
+        """Run one admitted job; always releases its admission slot."""
+        enqueued = time.monotonic()
+        try:
+            async with self._get_slots():
+                started = time.monotonic()
+                self.avg_wait += _EWMA_ALPHA * ((started - enqueued) - self.avg_wait)
+                self.running += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    future = loop.run_in_executor(self._get_executor(), fn, *args)
+                    result = await asyncio.wait_for(future, self.job_timeout)
+                except asyncio.TimeoutError:
+                    self.timed_out += 1
+                    raise OCRJobTimeout(f"OCR job exceeded {self.job_timeout}s")
+                except BrokenProcessPool:
+                    self.failed += 1
+                    logger.error("OCR pool died (worker crashed) — rebuilding it")
+                    self._reset_executor()
+                    raise
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.running -= 1
+            elapsed = time.monotonic() - started
+            self.avg_run += _EWMA_ALPHA * (elapsed - self.avg_run)
+            self.max_run = max(self.max_run, elapsed)
+            self.completed += 1
+            return result
+        except asyncio.CancelledError:
+            # Queued jobs never reach the pool; a running one finishes in its worker
+            self.cancelled += 1
+            raise
+        finally:
+            self.pending -= 1
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Run a single job and return its result (raises OCRQueueFull / OCRJobTimeout)."""
+        self._admit(1)
+        return await self._execute(fn, args)
+
+    async def run_many(self, fn: Callable, jobs: List[Sequence[Any]]) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Admit the whole batch (or raise OCRQueueFull), then yield
+        (index, result) as jobs finish.  A failed or timed-out job yields
+        (index, None); the rest of the batch carries on.
+        """
+        if not jobs:
+            return
+        self._admit(len(jobs))
+        tasks = {asyncio.ensure_future(self._execute(fn, args)): i for i, args in enumerate(jobs)}
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error("OCR job %d failed: %s", index, e)
+                        result = None
+                    yield index, result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "pending": self.pending,
+            "running": self.running,
+            "queued": max(0, self.pending - self.running),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.avg_wait * 1000, 1),
+            "avg_run_ms": round(self.avg_run * 1000, 1),
+            "max_run_ms": round(self.max_run * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        self._reset_executor()
+
+
+_pool: Optional[OCRJobPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> OCRJobPool:
+    """Process-wide OCR pool, built from settings on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = OCRJobPool(settings.OCR_WORKERS, settings.OCR_QUEUE_SIZE, settings.OCR_JOB_TIMEOUT_SECONDS)
+    return _pool
+
+
+def shutdown_ocr_pool() -> None:
+    """Stop the OCR worker processes (app shutdown)."""
+    if _pool is not None:
+        _pool.shutdown()
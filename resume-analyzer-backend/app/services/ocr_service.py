@@ -1,11 +1,14 @@
 import os
+import math
+import tempfile
 import requests
-import pdfplumber
 import pytesseract
-from PIL import Image
 import io
 from pdf2image import convert_from_bytes
+from typing import AsyncIterator, Dict, List, Tuple
 from app.core.config import settings
+from app.services.pdf_page_extractor import extract_pdf_pages, page_count
+from app.services.ocr_pool import OCRJobTimeout, get_ocr_pool
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,7 +22,7 @@ SARVAM_OCR_URL = "https://api.sarvam.ai/v1/vision/ocr"
 
 class OCRService:
     @staticmethod
-    async def extract_text_from_bytes(content: bytes, file_type: str) -> str:
+    async def extract_text_from_file(file_path: str, file_type: str) -> str:
         """
         Phoenix Upgrade: High-Fidelity Multi-Stage Extraction
         1. Native PDF Extraction (Fastest)
@@ -27,112 +30,193 @@ class OCRService:
         3. Tesseract Fallback (Local)
         """
         if file_type == 'pdf':
-            return await OCRService._process_pdf(content)
+            return await OCRService._process_pdf(file_path)
         elif file_type in ['jpg', 'jpeg', 'png']:
-            return await OCRService._process_image_bytes(content)
+            return await OCRService._process_image_file(file_path)
         return ""
 
     @staticmethod
-    async def _process_pdf(content: bytes) -> str:
-        """Extract text from PDF, fallback to OCR if scanned or complex."""
-        text = ""
+    async def _process_pdf(file_path: str) -> str:
+        text, _ = await OCRService.extract_pdf_document(file_path)
+        return text
+
+    @staticmethod
+    async def extract_pdf_document(file_path: str) -> Tuple[str, List[str]]:
+        """
+        Extract text from PDF page by page (off the event loop); only pages
+        without a usable text layer are rasterised and OCR'd.  Also returns
+        the heading candidates found in the layout of the text pages.
+        """
         try:
-            # Stage 1: Primary Extraction (pdfplumber)
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            # Stage 2: Secondary Fallback (pypdf) if primary is weak/empty
-            if len(text.strip()) < 50:
-                try:
-                    from pypdf import PdfReader
-                    reader = PdfReader(io.BytesIO(content))
-                    fallback_text = ""
-                    for page in reader.pages:
-                        fallback_text += page.extract_text() or ""
-                    if len(fallback_text.strip()) > len(text.strip()):
-                        text = fallback_text
-                except Exception:
-                    pass
-
-            # Stage 3: OCR Detection
-            # Heuristic: If text is very short but pages exist, it's likely scanned
-            if len(text.strip()) < 50:
-                logger.info("Scanned PDF detected. Triggering High-Fidelity OCR Pipeline...")
-                return await OCRService._ocr_scanned_pdf(content)
-            
-            return text
+            pages = await extract_pdf_pages(file_path)
         except Exception as e:
             logger.error(f"Native PDF parsing failed: {e}. Falling back to Vision.")
-            return await OCRService._ocr_scanned_pdf(content)
+            return await OCRService._ocr_scanned_pdf(file_path), []
+
+        scanned = [p.index for p in pages if p.needs_ocr]
+        ocr_text: Dict[int, str] = {}
+        if scanned:
+            logger.info(
+                f"{len(scanned)} of {len(pages)} PDF pages have no text layer. "
+                "Triggering High-Fidelity OCR Pipeline for those pages..."
+            )
+            ocr_text = await OCRService._ocr_pdf_pages(file_path, scanned)
+
+        parts = []
+        headings: List[str] = []
+        for page in pages:
+            text = ocr_text.get(page.index) or page.text
+            if text and text.strip():
+                parts.append(text)
+            if page.index not in ocr_text:
+                headings.extend(page.headings)
+        return "\n".join(parts), headings
 
     @staticmethod
-    async def _ocr_scanned_pdf(content: bytes) -> str:
-        """High-Fidelity: Convert PDF pages to images using pypdfium2 (No Poppler needed) and run OCR."""
+    async def _ocr_scanned_pdf(file_path: str) -> str:
+        """OCR every page (bounded by PDF_MAX_PAGES) — used when the PDF can't be parsed natively."""
         try:
-            import pypdfium2 as pdfium
-            pdf = pdfium.PdfDocument(content)
-            full_text = ""
-            
-            for page in pdf:
-                # Render page to a PIL image
-                # 300 DPI for high-quality OCR
-                bitmap = page.render(scale=4) # scale=4 is approx 288 DPI
-                img = bitmap.to_pil()
-                
-                img_byte_arr = io.BytesIO()
-                img.save(img_byte_arr, format='PNG')
-                img_bytes = img_byte_arr.getvalue()
-                
-                # Process with AI Vision or Tesseract
-                page_text = await OCRService._process_image_bytes(img_bytes)
-                full_text += page_text + "\n"
-                
-                bitmap.close()
-            pdf.close()
-            return full_text
+            n_pages = min(page_count(file_path), settings.PDF_MAX_PAGES)
         except Exception as e:
             logger.error(f"pypdfium2 OCR Pipeline Error: {e}")
             return ""
+        texts = await OCRService._ocr_pdf_pages(file_path, list(range(n_pages)))
+        return "\n".join(texts[i] for i in sorted(texts))
+
+    @staticmethod
+    async def _ocr_pdf_pages(file_path: str, page_indices: List[int]) -> Dict[int, str]:
+        """OCR the given PDF pages; {page index: text}."""
+        results: Dict[int, str] = {}
+        async for index, text in OCRService.iter_ocr_pages(file_path, page_indices):
+            results[index] = text
+        return results
+
+    @staticmethod
+    async def iter_ocr_pages(file_path: str, page_indices: List[int]) -> AsyncIterator[Tuple[int, str]]:
+        """
+        High-Fidelity: OCR the given pages on the bounded OCR pool and yield
+        (page index, text) as each page finishes (not necessarily in order).
+
+        Raises OCRQueueFull before any work starts if the pool is saturated.
+        """
+        if not page_indices:
+            return
+        # Workers open the stored PDF by path — nothing is copied into them
+        jobs = [(file_path, index, settings.OCR_JOB_TIMEOUT_SECONDS) for index in page_indices]
+        async for i, text in get_ocr_pool().run_many(ocr_pdf_page_job, jobs):
+            yield page_indices[i], text or ""
+
+    @staticmethod
+    async def _process_image_file(file_path: str) -> str:
+        """Send image to Sarvam AI (Akshar Vision) or Tesseract on the OCR pool."""
+        try:
+            return await get_ocr_pool().run(ocr_image_job, file_path, settings.OCR_JOB_TIMEOUT_SECONDS)
+        except OCRJobTimeout as e:
+            logger.error(f"Image OCR timed out: {e}")
+            return ""
 
     @staticmethod
-    async def _process_image_bytes(img_bytes: bytes) -> str:
-        """Send image to Sarvam AI (Akshar Vision) for high-accuracy extraction."""
-        if not SARVAM_API_KEY:
-            return OCRService._tesseract_fallback_bytes(img_bytes)
+    def _ocr_bitmap(bitmap, timeout: float) -> str:
+        """Sarvam Vision on a grayscale PNG of the page when configured, else Tesseract on the raw bitmap."""
+        if SARVAM_API_KEY:
+            png = io.BytesIO()
+            bitmap.to_pil().save(png, format='PNG')   # to_pil() wraps the buffer, no copy
+            extracted = OCRService._sarvam_ocr(png.getvalue(), timeout)
+            if extracted:
+                return extracted
+        return OCRService._tesseract_bitmap(bitmap, timeout)
 
+    @staticmethod
+    def _sarvam_ocr(img_bytes: bytes, timeout: float = 45) -> str:
+        """Sarvam Vision OCR; '' on any failure so the caller falls back to Tesseract."""
         try:
             # Akshar Vision handles complex Indian/English layouts perfectly
             files = {"file": ("image.png", img_bytes, "image/png")}
             headers = {"api-subscription-key": SARVAM_API_KEY}
-            
+
             # Using higher timeout for vision tasks
-            response = requests.post(SARVAM_OCR_URL, files=files, headers=headers, timeout=45)
-            
+            response = requests.post(SARVAM_OCR_URL, files=files, headers=headers, timeout=min(45, timeout))
+
             if response.status_code == 200:
                 data = response.json()
                 extracted = data.get("text", "")
                 if extracted.strip():
                     return extracted
-                
+
             logger.warning(f"Sarvam Vision failed ({response.status_code}). Trying Tesseract.")
-            return OCRService._tesseract_fallback_bytes(img_bytes)
-            
         except Exception as e:
             logger.error(f"Vision API Exception: {e}")
-            return OCRService._tesseract_fallback_bytes(img_bytes)
+        return ""
 
     @staticmethod
-    def _tesseract_fallback_bytes(img_bytes: bytes) -> str:
-        """Local fallback ensures project works even without internet/API credits."""
+    def _tesseract_bitmap(bitmap, timeout: float = 0) -> str:
+        """Write the grayscale page buffer as a binary PGM (header + raw rows) and OCR it."""
+        width, height, stride = bitmap.width, bitmap.height, bitmap.stride
+        rows = memoryview(bitmap.buffer).cast("B")
+        with tempfile.NamedTemporaryFile(prefix="ocr_", suffix=".pgm", delete=False) as f:
+            f.write(b"P5 %d %d 255\n" % (width, height))
+            if stride == width:
+                f.write(rows)
+            else:
+                for y in range(height):
+                    f.write(rows[y * stride:y * stride + width])
+        try:
+            return OCRService._tesseract_file(f.name, timeout)
+        finally:
+            try:
+                os.remove(f.name)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _tesseract_file(path: str, timeout: float = 0) -> str:
+        """
+        Local fallback ensures project works even without internet/API credits.
+        Tesseract reads the file itself (PGM page bitmaps, JPEG / PNG uploads).
+        """
         try:
-            img = Image.open(io.BytesIO(img_bytes))
             # Use --oem 1 --psm 3 for best general accuracy
             custom_config = r'--oem 3 --psm 6'
-            return pytesseract.image_to_string(img, config=custom_config)
+            # timeout kills the tesseract process, freeing the pool worker
+            return pytesseract.image_to_string(path, config=custom_config, timeout=timeout)
         except Exception as e:
             logger.error(f"Local OCR Critical Failure: {e}")
             return ""
 
+
+# ─── OCR POOL JOBS ───────────────────────────────────────────────────────────
+# Run inside the OCR worker processes (module-level so they pickle).
+
+def ocr_pdf_page_job(pdf_path: str, index: int, timeout: float) -> str:
+    """Render one page straight to 8-bit grayscale at an adaptive DPI and OCR it."""
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        page = pdf[index]
+        bitmap = page.render(scale=_render_scale(*page.get_size()), grayscale=True)
+        try:
+            return OCRService._ocr_bitmap(bitmap, timeout)
+        finally:
+            bitmap.close()
+            page.close()
+    finally:
+        pdf.close()
+
+
+def ocr_image_job(img_path: str, timeout: float) -> str:
+    if SARVAM_API_KEY:
+        with open(img_path, "rb") as f:
+            extracted = OCRService._sarvam_ocr(f.read(), timeout)
+        if extracted:
+            return extracted
+    return OCRService._tesseract_file(img_path, timeout)
+
+
+def _render_scale(width_pt: float, height_pt: float) -> float:
+    """
+    Render scale for OCR: OCR_TARGET_DPI, lowered for oversized pages so the
+    bitmap stays under OCR_MAX_PAGE_PIXELS (1 byte per pixel in grayscale).
+    """
+    scale = settings.OCR_TARGET_DPI / 72
+    area = max(width_pt * height_pt, 1.0)
+    return min(scale, math.sqrt(settings.OCR_MAX_PAGE_PIXELS / area))
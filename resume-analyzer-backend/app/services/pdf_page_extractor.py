@@ -0,0 +1,219 @@
+"""Page-Parallel PDF Text Extraction
+=================================
+Pulls the text layer out of an uploaded PDF without blocking the event loop:
+
+  - The document is split into page ranges and each range is parsed in a
+    worker process (pdfplumber, pypdfium2 text layer as per-page fallback)
+  - Every page is classified on its own: a page whose text layer is shorter
+    than PDF_PAGE_MIN_CHARS is flagged for OCR; the rest are never rasterised
+  - Lines set noticeably larger than the page's body text, or in bold when
+    the body is not, are reported as heading candidates for the section
+    segmenter (section_segmenter.py)
+  - At most PDF_MAX_PAGES pages are read; anything after that is ignored
+  - Small documents (one range) are parsed in a thread instead — spawning
+    IPC for a single-page CV costs more than it saves
+  - Workers get the stored file's path, not the bytes: each opens (and the
+    OS page cache shares) the one copy on disk
+
+Usage:
+    pages = await extract_pdf_pages(file_path)
+    scanned = [p.index for p in pages if p.needs_ocr]
+"""
+
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_HEADING_SIZE_RATIO = 1.15
+_HEADING_MAX_WORDS = 6
+_LINE_TOLERANCE = 2   # points; words this close vertically share a line
+
+
+class PageText(NamedTuple):
+    index: int          # 0-based page number
+    text: str           # text layer ('' when the page has none)
+    needs_ocr: bool     # text layer too thin — rasterise and OCR this page
+    headings: Tuple[str, ...] = ()   # lines that look like headings by font size / weight
+
+
+# ─── WORKER SIDE ─────────────────────────────────────────────────────────────
+# Module-level functions so they pickle into the spawned pool processes.
+
+def _extract_range(pdf_path: str, start: int, stop: int, min_chars: int) -> List[PageText]:
+    """Parse pages [start, stop) once per worker and classify each of them."""
+    import pdfplumber
+
+    results: List[PageText] = []
+    pdfium_doc = None
+    try:
+        with pdfplumber.open(pdf_path, pages=list(range(start + 1, stop + 1))) as pdf:
+            for offset, page in enumerate(pdf.pages):
+                index = start + offset
+                try:
+                    text = page.extract_text() or ""
+                except Exception:
+                    text = ""
+                headings = _layout_headings(page) if text.strip() else ()
+                if len(text.strip()) < min_chars:
+                    # pdfplumber can miss text that pdfium reads (odd encodings / CID fonts)
+                    if pdfium_doc is None:
+                        import pypdfium2 as pdfium
+                        pdfium_doc = pdfium.PdfDocument(pdf_path)
+                    alt = _pdfium_page_text(pdfium_doc, index)
+                    if len(alt.strip()) > len(text.strip()):
+                        text = alt
+                results.append(PageText(index, text, len(text.strip()) < min_chars, headings))
+    finally:
+        if pdfium_doc is not None:
+            pdfium_doc.close()
+    return results
+
+
+def _layout_headings(page) -> Tuple[str, ...]:
+    """
+    Short lines whose font is >= _HEADING_SIZE_RATIO x the page's body size,
+    or bold while most body text is not.  Reuses the chars pdfplumber
+    already parsed for extract_text().
+    """
+    try:
+        words = page.extract_words(extra_attrs=["size", "fontname"])
+    except Exception:
+        return ()
+    if not words:
+        return ()
+
+    sizes = sorted(round(w["size"], 1) for w in words for _ in w["text"])
+    body_size = sizes[len(sizes) // 2]   # median, weighted by characters
+    bold_chars = sum(len(w["text"]) for w in words if _is_bold(w["fontname"]))
+    body_is_bold = bold_chars > len(sizes) / 2
+
+    lines: List[List[dict]] = []
+    for word in sorted(words, key=lambda w: (round(w["top"]), w["x0"])):
+        if lines and abs(lines[-1][0]["top"] - word["top"]) <= _LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+
+    headings = []
+    for line in lines:
+        if len(line) > _HEADING_MAX_WORDS:
+            continue
+        larger = min(w["size"] for w in line) >= body_size * _HEADING_SIZE_RATIO
+        bold = not body_is_bold and all(_is_bold(w["fontname"]) for w in line)
+        if larger or bold:
+            headings.append(" ".join(w["text"] for w in sorted(line, key=lambda w: w["x0"])))
+    return tuple(headings)
+
+
+def _is_bold(fontname: str) -> bool:
+    name = fontname.lower()
+    return any(weight in name for weight in ("bold", "black", "heavy", "semibold"))
+
+
+def _pdfium_page_text(doc, index: int) -> str:
+    try:
+        page = doc[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_bounded() or ""
+        finally:
+            textpage.close()
+            page.close()
+    except Exception:
+        return ""
+
+
+# ─── POOL ────────────────────────────────────────────────────────────────────
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a threaded uvicorn worker is unsafe, and Windows only has spawn
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.PDF_EXTRACT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info("✅ PDF extraction pool ready | workers=%d", settings.PDF_EXTRACT_WORKERS)
+    return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the worker processes (app shutdown)."""
+    _reset_pool()
+
+
+# ─── ENTRY POINT ─────────────────────────────────────────────────────────────
+
+def page_count(pdf_path: str) -> int:
+    import pypdfium2 as pdfium
+    doc = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def _page_ranges(n_pages: int, workers: int, min_per_task: int) -> List[Tuple[int, int]]:
+    """Split [0, n_pages) into at most `workers` contiguous ranges of >= min_per_task pages."""
+    tasks = max(1, min(workers, n_pages // max(1, min_per_task)))
+    size, extra = divmod(n_pages, tasks)
+    ranges, start = [], 0
+    for i in range(tasks):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+async def extract_pdf_pages(pdf_path: str) -> List[PageText]:
+    """
+    Text layer of every page (up to PDF_MAX_PAGES), in page order.
+    Raises if the document cannot be opened at all.
+    """
+    total = await asyncio.to_thread(page_count, pdf_path)
+    n_pages = min(total, settings.PDF_MAX_PAGES)
+    if total > n_pages:
+        logger.warning("PDF has %d pages — extracting the first %d only", total, n_pages)
+    if n_pages == 0:
+        return []
+
+    min_chars = settings.PDF_PAGE_MIN_CHARS
+    ranges = _page_ranges(n_pages, settings.PDF_EXTRACT_WORKERS, settings.PDF_PAGES_PER_TASK)
+
+    if len(ranges) == 1:
+        return await asyncio.to_thread(_extract_range, pdf_path, 0, n_pages, min_chars)
+
+    loop = asyncio.get_running_loop()
+    try:
+        pool = _get_pool()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, _extract_range, pdf_path, start, stop, min_chars)
+            for start, stop in ranges
+        ))
+    except BrokenProcessPool:
+        logger.error("PDF extraction pool died — rebuilding it and parsing in-thread this time")
+        _reset_pool()
+        return await asyncio.to_thread(_extract_range, pdf_path, 0, n_pages, min_chars)
+    return [page for chunk in chunks for page in chunk]
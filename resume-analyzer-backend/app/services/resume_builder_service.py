@@ -13,13 +13,14 @@ Generates:
   Classic Professional | Modern Tech | Academic | Minimal ATS | Executive
 """
 
-import re
 import json
 import html
 import logging
 import asyncio
 from typing import Dict, Any, Optional, List
 
+from app.services.resume_structure_service import ResumeStructureService
+
 logger = logging.getLogger(__name__)
 
 TEMPLATES = {
@@ -30,17 +31,6 @@ TEMPLATES = {
     "executive": {"name": "Executive Impact", "description": "Bold headers with achievement focus for leadership roles.", "preview_color": "#e74c3c", "icon": "👔"},
 }
 
-_STRUCTURE_PROMPT = """You are an expert resume parser. Extract the resume content into structured JSON.
-Return ONLY valid JSON:
-{"name":"Full Name","email":"email","phone":"phone","linkedin":"","github":"","location":"","summary":"2-3 sentence summary",
-"education":[{"degree":"","institution":"","year":"","gpa":""}],
-"experience":[{"title":"","company":"","duration":"","bullets":["achievement with metrics"]}],
-"projects":[{"name":"","tech":"React, Node.js","bullets":["what it does"]}],
-"skills":{"languages":["Python"],"frameworks":["React"],"tools":["Docker"],"databases":["PostgreSQL"]},
-"certifications":["cert name"],"achievements":["achievement"]}
-RULES: Extract ONLY real info. Do NOT invent anything. Empty = [] or ""."""
-
-
 def _h(text):
     return html.escape(str(text)) if text else ""
 
@@ -244,13 +234,14 @@ class ResumeBuilderService:
     """Self-contained resume builder — NO external dependencies."""
 
     @staticmethod
-    async def build_resume(resume_text, template_id="classic", target_role="Software Engineer"):
+    async def build_resume(resume_text, template_id="classic", target_role="Software Engineer", sections=None):
         if template_id not in TEMPLATES: template_id = "classic"
         template_info = TEMPLATES[template_id]
-        structured = await ResumeBuilderService._extract_structure(resume_text, target_role)
+        extraction = await ResumeStructureService.extract(resume_text, sections)
+        structured = extraction.data
         if not structured: return {"success": False, "error": "Could not parse resume structure."}
         builder = _HTML_BUILDERS.get(template_id, _build_classic_html)
-        return {"success": True, "resume_html": builder(structured), "structured_data": structured, "template": {"id": template_id, "name": template_info["name"], "description": template_info["description"]}}
+        return {"success": True, "resume_html": builder(structured), "structured_data": structured, "structure_source": extraction.source, "template": {"id": template_id, "name": template_info["name"], "description": template_info["description"]}}
 
     @staticmethod
     async def generate_interview_questions(resume_text, target_role="Software Engineer"):
@@ -280,22 +271,6 @@ Be realistic: freshers 30-60, mid 55-80, senior 70-95."""
         if result and "dimensions" in result: return {"success": True, **result}
         return {"success":True,"dimensions":{"Technical Skills":60,"Experience Depth":45,"Impact & Metrics":40,"Education":65,"Projects & Portfolio":55,"Communication & Clarity":50},"overall_score":52,"strongest":"Education","weakest":"Impact & Metrics","one_line_verdict":"Solid foundation. Improve impact quantification."}
 
-    @staticmethod
-    async def _extract_structure(resume_text, target_role):
-        from app.core.ai_provider import AIProvider
-        prompt = f"Parse this resume into structured JSON.\nTarget Role: {target_role}\n\nRESUME:\n{resume_text[:5000]}\n\n{_STRUCTURE_PROMPT}"
-        result = await AIProvider.generate_json(prompt=prompt, system_prompt="Expert resume parser. Extract into JSON. Do NOT invent info.", max_tokens=1500, temperature=0.2, timeout=45)
-        if result and result.get("name"): return result
-        return ResumeBuilderService._basic_parse(resume_text)
-
-    @staticmethod
-    def _basic_parse(text):
-        lines = text.strip().split("\n")
-        name = lines[0].strip() if lines else "Your Name"
-        em = re.search(r'[\w.-]+@[\w.-]+\.\w+', text)
-        ph = re.search(r'[\+]?[\d\s\-().]{10,}', text)
-        return {"name":name,"email":em.group() if em else "","phone":ph.group().strip() if ph else "","linkedin":"","github":"","location":"","summary":"","education":[],"experience":[],"projects":[],"skills":{"languages":[],"frameworks":[],"tools":[]},"certifications":[],"achievements":[]}
-
     @staticmethod
     def get_templates():
         return [{"id":tid,"name":t["name"],"description":t["description"],"icon":t["icon"],"color":t["preview_color"]} for tid,t in TEMPLATES.items()]
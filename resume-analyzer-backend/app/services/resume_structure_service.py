@@ -0,0 +1,491 @@
+"""Structured Resume Extraction
+============================
+Turns resume text into the JSON the resume builders render (name, contact,
+summary, education, experience, projects, skills, certifications,
+achievements).  The rule-based pass below runs locally in a few milliseconds:
+
+  - Fields are parsed only from their own section, using the segmenter's
+    offsets (the stored Resume.parsed_data when the caller has it)
+  - Contact fields are found by regex over the header.  The name is the
+    first header line that looks like one; when none does, spaCy's PERSON
+    entity is used (if the model is loaded)
+  - Experience / projects: a non-bullet line opens an entry (title, company,
+    dates / name, tech) and the bullet lines after it fill the entry
+  - Skills: the resume's own "Label: a, b" lines when it has them.
+    Otherwise the skill ontology matcher finds them and they are grouped
+    into languages / frameworks / databases / tools
+  - A confidence score (0-1) measures how much of that was found.  Below
+    STRUCTURE_LLM_MIN_CONFIDENCE the LLM parses the resume instead, and the
+    local result fills any field the LLM leaves empty
+
+Results are cached per content hash in the analysis cache
+(core/result_cache.py).  The HTML builder, LaTeX export and company ATS
+therefore share one extraction per resume text, and the upload pipeline
+warms it.
+"""
+
+import re
+import time
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.result_cache import get_analysis_cache, make_cache_key, version_tag
+from app.services.ai_skill_ontology import SkillOntology
+from app.services.section_segmenter import (
+    SECTION_TITLES,
+    SEGMENTER_VERSION,
+    section_text,
+    sections_for_prompt,
+    segment_sections,
+)
+
+logger = logging.getLogger(__name__)
+
+STRUCTURE_PROMPT = """You are an expert resume parser. Extract the resume content into structured JSON.
+Return ONLY valid JSON:
+{"name":"Full Name","email":"email","phone":"phone","linkedin":"","github":"","location":"","summary":"2-3 sentence summary",
+"education":[{"degree":"","institution":"","year":"","gpa":""}],
+"experience":[{"title":"","company":"","duration":"","bullets":["achievement with metrics"]}],
+"projects":[{"name":"","tech":"React, Node.js","bullets":["what it does"]}],
+"skills":{"languages":["Python"],"frameworks":["React"],"tools":["Docker"],"databases":["PostgreSQL"]},
+"certifications":["cert name"],"achievements":["achievement"]}
+RULES: Extract ONLY real info. Do NOT invent anything. Empty = [] or ""."""
+
+# Bump the local tag when the rules below change; cached structures are keyed on it
+_EXTRACTOR_VERSION = version_tag(STRUCTURE_PROMPT, "local extractor v1", SEGMENTER_VERSION)
+
+# A local result served because the LLM fallback failed is only kept briefly
+_LLM_FAILED_CACHE_TTL = 300
+
+
+class StructuredResume(NamedTuple):
+    data: Dict[str, Any]
+    source: str          # "local" | "llm"
+    confidence: float    # of the local pass
+
+
+# ─── PATTERNS ────────────────────────────────────────────────────────────────
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s\-().]{8,}\d(?![\w/])")
+_LINKEDIN = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/[\w\-/%]+", re.IGNORECASE)
+_GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[\w\-]+", re.IGNORECASE)
+_URL = re.compile(r"(?:https?://|www\.)\S+|\b[\w-]+\.(?:com|io|dev|me|in|org|net)(?:/\S*)?\b", re.IGNORECASE)
+_HEADER_SPLIT = re.compile(r"\s*(?:[|•·●▪◆]|\s{2,}|\t)\s*")
+_NAME_LINE = re.compile(r"^[A-Za-z][A-Za-z.'\-]*(?:\s+[A-Za-z][A-Za-z.'\-]*){1,3}$")
+
+_BULLET = re.compile(r"^\s*(?:[•●▪■◆►‣◦·*\-–—➢✓]|o\s|\d{1,2}[.)]\s)\s*")
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*,?\s*'?\d{{2,4}}|\d{{1,2}}/(?:19|20)\d{{2}}|(?:19|20)\d{{2}})"
+_DATE_RANGE = re.compile(
+    rf"(?:{_DATE}\s*(?:-|–|—|to|until)\s*(?:{_DATE}|present|current|now|ongoing|till date)"
+    rf"|(?:(?:expected|since|from)\s+)?{_DATE})",
+    re.IGNORECASE,
+)
+_TITLE_SPLIT = re.compile(r"\s+(?:\||—|–|-|@|at)\s+|\s*[|,]\s*")
+_COMPANY_HINT = re.compile(
+    r"\b(?:inc|ltd|llc|llp|pvt|corp|corporation|company|technologies|technology|solutions|labs|"
+    r"systems|services|software|group|bank|consulting|limited)\b\.?",
+    re.IGNORECASE,
+)
+
+_ROLE_HINT = re.compile(
+    r"\b(?:engineer|engineering|developer|intern|analyst|manager|scientist|designer|consultant|lead|"
+    r"architect|associate|specialist|administrator|researcher|head|director|officer|trainee)\b",
+    re.IGNORECASE,
+)
+
+_DEGREE = re.compile(
+    r"\b(?:B\.?\s?Tech|M\.?\s?Tech|B\.E\.?|M\.E\.?|B\.?\s?Sc|M\.?\s?Sc|B\.S\.?|M\.S\.?|B\.A\.?|M\.A\.?|"
+    r"BCA|MCA|MBA|BBA|Ph\.?\s?D|(?i:bachelor|master|doctor|diploma|associate degree|high school|"
+    r"higher secondary|senior secondary|secondary school|intermediate|class\s*(?:x|xii|10|12)\b|12th|10th))"
+)
+_INSTITUTION = re.compile(
+    r"\b(?:university|college|institute|school|academy|polytechnic|vidyalaya|IIT|NIT|IIIT|BITS)\b",
+    re.IGNORECASE,
+)
+_GPA = re.compile(
+    r"\b(?:c?gpa|cpi|sgpa|grade)\s*[:\-]?\s*(\d{1,2}(?:\.\d+)?(?:\s*/\s*\d{1,3}(?:\.\d+)?)?)|\b(\d{2}(?:\.\d+)?\s*%)",
+    re.IGNORECASE,
+)
+_TECH_LABEL = re.compile(r"(?:tech(?:nologies|nology| stack)?|built with|tools|stack)\s*[:\-]\s*(.+)$", re.IGNORECASE)
+_SKILL_LABEL = re.compile(r"^([A-Za-z][A-Za-z /&+\-]{1,30}?)\s*[:|]\s*(\S.*)$")
+
+_SECTION_TITLE_SET = {t for titles in SECTION_TITLES.values() for t in titles}
+
+# Ontology category → builder skill group; languages are picked out first
+_SKILL_GROUPS = {
+    "Libraries": "frameworks", "Frontend": "frameworks", "Backend": "frameworks",
+    "Cross-Platform": "frameworks", "Native Android": "frameworks", "Native iOS": "frameworks",
+    "Database": "databases",
+    "Tools": "tools", "Visualization": "tools", "Containers": "tools", "CI/CD": "tools", "Cloud": "tools",
+    "Monitoring": "tools", "Infrastructure": "tools", "Practices": "tools", "Analytics Tools": "tools",
+}
+_LANGUAGES = frozenset({
+    "Python", "R", "SQL", "JavaScript", "TypeScript", "Go", "Rust", "Dart", "Swift", "Kotlin", "Java",
+    "C++", "C#", "C", "Scala", "Haskell", "Erlang", "Ruby", "Bash", "MATLAB", "Verilog", "VHDL",
+    "Embedded C", "HTML5", "CSS3",
+})
+_SKILL_GROUP_ORDER = ("languages", "frameworks", "databases", "tools", "other")
+
+
+def _build_skill_groups() -> Dict[str, str]:
+    groups: Dict[str, str] = {}
+    for categories in SkillOntology.CLUSTERS.values():
+        for category, skills in categories.items():
+            group = _SKILL_GROUPS.get(category)
+            for skill in skills:
+                if skill in _LANGUAGES:
+                    groups[skill] = "languages"
+                elif group:
+                    groups.setdefault(skill, group)
+    return groups
+
+
+_SKILL_GROUP_OF = _build_skill_groups()
+
+_MAX_SKILL_ITEMS = 40
+_MAX_LIST_ITEM_CHARS = 240
+
+
+# ─── FIELD PARSERS ───────────────────────────────────────────────────────────
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _strip_bullet(line: str) -> str:
+    return _BULLET.sub("", line, count=1).strip()
+
+
+def _is_bullet(line: str) -> bool:
+    match = _BULLET.match(line)
+    return bool(match) and bool(line[match.end():].strip())
+
+
+def _phone(text: str) -> str:
+    for match in _PHONE.finditer(text):
+        candidate = match.group().strip()
+        digits = sum(c.isdigit() for c in candidate)
+        # A date range ("2019 - 2023") looks like a number run too
+        if 10 <= digits <= 15 and not _DATE_RANGE.fullmatch(candidate):
+            return candidate
+    return ""
+
+
+def _contact(header: str, text: str) -> Dict[str, str]:
+    email = _EMAIL.search(header) or _EMAIL.search(text)
+    linkedin = _LINKEDIN.search(header) or _LINKEDIN.search(text)
+    github = _GITHUB.search(header) or _GITHUB.search(text)
+    location = ""
+    for line in header.splitlines()[:6]:
+        for piece in _HEADER_SPLIT.split(line):
+            piece = piece.strip(" ,")
+            if (
+                "," in piece and not any(c.isdigit() for c in piece) and "@" not in piece
+                and not _URL.search(piece) and len(piece.split()) <= 5
+            ):
+                location = piece
+                break
+        if location:
+            break
+    return {
+        "email": email.group() if email else "",
+        "phone": _phone(header) or _phone(text[:1500]),
+        "linkedin": linkedin.group() if linkedin else "",
+        "github": github.group() if github else "",
+        "location": location,
+    }
+
+
+def _name(header: str) -> Tuple[str, bool]:
+    """(name, confident) — a 2-4 word alphabetic line near the top, else spaCy PERSON, else line 1."""
+    lines = [line.strip() for line in header.splitlines() if line.strip()]
+    for line in lines[:4]:
+        first = _HEADER_SPLIT.split(line)[0].strip()
+        if _NAME_LINE.match(first) and first.lower() not in _SECTION_TITLE_SET:
+            return (first.title() if first.isupper() else first), True
+
+    from app.core.ai_model import AIModelManager
+    nlp = AIModelManager._spacy_ner   # only if already loaded; never load it for this
+    if nlp is not None and lines:
+        for ent in nlp(" \n".join(lines[:4])[:300]).ents:
+            if ent.label_ == "PERSON":
+                return ent.text.strip(), True
+    return (lines[0][:60] if lines else ""), False
+
+
+def _list_items(body: str) -> List[str]:
+    """Bulleted / one-per-line items, with wrapped continuation lines joined back on."""
+    items: List[str] = []
+    for raw in body.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if items and not _is_bullet(raw) and line[0].islower():
+            items[-1] = f"{items[-1]} {line}"
+            continue
+        line = _strip_bullet(line)
+        if line:
+            items.append(line)
+    return [item[:_MAX_LIST_ITEM_CHARS] for item in items]
+
+
+def _entries(body: str) -> List[Tuple[List[str], List[str]]]:
+    """
+    Split a section body into (header lines, bullets) entries.  A non-bullet
+    line after bullets opens a new entry.  Long unbulleted sentences under
+    an entry that already has its header are treated as bullets.
+    """
+    entries: List[Tuple[List[str], List[str]]] = []
+    header: List[str] = []
+    bullets: List[str] = []
+    for raw in body.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if _is_bullet(raw):
+            bullets.append(_strip_bullet(line))
+            continue
+        if bullets and line[0].islower():   # wrapped bullet
+            bullets[-1] = f"{bullets[-1]} {line}"
+            continue
+        has_header = len(header) >= 2 or any(_DATE_RANGE.search(h) for h in header)
+        if header and has_header and (len(line.split()) >= 8 or line.endswith(".")) and not _DATE_RANGE.search(line):
+            bullets.append(line)
+            continue
+        if bullets or len(header) >= 3:
+            entries.append((header, bullets))
+            header, bullets = [], []
+        header.append(line)
+    if header or bullets:
+        entries.append((header, bullets))
+    return entries
+
+
+def _split_dates(text: str) -> Tuple[str, str]:
+    """(text without its date range, the date range)"""
+    match = None
+    for match in _DATE_RANGE.finditer(text):
+        pass   # the last range on the line is the entry's dates
+    if match is None:
+        return text, ""
+    rest = f"{text[:match.start()]} {text[match.end():]}"
+    return rest, _clean(match.group()).strip(" ,()")
+
+
+def _parts(text: str) -> List[str]:
+    return [p.strip(" ,|–—-()") for p in _TITLE_SPLIT.split(text) if p.strip(" ,|–—-()")]
+
+
+def _experience(body: str) -> List[Dict[str, Any]]:
+    out = []
+    for header, bullets in _entries(body):
+        if not header:
+            if out:
+                out[-1]["bullets"].extend(bullets)
+            continue
+        rest, duration = _split_dates(" | ".join(header))
+        parts = _parts(rest)
+        title = parts[0] if parts else ""
+        company = parts[1] if len(parts) > 1 else ""
+        # "Acme Corp | Backend Developer" — company first
+        if company and not _ROLE_HINT.search(title) and (
+            _ROLE_HINT.search(company) or (_COMPANY_HINT.search(title) and not _COMPANY_HINT.search(company))
+        ):
+            title, company = company, title
+        out.append({"title": title, "company": company, "duration": duration, "bullets": bullets})
+    return out
+
+
+def _projects(body: str) -> List[Dict[str, Any]]:
+    out = []
+    for header, bullets in _entries(body):
+        if not header:
+            if out:
+                out[-1]["bullets"].extend(bullets)
+            continue
+        head, _ = _split_dates(" | ".join(header))
+        tech = ""
+        label = _TECH_LABEL.search(head)
+        if label:
+            tech, head = label.group(1), head[:label.start()]
+        else:
+            paren = re.search(r"\(([^()]{3,120})\)", head)
+            if paren and "," in paren.group(1):
+                tech, head = paren.group(1), head[:paren.start()] + head[paren.end():]
+        for bullet in list(bullets):
+            bullet_label = _TECH_LABEL.match(bullet)
+            if bullet_label and not tech:
+                tech = bullet_label.group(1)
+                bullets.remove(bullet)
+        parts = [p.strip(" ,|–—-:") for p in re.split(r"\s+[|–—-]\s+|\s*\|\s*|:\s+", head) if p.strip(" ,|–—-:")]
+        name = parts[0] if parts else ""
+        if not tech and len(parts) > 1:
+            tech = ", ".join(parts[1:])
+        out.append({"name": name, "tech": _clean(tech).strip(" ,."), "bullets": bullets})
+    return out
+
+
+def _education(body: str) -> List[Dict[str, str]]:
+    out: List[Dict[str, str]] = []
+    current: Optional[Dict[str, str]] = None
+    for raw in body.splitlines():
+        line = _strip_bullet(raw.strip())
+        if not line:
+            continue
+        gpa_match = _GPA.search(line)
+        if gpa_match:
+            line = f"{line[:gpa_match.start()]} {line[gpa_match.end():]}"
+        rest, year = _split_dates(line)
+        rest = _clean(rest).strip(" ,|–—-()")
+        degree = rest if _DEGREE.search(rest) else ""
+        institution = ""
+        if not degree and _INSTITUTION.search(rest):
+            institution = rest
+        elif degree and _INSTITUTION.search(rest):
+            # "B.Tech, Computer Science — XYZ University" on one line
+            pieces = _parts(rest)
+            institution = next((p for p in pieces if _INSTITUTION.search(p) and not _DEGREE.search(p)), "")
+            if institution:
+                degree = ", ".join(p for p in pieces if p != institution)
+
+        starts_new = current is None or (degree and current["degree"]) or (institution and current["institution"])
+        if starts_new and (degree or institution):
+            current = {"degree": "", "institution": "", "year": "", "gpa": ""}
+            out.append(current)
+        if current is None:
+            continue
+        if degree and not current["degree"]:
+            current["degree"] = degree
+        if institution and not current["institution"]:
+            current["institution"] = institution
+        if year and not current["year"]:
+            current["year"] = year
+        if gpa_match and not current["gpa"]:
+            current["gpa"] = _clean(gpa_match.group(1) or gpa_match.group(2))
+        if not (degree or institution or year or gpa_match) and not current["institution"] and len(rest.split()) <= 8:
+            current["institution"] = rest
+    return out
+
+
+def _skills(skills_body: str, text: str) -> Dict[str, List[str]]:
+    labelled: Dict[str, List[str]] = {}
+    for raw in skills_body.splitlines():
+        match = _SKILL_LABEL.match(_strip_bullet(raw.strip()))
+        if not match:
+            continue
+        key = re.sub(r"[^a-z0-9]+", "_", match.group(1).lower()).strip("_")
+        items = [i.strip(" .") for i in re.split(r"[,;•|]", match.group(2)) if i.strip(" .")]
+        labelled.setdefault(key, []).extend(items)
+    if labelled:
+        return {k: v[:_MAX_SKILL_ITEMS] for k, v in labelled.items()}
+
+    found = SkillOntology.extract_skills_from_text(skills_body or text)
+    if not found and skills_body:
+        items = [i.strip(" .") for i in re.split(r"[,;•|\n]", skills_body) if i.strip(" .")]
+        return {"other": [i for i in items if len(i) <= 40][:_MAX_SKILL_ITEMS]} if items else {}
+    grouped: Dict[str, List[str]] = {}
+    for skill in found:
+        grouped.setdefault(_SKILL_GROUP_OF.get(skill, "other"), []).append(skill)
+    return {g: grouped[g][:_MAX_SKILL_ITEMS] for g in _SKILL_GROUP_ORDER if g in grouped}
+
+
+def _confidence(data: Dict[str, Any], name_found: bool, parsed: Dict[str, Any]) -> float:
+    names = {s["name"] for s in parsed.get("sections", [])}
+    score = 0.0
+    score += 0.2 if name_found else 0.0
+    score += 0.15 if data["email"] or data["phone"] else 0.0
+    score += 0.25 if (
+        any(e["title"] and e["bullets"] for e in data["experience"])
+        or any(p["name"] and p["bullets"] for p in data["projects"])
+    ) else 0.0
+    score += 0.15 if data["education"] else 0.0
+    score += 0.15 if data["skills"] else 0.0
+    score += 0.1 if names - {"contact_info"} else 0.0
+    if "experience" in names and not data["experience"]:
+        score -= 0.15   # the section is there but its entries could not be read
+    return round(max(score, 0.0), 2)
+
+
+# ─── SERVICE ─────────────────────────────────────────────────────────────────
+
+class ResumeStructureService:
+    """Builder-ready structured resume data: local rules first, LLM only when unsure."""
+
+    @staticmethod
+    def extract_local(text: str, sections: Optional[Dict[str, Any]] = None) -> StructuredResume:
+        """Rule-based extraction (no I/O).  `sections` is the stored segmentation of `text`, if any."""
+        parsed = sections or segment_sections(text)
+
+        def body(name: str) -> str:
+            return section_text(parsed, text, name)
+
+        header = body("contact_info") or "\n".join(text.strip().splitlines()[:4])
+        name, name_found = _name(header)
+        data: Dict[str, Any] = {
+            "name": name,
+            **_contact(header, text),
+            "summary": _clean(body("summary"))[:600],
+            "education": _education(body("education")),
+            "experience": _experience(body("experience")),
+            "projects": _projects(body("projects")),
+            "skills": _skills(body("skills"), text),
+            "certifications": _list_items(body("certifications")),
+            "achievements": _list_items(body("achievements")),
+        }
+        return StructuredResume(data, "local", _confidence(data, name_found, parsed))
+
+    @staticmethod
+    async def extract(
+        text: str,
+        sections: Optional[Dict[str, Any]] = None,
+        allow_llm: bool = True,
+    ) -> StructuredResume:
+        """
+        Cached structured data for `text`.  The LLM is asked only when the
+        local pass is unsure and `allow_llm` is set.  A local-only low-confidence
+        result is not cached, so a later caller that allows the LLM can
+        still upgrade it.
+        """
+        cache = get_analysis_cache()
+        key = make_cache_key("structure", text, version=_EXTRACTOR_VERSION)
+        cached = cache.get(key)
+        if cached is not None:
+            return StructuredResume(**cached)
+
+        started = time.perf_counter()
+        result = ResumeStructureService.extract_local(text, sections)
+        ttl = None
+        if result.confidence < settings.STRUCTURE_LLM_MIN_CONFIDENCE:
+            if not allow_llm:
+                return result
+            llm_data = await ResumeStructureService._llm_structure(text, sections)
+            if llm_data:
+                merged = dict(result.data)
+                merged.update({k: v for k, v in llm_data.items() if k in merged and v})
+                result = StructuredResume(merged, "llm", result.confidence)
+            else:
+                ttl = _LLM_FAILED_CACHE_TTL
+        logger.info(
+            "Structured resume | source=%s | confidence=%.2f | %.0f ms",
+            result.source, result.confidence, (time.perf_counter() - started) * 1000,
+        )
+        cache.set(key, result._asdict(), ttl)
+        return result
+
+    @staticmethod
+    async def _llm_structure(text: str, sections: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        from app.core.ai_provider import AIProvider
+        parsed = sections or segment_sections(text)
+        prompt = f"Parse this resume into structured JSON.\n\nRESUME:\n{sections_for_prompt(parsed, text)}\n\n{STRUCTURE_PROMPT}"
+        result = await AIProvider.generate_json(
+            prompt=prompt,
+            system_prompt="Expert resume parser. Extract into JSON. Do NOT invent info.",
+            max_tokens=1500,
+            temperature=0.2,
+            timeout=45,
+        )
+        return result if result and result.get("name") else None
@@ -0,0 +1,317 @@
+"""
+Population Score Percentiles
+============================
+"What percentile is a 72 among Data Scientist resumes?" — answered from
+histograms of every stored score, not from reference constants.
+
+  - Segments: each predicted_role, plus ALL_SEGMENT for every resume
+  - Metrics: ats_score and each score_breakdown dimension (0-100 scale)
+  - Sketch: a fixed-bin histogram (PERCENTILE_BIN_WIDTH points per bin).
+    Scores live on a bounded 0-100 scale, so this is exact to the bin
+    width, O(1) to update and mergeable — what a t-digest / KLL sketch
+    would buy for an unbounded stream, without the approximation
+  - Persisted in `score_distributions` (one row per segment); each worker
+    keeps them in memory with prefix sums, so a lookup is two list
+    indexes, and reloads every PERCENTILE_REFRESH_SECONDS
+  - Incremental: record(resume) in the transaction that saves the resume
+  - Rebuild: the "score_percentiles_rebuild" task (batch lane, run by the
+    API's embedded worker or a dedicated one) re-scans resumes; the API
+    queues one a day at startup, and one whenever an incremental update
+    fails.  If it cannot be queued it runs in a thread here.  By hand:
+        python -m app.task_worker rebuild-percentiles
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.task_queue import TaskQueue, task_handler
+from app.db.session import SessionLocal
+from app.models.all_models import Resume, ScoreDistribution
+
+logger = logging.getLogger(__name__)
+
+ALL_SEGMENT = "__all__"
+SCORE_MAX = 100.0
+METRICS = (
+    "ats_score",
+    "semantic_similarity",
+    "skill_coverage",
+    "experience_depth",
+    "ats_format_score",
+    "market_readiness",
+    "action_verb_quality",
+    "quantification",
+)
+_UNSEGMENTED_ROLES = {"", "analyzing..."}   # placeholder roles are counted in ALL_SEGMENT only
+
+
+class ScoreHistogram:
+    """Counts per fixed-width score bin over [0, SCORE_MAX]; percentiles via prefix sums."""
+
+    __slots__ = ("bin_width", "counts", "total", "_below")
+
+    def __init__(self, bin_width: float, counts: Optional[List[int]] = None):
+        self.bin_width = bin_width
+        bins = int(SCORE_MAX / bin_width) + 1
+        self.counts = list(counts) if counts and len(counts) == bins else [0] * bins
+        self.total = sum(self.counts)
+        self._below: Optional[List[int]] = None
+
+    def _bin(self, score: float) -> int:
+        return int(min(max(score, 0.0), SCORE_MAX) / self.bin_width)
+
+    def add(self, score: float) -> None:
+        self.counts[self._bin(score)] += 1
+        self.total += 1
+        self._below = None
+
+    def percentile(self, score: float) -> float:
+        """Share of samples below `score` (ties count half), 0-100."""
+        if not self.total:
+            return 0.0
+        below = self._below
+        if below is None:
+            below, running = [], 0
+            for count in self.counts:
+                below.append(running)
+                running += count
+            self._below = below
+        i = self._bin(score)
+        return 100.0 * (below[i] + self.counts[i] / 2) / self.total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Score at quantile `q` (0-1), as the centre of the bin it falls in."""
+        if not self.total:
+            return None
+        target = q * self.total
+        running = 0
+        for i, count in enumerate(self.counts):
+            running += count
+            if count and running >= target:
+                return min((i + 0.5) * self.bin_width, SCORE_MAX)
+        return SCORE_MAX
+
+
+def _segment(role: Optional[str]) -> Optional[str]:
+    role = (role or "").strip()
+    return None if role.lower() in _UNSEGMENTED_ROLES else role
+
+
+def _scores(ats_score: Optional[float], breakdown: Optional[Dict[str, Any]]) -> Iterable[Tuple[str, float]]:
+    breakdown = breakdown or {}
+    for metric in METRICS:
+        value = ats_score if metric == "ats_score" else breakdown.get(metric)
+        if isinstance(value, (int, float)):
+            yield metric, float(value)
+
+
+class _Population:
+    """One segment: sample count and a histogram per metric."""
+
+    __slots__ = ("sample_count", "histograms")
+
+    def __init__(self, bin_width: float, sample_count: int = 0, histograms: Optional[Dict[str, List[int]]] = None):
+        self.sample_count = sample_count
+        self.histograms = {
+            metric: ScoreHistogram(bin_width, (histograms or {}).get(metric)) for metric in METRICS
+        }
+
+    def add(self, ats_score: Optional[float], breakdown: Optional[Dict[str, Any]]) -> None:
+        self.sample_count += 1
+        for metric, value in _scores(ats_score, breakdown):
+            self.histograms[metric].add(value)
+
+    def to_json(self) -> Dict[str, List[int]]:
+        return {metric: hist.counts for metric, hist in self.histograms.items()}
+
+
+class ScorePercentileService:
+    """Percentile lookups (in-memory) and histogram maintenance (score_distributions)."""
+
+    _populations: Dict[str, _Population] = {}
+    _loaded_at: float = 0.0
+    _lock = threading.Lock()
+
+    # ─── LOOKUPS ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def population(role: Optional[str]) -> Tuple[str, Optional[_Population]]:
+        """
+        The segment to rank a `role` resume against: the role's own when it
+        has PERCENTILE_MIN_SAMPLES resumes, else all resumes.
+        """
+        populations = ScorePercentileService._current()
+        segment = _segment(role)
+        own = populations.get(segment) if segment else None
+        if own is not None and own.sample_count >= settings.PERCENTILE_MIN_SAMPLES:
+            return segment, own
+        overall = populations.get(ALL_SEGMENT)
+        if overall is not None and overall.sample_count >= settings.PERCENTILE_MIN_SAMPLES:
+            return ALL_SEGMENT, overall
+        return ALL_SEGMENT, None
+
+    @staticmethod
+    def percentile(score: float, role: Optional[str] = None, metric: str = "ats_score") -> Optional[float]:
+        """Percentile of `score` for `metric` among `role` resumes (None until there is enough data)."""
+        _, population = ScorePercentileService.population(role)
+        if population is None:
+            return None
+        return population.histograms[metric].percentile(score)
+
+    @staticmethod
+    def _current() -> Dict[str, _Population]:
+        if time.monotonic() - ScorePercentileService._loaded_at > settings.PERCENTILE_REFRESH_SECONDS:
+            with ScorePercentileService._lock:
+                if time.monotonic() - ScorePercentileService._loaded_at > settings.PERCENTILE_REFRESH_SECONDS:
+                    ScorePercentileService._reload()
+        return ScorePercentileService._populations
+
+    @staticmethod
+    def _reload() -> None:
+        db = SessionLocal()
+        try:
+            rows = db.query(ScoreDistribution).all()
+            populations = {}
+            for row in rows:
+                if row.bin_width != settings.PERCENTILE_BIN_WIDTH:
+                    continue   # built with another bin width; the next rebuild replaces it
+                populations[row.segment] = _Population(row.bin_width, row.sample_count, row.histograms)
+            ScorePercentileService._populations = populations
+        except Exception as e:
+            logger.warning("Score distributions unavailable (%s) — percentiles use reference values", e)
+        finally:
+            db.close()
+        ScorePercentileService._loaded_at = time.monotonic()
+
+    # ─── INCREMENTAL UPDATE ──────────────────────────────────────────────────
+
+    @staticmethod
+    def record(db: Session, resume: Resume) -> None:
+        """
+        Add a new resume's scores to its role's and the overall histograms.
+
+        Call inside the transaction that inserts the resume (after flush,
+        before commit).  rebuild() holds the score_distributions write lock
+        while it scans, so each resume is counted exactly once, either by the
+        scan or by this update.  A failed update only rolls back its
+        savepoint (the resume is still saved) and queues a rebuild.
+        """
+        segments = [ALL_SEGMENT] + [s for s in (_segment(resume.predicted_role),) if s]
+        ats_score, breakdown = resume.ats_score, resume.score_breakdown
+        try:
+            with db.begin_nested():
+                rows = {
+                    row.segment: row for row in
+                    db.query(ScoreDistribution).filter(ScoreDistribution.segment.in_(segments)).with_for_update()
+                }
+                for segment in segments:
+                    row = rows.get(segment)
+                    if row is None:
+                        row = ScoreDistribution(segment=segment, sample_count=0,
+                                                bin_width=settings.PERCENTILE_BIN_WIDTH, histograms={})
+                        db.add(row)
+                    elif row.bin_width != settings.PERCENTILE_BIN_WIDTH:
+                        raise RuntimeError(f"segment {segment!r} has bin width {row.bin_width}")
+                    population = _Population(row.bin_width, row.sample_count, row.histograms)
+                    population.add(ats_score, breakdown)
+                    row.sample_count = population.sample_count
+                    row.histograms = population.to_json()   # reassign: JSON columns don't track in-place edits
+        except Exception as e:
+            logger.warning("Score distribution update failed (%s) — queueing a rebuild", e)
+            # Queue after commit: on SQLite this transaction holds the write lock the enqueue needs
+            event.listen(db, "after_commit",
+                         lambda _: ScorePercentileService.schedule_rebuild(reason="update-failed"), once=True)
+            return
+
+        def publish(_session) -> None:
+            # This worker sees its own write once it commits; others on their next reload
+            with ScorePercentileService._lock:
+                populations = ScorePercentileService._populations
+                for segment in segments:
+                    population = populations.get(segment)
+                    if population is None:
+                        population = populations[segment] = _Population(settings.PERCENTILE_BIN_WIDTH)
+                    population.add(ats_score, breakdown)
+
+        event.listen(db, "after_commit", publish, once=True)
+
+    # ─── REBUILD ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Recompute every segment from the resumes table; returns the number of resumes scanned.
+
+        One transaction that takes the score_distributions write lock before
+        scanning (LOCK TABLE on Postgres; the DELETE's database lock on
+        SQLite) and swaps in the new rows at commit.  Uploads wait for it in
+        record(): a resume committed before the lock is in the scan, and one
+        committed after it is added on top of the rebuilt rows.  Readers keep
+        the previous rows until the commit.
+        """
+        bin_width = settings.PERCENTILE_BIN_WIDTH
+        populations: Dict[str, _Population] = {}
+        scanned = 0
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text("LOCK TABLE score_distributions IN EXCLUSIVE MODE"))
+            db.query(ScoreDistribution).delete()
+
+            rows = db.query(Resume.predicted_role, Resume.ats_score, Resume.score_breakdown).yield_per(1000)
+            for role, ats_score, breakdown in rows:
+                scanned += 1
+                for segment in (ALL_SEGMENT, _segment(role)):
+                    if segment:
+                        populations.setdefault(segment, _Population(bin_width)).add(ats_score, breakdown)
+
+            for segment, population in populations.items():
+                db.add(ScoreDistribution(
+                    segment=segment, sample_count=population.sample_count,
+                    bin_width=bin_width, histograms=population.to_json(),
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        with ScorePercentileService._lock:
+            ScorePercentileService._populations = populations
+            ScorePercentileService._loaded_at = time.monotonic()
+        logger.info("Score distributions rebuilt: %d resumes, %d segments", scanned, len(populations))
+        return scanned
+
+    @staticmethod
+    def schedule_rebuild(reason: str = "daily") -> None:
+        """
+        Queue a background rebuild: the daily one once per day; a repair
+        ("update-failed") joins a pending one, or runs again once the last
+        has finished, so a failure after today's rebuild is still repaired.
+        """
+        if reason == "daily":
+            key, requeue_finished = f"score_percentiles_rebuild:daily:{datetime.utcnow():%Y-%m-%d}", False
+        else:
+            key, requeue_finished = f"score_percentiles_rebuild:{reason}", True
+        try:
+            TaskQueue.enqueue(
+                "score_percentiles_rebuild", {"reason": reason},
+                idempotency_key=key, lane="batch", requeue_finished=requeue_finished,
+            )
+        except Exception as e:
+            logger.warning("Could not queue score distribution rebuild (%s) — rebuilding in a thread", e)
+            threading.Thread(target=rebuild_percentiles_task, args=({"reason": reason},),
+                             name="percentile-rebuild", daemon=True).start()
+
+
+@task_handler("score_percentiles_rebuild")
+def rebuild_percentiles_task(payload: Dict[str, Any]) -> None:
+    db = SessionLocal()
+    try:
+        ScorePercentileService.rebuild(db)
+    finally:
+        db.close()
@@ -0,0 +1,232 @@
+"""Deterministic Resume Section Segmenter
+=====================================
+Splits extracted resume text into sections with character offsets, without
+an LLM call:
+
+  - A line is a heading when it matches a known section title ("Work
+    Experience", "TECHNICAL SKILLS:", "Skills: Python, SQL" inline), or is
+    an ALL-CAPS line naming one
+  - Layout hints sharpen this: PDF lines set in a larger / bold font
+    (pdf_page_extractor) and DOCX "Heading" / "Title" paragraphs come in
+    as `heading_hints`; a hinted line that names no known section starts
+    an "other" section (e.g. "Open Source"), except in the first few lines
+    where it is the name / headline
+  - Everything before the first heading is `contact_info`
+
+Result (stored as Resume.parsed_data):
+    {
+      "segmenter": "1",
+      "layout": "pdf" | "docx" | "text",
+      "sections": [
+        {"name": "contact_info", "heading": None, "start": 0, "end": 58},
+        {"name": "experience", "heading": "WORK EXPERIENCE", "start": 76, "end": 912},
+        ...
+      ]
+    }
+`start` / `end` index the section body in Resume.content_text, so consumers
+slice the stored text instead of re-scanning it: section_text(parsed, text, "skills").
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SEGMENTER_VERSION = "1"
+
+# Canonical section → heading titles (compared after _normalise)
+SECTION_TITLES: Dict[str, Tuple[str, ...]] = {
+    "summary": (
+        "summary", "professional summary", "career summary", "executive summary", "profile",
+        "professional profile", "objective", "career objective", "about me", "about",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history",
+        "internship", "internships", "internship experience",
+    ),
+    "education": (
+        "education", "academic background", "academics", "educational qualifications",
+        "academic qualifications", "qualifications", "education and training",
+    ),
+    "skills": (
+        "skills", "technical skills", "core skills", "key skills", "skill set", "skillset",
+        "technologies", "tech stack", "technical expertise", "core competencies", "competencies",
+        "tools and technologies", "skills and tools",
+    ),
+    "projects": (
+        "projects", "personal projects", "academic projects", "key projects", "selected projects",
+        "side projects", "notable projects",
+    ),
+    "certifications": (
+        "certifications", "certificates", "certification", "licenses and certifications",
+        "certifications and courses", "courses", "training", "online courses",
+    ),
+    "achievements": (
+        "achievements", "awards", "honors", "honours", "accomplishments", "awards and achievements",
+        "honors and awards", "achievements and awards",
+    ),
+    "publications": ("publications", "research", "research papers", "papers"),
+    "leadership": ("leadership", "positions of responsibility", "leadership experience"),
+    "volunteering": ("volunteering", "volunteer experience", "volunteer work", "community service"),
+    "languages": ("languages", "spoken languages", "language proficiency"),
+    "interests": (
+        "interests", "hobbies", "hobbies and interests", "extracurricular activities",
+        "extra curricular activities", "activities",
+    ),
+    "contact_info": ("contact", "contact information", "contact details", "personal details", "personal information"),
+}
+
+# Words that name a section inside a longer ALL-CAPS / layout heading ("TECHNICAL SKILLS & TOOLS")
+_SECTION_WORDS: Dict[str, str] = {
+    "summary": "summary", "profile": "summary", "objective": "summary",
+    "experience": "experience", "employment": "experience", "internship": "experience", "internships": "experience",
+    "education": "education", "academic": "education", "academics": "education",
+    "skills": "skills", "technologies": "skills", "competencies": "skills",
+    "projects": "projects",
+    "certifications": "certifications", "certificates": "certifications", "courses": "certifications",
+    "achievements": "achievements", "awards": "achievements", "honors": "achievements",
+    "publications": "publications",
+    "leadership": "leadership",
+    "volunteering": "volunteering", "volunteer": "volunteering",
+    "languages": "languages",
+    "interests": "interests", "hobbies": "interests",
+}
+
+_MAJOR_SECTIONS = frozenset({"summary", "experience", "education", "projects"})
+
+_HEADER_LINES = 3      # leading lines where an unknown layout heading is the name / headline
+_MAX_HEADING_CHARS = 60
+_MAX_HEADING_WORDS = 6
+
+_TITLE_TO_SECTION: Dict[str, str] = {}
+for _section, _titles in SECTION_TITLES.items():
+    for _title in _titles:
+        _TITLE_TO_SECTION[_title] = _section
+
+# "Skills: Python, SQL" — a known title, a separator, then content on the same line
+_INLINE_HEADING = re.compile(
+    r"^\s*(?P<title>(?:" + "|".join(
+        re.escape(t).replace(r"\ and\ ", r"\s*(?:and|&)\s*").replace(r"\ ", r"\s+")
+        for t in sorted(_TITLE_TO_SECTION, key=len, reverse=True)
+    ) + r"))\s*[:|\-–—]\s+(?P<body>\S.*)$",
+    re.IGNORECASE,
+)
+
+
+def _normalise(line: str) -> str:
+    """Lowercase, '&' → 'and', strip bullets / decoration / trailing colon, collapse spaces."""
+    s = line.strip().lower().replace("&", " and ")
+    s = re.sub(r"^[\s•●▪■◆►\-–—*#|]+", "", s)
+    s = re.sub(r"[\s:|\-–—_=*#]+$", "", s)
+    return " ".join(s.split())
+
+
+def _heading_section(line: str, hinted: bool) -> Optional[str]:
+    """Section a stand-alone heading line names, 'other' for an unknown hinted one, else None."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > _MAX_HEADING_CHARS:
+        return None
+    norm = _normalise(stripped)
+    words = norm.split()
+    if not words or len(words) > _MAX_HEADING_WORDS or stripped.endswith((".", ",")):
+        return None
+    if norm in _TITLE_TO_SECTION:
+        return _TITLE_TO_SECTION[norm]
+    letters = [c for c in stripped if c.isalpha()]
+    all_caps = len(letters) >= 3 and all(c.isupper() for c in letters)
+    if all_caps or hinted:
+        for word in words:
+            if word in _SECTION_WORDS:
+                return _SECTION_WORDS[word]
+    if hinted and not any(c.isdigit() for c in stripped) and "@" not in stripped:
+        return "other"
+    return None
+
+
+def segment_sections(
+    text: str,
+    heading_hints: Optional[Iterable[str]] = None,
+    layout: str = "text",
+) -> Dict[str, Any]:
+    """Split `text` into sections (see module docstring for the result shape)."""
+    hints = {_normalise(h) for h in (heading_hints or ()) if h and h.strip()}
+    headings: List[Tuple[str, Optional[str], int]] = []   # (section, heading text, body start)
+    ends: List[int] = []                                  # where each heading line begins
+
+    offset = 0
+    line_no = 0
+    for raw_line in text.splitlines(keepends=True):
+        line = raw_line.rstrip("\r\n")
+        line_start, offset = offset, offset + len(raw_line)
+        if not line.strip():
+            continue
+        line_no += 1
+        lead = len(line) - len(line.lstrip())
+
+        section = _heading_section(line, _normalise(line) in hints)
+        # The name / headline at the top is usually set large too — not a section
+        if section == "other" and not headings and line_no <= _HEADER_LINES:
+            section = None
+        if section is not None:
+            headings.append((section, line.strip(), line_start + len(line)))
+            ends.append(line_start)
+            continue
+
+        inline = _INLINE_HEADING.match(line)
+        if inline:
+            title = inline.group("title")
+            section = _TITLE_TO_SECTION[_normalise(title)]
+            # "Languages: Python, Go" / "Tools: ..." inside a skills block are sub-labels, not new sections
+            if headings and headings[-1][0] == "skills" and section not in _MAJOR_SECTIONS:
+                continue
+            headings.append((section, title.strip(), line_start + inline.start("body")))
+            ends.append(line_start + lead)
+
+    sections: List[Dict[str, Any]] = []
+
+    def add(name: str, heading: Optional[str], start: int, end: int) -> None:
+        body = text[start:end]
+        stripped = body.strip()
+        if not stripped and heading is None:
+            return
+        start += len(body) - len(body.lstrip())
+        sections.append({"name": name, "heading": heading, "start": start, "end": start + len(stripped)})
+
+    first_heading = ends[0] if ends else len(text)
+    add("contact_info", None, 0, first_heading)
+    for i, (name, heading, start) in enumerate(headings):
+        end = ends[i + 1] if i + 1 < len(headings) else len(text)
+        add(name, heading, start, end)
+
+    return {"segmenter": SEGMENTER_VERSION, "layout": layout, "sections": sections}
+
+
+# ─── CONSUMER HELPERS ────────────────────────────────────────────────────────
+
+def is_current(parsed_data: Optional[Dict[str, Any]]) -> bool:
+    """True if `parsed_data` was produced by this segmenter version (older rows hold {"raw_text": ...})."""
+    return bool(parsed_data) and parsed_data.get("segmenter") == SEGMENTER_VERSION
+
+
+def section_text(parsed_data: Dict[str, Any], text: str, name: str) -> str:
+    """Body text of every `name` section, in document order (blank line between repeats)."""
+    return "\n\n".join(
+        text[s["start"]:s["end"]] for s in parsed_data.get("sections", []) if s["name"] == name
+    )
+
+
+def sections_for_prompt(parsed_data: Dict[str, Any], text: str, limit: int = 5000) -> str:
+    """
+    Text relabelled by section ("## EXPERIENCE" ...), for structure prompts.
+    Each section is capped to its share of `limit`, so a long experience
+    block cannot push education / skills out of the prompt the way a plain
+    text[:limit] cut does.
+    """
+    sections = parsed_data.get("sections", [])
+    if not sections:
+        return text[:limit]
+    share = max(limit // len(sections), 200)
+    parts = []
+    for s in sections:
+        label = (s.get("heading") or s["name"]).rstrip(": ").upper() if s["name"] != "contact_info" else "CONTACT"
+        parts.append(f"## {label}\n{text[s['start']:s['end']][:share]}")
+    return "\n\n".join(parts)[:limit]
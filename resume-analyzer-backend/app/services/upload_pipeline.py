@@ -0,0 +1,440 @@
+"""Async Resume Upload Pipeline
+============================
+POST /resumes/upload only validates and stores the file, records an
+UploadJob row and returns 202 with its id.  The analysis then runs here as
+a background task, one stage at a time:
+
+    extract  → text + layout-aware sections (with offsets, stored as
+               Resume.parsed_data) from the stored PDF / DOCX / TXT blob (OCR
+               pool for scanned pages); cached per content hash, so an
+               identical re-upload skips this work entirely
+    score    → ATS analysis; the Resume row + v1 snapshot are saved here,
+               so the result endpoint works from this point on.  The
+               builders' structured data is warmed alongside (cached per
+               content hash), so template generation later is a cache hit
+    predict  → role to rewrite for (user's role, else the ATS prediction,
+               else the job prediction service)
+    rewrite  → full AI rewrite stored on the Resume, run as a durable
+               "resume_rewrite" task (app/core/task_queue.py) by a worker
+
+Stage, status and per-stage timings (ms) live on the UploadJob row, so any
+API worker can answer status / result / SSE requests for the job.
+
+The upload's blob reference (app/core/blob_store.py) is handed to the saved
+Resume; a run that fails before saving one releases it.
+
+The job, resume and blob-cache writes are blocking SessionLocal work, so the
+pipeline runs them with asyncio.to_thread rather than on the event loop.
+Jobs a restart interrupted are failed at startup (sweep_interrupted_jobs).
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.blob_store import blob_key, get_blob_store
+from app.core.llm_clients import permanent_provider_error
+from app.core.task_queue import PermanentTaskError, TaskQueue, task_handler, TERMINAL_STATUSES as TASK_TERMINAL_STATUSES
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.models.all_models import Resume, ResumeVersion, UploadJob
+from app.services.ocr_pool import OCRQueueFull
+from app.services.score_percentile_service import ScorePercentileService
+from app.services.user_stats_service import UserStatsService
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("extract", "score", "predict", "rewrite")
+TERMINAL_STATUSES = ("completed", "failed")
+
+_OCR_BUSY_RETRIES = 3
+_NO_TEXT_ERROR = (
+    "The system could not detect any readable text in this document. "
+    "If this is a scanned image, ensure the quality is clear."
+)
+_REWRITE_FAILED_TEXT = "AI rewrite failed. Please try the Optimize option manually."
+_INTERRUPTED_ERROR = "Processing was interrupted by a server restart. Please upload the resume again."
+
+
+class UploadPipeline:
+    # Strong references so running pipelines are not garbage-collected mid-flight
+    _tasks: Set[asyncio.Task] = set()
+
+    # ── job rows ──
+
+    @staticmethod
+    async def create_job(db: AsyncSession, owner_id: int, title: str, filename: str) -> UploadJob:
+        job = UploadJob(
+            id=uuid.uuid4().hex,
+            owner_id=owner_id,
+            title=title,
+            filename=filename,
+            status="queued",
+            stage_timings={},
+        )
+        db.add(job)
+        await db.commit()
+        return job
+
+    @staticmethod
+    async def _update_job(job_id: str, **fields: Any) -> None:
+        await asyncio.to_thread(UploadPipeline._write_job, job_id, **fields)
+
+    @staticmethod
+    def _write_job(job_id: str, **fields: Any) -> None:
+        db = SessionLocal()
+        try:
+            job = db.query(UploadJob).filter(UploadJob.id == job_id).first()
+            if job is None:
+                return
+            timing = fields.pop("timing", None)
+            if timing:
+                # Reassign (not mutate) so SQLAlchemy sees the JSON change
+                job.stage_timings = {**(job.stage_timings or {}), **timing}
+            for name, value in fields.items():
+                setattr(job, name, value)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Upload job {job_id} update failed: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def sweep_interrupted_jobs() -> int:
+        """
+        Fail queued / running jobs not updated for UPLOAD_JOB_STALE_SECONDS.
+
+        Pipelines run inside the API process, so a restart loses them and
+        their rows would otherwise poll as "running" forever.  Every stage
+        touches the row, so the age cut-off spares jobs other live workers
+        are still running.  Returns the number of jobs failed.
+        """
+        stale = datetime.utcnow() - timedelta(seconds=settings.UPLOAD_JOB_STALE_SECONDS)
+        db = SessionLocal()
+        try:
+            swept = (
+                db.query(UploadJob)
+                .filter(UploadJob.status.in_(("queued", "running")), UploadJob.updated_at < stale)
+                .update({UploadJob.status: "failed", UploadJob.error: _INTERRUPTED_ERROR},
+                        synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+        if swept:
+            logger.warning("Failed %d upload job(s) interrupted by a restart", swept)
+        return swept
+
+    @staticmethod
+    async def snapshot(job_id: str) -> Optional[Dict[str, Any]]:
+        """Current job state as plain JSON (fresh session — used by the SSE poller)."""
+        async with AsyncSessionLocal() as db:
+            job = await db.get(UploadJob, job_id)
+            if job is None:
+                return None
+            return {
+                "id": job.id,
+                "status": job.status,
+                "stage": job.stage,
+                "stage_timings": job.stage_timings or {},
+                "resume_id": job.resume_id,
+                "error": job.error,
+            }
+
+    @staticmethod
+    @asynccontextmanager
+    async def _stage(job_id: str, name: str):
+        await UploadPipeline._update_job(job_id, status="running", stage=name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            await UploadPipeline._update_job(job_id, timing={name: elapsed_ms})
+            logger.info(f"Upload job {job_id}: {name} took {elapsed_ms} ms")
+
+    # ── orchestration ──
+
+    @staticmethod
+    def start(
+        job_id: str,
+        blob_sha256: str,
+        filename: str,
+        title: str,
+        job_description: Optional[str],
+        owner_id: int,
+    ) -> asyncio.Task:
+        return UploadPipeline._spawn(
+            UploadPipeline.run(job_id, blob_sha256, filename, title, job_description, owner_id)
+        )
+
+    @staticmethod
+    def _spawn(coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        UploadPipeline._tasks.add(task)
+        task.add_done_callback(UploadPipeline._tasks.discard)
+        return task
+
+    @staticmethod
+    async def run(
+        job_id: str,
+        blob_sha256: str,
+        filename: str,
+        title: str,
+        job_description: Optional[str],
+        owner_id: int,
+    ) -> None:
+        # Smart detection: short input = role name; long input = full job description
+        user_target_role = None
+        jd_text = None
+        if job_description:
+            if len(job_description.strip()) < 80:
+                # User typed a role name (e.g. "Devops", "Data Scientist")
+                user_target_role = job_description.strip()
+            else:
+                # User pasted a full job description
+                jd_text = job_description
+
+        resume_id = None
+        try:
+            async with UploadPipeline._stage(job_id, "extract"):
+                extracted_text, parsed_sections = await UploadPipeline._extract(blob_sha256, filename)
+            if not extracted_text:
+                logger.warning(f"File {filename} yielded zero text.")
+                await UploadPipeline._update_job(job_id, status="failed", error=_NO_TEXT_ERROR)
+                return
+
+            async with UploadPipeline._stage(job_id, "score"):
+                from app.services.ats_scoring_service import ATSScoringService
+                analysis_result = await ATSScoringService.calculate_score(
+                    extracted_text,
+                    job_description=jd_text,
+                    target_role=user_target_role,
+                )
+                resume_id = await asyncio.to_thread(
+                    UploadPipeline._save_resume,
+                    extracted_text, parsed_sections, analysis_result, filename,
+                    blob_key(blob_sha256), title, owner_id,
+                )
+                await UploadPipeline._update_job(job_id, resume_id=resume_id)
+                UploadPipeline._spawn(UploadPipeline._warm_structure(extracted_text, parsed_sections))
+
+            async with UploadPipeline._stage(job_id, "predict"):
+                rewrite_role = (
+                    user_target_role
+                    or analysis_result.get("predicted_role")
+                    or await asyncio.to_thread(UploadPipeline._predict_role, extracted_text)
+                )
+
+            async with UploadPipeline._stage(job_id, "rewrite"):
+                await UploadPipeline._rewrite(resume_id, rewrite_role)
+
+            await UploadPipeline._update_job(job_id, status="completed")
+        except Exception as e:
+            logger.error(f"Upload job {job_id} failed: {e}")
+            await UploadPipeline._update_job(job_id, status="failed", error=str(e))
+        finally:
+            if resume_id is None:
+                await asyncio.to_thread(get_blob_store().release, blob_sha256)
+
+    # ── stages ──
+
+    @staticmethod
+    async def _extract(blob_sha256: str, filename: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        (text, sections) for the blob — from the extraction cache when this
+        content was seen before.  If the OCR pool is saturated, wait as it
+        suggests and try again.
+        """
+        from app.services.file_parser_service import AIRawParser
+        store = get_blob_store()
+        cached = await asyncio.to_thread(store.get_extraction, blob_sha256)
+        if cached is not None:
+            logger.info(f"{filename}: identical upload seen before — reusing its extracted text")
+            return cached
+
+        document = None
+        for attempt in range(_OCR_BUSY_RETRIES + 1):
+            try:
+                async with store.local_path(blob_sha256) as path:
+                    document = await AIRawParser.extract_document(path, filename)
+                break
+            except OCRQueueFull as e:
+                if attempt == _OCR_BUSY_RETRIES:
+                    raise
+                logger.info(f"OCR pool busy — retrying extraction of {filename} in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+        if document is None or not document.text:
+            return "", {}
+
+        # Segment now, while the layout's heading hints are at hand
+        parsed_sections = AIRawParser.extract_sections(document.text, document.headings, document.layout)
+        await asyncio.to_thread(store.save_extraction, blob_sha256, document.text, parsed_sections)
+        return document.text, parsed_sections
+
+    @staticmethod
+    def _save_resume(
+        extracted_text: str,
+        parsed_sections: Dict[str, Any],
+        analysis_result: Dict[str, Any],
+        filename: str,
+        file_path: str,
+        title: str,
+        owner_id: int,
+    ) -> int:
+        db = SessionLocal()
+        try:
+            db_resume = Resume(
+                title=title,
+                file_path=file_path,
+                file_type=filename.split('.')[-1],
+                content_text=extracted_text,
+                parsed_data=parsed_sections,
+                ats_score=analysis_result["ats_score"],
+                score_breakdown=analysis_result["breakdown"],
+                missing_keywords=analysis_result.get("missing_skills", []),
+                owner_id=owner_id,
+                # ✅ Use Gemini-predicted role immediately — no more "Analyzing..." placeholder
+                predicted_role=analysis_result.get("predicted_role", "Analyzing..."),
+                ai_rewritten_content=None,
+                analysis=analysis_result.get("analysis"),
+                suggestions=analysis_result.get("suggestions"),
+                key_strengths=analysis_result.get("key_strengths"),
+                market_readiness=analysis_result.get("breakdown", {}).get("market_readiness", 85)
+            )
+            db.add(db_resume)
+            db.flush()
+            ScorePercentileService.record(db, db_resume)   # same transaction as the insert (see rebuild())
+            db.commit()
+            db.refresh(db_resume)
+            UserStatsService.record_resume(db, db_resume)
+
+            # Auto-create version snapshot for tracking
+            try:
+                snapshot = ResumeVersion(
+                    resume_id=db_resume.id,
+                    owner_id=owner_id,
+                    version_number=1,
+                    title=f"v1 - {title}",
+                    ats_score=db_resume.ats_score,
+                    predicted_role=db_resume.predicted_role,
+                    score_breakdown=db_resume.score_breakdown,
+                    missing_skills=db_resume.missing_keywords,
+                    key_strengths=db_resume.key_strengths,
+                )
+                db.add(snapshot)
+                db.commit()
+                UserStatsService.record_snapshot(db, snapshot)
+            except Exception as e:
+                db.rollback()
+                logger.warning("Auto-snapshot failed: %s", e)
+            return db_resume.id
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _warm_structure(extracted_text: str, parsed_sections: Dict[str, Any]) -> None:
+        """Structured data for the builders / LaTeX export, off the job's critical path."""
+        from app.services.resume_structure_service import ResumeStructureService
+        try:
+            await ResumeStructureService.extract(extracted_text, parsed_sections)
+        except Exception as e:
+            logger.warning("Structured resume warm-up failed: %s", e)
+
+    @staticmethod
+    def _predict_role(extracted_text: str) -> str:
+        from app.services.job_prediction_service import JobPredictionService
+        logger.info("No target role specified — predicting from resume...")
+        predicted = JobPredictionService.predict_job_role(extracted_text)
+        if predicted and isinstance(predicted, list):
+            return predicted[0].get('role', 'Software Engineer')
+        return "Software Engineer"
+
+    @staticmethod
+    async def _rewrite(resume_id: int, target_role: str) -> None:
+        """
+        Hand the rewrite to the durable task queue and wait (bounded) for it,
+        so the stage timing covers it; a slow queue just leaves it running.
+        Fails the stage when no worker claims the task within
+        UPLOAD_REWRITE_PICKUP_SECONDS (it stays queued for a later worker).
+        """
+        started = time.monotonic()
+        task_id = await asyncio.to_thread(
+            TaskQueue.enqueue,
+            "resume_rewrite",
+            {"resume_id": resume_id, "target_role": target_role},
+            idempotency_key=f"resume_rewrite:{resume_id}:{target_role}",
+            lane="interactive",
+        )
+        if not await TaskQueue.wait_for_pickup(task_id, settings.UPLOAD_REWRITE_PICKUP_SECONDS):
+            raise RuntimeError(
+                "AI rewrite is queued but no task worker is running. Start `python -m app.task_worker run` "
+                "or set TASK_QUEUE_EMBEDDED_WORKER=true on the API."
+            )
+        remaining = settings.UPLOAD_REWRITE_WAIT_SECONDS - (time.monotonic() - started)
+        status = await TaskQueue.wait(task_id, max(remaining, 0.0))
+        if status not in TASK_TERMINAL_STATUSES:
+            logger.info(f"Rewrite task {task_id} for resume {resume_id} still {status} — continuing in the queue")
+
+
+# ─── TASK HANDLERS ───────────────────────────────────────────────────────────
+
+def _load_resume_text(resume_id: int) -> Optional[Tuple[Optional[str]]]:
+    db = SessionLocal()
+    try:
+        return db.query(Resume.content_text).filter(Resume.id == resume_id).first()
+    finally:
+        db.close()
+
+
+def _store_rewrite(resume_id: int, text: str) -> bool:
+    db = SessionLocal()
+    try:
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        if not resume:
+            return False
+        resume.ai_rewritten_content = text
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def _rewrite_gave_up(payload: Dict[str, Any], error: str) -> None:
+    _store_rewrite(payload["resume_id"], _REWRITE_FAILED_TEXT)
+
+
+@task_handler("resume_rewrite", on_give_up=_rewrite_gave_up)
+async def rewrite_resume_task(payload: Dict[str, Any]) -> None:
+    """
+    Full-resume rewrite for `target_role`; raises on provider failure —
+    PermanentTaskError (no retry) for a missing key, spent credits or a 4xx.
+    """
+    from app.services.ai_rewrite_service import AIRewriteService
+    resume_id, target_role = payload["resume_id"], payload["target_role"]
+
+    row = await asyncio.to_thread(_load_resume_text, resume_id)
+    if row is None:
+        logger.error(f"Resume {resume_id} not found in DB during rewrite.")
+        return
+
+    logger.info(f"Rewriting resume {resume_id} for role: {target_role}...")
+    rewritten = await AIRewriteService.rewrite_section(
+        text=(row[0] or "")[:4000],
+        section_type="Entire Resume",
+        target_role=target_role,
+        company_type="MNC",
+    )
+    # rewrite_section reports provider errors as text rather than raising
+    if rewritten.startswith(("Rewrite failed", "Rewrite timed out")):
+        if permanent_provider_error(rewritten):
+            raise PermanentTaskError(rewritten)
+        raise RuntimeError(rewritten)
+    if await asyncio.to_thread(_store_rewrite, resume_id, rewritten):
+        logger.info(f"Resume {resume_id} rewrite saved to DB.")
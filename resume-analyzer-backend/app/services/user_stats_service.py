@@ -0,0 +1,281 @@
+"""
+Per-User Analytics Rollups
+==========================
+The dashboard endpoints (AnalyticsService.get_user_analytics, /user-stats,
+/applications/stats) read one `user_stats` row instead of re-aggregating
+every resume and application the user owns.
+
+  - Writers call record_resume / record_snapshot / record_applications
+    right after committing; the row is locked (FOR UPDATE on Postgres) and
+    folded forward — counters, score sum / min / max, weekday / month / day
+    buckets, skill counts
+  - A user without a row (new, or never backfilled) gets one built from
+    the base tables on first read or write — rebuild() folds the stored
+    rows through the same update functions, so both paths agree.  Counts
+    are of stored rows: a snapshot pruned by the per-resume retention
+    limit is subtracted when its replacement is recorded
+  - If an incremental update fails, the row is dropped rather than left
+    wrong; the next read rebuilds it
+  - Backfill:  python -m app.task_worker backfill-user-stats
+
+Day buckets are kept for the last ACTIVITY_WINDOW_DAYS only, so a row stays
+small however many resumes a user uploads.  Resumes are never deleted or
+re-scored in this codebase; a path that does either must call rebuild().
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.all_models import Resume, ResumeVersion, User, UserStats
+from app.models.application import Application
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_WINDOW_DAYS = 30
+WEEKDAYS = ("Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+
+
+def _utc(moment: Optional[datetime]) -> datetime:
+    """Naive UTC (SQLite returns naive timestamps, Postgres aware ones)."""
+    if moment is None:
+        return datetime.utcnow()
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _bump(buckets: Optional[Dict[str, int]], key: str) -> Dict[str, int]:
+    # JSON columns only persist on reassignment, so always return a new dict
+    updated = dict(buckets or {})
+    updated[key] = updated.get(key, 0) + 1
+    return updated
+
+
+def _trim(buckets: Optional[Dict[str, int]], now: datetime) -> Dict[str, int]:
+    oldest = (now - timedelta(days=ACTIVITY_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    return {day: n for day, n in (buckets or {}).items() if day >= oldest}
+
+
+def _empty(user_id: int) -> UserStats:
+    return UserStats(
+        user_id=user_id, resume_count=0, scored_count=0, ats_score_sum=0.0,
+        weekday_uploads=[0] * 7, monthly_uploads={}, daily_uploads={}, skill_counts={},
+        snapshot_count=0, application_count=0, applications_applied=0, applications_failed=0,
+        daily_applications={},
+    )
+
+
+# ─── FOLD FUNCTIONS (shared by incremental updates and rebuild) ──────────────
+
+def _add_resume(stats: UserStats, created_at: Optional[datetime], ats_score: Optional[float],
+                score_breakdown: Optional[Dict[str, Any]]) -> None:
+    at = _utc(created_at)
+    stats.resume_count += 1
+    if ats_score is not None:
+        stats.scored_count += 1
+        stats.ats_score_sum += ats_score
+        stats.ats_score_max = ats_score if stats.ats_score_max is None else max(stats.ats_score_max, ats_score)
+        stats.ats_score_min = ats_score if stats.ats_score_min is None else min(stats.ats_score_min, ats_score)
+    stats.first_upload_at = at if stats.first_upload_at is None else min(stats.first_upload_at, at)
+    stats.last_upload_at = at if stats.last_upload_at is None else max(stats.last_upload_at, at)
+
+    weekdays = list(stats.weekday_uploads or [0] * 7)
+    weekdays[(at.weekday() + 1) % 7] += 1   # Python: Monday = 0 → Sunday-first
+    stats.weekday_uploads = weekdays
+    stats.monthly_uploads = _bump(stats.monthly_uploads, at.strftime("%Y-%m"))
+    stats.daily_uploads = _bump(stats.daily_uploads, at.strftime("%Y-%m-%d"))
+
+    skills = (score_breakdown or {}).get("extracted_skills") or []
+    if skills:
+        counts = dict(stats.skill_counts or {})
+        for skill in set(skills):
+            counts[skill] = counts.get(skill, 0) + 1
+        stats.skill_counts = counts
+
+
+def _add_snapshot(stats: UserStats, created_at: Optional[datetime], ats_score: Optional[float]) -> None:
+    at = _utc(created_at)
+    stats.snapshot_count += 1
+    if stats.latest_snapshot_at is None or at >= stats.latest_snapshot_at:
+        stats.latest_snapshot_at = at
+        stats.latest_snapshot_score = ats_score
+
+
+def _remove_snapshots(stats: UserStats, count: int) -> None:
+    # Only the oldest versions are pruned, so the latest snapshot is unaffected
+    stats.snapshot_count = max(stats.snapshot_count - count, 0)
+
+
+def _add_application(stats: UserStats, applied_at: Optional[datetime], status: Optional[str]) -> None:
+    stats.application_count += 1
+    if status == "applied":
+        stats.applications_applied += 1
+    elif status == "failed":
+        stats.applications_failed += 1
+    stats.daily_applications = _bump(stats.daily_applications, _utc(applied_at).strftime("%Y-%m-%d"))
+
+
+class UserStatsService:
+    """Read, update and rebuild `user_stats` rows."""
+
+    # ─── READ ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def get(db: Session, user_id: int) -> UserStats:
+        """The user's rollup, built from the base tables if it does not exist yet."""
+        stats = db.get(UserStats, user_id)
+        if stats is None:
+            stats = UserStatsService.rebuild(db, user_id)
+        return stats
+
+    @staticmethod
+    def summary(stats: UserStats, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Derived figures the endpoints report (averages, windows, most active day, top skills)."""
+        now = now or datetime.utcnow()
+        window_start = (now - timedelta(days=ACTIVITY_WINDOW_DAYS)).strftime("%Y-%m-%d")
+        weekdays = stats.weekday_uploads or [0] * 7
+        skills = stats.skill_counts or {}
+        return {
+            "total_resumes": stats.resume_count,
+            "average_ats_score": stats.ats_score_sum / stats.scored_count if stats.scored_count else 0.0,
+            "highest_score": stats.ats_score_max or 0.0,
+            "lowest_score": stats.ats_score_min or 0.0,
+            "first_upload_at": stats.first_upload_at,
+            "last_upload_at": stats.last_upload_at,
+            "resumes_this_month": (stats.monthly_uploads or {}).get(now.strftime("%Y-%m"), 0),
+            "resumes_last_30_days": sum(n for day, n in (stats.daily_uploads or {}).items() if day >= window_start),
+            "most_active_day": WEEKDAYS[weekdays.index(max(weekdays))] if any(weekdays) else "N/A",
+            "unique_skills": len(skills),
+            "top_skills": sorted(skills, key=lambda s: (-skills[s], s))[:15],
+            "snapshots": stats.snapshot_count,
+            "latest_snapshot_score": stats.latest_snapshot_score,
+            "applications_total": stats.application_count,
+            "applications_applied": stats.applications_applied,
+            "applications_failed": stats.applications_failed,
+            "applications_last_30_days": sum(
+                n for day, n in (stats.daily_applications or {}).items() if day >= window_start
+            ),
+        }
+
+    # ─── INCREMENTAL UPDATES (call after the write has committed) ───────────
+
+    @staticmethod
+    def record_resume(db: Session, resume: Resume) -> None:
+        UserStatsService._apply(db, resume.owner_id, lambda stats: _add_resume(
+            stats, resume.created_at, resume.ats_score, resume.score_breakdown,
+        ))
+
+    @staticmethod
+    def record_snapshot(db: Session, version: ResumeVersion, pruned: int = 0) -> None:
+        """`version` was stored and `pruned` older versions were deleted to make room."""
+        def update(stats: UserStats) -> None:
+            _add_snapshot(stats, version.created_at, version.ats_score)
+            _remove_snapshots(stats, pruned)
+
+        UserStatsService._apply(db, version.owner_id, update)
+
+    @staticmethod
+    def record_applications(db: Session, user_id: int, applications: Iterable[Application]) -> None:
+        applications = list(applications)
+        if not applications:
+            return
+
+        def update(stats: UserStats) -> None:
+            for application in applications:
+                _add_application(stats, application.applied_at, application.status)
+
+        UserStatsService._apply(db, user_id, update)
+
+    @staticmethod
+    def _apply(db: Session, user_id: int, update: Callable[[UserStats], None]) -> None:
+        try:
+            stats = db.query(UserStats).filter(UserStats.user_id == user_id).with_for_update().first()
+            if stats is None:
+                # No rollup yet: the tables already hold this write, so build from them
+                UserStatsService.rebuild(db, user_id)
+                return
+            update(stats)
+            now = datetime.utcnow()
+            stats.daily_uploads = _trim(stats.daily_uploads, now)
+            stats.daily_applications = _trim(stats.daily_applications, now)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("user_stats update for user %s failed (%s) — dropping the row for rebuild", user_id, e)
+            UserStatsService.discard(db, user_id)
+
+    @staticmethod
+    def discard(db: Session, user_id: int) -> None:
+        """Delete a user's rollup; the next read rebuilds it."""
+        try:
+            db.query(UserStats).filter(UserStats.user_id == user_id).delete()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Could not drop user_stats row for user %s: %s", user_id, e)
+
+    # ─── REBUILD / BACKFILL ──────────────────────────────────────────────────
+
+    @staticmethod
+    def compute(db: Session, user_id: int) -> UserStats:
+        """A fresh (unsaved) rollup folded from the user's stored rows — projected columns only."""
+        stats = _empty(user_id)
+        resumes = (
+            db.query(Resume.created_at, Resume.ats_score, Resume.score_breakdown)
+            .filter(Resume.owner_id == user_id)
+            .order_by(Resume.created_at, Resume.id)
+        )
+        for created_at, ats_score, score_breakdown in resumes.yield_per(500):
+            _add_resume(stats, created_at, ats_score, score_breakdown)
+        snapshots = (
+            db.query(ResumeVersion.created_at, ResumeVersion.ats_score)
+            .filter(ResumeVersion.owner_id == user_id)
+            .order_by(ResumeVersion.created_at, ResumeVersion.id)
+        )
+        for created_at, ats_score in snapshots:
+            _add_snapshot(stats, created_at, ats_score)
+        applications = (
+            db.query(Application.applied_at, Application.status)
+            .filter(Application.user_id == user_id)
+        )
+        for applied_at, status in applications.yield_per(1000):
+            _add_application(stats, applied_at, status)
+        now = datetime.utcnow()
+        stats.daily_uploads = _trim(stats.daily_uploads, now)
+        stats.daily_applications = _trim(stats.daily_applications, now)
+        return stats
+
+    @staticmethod
+    def rebuild(db: Session, user_id: int) -> UserStats:
+        """Recompute a user's rollup from the base tables and save it (insert or replace)."""
+        stats = db.merge(UserStatsService.compute(db, user_id))
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request inserted the row first; theirs is as fresh as ours
+            db.rollback()
+            stats = db.get(UserStats, user_id)
+        return stats
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 500, missing_only: bool = False) -> int:
+        """Rebuild rollups for every user (or only those without one); returns the number rebuilt."""
+        rebuilt = 0
+        last_id = 0
+        while True:
+            query = db.query(User.id).filter(User.id > last_id)
+            if missing_only:
+                query = query.outerjoin(UserStats, UserStats.user_id == User.id).filter(UserStats.user_id.is_(None))
+            user_ids: List[int] = [row.id for row in query.order_by(User.id).limit(batch_size)]
+            if not user_ids:
+                return rebuilt
+            for user_id in user_ids:
+                UserStatsService.rebuild(db, user_id)
+                rebuilt += 1
+            db.expunge_all()
+            last_id = user_ids[-1]
+            logger.info("user_stats backfill: %d users rebuilt (through id %d)", rebuilt, last_id)
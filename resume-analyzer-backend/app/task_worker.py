@@ -0,0 +1,136 @@
+"""
+Task queue worker CLI (see app/core/task_queue.py).
+
+    python -m app.task_worker run [--lanes interactive,batch] [--concurrency 2]
+    python -m app.task_worker backfill-rewrites [--limit 200]
+    python -m app.task_worker backfill-user-stats [--batch-size 500] [--missing-only]
+    python -m app.task_worker rebuild-percentiles
+    python -m app.task_worker stats
+
+`run` is the dedicated worker entrypoint (Procfile "worker"), so rewrites
+scale separately from request handling; the API then runs with
+TASK_QUEUE_EMBEDDED_WORKER=false.  Without one, each API process runs an
+embedded worker (the default).
+"""
+
+import sys
+import json
+import signal
+import asyncio
+import logging
+import argparse
+
+from app.core.config import settings
+from app.core.task_queue import LANES, TaskQueue, TaskWorker
+from app.db.session import SessionLocal, engine
+from app.models import all_models
+from app.models.all_models import Resume
+from app.services.score_percentile_service import ScorePercentileService
+from app.services.user_stats_service import UserStatsService
+
+# Importing the modules registers their task handlers
+import app.services.upload_pipeline  # noqa: F401  (resume_rewrite, score_percentiles_rebuild)
+
+logger = logging.getLogger("app.task_worker")
+
+_REWRITE_FAILED_PREFIX = "AI rewrite failed"
+
+
+def _run(args) -> None:
+    lanes = [lane.strip() for lane in args.lanes.split(",") if lane.strip()]
+    unknown = [lane for lane in lanes if lane not in LANES]
+    if unknown:
+        sys.exit(f"Unknown lane(s): {', '.join(unknown)} (choose from {', '.join(LANES)})")
+
+    worker = TaskWorker(lanes=lanes, concurrency=args.concurrency, poll_interval=args.poll_interval)
+    # Finish the tasks in hand on SIGTERM / Ctrl-C instead of abandoning their leases
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: worker.stop())
+    asyncio.run(worker.run())
+
+
+def _backfill_rewrites(args) -> None:
+    """Queue batch-lane rewrites for resumes that have none (or whose rewrite failed)."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Resume.id, Resume.predicted_role)
+            .filter(
+                (Resume.ai_rewritten_content.is_(None))
+                | (Resume.ai_rewritten_content.like(f"{_REWRITE_FAILED_PREFIX}%"))
+            )
+            .order_by(Resume.id.desc())
+            .limit(args.limit)
+            .all()
+        )
+    finally:
+        db.close()
+
+    for resume_id, role in rows:
+        role = role if role and role != "Analyzing..." else "Software Engineer"
+        TaskQueue.enqueue(
+            "resume_rewrite",
+            {"resume_id": resume_id, "target_role": role},
+            idempotency_key=f"resume_rewrite:{resume_id}:{role}",
+            lane="batch",
+        )
+    print(f"Queued {len(rows)} rewrite task(s) on the batch lane")
+
+
+def _backfill_user_stats(args) -> None:
+    """Rebuild per-user analytics rollups from the resume / version / application tables."""
+    db = SessionLocal()
+    try:
+        rebuilt = UserStatsService.backfill(db, batch_size=args.batch_size, missing_only=args.missing_only)
+    finally:
+        db.close()
+    print(f"Rebuilt user_stats for {rebuilt} user(s)")
+
+
+def _rebuild_percentiles(args) -> None:
+    """Recompute the /benchmark score distributions from the resumes table."""
+    db = SessionLocal()
+    try:
+        scanned = ScorePercentileService.rebuild(db)
+    finally:
+        db.close()
+    print(f"Rebuilt score distributions from {scanned} resume(s)")
+
+
+def _stats(args) -> None:
+    print(json.dumps(TaskQueue.stats(), indent=2))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.task_worker", description="Durable task queue worker")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="claim and execute tasks until stopped")
+    run.add_argument("--lanes", default=",".join(LANES), help="comma-separated lanes to serve")
+    run.add_argument("--concurrency", type=int, default=settings.TASK_WORKER_CONCURRENCY)
+    run.add_argument("--poll-interval", type=float, default=1.0, help="seconds to sleep when idle")
+    run.set_defaults(func=_run)
+
+    backfill = sub.add_parser("backfill-rewrites", help="queue rewrites for resumes missing one (batch lane)")
+    backfill.add_argument("--limit", type=int, default=200)
+    backfill.set_defaults(func=_backfill_rewrites)
+
+    user_stats = sub.add_parser("backfill-user-stats", help="rebuild per-user analytics rollups")
+    user_stats.add_argument("--batch-size", type=int, default=500)
+    user_stats.add_argument("--missing-only", action="store_true", help="skip users that already have a rollup")
+    user_stats.set_defaults(func=_backfill_user_stats)
+
+    percentiles = sub.add_parser("rebuild-percentiles", help="recompute /benchmark score distributions")
+    percentiles.set_defaults(func=_rebuild_percentiles)
+
+    stats = sub.add_parser("stats", help="task counts per lane and status")
+    stats.set_defaults(func=_stats)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-7s | %(name)s | %(message)s")
+    all_models.Base.metadata.create_all(bind=engine)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Load benchmark — sync Session in the threadpool vs AsyncSession on the loop.
+
+Each simulated request does what an authenticated resume listing does: load
+the user by primary key, then select their resumes.  The "sync" variant runs
+that on a Session via anyio's threadpool (how FastAPI runs a `def` handler,
+40 threads by default); the "async" variant awaits it on an AsyncSession.
+Both engines use the DB_POOL_SIZE / DB_MAX_OVERFLOW pool from config.
+
+"threadpool wait" is how long a trivial threadpool call (standing in for the
+app's remaining sync handlers and file parsing) waits for a thread while the
+load runs: sync DB handlers hold threads while they queue for a pool
+connection; async ones hold none.
+
+Backends:
+  - sqlite      a fresh SQLite file (aiosqlite for the async engine)
+  - pg-standin  the same file with RTT_MS of injected latency per statement,
+                standing in for a network round trip to Postgres: the sync
+                engine sleeps its thread, the async engine awaits
+  - --url       a real database, e.g. postgresql://user:pw@host/db
+                (tables are created; rows are seeded under bench-*@example.com)
+
+Usage (from resume-analyzer-backend/):
+    python scripts/bench_db_async.py [--requests 2000] [--concurrency 100] [--rtt-ms 2] [--url URL]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anyio  # noqa: E402
+from sqlalchemy import create_engine, event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+from sqlalchemy.util import await_only  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import async_database_url  # noqa: E402
+from app.models.all_models import Base, Resume, User  # noqa: E402
+
+USERS = 50
+RESUMES_PER_USER = 5
+THREADPOOL_TOKENS = 40      # anyio's default, which FastAPI inherits
+
+
+def _pool_kwargs(url: str) -> dict:
+    kwargs = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    return kwargs
+
+
+def seed(url: str) -> list:
+    """Create tables and bench rows; returns the bench user ids."""
+    engine = create_engine(url, **_pool_kwargs(url))
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        ids = []
+        for i in range(USERS):
+            email = f"bench-{i}@example.com"
+            user = db.scalar(select(User).where(User.email == email))
+            if user is None:
+                user = User(email=email, full_name=f"Bench {i}", hashed_password="x")
+                db.add(user)
+                db.flush()
+                db.add_all(
+                    Resume(owner_id=user.id, title=f"Resume {j}", file_path=f"bench/{i}_{j}.pdf",
+                           content_text="Python SQL " * 200, ats_score=60 + j)
+                    for j in range(RESUMES_PER_USER)
+                )
+            ids.append(user.id)
+        db.commit()
+    engine.dispose()
+    return ids
+
+
+def sync_engine(url: str, rtt: float):
+    engine = create_engine(url, **_pool_kwargs(url))
+    if rtt:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _round_trip(*_):
+            time.sleep(rtt)
+    return engine
+
+
+def async_engine(url: str, rtt: float):
+    kwargs = _pool_kwargs(url)
+    if url.startswith("sqlite"):
+        kwargs["poolclass"] = AsyncAdaptedQueuePool   # aiosqlite defaults to NullPool
+    engine = create_async_engine(async_database_url(url), **kwargs)
+    if rtt:
+        # Hooks run inside SQLAlchemy's greenlet, so they can await the loop
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _round_trip(*_):
+            await_only(asyncio.sleep(rtt))
+    return engine
+
+
+async def run_sync(url: str, rtt: float, user_ids: list, requests: int, concurrency: int, limiter) -> list:
+    engine = sync_engine(url, rtt)
+    Session = sessionmaker(bind=engine)
+
+    def handler(user_id: int) -> int:
+        with Session() as db:
+            user = db.get(User, user_id)
+            return len(db.scalars(select(Resume).where(Resume.owner_id == user.id)).all())
+
+    async def one(user_id: int) -> None:
+        await anyio.to_thread.run_sync(handler, user_id, limiter=limiter)
+
+    try:
+        return await _drive(one, user_ids, requests, concurrency)
+    finally:
+        engine.dispose()
+
+
+async def run_async(url: str, rtt: float, user_ids: list, requests: int, concurrency: int, limiter) -> list:
+    engine = async_engine(url, rtt)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def one(user_id: int) -> None:
+        async with Session() as db:
+            user = await db.get(User, user_id)
+            (await db.scalars(select(Resume).where(Resume.owner_id == user.id))).all()
+
+    try:
+        return await _drive(one, user_ids, requests, concurrency)
+    finally:
+        await engine.dispose()
+
+
+async def _drive(one, user_ids: list, requests: int, concurrency: int) -> list:
+    """`requests` calls, at most `concurrency` in flight; returns per-request latencies (s)."""
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed(i: int) -> None:
+        async with gate:
+            t0 = time.perf_counter()
+            await one(user_ids[i % len(user_ids)])
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(timed(i) for i in range(requests)))
+    return latencies
+
+
+async def _with_probe(runner, *args) -> tuple:
+    """Run `runner` while timing trivial calls through the same threadpool limiter."""
+    limiter = anyio.CapacityLimiter(THREADPOOL_TOKENS)
+    waits = []
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await anyio.to_thread.run_sync(lambda: None, limiter=limiter)
+            waits.append(time.perf_counter() - t0)
+            await asyncio.sleep(0.01)
+
+    probe_task = asyncio.create_task(probe())
+    try:
+        latencies = await runner(*args, limiter)
+    finally:
+        done.set()
+        await probe_task
+    return latencies, waits
+
+
+def _p95(values: list) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+
+
+def report(label: str, latencies: list, waits: list, wall: float) -> None:
+    print(f"  {label:<6} {len(latencies) / wall:8.0f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms   p95 {_p95(latencies) * 1000:7.1f} ms   "
+          f"threadpool wait p95 {_p95(waits) * 1000:7.1f} ms")
+
+
+def bench(name: str, url: str, rtt: float, args) -> None:
+    user_ids = seed(url)
+    print(f"{name}: {args.requests} requests, concurrency {args.concurrency}, "
+          f"pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}"
+          + (f", +{rtt * 1000:g} ms per statement" if rtt else ""))
+    for label, runner in (("sync", run_sync), ("async", run_async)):
+        t0 = time.perf_counter()
+        latencies, waits = asyncio.run(_with_probe(runner, url, rtt, user_ids, args.requests, args.concurrency))
+        report(label, latencies, waits, time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="injected latency for pg-standin")
+    parser.add_argument("--url", help="benchmark a real database instead of the SQLite stand-ins")
+    args = parser.parse_args()
+
+    if args.url:
+        bench(args.url.split("://", 1)[0], args.url, 0.0, args)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        bench("sqlite", url, 0.0, args)
+        bench("pg-standin", url, args.rtt_ms / 1000, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Microbenchmark — keyword scoring on a ~5,000-word resume.
+
+Compares the single-pass ResumeFeatures extractor (+ pure sub-scores) against
+the legacy multi-scan approach, copied below from the pre-optimisation tree:
+a substring scan per ontology skill and synonym, 8 metric findalls, 70+
+section substring checks, a separate split/strip for verbs, a separate number
+findall, and a separate relevance tokenisation.
+
+Usage (from resume-analyzer-backend/):
+    python scripts/bench_keyword_scoring.py [words] [repeats]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ai_scoring_engine import (  # noqa: E402
+    ResumeFeatures, STRONG_VERBS, WEAK_VERBS,
+    score_relevance, score_skill_coverage, score_experience_depth,
+    score_structure, score_verb_quality, score_quantification, template_words,
+)
+from app.services.ai_skill_ontology import SkillOntology  # noqa: E402
+
+SAMPLE = """
+JOHN DOE — Backend Engineer | john@example.com | github.com/johndoe
+Professional Summary: Engineer with 5+ years building distributed systems.
+Experience: Architected a payments platform serving 2 million users; reduced
+p99 latency by 40% and saved $120,000 per year. Led 6 members; delivered 3x faster
+releases. Helped migrate 30+ endpoints to FastAPI, Docker and Kubernetes on AWS.
+Projects: Built a recommendation engine in Python with PyTorch; ranked top 5 in
+a national hackathon. Skills: Python, Go, SQL, PostgreSQL, Redis, Kafka, React.
+Education: B.Tech Computer Science, XYZ University, CGPA 8.9 (2016-2020).
+Certifications: AWS Certified Developer. Volunteer mentor at an open source club.
+"""
+
+TEMPLATE = ("Backend Developer Python Java Node.js SQL PostgreSQL MongoDB REST API GraphQL "
+            "microservices Docker Kubernetes authentication caching message queue Redis")
+
+# ─── LEGACY PATH ─────────────────────────────────────────────────────────────
+# Copied from the pre-optimisation tree (ai_skill_ontology.py / ai_scoring_engine.py)
+# so the baseline does not pick up the compiled skill matcher. The CLUSTERS /
+# SYNONYMS data and the verb lists are unchanged since, so they are shared.
+
+_METRIC_PATTERNS = [
+    r'\d+\s*%',                            # percentages
+    r'\$\s*[\d,]+',                        # dollar amounts
+    r'₹\s*[\d,]+',                         # rupee amounts
+    r'\d+\s*(million|billion|lakh|crore)',  # large numbers
+    r'increased|decreased|improved|reduced|optimized|grew|saved|delivered|boosted|elevated',
+    r'\d+\+?\s*(users|clients|projects|teams|members|customers|endpoints|requests)',
+    r'\d+x\s*(faster|improvement|increase|reduction)',  # multiplier metrics
+    r'(top|first|ranked)\s*\d+',           # rankings
+]
+
+_SECTION_KEYWORDS = {
+    "contact": ["email", "phone", "linkedin", "github", "@", "portfolio", "website"],
+    "summary": ["summary", "objective", "profile", "about me", "professional summary"],
+    "education": ["bachelor", "master", "b.tech", "m.tech", "university", "college",
+                 "degree", "gpa", "cgpa", "diploma", "phd", "mba", "certification"],
+    "experience": ["experience", "internship", "worked", "employed", "company",
+                  "organization", "intern", "full-time", "part-time", "contract"],
+    "skills": ["skills", "technologies", "tools", "languages", "frameworks",
+               "proficiency", "competencies", "technical skills"],
+    "projects": ["project", "built", "developed", "created", "implemented",
+                "portfolio", "capstone", "thesis", "research project"],
+    "achievements": ["award", "winner", "achievement", "rank", "gold", "silver",
+                   "hackathon", "certification", "scholarship", "honor", "dean's list"],
+    "certifications": ["certified", "certification", "certificate", "coursera",
+                     "udemy", "aws certified", "google certified", "microsoft certified"],
+    "publications": ["published", "paper", "journal", "conference", "arxiv",
+                   "ieee", "acm", "research paper"],
+    "extracurricular": ["volunteer", "club", "society", "leadership", "community",
+                      "open source", "contributor", "organizer", "mentor"],
+}
+
+
+def legacy_extract_skills_from_text(text):
+    """Baseline SkillOntology.extract_skills_from_text: one substring scan per skill and synonym."""
+    text_lower = text.lower()
+    found_skills = set()
+
+    for cluster_name, categories in SkillOntology.CLUSTERS.items():
+        for cat_skills in categories.values():
+            for skill in cat_skills:
+                if skill.lower() in text_lower:
+                    found_skills.add(skill)
+
+    # Also check synonyms
+    for synonym, canonical in SkillOntology.SYNONYMS.items():
+        if synonym in text_lower and canonical not in found_skills:
+            found_skills.add(canonical)
+
+    return sorted(list(found_skills))
+
+
+def legacy_relevance(resume_text, target_template):
+    """Baseline AIScoringEngine.calculate_relevance_score."""
+    resume_words = set(re.findall(r'\w+', resume_text.lower()))
+    template = {w for w in re.findall(r'\w+', target_template.lower()) if len(w) > 2}
+    if not template:
+        return 45.0
+    skill_terms = {w for w in template if len(w) > 3}
+    basic_terms = template - skill_terms
+    weighted_match = len(resume_words & skill_terms) * 2 + len(resume_words & basic_terms)
+    weighted_total = len(skill_terms) * 2 + len(basic_terms)
+    return round(min((weighted_match / weighted_total) * 100 * 1.15, 100), 2)
+
+
+def legacy_scores(text, cluster_skills, template_text):
+    """The six sub-scores as the baseline calculate_comprehensive_score computed them."""
+    words = text.split()
+    text_lower = text.lower()
+    legacy_extract_skills_from_text(text)
+
+    relevance = legacy_relevance(text, template_text)
+
+    matched_skills = [s for s in cluster_skills if s.lower() in text_lower]
+    skill_coverage = min((len(matched_skills) / max(len(cluster_skills) * 0.4, 1)) * 100, 100)
+
+    depth_hits = sum(len(re.findall(p, text, re.IGNORECASE)) for p in _METRIC_PATTERNS)
+    experience_depth = min((depth_hits / 8) * 100, 100)
+
+    sections_found = sum(1 for kws in _SECTION_KEYWORDS.values() if any(kw in text_lower for kw in kws))
+    structure = min((sections_found / 7) * 100, 100)
+
+    words_lower = [w.lower().rstrip(".,;:") for w in words]
+    strong = sum(1 for w in words_lower if w in STRONG_VERBS)
+    weak = sum(1 for w in words_lower if w in WEAK_VERBS)
+    verb_quality = (strong / (strong + weak)) * 100 if strong + weak else 30
+
+    meaningful_numbers = [n for n in re.findall(r'\d+', text) if 2 <= len(n) <= 10]
+    quantification = min((len(meaningful_numbers) / 10) * 100, 100)
+
+    return (relevance, (skill_coverage, matched_skills), experience_depth, structure, verb_quality, quantification)
+
+
+# ─── SINGLE PASS ─────────────────────────────────────────────────────────────
+
+def single_pass_scores(text, cluster_skills, template):
+    features = ResumeFeatures(text)
+    return (
+        score_relevance(features, template),
+        score_skill_coverage(features, cluster_skills),
+        score_experience_depth(features),
+        score_structure(features),
+        score_verb_quality(features),
+        score_quantification(features),
+    )
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    target_words = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    text = (SAMPLE * (target_words // len(SAMPLE.split()) + 1))
+    cluster_skills = SkillOntology.get_cluster_skills("Web Development")
+    template = template_words(TEMPLATE)
+
+    legacy_ms = best_of(lambda: legacy_scores(text, cluster_skills, TEMPLATE), repeats)
+    single_ms = best_of(lambda: single_pass_scores(text, cluster_skills, template), repeats)
+
+    print(f"resume: {len(text.split())} words, {len(text)} chars, best of {repeats}")
+    print(f"legacy multi-scan : {legacy_ms:7.2f} ms")
+    print(f"ResumeFeatures    : {single_ms:7.2f} ms  ({legacy_ms / single_ms:.1f}x faster)")
+
+    # Skill coverage may differ by design: the ontology matcher is word-boundary, not substring
+    names = ("relevance", "skill_coverage", "experience_depth", "structure", "verb_quality", "quantification")
+    legacy = legacy_scores(text, cluster_skills, TEMPLATE)
+    single = single_pass_scores(text, cluster_skills, template)
+    differing = [name for name, old, new in zip(names, legacy, single) if old != new]
+    print(f"sub-scores differing from legacy: {', '.join(differing) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Local LLM stub server — speaks just enough of the Gemini and OpenAI REST APIs
+for the pooled clients in app/core/llm_clients.py.
+
+  POST .../models/<model>:generateContent          Gemini
+  POST .../models/<model>:streamGenerateContent    Gemini SSE (alt=sse)
+  POST .../chat/completions                        OpenAI (SSE when "stream": true)
+
+Every request sleeps `--delay` seconds (to simulate model latency) and returns
+`--reply`, so concurrency limits, keep-alive and timeouts can be exercised
+without keys or network.  Streams send the reply word by word, `--delay`
+apart after the first, so time-to-first-byte can be measured.
+
+Usage (from resume-analyzer-backend/):
+    python scripts/llm_stub_server.py --port 8765 --delay 0.5
+    GEMINI_API_BASE=http://127.0.0.1:8765/v1beta OPENAI_API_BASE=http://127.0.0.1:8765/v1 \
+        GEMINI_API_KEY=stub OPENAI_API_KEY=sk-stub uvicorn app.main:app
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = '{"status": "ok", "source": "llm-stub"}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real APIs
+    delay = 0.0
+    reply = DEFAULT_REPLY
+    _lock = threading.Lock()
+    counts = {"gemini": 0, "openai": 0, "concurrent_peak": 0}
+    _active = 0
+
+    def _send_json(self, status: int, body) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_sse(self, events) -> None:
+        """Stream `data:` events, flushing each; the connection closes at the end."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for i, event in enumerate(events):
+            if i:
+                time.sleep(type(self).delay)
+            self.wfile.write(f"data: {event}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        cls = type(self)
+        with cls._lock:
+            cls._active += 1
+            cls.counts["concurrent_peak"] = max(cls.counts["concurrent_peak"], cls._active)
+        path = urlsplit(self.path).path
+        words = re.findall(r"\S+\s*", cls.reply)
+        try:
+            time.sleep(cls.delay)
+            if path.endswith(":streamGenerateContent"):
+                cls.counts["gemini"] += 1
+                self._send_sse(
+                    json.dumps({"candidates": [{"content": {"role": "model", "parts": [{"text": w}]}}]})
+                    for w in words
+                )
+            elif path.endswith("/chat/completions") and payload.get("stream"):
+                cls.counts["openai"] += 1
+                chunks = [json.dumps({"choices": [{"index": 0, "delta": {"content": w}}]}) for w in words]
+                self._send_sse(chunks + ["[DONE]"])
+            elif path.endswith(":generateContent"):
+                cls.counts["gemini"] += 1
+                self._send_json(200, {
+                    "candidates": [{"content": {"role": "model", "parts": [{"text": cls.reply}]}}],
+                })
+            elif path.endswith("/chat/completions"):
+                cls.counts["openai"] += 1
+                self._send_json(200, {
+                    "model": payload.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": cls.reply}}],
+                })
+            else:
+                self._send_json(404, {"error": f"unknown path {self.path}"})
+        finally:
+            with cls._lock:
+                cls._active -= 1
+
+    def do_GET(self):
+        self._send_json(200, dict(type(self).counts))   # request counters
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(port: int = 8765, delay: float = 0.0, reply: str = DEFAULT_REPLY) -> ThreadingHTTPServer:
+    """Start the stub in a daemon thread and return the server (call .shutdown() to stop)."""
+    StubHandler.delay = delay
+    StubHandler.reply = reply
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--reply", default=DEFAULT_REPLY, help="text returned by every completion")
+    args = parser.parse_args()
+    srv = serve(args.port, args.delay, args.reply)
+    print(f"LLM stub listening on http://127.0.0.1:{args.port} (delay={args.delay}s)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
@@ -21,6 +21,17 @@ def H():
     if TOKEN: h["Authorization"] = f"Bearer {TOKEN}"
     return h
 
+def wait_upload(r, timeout=60):
+    """Upload returns 202 + job; poll its result URL until the analysis is ready."""
+    if r.status_code != 202: return r
+    url = BASE.rsplit("/api/v1", 1)[0] + r.json()["result_url"]
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        r = requests.get(url, headers=H(), timeout=10)
+        if r.status_code != 202: return r
+        time.sleep(1)
+    return r
+
 # 1. ROOT
 print("\n--- 1. Root ---")
 try:
@@ -54,6 +65,7 @@ if TOKEN:
         r = requests.post(f"{BASE}/resumes/upload",headers={"Authorization":f"Bearer {TOKEN}"},
             files={"file":("r.txt",txt,"text/plain")},
             data={"title":"Test","job_description":"Python FastAPI dev"},timeout=60)
+        r = wait_upload(r)
         if r.status_code==200:
             RID=r.json().get("id")
             log("PASS","POST /resumes/upload",f"ID:{RID} ATS:{r.json().get('ats_score')}")
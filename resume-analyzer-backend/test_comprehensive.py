@@ -120,6 +120,20 @@ def auth_headers_upload():
     return h
 
 
+def wait_upload(r, timeout=TIMEOUT):
+    """Upload returns 202 + job; poll its result URL until the analysis is ready."""
+    if r.status_code != 202:
+        return r
+    url = DEPLOYED_URL + r.json()["result_url"]
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        r = requests.get(url, headers=headers(), timeout=TIMEOUT)
+        if r.status_code != 202:
+            return r
+        time.sleep(1)
+    return r
+
+
 # =============================================================================
 # TEST GROUPS
 # =============================================================================
@@ -214,6 +228,7 @@ def test_resume_upload():
             data={"title": "Auto Detect Resume", "job_description": ""},
             timeout=TIMEOUT
         )
+        r = wait_upload(r)
         if r.status_code == 200:
             data = r.json()
             RID = data.get("id")
@@ -266,6 +281,7 @@ def test_resume_upload():
             data={"title": "DevOps Resume", "job_description": "DevOps Engineer"},
             timeout=TIMEOUT
         )
+        r = wait_upload(r)
         if r.status_code == 200:
             data = r.json()
             rid2 = data.get("id")
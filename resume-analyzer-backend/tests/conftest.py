@@ -0,0 +1,65 @@
+"""Shared fixtures: every test session runs against a throwaway SQLite database."""
+
+import os
+import tempfile
+import uuid
+
+# Before any app import: app.db.session builds its engines from DATABASE_URL at import time.
+_DB_DIR = tempfile.mkdtemp(prefix="resume-analyzer-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+
+import httpx
+import pytest
+
+from app.core.principal_cache import Principal, invalidate_principal
+from app.db.session import SessionLocal, engine
+from app.models import all_models
+from app.models.all_models import Resume, ResumeVersion, UploadJob, User, UserStats
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    # Uploads spool to ./uploads and blobs default to ./uploads/blobs: keep them out of the checkout
+    cwd = os.getcwd()
+    os.chdir(_DB_DIR)
+    all_models.Base.metadata.create_all(bind=engine)
+    yield
+    engine.dispose()
+    os.chdir(cwd)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    """A fresh user; their resumes, versions, jobs and rollup are removed afterwards."""
+    user = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="x", full_name="Test User")
+    db.add(user)
+    db.commit()
+    yield user
+    db.rollback()
+    for model, column in ((UserStats, UserStats.user_id), (ResumeVersion, ResumeVersion.owner_id),
+                          (UploadJob, UploadJob.owner_id), (Resume, Resume.owner_id)):
+        db.query(model).filter(column == user.id).delete()
+    db.query(User).filter(User.id == user.id).delete()
+    db.commit()
+    invalidate_principal(user.id)   # SQLite reuses the id for the next test's user
+
+
+@pytest.fixture
+def api(user):
+    """An httpx client on the ASGI app, authenticated as `user` (token checks bypassed)."""
+    from app.api import dependencies as deps
+    from app.main import app
+
+    app.dependency_overrides[deps.get_current_user] = lambda: Principal(user.id, user.email, True)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client
+    app.dependency_overrides.pop(deps.get_current_user, None)
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import os
+
+from app.core.blob_store import BlobStore, LocalBlobBackend, blob_digest, blob_key, get_blob_store
+from app.db.session import AsyncSessionLocal
+from app.models.all_models import Resume, StoredBlob
+from app.schemas.all_schemas import ResumeDetailedAnalysis
+from app.services.upload_pipeline import UploadPipeline
+
+RESUME_TEXT = (
+    "Jane Doe\njane@example.com\n\nSUMMARY\nBackend engineer building Python and FastAPI services.\n\n"
+    "SKILLS\nPython, FastAPI, PostgreSQL, Docker, AWS\n\nEXPERIENCE\nSoftware Engineer at Acme\n"
+    "- Built REST APIs serving 2M requests a day\n- Cut p95 latency by 40%\n"
+)
+
+
+def _spool(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path), hashlib.sha256(content).hexdigest(), len(content)
+
+
+def _blob_row(db, digest):
+    db.expire_all()
+    return db.query(StoredBlob).filter(StoredBlob.sha256 == digest).first()
+
+
+def test_identical_uploads_share_one_blob_until_the_last_release(db, tmp_path):
+    store = BlobStore(LocalBlobBackend(str(tmp_path / "blobs")))
+    content = b"%PDF-1.4 the same resume uploaded twice"
+
+    first = store.put(*_spool(tmp_path, "a.pdf", content))
+    path, digest, size = _spool(tmp_path, "b.pdf", content)
+    second = store.put(path, digest, size)
+
+    assert first == second and os.path.exists(first)
+    assert not os.path.exists(path)   # the duplicate spool file was consumed
+    assert (store.stored, store.deduplicated) == (1, 1)
+    assert _blob_row(db, digest).refcount == 2
+
+    store.release(digest)
+    assert os.path.exists(first) and _blob_row(db, digest).refcount == 1
+
+    store.release(digest)
+    assert not os.path.exists(first)
+    assert _blob_row(db, digest) is None
+
+
+def test_blob_key_resolves_back_to_its_digest():
+    digest = hashlib.sha256(b"cv").hexdigest()
+    assert blob_key(digest) == f"blobs/{digest[:2]}/{digest}"
+    assert blob_digest(blob_key(digest)) == digest
+    assert blob_digest(f"s3://bucket/resumes/{digest[:2]}/{digest}") == digest
+    assert blob_digest("uploads/1700000000_cv.pdf") is None
+
+
+def test_responses_never_carry_a_backend_locator(db, user, api):
+    digest = hashlib.sha256(b"legacy row").hexdigest()
+    resume = Resume(title="cv", file_path=f"/srv/app/uploads/blobs/{digest[:2]}/{digest}",
+                    owner_id=user.id, ats_score=70)
+    db.add(resume)
+    db.commit()
+
+    assert ResumeDetailedAnalysis.from_orm(resume).file_path == blob_key(digest)
+    response = asyncio.run(api.get(f"/api/v1/resumes/{resume.id}"))
+    assert response.status_code == 200
+    assert response.json()["file_path"] == blob_key(digest)
+
+
+def test_pipeline_stores_the_blob_key_not_the_locator(db, user, tmp_path, monkeypatch):
+    async def no_rewrite(resume_id, target_role):
+        return None
+
+    monkeypatch.setattr(UploadPipeline, "_rewrite", staticmethod(no_rewrite))
+    path, digest, size = _spool(tmp_path, "cv.txt", RESUME_TEXT.encode())
+    locator = get_blob_store().put(path, digest, size)
+
+    async def upload():
+        async with AsyncSessionLocal() as session:
+            job = await UploadPipeline.create_job(session, user.id, "cv", "cv.txt")
+        await UploadPipeline.run(job.id, digest, "cv.txt", "cv", None, user.id)
+        return job.id
+
+    asyncio.run(upload())
+
+    resume = db.query(Resume).filter(Resume.owner_id == user.id).one()
+    assert resume.file_path == blob_key(digest) != locator
+    assert blob_digest(resume.file_path) == digest
+    get_blob_store().release(digest)
@@ -0,0 +1,42 @@
+from app.api.endpoints.resumes import match_roles_batch
+from app.core.principal_cache import Principal
+from app.core.result_cache import get_analysis_cache
+from app.schemas.all_schemas import BatchRoleMatchRequest
+from app.services.ai_parser_service import AIParserService
+
+
+class _RecordingNLP:
+    """Stands in for the spaCy pipeline: records how nlp.pipe was called."""
+
+    def __init__(self):
+        self.calls = []
+
+    def pipe(self, texts, batch_size, n_process):
+        texts = list(texts)
+        self.calls.append((len(texts), n_process))
+        return [None] * len(texts)
+
+
+def test_batch_endpoint_tags_in_process(monkeypatch):
+    nlp = _RecordingNLP()
+    monkeypatch.setattr(AIParserService, "get_nlp", staticmethod(lambda: nlp))
+    monkeypatch.setattr("app.services.ai_parser_service.os.cpu_count", lambda: 8)
+    get_analysis_cache().clear()
+    texts = [f"Candidate {i}\nSKILLS\nPython, SQL, Docker" for i in range(200)]
+
+    response = match_roles_batch(BatchRoleMatchRequest(texts=texts, top_k=3, include_profiles=True),
+                                 current_user=Principal(1, "a@example.com", True))
+
+    assert len(response["profiles"]) == len(texts)
+    assert nlp.calls == [(200, 1)]
+
+
+def test_offline_batches_use_a_process_per_full_batch(monkeypatch):
+    nlp = _RecordingNLP()
+    monkeypatch.setattr(AIParserService, "get_nlp", staticmethod(lambda: nlp))
+    monkeypatch.setattr("app.services.ai_parser_service.os.cpu_count", lambda: 8)
+    monkeypatch.setattr("app.services.ai_parser_service.settings.SPACY_PIPE_PROCESSES", 0)
+    get_analysis_cache().clear()
+
+    AIParserService.extract_structured_data_many([f"Offline candidate {i}" for i in range(100)])
+    assert nlp.calls == [(100, 3)]   # 100 texts / batches of 32
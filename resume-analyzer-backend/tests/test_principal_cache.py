@@ -0,0 +1,105 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.api import dependencies as deps
+from app.core import principal_cache, security
+from app.core.principal_cache import Principal, PrincipalCache, get_principal_cache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(principal_cache.time, "monotonic", clock)
+    return clock
+
+
+def _principal(user_id, email="a@example.com"):
+    return Principal(user_id, email, True)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = PrincipalCache(ttl=30, max_entries=10)
+    cache.set("1", 100, _principal(1))
+
+    clock.now += 29
+    assert cache.get("1", 100) == _principal(1)
+    clock.now += 2
+    assert cache.get("1", 100) is None
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+
+def test_least_recently_used_entry_goes_first(clock):
+    cache = PrincipalCache(ttl=30, max_entries=2)
+    cache.set("1", 100, _principal(1))
+    cache.set("2", 100, _principal(2))
+    cache.get("1", 100)             # 2 is now the least recently used
+    cache.set("3", 100, _principal(3))
+
+    assert cache.get("2", 100) is None
+    assert cache.get("1", 100) and cache.get("3", 100)
+    assert cache.stats()["size"] == 2
+
+
+def test_invalidate_drops_every_token_of_the_user(clock):
+    cache = PrincipalCache(ttl=30, max_entries=10)
+    cache.set("1", 100, _principal(1))
+    cache.set("1", 200, _principal(1))
+    cache.set("12", 100, _principal(12))
+
+    cache.invalidate(1)
+
+    assert cache.get("1", 100) is None and cache.get("1", 200) is None
+    assert cache.get("12", 100) == _principal(12)
+
+
+def test_zero_ttl_disables_caching(clock):
+    cache = PrincipalCache(ttl=0, max_entries=10)
+    cache.set("1", 100, _principal(1))
+    assert cache.get("1", 100) is None
+
+
+def test_current_user_is_reloaded_after_invalidation(db, user):
+    token = security.create_access_token(user.id)
+    get_principal_cache().invalidate(user.id)
+
+    assert asyncio.run(deps.get_current_user(token)).email == user.email
+
+    user.is_active = False
+    db.commit()
+    assert asyncio.run(deps.get_current_user(token)).is_active   # still the cached snapshot
+
+    principal_cache.invalidate_principal(user.id)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(deps.get_current_user(token))
+    assert exc.value.status_code == 400
+
+
+def test_profile_update_invalidates_the_cached_principal(user):
+    from app.main import app
+
+    token = security.create_access_token(user.id)
+    new_email = f"{uuid.uuid4().hex}@example.com"
+
+    async def update_and_resolve():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test",
+                                     headers={"Authorization": f"Bearer {token}"}) as client:
+            await client.get("/api/v1/users/me")   # warms the cache
+            response = await client.put("/api/v1/users/me", json={"email": new_email})
+        return response, await deps.get_current_user(token)
+
+    response, principal = asyncio.run(update_and_resolve())
+
+    assert response.status_code == 200
+    assert principal.email == new_email
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from app.core.result_cache import (
+    AnalysisCache,
+    LocalRedis,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+    make_cache_key,
+    text_hash,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCacheBackend(max_entries=3)
+    if request.param == "sqlite":
+        return SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=3)
+    return RedisCacheBackend(LocalRedis())
+
+
+def test_keys_ignore_whitespace_but_not_parts():
+    assert text_hash("Python  developer\n") == text_hash("Python developer")
+    assert text_hash("") == ""
+    key = make_cache_key("ats", "Python developer", role="Data Scientist", version="v1")
+    assert key.startswith("ats:")
+    assert key == make_cache_key("ats", " Python\tdeveloper ", version="v1", role="Data Scientist")
+    assert key != make_cache_key("ats", "Python developer", role="Backend Engineer", version="v1")
+    assert key != make_cache_key("ats", "Python developer", role="Data Scientist", version="v2")
+
+
+def test_round_trip_returns_fresh_copies(backend):
+    cache = AnalysisCache(backend, default_ttl=60)
+    cache.set("k", {"ats_score": 72, "skills": ["Python"]})
+    first = cache.get("k")
+    first["skills"].append("mutated")
+    assert cache.get("k") == {"ats_score": 72, "skills": ["Python"]}
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["backend"] == backend.name
+
+
+def test_entries_expire(backend):
+    cache = AnalysisCache(backend, default_ttl=60)
+    cache.set("short", 1, ttl=0.05 if backend.name != "redis" else 1)
+    time.sleep(0.1 if backend.name != "redis" else 1.1)
+    assert cache.get("short") is None
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_lru_eviction(kind, tmp_path):
+    backend = (MemoryCacheBackend(max_entries=2) if kind == "memory"
+               else SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=2))
+    cache = AnalysisCache(backend, default_ttl=60)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1   # touch: "b" is now least recently used
+    time.sleep(0.01)
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert backend.size() == 2
+    assert backend.evictions == 1
+
+
+def test_backend_errors_are_misses():
+    class Broken:
+        name = "broken"
+        evictions = 0
+
+        def get(self, key):
+            raise ConnectionError("down")
+
+        def set(self, key, value, ttl):
+            raise ConnectionError("down")
+
+        def size(self):
+            raise ConnectionError("down")
+
+    cache = AnalysisCache(Broken(), default_ttl=60)
+    cache.set("k", 1)
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert stats["errors"] == 2 and stats["misses"] == 1 and stats["size"] is None
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.task_queue import TaskQueue, TaskWorker
+from app.models.all_models import Resume, ScoreDistribution, TaskRecord
+from app.services.score_percentile_service import (
+    ALL_SEGMENT,
+    ScoreHistogram,
+    ScorePercentileService,
+    _Population,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_tables(db, monkeypatch):
+    monkeypatch.setattr(settings, "PERCENTILE_MIN_SAMPLES", 3)
+    for model in (ScoreDistribution, Resume, TaskRecord):
+        db.query(model).delete()
+    db.commit()
+    ScorePercentileService._populations = {}
+    ScorePercentileService._loaded_at = time.monotonic()
+    yield
+    for model in (ScoreDistribution, Resume, TaskRecord):
+        db.query(model).delete()
+    db.commit()
+    ScorePercentileService._loaded_at = 0.0
+
+
+def _save(db, role, ats_score, **breakdown):
+    resume = Resume(title="cv", file_path="cv.pdf", predicted_role=role,
+                    ats_score=ats_score, score_breakdown=breakdown)
+    db.add(resume)
+    db.flush()
+    ScorePercentileService.record(db, resume)
+    db.commit()
+    return resume
+
+
+def test_histogram_percentile_counts_ties_half():
+    hist = ScoreHistogram(bin_width=1.0)
+    assert hist.percentile(50) == 0.0
+    for score in (10, 20, 30, 40):
+        hist.add(score)
+    assert hist.percentile(5) == 0.0
+    assert hist.percentile(20) == pytest.approx(37.5)   # 1 below + half of 1 tie, of 4
+    assert hist.percentile(35) == 75.0
+    assert hist.percentile(100) == 100.0
+    hist.add(35)   # prefix sums are rebuilt after an add
+    assert hist.percentile(35) == pytest.approx(70.0)
+
+
+def test_histogram_clamps_and_quantiles():
+    hist = ScoreHistogram(bin_width=0.5)
+    assert hist.quantile(0.5) is None
+    for score in (-5, 50, 150):
+        hist.add(score)
+    assert hist.counts[0] == 1 and hist.counts[-1] == 1
+    assert hist.quantile(0.5) == 50.25
+    assert hist.quantile(1.0) == 100.0
+
+
+def test_histogram_ignores_counts_for_another_bin_width():
+    assert ScoreHistogram(1.0, [1, 2, 3]).total == 0
+
+
+def test_small_role_falls_back_to_all_resumes(db):
+    for score in (40, 60, 80):
+        _save(db, "Data Scientist", score)
+    _save(db, "DevOps Engineer", 70)
+
+    segment, population = ScorePercentileService.population("Data Scientist")
+    assert segment == "Data Scientist" and population.sample_count == 3
+    segment, population = ScorePercentileService.population("DevOps Engineer")
+    assert segment == ALL_SEGMENT and population.sample_count == 4
+    assert ScorePercentileService.percentile(70, "Data Scientist") == pytest.approx(100 * 2 / 3)
+    assert ScorePercentileService.percentile(70, "DevOps Engineer") == pytest.approx(62.5)
+
+
+def test_no_percentile_until_enough_samples(db):
+    _save(db, "Data Scientist", 50)
+    assert ScorePercentileService.percentile(50, "Data Scientist") is None
+
+
+def test_placeholder_roles_count_only_in_all_segment(db):
+    _save(db, "Analyzing...", 50)
+    _save(db, "", 60)
+    rows = {row.segment: row.sample_count for row in db.query(ScoreDistribution)}
+    assert rows == {ALL_SEGMENT: 2}
+
+
+def test_breakdown_metrics(db):
+    for coverage in (20, 40, 60):
+        _save(db, "Data Scientist", 50, skill_coverage=coverage)
+    assert ScorePercentileService.percentile(40, "Data Scientist", "skill_coverage") == pytest.approx(50.0)
+
+
+def test_incremental_updates_match_rebuild(db):
+    samples = [("Data Scientist", 55.5, 40), ("Data Scientist", 72, 80), ("Backend Engineer", 90, 65),
+               ("Data Scientist", 63.2, 70), ("Analyzing...", 30, 10)]
+    for role, score, coverage in samples:
+        _save(db, role, score, skill_coverage=coverage)
+    incremental = {row.segment: (row.sample_count, row.histograms) for row in db.query(ScoreDistribution)}
+    in_memory = {segment: (p.sample_count, p.to_json()) for segment, p in ScorePercentileService._populations.items()}
+
+    assert ScorePercentileService.rebuild(db) == len(samples)
+    db.expire_all()
+    rebuilt = {row.segment: (row.sample_count, row.histograms) for row in db.query(ScoreDistribution)}
+    assert incremental == rebuilt == in_memory
+
+
+def test_rebuild_replaces_stale_rows(db):
+    db.add(ScoreDistribution(segment="Old Role", sample_count=99,
+                             bin_width=settings.PERCENTILE_BIN_WIDTH,
+                             histograms=_Population(settings.PERCENTILE_BIN_WIDTH).to_json()))
+    db.commit()
+    db.add(Resume(title="cv", file_path="cv.pdf", predicted_role="Data Scientist", ats_score=70))
+    db.commit()
+
+    assert ScorePercentileService.rebuild(db) == 1
+    assert {row.segment for row in db.query(ScoreDistribution)} == {ALL_SEGMENT, "Data Scientist"}
+
+
+def _break_segment(db, segment):
+    """A row built with another bin width makes record() fail for `segment`."""
+    db.add(ScoreDistribution(segment=segment, sample_count=1, bin_width=settings.PERCENTILE_BIN_WIDTH * 2,
+                             histograms={}))
+    db.commit()
+
+
+def _repair_tasks(db):
+    db.expire_all()
+    return db.query(TaskRecord).filter(TaskRecord.kind == "score_percentiles_rebuild").all()
+
+
+def _run_queued_tasks():
+    async def main():
+        worker = TaskWorker(lanes=["batch"])
+        while (task := await asyncio.to_thread(TaskQueue.claim, "test-worker", ["batch"])) is not None:
+            await worker._execute(task, "test-worker")
+    asyncio.run(main())
+
+
+def test_failed_update_keeps_resume_and_is_repaired(db):
+    _break_segment(db, "Data Scientist")
+    _save(db, "Data Scientist", 70)
+    assert db.query(Resume).count() == 1
+    (task,) = _repair_tasks(db)
+    assert task.status == "queued" and task.lane == "batch"
+
+    _run_queued_tasks()
+    rows = {row.segment: (row.bin_width, row.sample_count) for row in db.query(ScoreDistribution)}
+    assert rows["Data Scientist"] == (settings.PERCENTILE_BIN_WIDTH, 1)
+    assert _repair_tasks(db)[0].status == "done"
+
+
+def test_failure_after_a_finished_repair_queues_it_again(db):
+    _break_segment(db, "Data Scientist")
+    _save(db, "Data Scientist", 70)
+    _run_queued_tasks()
+
+    _break_segment(db, "Backend Engineer")
+    _save(db, "Backend Engineer", 80)
+    (task,) = _repair_tasks(db)
+    assert task.status == "queued"
+    _run_queued_tasks()
+    db.expire_all()
+    assert db.get(ScoreDistribution, "Backend Engineer").bin_width == settings.PERCENTILE_BIN_WIDTH
+    assert db.get(ScoreDistribution, ALL_SEGMENT).sample_count == 2
+
+
+def test_rebuild_runs_in_a_thread_when_it_cannot_be_queued(db, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    monkeypatch.setattr(TaskQueue, "enqueue", unavailable)
+    db.add(Resume(title="cv", file_path="cv.pdf", predicted_role="Data Scientist", ats_score=70))
+    db.commit()
+    ScorePercentileService.schedule_rebuild(reason="update-failed")
+    for thread in threading.enumerate():
+        if thread.name == "percentile-rebuild":
+            thread.join(timeout=10)
+    db.expire_all()
+    assert db.get(ScoreDistribution, ALL_SEGMENT).sample_count == 1
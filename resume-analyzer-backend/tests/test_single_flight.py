@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.resilience import SingleFlight
+
+
+def test_concurrent_async_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"score": 72}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert results == [{"score": 72}] * 5
+    assert flight.stats()["executed"] == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+
+    async def main():
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0.01, result="a")),
+            flight.do("b", lambda: asyncio.sleep(0.01, result="b")),
+        )
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flight.executed == 2 and flight.coalesced == 0
+
+
+def test_exception_is_shared_and_not_cached():
+    flight = SingleFlight("test")
+    attempts = 0
+
+    async def failing():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert attempts == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    # The failure is forgotten once the call finishes: the next caller runs again
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do("key", failing))
+    assert attempts == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight("test")
+
+    async def main():
+        first = asyncio.create_task(flight.do("key", lambda: asyncio.sleep(0.05, result="done")))
+        second = asyncio.create_task(flight.do("key", lambda: asyncio.sleep(0.05, result="other")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_do_sync_coalesces_threads():
+    flight = SingleFlight("test")
+    calls = 0
+    started = threading.Event()
+
+    def work():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.1)
+        return "parsed"
+
+    results = []
+
+    def caller():
+        results.append(flight.do_sync("key", work))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=caller) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert calls == 1
+    assert results == ["parsed"] * 5
+    assert flight.coalesced == 4
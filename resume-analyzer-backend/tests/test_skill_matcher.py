@@ -0,0 +1,61 @@
+from app.services.ai_skill_ontology import SkillMatcher, SkillOntology
+
+TERMS = {
+    "python": "Python",
+    "r": "R",
+    "go": "Go",
+    "java": "Java",
+    "javascript": "JavaScript",
+    "linux": "Linux",
+    "kali linux": "Kali Linux",
+    "machine learning": "Machine Learning",
+    "c++": "C++",
+}
+
+
+def test_word_boundaries():
+    matcher = SkillMatcher(TERMS)
+    assert matcher.find("Java and JavaScript") == {"Java", "JavaScript"}
+    # Short terms do not hit inside other words
+    assert matcher.find("Ruby, Google, Rust, Golang") == set()
+    assert matcher.find("Go and R") == {"Go", "R"}
+
+
+def test_case_and_whitespace_insensitive():
+    matcher = SkillMatcher(TERMS)
+    assert matcher.find("MACHINE\n  LEARNING with PyThOn") == {"Machine Learning", "Python"}
+
+
+def test_symbols_in_terms():
+    matcher = SkillMatcher(TERMS)
+    assert matcher.find("Modern C++ and C") == {"C++"}
+
+
+def test_nested_terms_reported_by_find_and_finditer():
+    matcher = SkillMatcher(TERMS)
+    text = "Pentesting on Kali Linux"
+    assert matcher.find(text) == {"Kali Linux", "Linux"}
+    spans = matcher.finditer(text)
+    assert spans == [("Kali Linux", 14, 24), ("Linux", 19, 24)]
+    assert {canonical for canonical, _, _ in spans} == matcher.find(text)
+    assert [text[start:end] for _, start, end in spans] == ["Kali Linux", "Linux"]
+
+
+def test_finditer_in_text_order():
+    matcher = SkillMatcher(TERMS)
+    spans = matcher.finditer("Python, then Java, then Go")
+    assert [canonical for canonical, _, _ in spans] == ["Python", "Java", "Go"]
+
+
+def test_empty_input_and_vocabulary():
+    assert SkillMatcher(TERMS).find("") == set()
+    assert SkillMatcher(TERMS).finditer("") == []
+    assert SkillMatcher({}).find("Python") == set()
+
+
+def test_ontology_terms_prefer_skill_names_over_synonyms():
+    terms = SkillOntology.matcher_terms()
+    for categories in SkillOntology.CLUSTERS.values():
+        for skills in categories.values():
+            for skill in skills:
+                assert terms[skill.lower()] == skill
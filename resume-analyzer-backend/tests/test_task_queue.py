@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.task_queue import PermanentTaskError, TaskQueue, TaskWorker, task_handler
+from app.models.all_models import TaskRecord
+
+WORKER = "test-worker"
+
+
+@pytest.fixture(autouse=True)
+def _empty_queue(db):
+    db.query(TaskRecord).delete()
+    db.commit()
+    yield
+    db.query(TaskRecord).delete()
+    db.commit()
+
+
+def _row(db, task_id):
+    db.expire_all()
+    return db.get(TaskRecord, task_id)
+
+
+def _drain(worker: TaskWorker) -> None:
+    """Run each due task once (attempts scheduled in the future stay queued)."""
+    async def main():
+        while True:
+            task = await asyncio.to_thread(TaskQueue.claim, WORKER, worker.lanes)
+            if task is None:
+                return
+            await worker._execute(task, WORKER)
+    asyncio.run(main())
+
+
+def test_claim_leases_interactive_before_batch(db):
+    batch = TaskQueue.enqueue("test_noop", {}, lane="batch")
+    interactive = TaskQueue.enqueue("test_noop", {}, lane="interactive")
+
+    task = TaskQueue.claim(WORKER, ["interactive", "batch"])
+    assert task.id == interactive
+    row = _row(db, interactive)
+    assert (row.status, row.attempts, row.locked_by) == ("running", 1, WORKER)
+
+    assert TaskQueue.claim(WORKER, ["batch"]).id == batch
+    assert TaskQueue.claim(WORKER, ["interactive", "batch"]) is None
+
+
+def test_enqueue_is_idempotent_and_requeues_failed_tasks(db):
+    first = TaskQueue.enqueue("test_noop", {"n": 1}, idempotency_key="once")
+    assert TaskQueue.enqueue("test_noop", {"n": 2}, idempotency_key="once") == first
+    assert _row(db, first).payload == {"n": 1}
+
+    row = _row(db, first)
+    row.status = "failed"
+    db.commit()
+    assert TaskQueue.enqueue("test_noop", {"n": 3}, idempotency_key="once") == first
+    row = _row(db, first)
+    assert (row.status, row.attempts, row.payload) == ("queued", 0, {"n": 3})
+
+
+def test_expired_lease_is_reclaimed(db):
+    task_id = TaskQueue.enqueue("test_noop", {})
+    stale = TaskQueue.claim("dead-worker", ["interactive"])
+    assert TaskQueue.claim(WORKER, ["interactive"]) is None
+
+    row = _row(db, task_id)
+    row.locked_at = datetime.utcnow() - timedelta(seconds=settings.TASK_LEASE_SECONDS + 1)
+    db.commit()
+    reclaimed = TaskQueue.claim(WORKER, ["interactive"])
+    assert reclaimed.id == task_id and reclaimed.attempts == 2
+
+    # The dead worker's late completion no longer owns the row
+    TaskQueue.complete(stale, "dead-worker")
+    assert _row(db, task_id).status == "running"
+    TaskQueue.complete(reclaimed, WORKER)
+    assert _row(db, task_id).status == "done"
+
+
+def test_failures_retry_with_backoff_then_give_up(db, monkeypatch):
+    monkeypatch.setattr(settings, "TASK_RETRY_BASE_SECONDS", 0.0)
+    given_up = []
+
+    @task_handler("test_flaky", max_attempts=3, on_give_up=lambda payload, error: given_up.append(error))
+    def flaky(payload):
+        raise RuntimeError("provider timeout")
+
+    task_id = TaskQueue.enqueue("test_flaky", {})
+    worker = TaskWorker(lanes=["interactive"])
+    _drain(worker)
+
+    row = _row(db, task_id)
+    assert (row.status, row.attempts) == ("failed", 3)
+    assert row.last_error == "RuntimeError: provider timeout"
+    assert given_up == ["RuntimeError: provider timeout"]
+    assert worker.failed == 3
+
+
+def test_retry_is_scheduled_in_the_future(db):
+    task_id = TaskQueue.enqueue("test_noop", {})
+    task = TaskQueue.claim(WORKER, ["interactive"])
+    assert TaskQueue.fail(task, WORKER, "boom") is True
+
+    row = _row(db, task_id)
+    assert row.status == "queued" and row.run_at > datetime.utcnow()
+    assert TaskQueue.claim(WORKER, ["interactive"]) is None
+
+
+def test_permanent_error_is_not_retried(db):
+    given_up = []
+
+    @task_handler("test_misconfigured", max_attempts=3, on_give_up=lambda payload, error: given_up.append(payload))
+    async def misconfigured(payload):
+        raise PermanentTaskError("GEMINI_API_KEY not configured")
+
+    task_id = TaskQueue.enqueue("test_misconfigured", {"resume_id": 7})
+    _drain(TaskWorker(lanes=["interactive"]))
+
+    row = _row(db, task_id)
+    assert (row.status, row.attempts) == ("failed", 1)
+    assert given_up == [{"resume_id": 7}]
+
+
+def test_unknown_kind_fails_without_retry(db):
+    task_id = TaskQueue.enqueue("test_unregistered", {})
+    _drain(TaskWorker(lanes=["interactive"]))
+    row = _row(db, task_id)
+    assert (row.status, row.attempts) == ("failed", 1)
+    assert row.last_error.startswith("LookupError")
+
+
+def test_success_and_wait(db):
+    done = []
+
+    @task_handler("test_ok")
+    def ok(payload):
+        done.append(payload["n"])
+
+    task_id = TaskQueue.enqueue("test_ok", {"n": 1})
+    assert asyncio.run(TaskQueue.wait(task_id, timeout=0)) == "queued"
+    worker = TaskWorker(lanes=["interactive"])
+    _drain(worker)
+    assert done == [1] and worker.processed == 1
+    assert asyncio.run(TaskQueue.wait(task_id, timeout=1, poll_interval=0.01)) == "done"
+    assert TaskQueue.stats()["interactive"] == {"done": 1}
+
+
+def test_wait_for_pickup(db):
+    task_id = TaskQueue.enqueue("test_noop", {})
+    assert asyncio.run(TaskQueue.wait_for_pickup(task_id, timeout=0.05, poll_interval=0.01)) is False
+    TaskQueue.claim(WORKER, ["interactive"])
+    assert asyncio.run(TaskQueue.wait_for_pickup(task_id, timeout=0.05, poll_interval=0.01)) is True
+    # A retry puts the task back in "queued", but it was picked up before
+    TaskQueue.fail(_row(db, task_id), WORKER, "boom")
+    assert asyncio.run(TaskQueue.wait_for_pickup(task_id, timeout=0, poll_interval=0.01)) is True
@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api.uploads import receive_upload
+from app.core.blob_store import get_blob_store
+from app.models.all_models import StoredBlob
+from app.services.upload_pipeline import UploadPipeline
+
+BOUNDARY = "test-boundary"
+RESUME = b"Jane Doe\nPython, FastAPI, PostgreSQL\nSoftware Engineer at Acme\n"
+
+
+def _multipart(filename, content, **fields):
+    body = b""
+    for name, value in fields.items():
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n").encode()
+    body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+             "Content-Type: application/octet-stream\r\n\r\n").encode()
+    return body + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _streamed_request(body, chunk_size=1024):
+    """A request whose body arrives in chunks, with no Content-Length to reject it up front."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    async def receive():
+        data = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": data, "more_body": bool(chunks)}
+
+    scope = {"type": "http", "method": "POST", "path": "/", "query_string": b"",
+             "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]}
+    return Request(scope, receive)
+
+
+def _spooled(spool_dir):
+    return [name for name in os.listdir(spool_dir) if name.startswith(".upload_")] if os.path.isdir(spool_dir) else []
+
+
+def test_streamed_upload_is_hashed_and_spooled(tmp_path):
+    spool_dir = str(tmp_path)
+    request = _streamed_request(_multipart("cv.txt", RESUME, title="My CV"))
+    upload = asyncio.run(receive_upload(request, "file", max_bytes=1024, spool_dir=spool_dir))
+
+    assert upload.fields == {"title": "My CV"}
+    assert (upload.filename, upload.size) == ("cv.txt", len(RESUME))
+    assert upload.sha256 == hashlib.sha256(RESUME).hexdigest()
+    with open(upload.path, "rb") as f:
+        assert f.read() == RESUME
+    upload.discard()
+    assert _spooled(spool_dir) == []
+
+
+def test_oversized_upload_is_aborted_mid_stream_without_leftovers(tmp_path):
+    spool_dir = str(tmp_path)
+    request = _streamed_request(_multipart("cv.txt", b"x" * 64 * 1024, title="My CV"))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(receive_upload(request, "file", max_bytes=8 * 1024, spool_dir=spool_dir))
+
+    assert exc.value.status_code == 413
+    assert _spooled(spool_dir) == []
+
+
+def test_disallowed_extension_is_rejected_before_spooling(tmp_path):
+    spool_dir = str(tmp_path)
+    request = _streamed_request(_multipart("cv.exe", RESUME, title="My CV"))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(receive_upload(request, "file", max_bytes=1024, spool_dir=spool_dir,
+                                   allowed_extensions={"pdf", "docx", "txt"}))
+
+    assert exc.value.status_code == 400
+    assert _spooled(spool_dir) == []
+
+
+def _post_upload(api, content=RESUME):
+    files = {"file": ("cv.txt", content, "text/plain")}
+    return asyncio.run(api.post("/api/v1/resumes/upload", files=files, data={"title": "My CV"}))
+
+
+def test_upload_endpoint_stores_the_blob_and_starts_a_job(db, api, monkeypatch):
+    started = []
+    monkeypatch.setattr(UploadPipeline, "start", staticmethod(lambda *args: started.append(args)))
+
+    response = _post_upload(api)
+
+    assert response.status_code == 202
+    digest = hashlib.sha256(RESUME).hexdigest()
+    assert started and started[0][:3] == (response.json()["job_id"], digest, "cv.txt")
+    assert db.query(StoredBlob).filter(StoredBlob.sha256 == digest).one().refcount == 1
+    assert _spooled("uploads") == []
+
+    get_blob_store().release(digest)
+
+
+def test_upload_endpoint_releases_the_blob_when_no_job_is_created(db, api, monkeypatch):
+    async def failing_create_job(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(UploadPipeline, "create_job", staticmethod(failing_create_job))
+    content = RESUME + b"orphan check\n"
+
+    response = _post_upload(api, content)
+
+    assert response.status_code == 500
+    digest = hashlib.sha256(content).hexdigest()
+    assert db.query(StoredBlob).filter(StoredBlob.sha256 == digest).first() is None
+    assert _spooled("uploads") == []
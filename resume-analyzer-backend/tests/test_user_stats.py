@@ -0,0 +1,72 @@
+import asyncio
+
+from app.api.endpoints.advanced_features import create_version_snapshot
+from app.core.principal_cache import Principal
+from app.db.session import AsyncSessionLocal
+from app.models.all_models import Resume, ResumeVersion, UserStats
+from app.services.user_stats_service import UserStatsService
+
+ROLLUP_FIELDS = ("resume_count", "scored_count", "ats_score_sum", "ats_score_max", "snapshot_count",
+                 "latest_snapshot_score", "monthly_uploads", "weekday_uploads", "skill_counts")
+
+
+def _rollup(stats):
+    return {field: getattr(stats, field) for field in ROLLUP_FIELDS}
+
+
+def _add_resume(db, user, ats_score, **breakdown):
+    resume = Resume(title="cv", file_path="cv.pdf", owner_id=user.id, ats_score=ats_score,
+                    score_breakdown=breakdown)
+    db.add(resume)
+    db.commit()
+    UserStatsService.record_resume(db, resume)
+    return resume
+
+
+def test_incremental_resume_updates_match_rebuild(db, user):
+    UserStatsService.get(db, user.id)   # start from an (empty) stored row
+    for score in (55.0, 72.5, 64.0):
+        _add_resume(db, user, score, skill_coverage=50)
+
+    db.expire_all()
+    incremental = _rollup(db.get(UserStats, user.id))
+    assert incremental["resume_count"] == 3 and incremental["ats_score_max"] == 72.5
+    assert incremental == _rollup(UserStatsService.compute(db, user.id))
+
+
+def test_pruned_snapshots_are_not_counted(db, user):
+    resume = _add_resume(db, user, 70.0)
+    principal = Principal(user.id, user.email, True)
+
+    async def snapshot():
+        async with AsyncSessionLocal() as session:
+            return await create_version_snapshot(resume.id, db=session, current_user=principal)
+
+    async def take(count):
+        for _ in range(count):
+            await snapshot()
+
+    asyncio.run(take(22))   # the retention limit (20 per resume) prunes the two oldest
+
+    db.expire_all()
+    assert db.query(ResumeVersion).filter(ResumeVersion.resume_id == resume.id).count() == 20
+    incremental = db.get(UserStats, user.id)
+    rebuilt = UserStatsService.compute(db, user.id)
+    assert incremental.snapshot_count == rebuilt.snapshot_count == 20
+    assert incremental.latest_snapshot_score == rebuilt.latest_snapshot_score == 70.0
+    assert UserStatsService.summary(incremental)["snapshots"] == 20
+
+
+def test_failed_update_drops_the_row_for_rebuild(db, user, monkeypatch):
+    _add_resume(db, user, 60.0)
+
+    def broken(stats, *args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("app.services.user_stats_service._add_resume", broken)
+    _add_resume(db, user, 80.0)
+    db.expire_all()
+    assert db.get(UserStats, user.id) is None
+
+    monkeypatch.undo()
+    assert UserStatsService.get(db, user.id).resume_count == 2
@@ -91,6 +91,7 @@ export const resumeAPI = {
     }),
     getAll: () => api.get('/resumes/'),
     getById: (id) => api.get(`/resumes/${id}`),
+    getUploadJob: (jobId) => api.get(`/resumes/jobs/${jobId}`),
 };
 
 // Job API
@@ -3,6 +3,10 @@ import { useNavigate } from 'react-router-dom';
 import { resumeAPI } from '../api';
 import { Upload, FileText, AlertCircle, CheckCircle } from 'lucide-react';
 
+// Upload job polling: once a second, for up to 3 minutes (scanned PDFs go through OCR)
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_MAX_ATTEMPTS = 180;
+
 export default function UploadResume() {
     const [file, setFile] = useState(null);
     const [title, setTitle] = useState('');
@@ -40,7 +44,21 @@ export default function UploadResume() {
 
         try {
             const response = await resumeAPI.upload(formData);
-            navigate(`/resume/${response.data.id}`);
+            // Upload returns 202 + job id; the analysis page is ready once scoring has saved the resume
+            let job = (await resumeAPI.getUploadJob(response.data.job_id)).data;
+            for (let attempt = 1; !job.resume_id && job.status !== 'failed'; attempt++) {
+                if (attempt > JOB_POLL_MAX_ATTEMPTS) {
+                    setError('Analysis is taking longer than expected. Please check your dashboard shortly or upload again.');
+                    return;
+                }
+                await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+                job = (await resumeAPI.getUploadJob(response.data.job_id)).data;
+            }
+            if (!job.resume_id) {
+                setError(job.error || 'Analysis failed');
+                return;
+            }
+            navigate(`/resume/${job.resume_id}`);
         } catch (err) {
             setError(err.response?.data?.error || err.response?.data?.detail || 'Upload failed');
         } finally {